@@ -1,7 +1,11 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox
-import subprocess
 import os
+import sys
+
+from os.path import dirname, join
+sys.path.insert(0, join(dirname(dirname(__file__)), "Tool module"))
+from YinPinChuLi import check_ffmpeg, extract_audio
 
 class AudioExtractorApp:
     def __init__(self, root):
@@ -106,29 +110,18 @@ class AudioExtractorApp:
             return
 
         # 检查 FFmpeg 是否可用
-        try:
-            subprocess.run(["ffmpeg", "-version"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        except FileNotFoundError:
+        if not check_ffmpeg():
             messagebox.showerror("错误", "FFmpeg 未安装或不在系统路径中。")
             return
 
         # 执行 FFmpeg 命令
-        command = [
-            'ffmpeg',
-            '-i', video_file,
-            '-q:a', '0',
-            '-map', 'a',
-            '-y',
-            audio_file
-        ]
-
         try:
-            subprocess.run(command, check=True)
+            extract_audio(video_file, audio_file)
             self.status_label.config(text="✅ 提取成功！", fg="green")
             messagebox.showinfo("成功", f"音频已保存至：{audio_file}")
-        except subprocess.CalledProcessError:
+        except (RuntimeError, OSError) as e:
             self.status_label.config(text="❌ 提取失败！", fg="red")
-            messagebox.showerror("错误", "音频提取过程中发生错误。")
+            messagebox.showerror("错误", str(e))
 
 if __name__ == "__main__":
     root = tk.Tk()
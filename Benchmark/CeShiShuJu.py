@@ -0,0 +1,175 @@
+# 禁止生成 .pyc 文件
+import sys
+sys.dont_write_bytecode = True
+
+import math
+import os
+import random
+import shutil
+import subprocess
+
+# 基准测试使用的合成测试数据。
+# 所有数据都在本地生成，使用固定的随机种子，同样的规模每次生成的内容相同；
+# 生成后缓存在数据目录下，再次运行时直接复用。
+
+# 测试规模：PDF页数、图片像素(百万)、目录树条目数、视频秒数、换算次数
+SIZES = {
+    "small": {"pages": 10, "megapixels": 1, "entries": 1000, "video_seconds": 5, "conversions": 10000},
+    "medium": {"pages": 1000, "megapixels": 10, "entries": 10000, "video_seconds": 30, "conversions": 100000},
+    "large": {"pages": 10000, "megapixels": 100, "entries": 100000, "video_seconds": 120, "conversions": 1000000},
+}
+
+SEED = 20240101
+
+def _image_size(megapixels: float):
+    """按 4:3 比例计算指定像素数的图片尺寸"""
+    width = int(math.sqrt(megapixels * 1e6 * 4 / 3))
+    return width, int(megapixels * 1e6 / width)
+
+def make_pdf(path: str, pages: int) -> str:
+    """生成指定页数的文字PDF，优先使用 PyMuPDF，没有时使用 reportlab"""
+    if os.path.exists(path):
+        return path
+    rng = random.Random(SEED + pages)
+    words = ["三垣", "工具", "PDF", "benchmark", "page", "拆分", "合并", "水印", "lorem", "ipsum"]
+    tmp_path = path + ".tmp"
+    try:
+        import fitz
+        document = fitz.open()
+        for i in range(pages):
+            page = document.new_page()
+            page.insert_text((72, 72), f"Page {i + 1}", fontsize=24)
+            text = " ".join(rng.choice(words[2:]) for _ in range(200))
+            page.insert_textbox(fitz.Rect(72, 100, 540, 760), text, fontsize=10)
+        document.save(tmp_path)
+        document.close()
+    except ImportError:
+        from reportlab.pdfgen import canvas
+        can = canvas.Canvas(tmp_path)
+        for i in range(pages):
+            can.setFont("Helvetica", 24)
+            can.drawString(72, 770, f"Page {i + 1}")
+            can.setFont("Helvetica", 10)
+            for line in range(40):
+                can.drawString(72, 740 - line * 16, " ".join(rng.choice(words[2:]) for _ in range(12)))
+            can.showPage()
+        can.save()
+    os.replace(tmp_path, path)
+    return path
+
+def make_image(path: str, megapixels: float) -> str:
+    """生成指定像素数的RGB图片(渐变叠加固定种子的噪点)"""
+    if os.path.exists(path):
+        return path
+    from PIL import Image
+
+    width, height = _image_size(megapixels)
+    rng = random.Random(SEED)
+    noise = Image.frombytes("L", (256, 256), bytes(rng.getrandbits(8) for _ in range(256 * 256)))
+    image = Image.merge("RGB", [
+        Image.linear_gradient("L").resize((width, height)),
+        Image.radial_gradient("L").resize((width, height)),
+        noise.resize((width, height)),
+    ])
+    tmp_path = path + ".tmp"
+    image.save(tmp_path, "JPEG", quality=90)
+    os.replace(tmp_path, path)
+    return path
+
+def make_tiles(directory: str, image_path: str) -> list:
+    """将测试图片切成九宫格，作为图片合成的输入"""
+    from PIL import Image
+
+    tiles = [os.path.join(directory, f"tile_{i}.png") for i in range(9)]
+    if all(os.path.exists(tile) for tile in tiles):
+        return tiles
+    os.makedirs(directory, exist_ok=True)
+    with Image.open(image_path) as img:
+        tile_width, tile_height = img.size[0] // 3, img.size[1] // 3
+        for i, tile in enumerate(tiles):
+            left, upper = (i % 3) * tile_width, (i // 3) * tile_height
+            img.crop((left, upper, left + tile_width, upper + tile_height)).save(tile)
+    return tiles
+
+def _tree_dirs(root: str, count: int) -> list:
+    """按编号的十进制位生成多层目录路径，如 12 -> root/d1/d2"""
+    return [os.path.join(root, *[f"d{digit}" for digit in str(i)]) for i in range(count)]
+
+def make_tree(root: str, entries: int) -> str:
+    """生成约有指定条目数的多层目录树(每个目录9个空文件)"""
+    marker = os.path.join(root, ".complete")
+    if os.path.exists(marker):
+        return root
+    if os.path.exists(root):
+        shutil.rmtree(root)
+    for directory in _tree_dirs(root, max(1, entries // 10)):
+        os.makedirs(directory, exist_ok=True)
+        for j in range(9):
+            open(os.path.join(directory, f"f{j}.txt"), "w").close()
+    open(marker, "w").close()
+    return root
+
+def make_empty_tree(root: str, entries: int) -> int:
+    """生成只包含空目录的目录树(用于空文件夹清理，每次运行都会被删除)"""
+    directories = _tree_dirs(root, entries)
+    for directory in directories:
+        os.makedirs(directory, exist_ok=True)
+    return len(directories)
+
+def has_ffmpeg() -> bool:
+    return shutil.which("ffmpeg") is not None
+
+def make_video(path: str, seconds: int) -> str:
+    """使用 FFmpeg 生成带静音音轨的测试视频，没有 FFmpeg 时返回 None"""
+    if os.path.exists(path):
+        return path
+    if not has_ffmpeg():
+        return None
+    tmp_path = path + ".tmp.mp4"
+    subprocess.run([
+        "ffmpeg", "-y", "-loglevel", "error",
+        "-f", "lavfi", "-i", f"testsrc=size=320x240:rate=25:duration={seconds}",
+        "-f", "lavfi", "-i", "anullsrc=r=44100:cl=stereo",
+        "-t", str(seconds), "-shortest", "-c:v", "libx264", "-c:a", "aac", tmp_path
+    ], check=True)
+    os.replace(tmp_path, path)
+    return path
+
+def prepare(fixture_dir: str, size: str, log=print) -> dict:
+    """
+    生成(或复用)指定规模的全部测试数据。
+
+    依赖未安装时对应的数据会被跳过，使用这些数据的测试项会标记为跳过。
+
+    Returns:
+        dict: 数据名 -> 路径，如 {"pdf": ..., "image": ..., "tiles": [...], "tree": ..., "video": ...}
+    """
+    spec = SIZES[size]
+    os.makedirs(fixture_dir, exist_ok=True)
+    fixtures = {}
+
+    def build(name, func, *args):
+        log(f"准备测试数据: {name} ({size})")
+        try:
+            fixtures[name] = func(*args)
+        except ImportError as e:
+            log(f"  跳过 {name}: {str(e)}")
+
+    build("pdf", make_pdf, os.path.join(fixture_dir, f"pdf_{spec['pages']}.pdf"), spec["pages"])
+    build("image", make_image, os.path.join(fixture_dir, f"image_{spec['megapixels']}mp.jpg"),
+          spec["megapixels"])
+    if "image" in fixtures:
+        build("tiles", make_tiles, os.path.join(fixture_dir, f"tiles_{spec['megapixels']}mp"),
+              fixtures["image"])
+        image_dir = os.path.join(fixture_dir, f"images_{spec['megapixels']}mp")
+        os.makedirs(image_dir, exist_ok=True)
+        image_copy = os.path.join(image_dir, os.path.basename(fixtures["image"]))
+        if not os.path.exists(image_copy):
+            shutil.copyfile(fixtures["image"], image_copy)
+        fixtures["image_dir"] = image_dir
+    build("tree", make_tree, os.path.join(fixture_dir, f"tree_{spec['entries']}"), spec["entries"])
+    build("video", make_video, os.path.join(fixture_dir, f"video_{spec['video_seconds']}s.mp4"),
+          spec["video_seconds"])
+    if fixtures.get("video") is None:
+        fixtures.pop("video", None)
+    return fixtures
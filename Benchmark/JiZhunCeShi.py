@@ -0,0 +1,334 @@
+# 禁止生成 .pyc 文件
+import sys
+sys.dont_write_bytecode = True
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import tempfile
+import time
+
+from os.path import dirname, join
+sys.path.insert(0, join(dirname(dirname(os.path.abspath(__file__))), "Tool module"))
+sys.path.insert(0, dirname(os.path.abspath(__file__)))
+from PeiZhi import get_data_dir
+from JieGuoHuanCun import NO_CACHE_ENV
+from CeShiShuJu import SIZES, prepare
+
+# 基准测试测量的是实际计算，不使用结果缓存(子进程继承该环境变量)
+os.environ[NO_CACHE_ENV] = "1"
+
+# 各工具核心操作的基准测试。
+#
+# 用法：
+#   python Benchmark/JiZhunCeShi.py                         运行 small 规模的全部测试
+#   python Benchmark/JiZhunCeShi.py --size small,medium --case pdf-split,pdf-merge
+#   python Benchmark/JiZhunCeShi.py --compare 旧结果.json 新结果.json
+#
+# 每个测试项在独立的子进程中运行，以便准确统计峰值内存(RSS)；
+# 结果保存为JSON，包括耗时、每秒处理的页数/文件数和峰值内存。
+
+def _peak_rss_mb():
+    """当前进程的峰值常驻内存(MB)，不支持的系统返回 None"""
+    # Linux 优先读取 VmHWM：ru_maxrss 会继承 fork 前父进程的内存峰值
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except (OSError, ValueError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为KB，macOS 为字节
+    if sys.platform == "darwin":
+        return round(peak / (1024 * 1024), 1)
+    return round(peak / 1024, 1)
+
+# ---- 测试项 ----
+# 每个测试项接收 (fixtures, spec, workdir)，返回 (处理数量, 单位)
+
+def case_pdf_split(fixtures, spec, workdir):
+    from PDFChuLi import split_pdf_by_count
+    result = split_pdf_by_count(fixtures["pdf"], workdir, 10)
+    return result["pages"], "页"
+
+def case_pdf_merge(fixtures, spec, workdir):
+    from PDFChuLi import merge_pdfs
+    result = merge_pdfs([(fixtures["pdf"], None), (fixtures["pdf"], None)],
+                        os.path.join(workdir, "merged.pdf"))
+    return result["pages"], "页"
+
+def case_pdf_watermark(fixtures, spec, workdir):
+    from PDFChuLi import add_watermark
+    result = add_watermark(fixtures["pdf"], os.path.join(workdir, "watermark.pdf"), "Benchmark")
+    return result["pages"], "页"
+
+def case_pdf_to_image(fixtures, spec, workdir):
+    from PDFChuLi import pdf_to_images
+    # 渲染耗时远高于其他操作，最多渲染前100页
+    result = pdf_to_images(fixtures["pdf"], workdir, range(min(spec["pages"], 100)), "png", 150)
+    return result["pages"], "页"
+
+def case_image_to_pdf(fixtures, spec, workdir):
+    from PDFChuLi import images_to_pdf
+    result = images_to_pdf(fixtures["tiles"], os.path.join(workdir, "images.pdf"))
+    return result["pages"], "张"
+
+def case_image_convert(fixtures, spec, workdir):
+    from TuPianChuLi import convert_images
+    result = convert_images(fixtures["image_dir"], workdir, "png", 90)
+    if result["failed"]:
+        raise RuntimeError(result["failed"][0][1])
+    return spec["megapixels"] * len(result["outputs"]), "百万像素"
+
+def case_image_grid(fixtures, spec, workdir):
+    from TuPianChuLi import split_grid
+    split_grid(fixtures["image"], workdir)
+    return spec["megapixels"], "百万像素"
+
+def case_image_combine(fixtures, spec, workdir):
+    from TuPianChuLi import combine_images, save_image
+    image = combine_images(fixtures["tiles"], "uniform")
+    save_image(image, os.path.join(workdir, "combined.png"))
+    return len(fixtures["tiles"]), "张"
+
+def case_dir_tree(fixtures, spec, workdir):
+    from WenJianChuLi import generate_dir_tree
+    tree = generate_dir_tree(fixtures["tree"])
+    return tree.count("\n"), "条"
+
+def case_clean_empty(fixtures, spec, workdir):
+    from WenJianChuLi import remove_empty_folders
+    return remove_empty_folders(fixtures["empty_tree"]), "个目录"
+
+def case_rmb_upper(fixtures, spec, workdir):
+    from QiTaChuLi import RMBUpperConverter
+    converter = RMBUpperConverter()
+    count = spec["conversions"]
+    for i in range(count):
+        converter.convert(f"{i * 7919 % 10 ** 12}.{i % 100:02d}")
+    return count, "次"
+
+def case_length(fixtures, spec, workdir):
+    from QiTaChuLi import UNITS, length_converter
+    units = list(UNITS)
+    count = spec["conversions"]
+    for i in range(count):
+        length_converter(i * 1.5, units[i % len(units)], units[(i * 7) % len(units)])
+    return count, "次"
+
+def case_audio_extract(fixtures, spec, workdir):
+    from YinPinChuLi import extract_audio
+    extract_audio(fixtures["video"], os.path.join(workdir, "audio.mp3"))
+    return spec["video_seconds"], "秒视频"
+
+# 测试项 -> (函数, 需要的测试数据)
+CASES = {
+    "pdf-split": (case_pdf_split, ["pdf"]),
+    "pdf-merge": (case_pdf_merge, ["pdf"]),
+    "pdf-watermark": (case_pdf_watermark, ["pdf"]),
+    "pdf-to-image": (case_pdf_to_image, ["pdf"]),
+    "image-to-pdf": (case_image_to_pdf, ["tiles"]),
+    "image-convert": (case_image_convert, ["image_dir"]),
+    "image-grid": (case_image_grid, ["image"]),
+    "image-combine": (case_image_combine, ["tiles"]),
+    "dir-tree": (case_dir_tree, ["tree"]),
+    "clean-empty": (case_clean_empty, []),
+    "rmb-upper": (case_rmb_upper, []),
+    "length": (case_length, []),
+    "audio-extract": (case_audio_extract, ["video"]),
+}
+
+def run_case(name: str, size: str, fixtures: dict) -> dict:
+    """在当前进程中运行一个测试项(由子进程调用)"""
+    func, _ = CASES[name]
+    spec = SIZES[size]
+    workdir = tempfile.mkdtemp(prefix=f"sanyuan_bench_{name}_")
+    try:
+        if name == "clean-empty":
+            # 准备工作不计入耗时
+            from CeShiShuJu import make_empty_tree
+            fixtures = dict(fixtures, empty_tree=os.path.join(workdir, "empty"))
+            make_empty_tree(fixtures["empty_tree"], spec["entries"])
+        start_cpu = time.process_time()
+        start = time.perf_counter()
+        units, unit = func(fixtures, spec, workdir)
+        wall = time.perf_counter() - start
+        cpu = time.process_time() - start_cpu
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return {
+        "wall_s": round(wall, 4),
+        "cpu_s": round(cpu, 4),
+        "units": units,
+        "unit": unit,
+        "rate": round(units / wall, 2) if wall > 0 else None,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+def run_case_subprocess(name: str, size: str, fixtures: dict, timeout: float) -> dict:
+    """在独立子进程中运行测试项，返回结果或错误"""
+    command = [sys.executable, os.path.abspath(__file__), "--run-case", name,
+               "--size", size, "--fixtures", json.dumps(fixtures)]
+    try:
+        completed = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                   timeout=timeout, encoding="utf-8", errors="replace")
+    except subprocess.TimeoutExpired:
+        return {"error": f"超时({timeout}秒)"}
+    lines = [line for line in completed.stdout.splitlines() if line.startswith("{")]
+    if completed.returncode != 0 or not lines:
+        error = completed.stderr.strip().splitlines()
+        return {"error": error[-1] if error else f"退出码 {completed.returncode}"}
+    return json.loads(lines[-1])
+
+def run_benchmarks(sizes, cases, repeat: int = 1, fixture_dir: str = None,
+                   timeout: float = 3600, log=print) -> dict:
+    """
+    运行基准测试。
+
+    Args:
+        sizes: 测试规模列表，如 ["small", "medium"]
+        cases: 测试项列表
+        repeat (int): 每个测试项的重复次数，耗时取中位数，内存取最大值
+        fixture_dir (str): 测试数据目录，默认在数据目录下
+        timeout (float): 单个测试项的超时时间(秒)
+
+    Returns:
+        dict: 包含运行环境和全部测试结果的报告
+    """
+    fixture_dir = fixture_dir or os.path.join(get_data_dir(), "benchmark_fixtures")
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "repeat": repeat,
+        },
+        "results": [],
+    }
+    for size in sizes:
+        fixtures = prepare(fixture_dir, size, log)
+        for name in cases:
+            _, required = CASES[name]
+            entry = {"case": name, "size": size}
+            missing = [key for key in required if key not in fixtures]
+            if missing:
+                entry["skipped"] = f"缺少测试数据: {', '.join(missing)}"
+                log(f"{name} ({size}): 跳过，{entry['skipped']}")
+                report["results"].append(entry)
+                continue
+            runs = []
+            for _ in range(repeat):
+                result = run_case_subprocess(name, size, fixtures, timeout)
+                if "error" in result:
+                    entry["error"] = result["error"]
+                    break
+                runs.append(result)
+            if runs and "error" not in entry:
+                runs.sort(key=lambda r: r["wall_s"])
+                median = runs[len(runs) // 2]
+                entry.update(median)
+                entry["wall_s_all"] = [r["wall_s"] for r in runs]
+                peaks = [r["peak_rss_mb"] for r in runs if r["peak_rss_mb"] is not None]
+                entry["peak_rss_mb"] = max(peaks) if peaks else None
+                log(f"{name} ({size}): {entry['wall_s']:.3f}s，{entry['rate']} {entry['unit']}/秒，"
+                    f"峰值内存 {entry['peak_rss_mb']} MB")
+            else:
+                log(f"{name} ({size}): 失败，{entry.get('error')}")
+            report["results"].append(entry)
+    return report
+
+def compare_reports(old: dict, new: dict, threshold: float = 0.1) -> list:
+    """
+    比较两次测试结果。
+
+    Args:
+        old: 基准结果
+        new: 新的结果
+        threshold (float): 耗时变化超过该比例时标记为变快或变慢
+
+    Returns:
+        list: 每个测试项的比较结果字典
+    """
+    old_results = {(r["case"], r["size"]): r for r in old["results"] if "wall_s" in r}
+    rows = []
+    for result in new["results"]:
+        key = (result["case"], result["size"])
+        if "wall_s" not in result or key not in old_results:
+            continue
+        before = old_results[key]
+        ratio = result["wall_s"] / before["wall_s"] if before["wall_s"] else None
+        if ratio is None:
+            status = "-"
+        elif ratio > 1 + threshold:
+            status = "变慢"
+        elif ratio < 1 - threshold:
+            status = "变快"
+        else:
+            status = "持平"
+        rows.append({
+            "case": result["case"], "size": result["size"],
+            "old_s": before["wall_s"], "new_s": result["wall_s"], "ratio": ratio,
+            "old_rss_mb": before.get("peak_rss_mb"), "new_rss_mb": result.get("peak_rss_mb"),
+            "status": status,
+        })
+    return rows
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="三垣工具核心操作基准测试")
+    parser.add_argument("--size", default="small", help=f"测试规模，逗号分隔: {', '.join(SIZES)}")
+    parser.add_argument("--case", default="all", help=f"测试项，逗号分隔，默认全部: {', '.join(CASES)}")
+    parser.add_argument("--repeat", type=int, default=1, help="重复次数")
+    parser.add_argument("--fixtures", help="测试数据目录")
+    parser.add_argument("--timeout", type=float, default=3600, help="单项超时(秒)")
+    parser.add_argument("--out", help="结果JSON路径，默认保存在数据目录的 benchmarks 下")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="比较两个结果文件")
+    parser.add_argument("--run-case", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run_case:
+        # 子进程模式：运行单个测试项并输出一行JSON
+        result = run_case(args.run_case, args.size, json.loads(args.fixtures))
+        print(json.dumps(result, ensure_ascii=False))
+        return 0
+
+    if args.compare:
+        with open(args.compare[0], "r", encoding="utf-8") as f:
+            old = json.load(f)
+        with open(args.compare[1], "r", encoding="utf-8") as f:
+            new = json.load(f)
+        for row in compare_reports(old, new):
+            ratio = "-" if row["ratio"] is None else f"{row['ratio']:.2f}x"
+            print(f"{row['case']:<15} {row['size']:<7} {row['old_s']:>9.3f}s -> {row['new_s']:>9.3f}s  "
+                  f"{ratio:>7}  内存 {row['old_rss_mb']} -> {row['new_rss_mb']} MB  {row['status']}")
+        return 0
+
+    sizes = [s.strip() for s in args.size.split(",") if s.strip()]
+    cases = list(CASES) if args.case == "all" else [c.strip() for c in args.case.split(",") if c.strip()]
+    unknown = [s for s in sizes if s not in SIZES] + [c for c in cases if c not in CASES]
+    if unknown:
+        parser.error(f"未知的测试规模或测试项: {', '.join(unknown)}")
+
+    report = run_benchmarks(sizes, cases, args.repeat, args.fixtures, args.timeout)
+    out = args.out
+    if not out:
+        out_dir = os.path.join(get_data_dir(), "benchmarks")
+        os.makedirs(out_dir, exist_ok=True)
+        out = os.path.join(out_dir, f"benchmark_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"结果已保存: {out}")
+    failed = [r for r in report["results"] if "error" in r]
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,28 +1,12 @@
 import os
+import sys
 from tkinter import *
 from tkinter import filedialog, messagebox
-import os
 
-def generate_dir_tree(path='.', ignore=None, prefix=''):
-    if ignore is None:
-        ignore = []
-    try:
-        items = sorted(os.listdir(path))
-    except PermissionError:
-        return f"无法访问 {path}：权限不足\n"
-    result = ""
-    for i, item in enumerate(items):
-        if item in ignore:
-            continue
-        full_path = os.path.join(path, item)
-        is_last = i == len(items) - 1
-        # 添加当前项到结果
-        result += prefix + ('└── ' if is_last else '├── ') + item + '\n'
-        # 如果是目录，递归处理
-        if os.path.isdir(full_path):
-            new_prefix = prefix + ('    ' if is_last else '│   ')
-            result += generate_dir_tree(full_path, ignore, new_prefix)
-    return result
+from os.path import dirname, join
+sys.path.insert(0, join(dirname(dirname(__file__)), "Tool module"))
+from WenJianChuLi import generate_dir_tree
+
 class DirTreeGUI:
     def __init__(self, root):
         self.root = root
@@ -1,75 +1,11 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
+import sys
 
-# 单位字典定义为全局常量
-# 单位分类字典
-UNIT_CATEGORIES = {
-    '公制单位': ['m', 'km', 'dm', 'cm', 'mm', 'μm', 'nm', 'pm', 'fm'],
-    '英制单位': ['inch', 'foot', 'yard', 'fath', 'furlong', 'mile'],
-    '中国传统单位': ['里', '丈', '尺', '寸', '分', '厘', '毫', '寻', '仞', '步', '常', '跬'],
-    '天文单位': ['AU', 'ly', 'pc'],  # 使用简单符号
-    '航海单位': ['nmi', 'cable']      # 使用简单符号
-}
-
-# 单位显示名称映射
-UNIT_DISPLAY_NAMES = {
-    'AU': '天文单位',
-    'ly': '光年',
-    'pc': '秒差距',
-    'nmi': '海里',
-    'cable': '链'
-}
-
-# 单位换算字典，如果换算结果有问题在这里修改
-UNITS = {
-    # 公制单位
-    'm': 1,
-    'km': 1000,
-    'dm': 0.1,
-    'cm': 0.01,
-    'mm': 0.001,
-    'μm': 1e-6,
-    'nm': 1e-9,
-    'pm': 1e-12,
-    'fm': 1e-15,
-    # 英制单位
-    'inch': 0.0254,
-    'foot': 0.3048,
-    'yard': 0.9144,
-    'fath': 1.8288,  # 英寻
-    'furlong': 201.168,  # 浪
-    'mile': 1609.344,
-    # 中国传统单位
-    '里': 500,
-    '丈': 3.3333,
-    '尺': 0.3333,
-    '寸': 0.0333,
-    '分': 0.0033,
-    '厘': 0.0003,
-    '毫': 0.00003,
-    '寻': 1.6,
-    '仞': 1.8,
-    '步': 1.5,
-    '常': 2.4,
-    '跬': 0.8,
-    # 天文单位
-    'AU': 149597870700,
-    'ly': 9460730472580800,
-    'pc': 30856775814913672.8,
-    # 航海单位
-    'nmi': 1852,
-    'cable': 185.2
-}
-
-def length_converter(value, from_unit, to_unit):
-    """长度单位换算函数"""
-    try:
-        result = value * UNITS[from_unit] / UNITS[to_unit]
-        return round(result, 6)
-    except KeyError as e:
-        raise ValueError(f"无效的单位: {str(e)}")
-    except Exception as e:
-        raise ValueError(f"转换错误: {str(e)}")
+# 单位字典定义在 QiTaChuLi 模块中，如果换算结果有问题在那里修改
+from os.path import dirname, join
+sys.path.insert(0, join(dirname(dirname(__file__)), "Tool module"))
+from QiTaChuLi import UNIT_CATEGORIES, UNIT_DISPLAY_NAMES, UNITS
 
 def convert_and_display():
     try:
@@ -1,7 +1,11 @@
-import os
+import sys
 import tkinter as tk
 from tkinter import filedialog, messagebox
 
+from os.path import dirname, join
+sys.path.insert(0, join(dirname(dirname(__file__)), "Tool module"))
+from WenJianChuLi import remove_empty_folders
+
 class EmptyFolderCleaner:
     def __init__(self, root):
         self.root = root
@@ -66,17 +70,7 @@ v1.0 - 初始版本
             messagebox.showerror("错误", str(e))
             
     def _remove_empty_folders(self, folder):
-        count = 0
-        for root, dirs, files in os.walk(folder, topdown=False):
-            for dir_name in dirs:
-                dir_path = os.path.join(root, dir_name)
-                try:
-                    if not os.listdir(dir_path):
-                        os.rmdir(dir_path)
-                        count += 1
-                except Exception:
-                    continue
-        return count
+        return remove_empty_folders(folder)
 
 if __name__ == "__main__":
     root = tk.Tk()
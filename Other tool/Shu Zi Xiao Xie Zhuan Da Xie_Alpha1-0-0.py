@@ -1,23 +1,15 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import re
+import sys
 
-class RMBConverter:
+from os.path import dirname, join
+sys.path.insert(0, join(dirname(dirname(__file__)), "Tool module"))
+from QiTaChuLi import RMBUpperConverter
+
+class RMBConverter(RMBUpperConverter):
     def __init__(self):
-        # 数字到中文大写的映射
-        self.num_map = {
-            '0': '零', '1': '壹', '2': '贰', '3': '叁', '4': '肆',
-            '5': '伍', '6': '陆', '7': '柒', '8': '捌', '9': '玖'
-        }
-        
-        # 整数部分的单位
-        self.int_units = ['', '拾', '佰', '仟']
-        
-        # 大单位，从个位开始，每4位一个大单位
-        self.big_units = ['', '万', '亿', '兆', '京', '垓']
-        
-        # 小数部分的单位
-        self.decimal_units = ['角', '分', '厘', '毫', '丝', '忽', '微']
+        # 数字映射和单位由 RMBUpperConverter 初始化
+        super().__init__()
         
         self.setup_gui()
 
@@ -73,140 +65,6 @@ class RMBConverter:
         self.result_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
 
 
-    def validate_input(self, num_str):
-        """验证输入是否有效"""
-        # 检查是否为空
-        if not num_str:
-            return None
-            
-        # 使用正则表达式检查格式
-        pattern = r'^\d{1,30}(\.\d{1,7})?$'
-        if not re.match(pattern, num_str):
-            return "请输入正确的数字格式（小数点后最多7位）"
-            
-        # 检查整数部分是否超过21位
-        parts = num_str.split('.')
-        int_part = parts[0].lstrip('0')
-        if len(int_part) > 21:
-            return "整数部分超过21位，请输入更小的数字"
-            
-        return None  # 验证通过
-
-    def convert_integer_part(self, int_str):
-        """转换整数部分"""
-        # 去除前导零
-        int_str = int_str.lstrip('0')
-        if not int_str:
-            return '零'
-            
-        # 确保数字不超过21位
-        if len(int_str) > 21:
-            int_str = int_str[-21:]
-            
-        # 从右到左每4位分成一组
-        groups = []
-        length = len(int_str)
-        for i in range(0, length, 4):
-            start = max(0, length - i - 4)
-            end = length - i
-            groups.insert(0, int_str[start:end])  # 插入到开头保持顺序
-            
-        result = []
-        for i, group in enumerate(groups):
-            # 跳过全为0的组，但保留最后一组（个位）如果它是0
-            if group == '0' * len(group) and i < len(groups)-1:
-                # 如果后面还有非零组，添加一个"零"
-                if any(g != '0' * len(g) for g in groups[i+1:]):
-                    if not (result and result[-1] == '零'):
-                        result.append('零')
-                continue
-                
-            # 处理每一组内的数字，确保完整转换"X仟X佰X拾X"形式
-            group_result = []
-            has_zero = False
-            last_non_zero = None
-            
-            for j, digit in enumerate(group):
-                unit_index = len(group) - j - 1
-                
-                if digit == '0':
-                    has_zero = True
-                else:
-                    # 如果前面有零且不是组的开始，添加一个"零"
-                    if has_zero and group_result:
-                        group_result.append('零')
-                    
-                    # 添加数字和单位
-                    group_result.append(self.num_map[digit])
-                    if unit_index > 0:  # 不是个位数才加单位
-                        group_result.append(self.int_units[unit_index])
-                    
-                    last_non_zero = digit
-                    has_zero = False
-                    
-            # 处理末尾的零
-            if has_zero and last_non_zero is not None:
-                group_result.append('零')
-            
-            # 如果这组有内容，添加大单位（万、亿等）
-            if group_result:
-                result.extend(group_result)
-                # 计算大单位索引，从右到左依次是万、亿、兆...
-                big_unit_index = len(groups) - i - 1
-                if big_unit_index < len(self.big_units):
-                    result.append(self.big_units[big_unit_index])
-        
-        return ''.join(result) if result else '零'
-
-    def convert_decimal_part(self, decimal_str):
-        """转换小数部分"""
-        result = []
-        # 确保小数部分不超过7位，不足的补0
-        decimal_str = (decimal_str + '0' * 7)[:7]
-        
-        last_non_zero = -1
-        # 找到最后一个非零数字的位置
-        for i in range(len(decimal_str)-1, -1, -1):
-            if decimal_str[i] != '0':
-                last_non_zero = i
-                break
-        
-        # 只处理到最后一个非零数字
-        for i, digit in enumerate(decimal_str[:last_non_zero + 1]):
-            if digit != '0':
-                result.append(self.num_map[digit])
-                result.append(self.decimal_units[i])
-            elif result and result[-1] not in self.decimal_units:
-                # 如果前面有数字且不是以单位结尾，添加"零"
-                result.append('零')
-                
-        return ''.join(result)
-
-    def convert(self, num_str):
-        """转换数字为中文大写"""
-        try:
-            # 分离整数和小数部分
-            parts = num_str.split('.')
-            integer_part = parts[0]
-            decimal_part = parts[1] if len(parts) > 1 else ''
-            
-            # 转换整数和小数部分
-            result = []
-            int_result = self.convert_integer_part(integer_part)
-            if int_result:
-                result.append(int_result)
-                result.append('元')
-            
-            dec_result = self.convert_decimal_part(decimal_part)
-            if dec_result:
-                result.append(dec_result)
-            elif int_result:
-                result.append('整')
-                
-            return ''.join(result)
-        except Exception as e:
-            return f'转换错误：{str(e)}'
-
     def on_input_change(self, *args):
         """输入变化时的处理函数"""
         input_text = self.input_var.get().strip()
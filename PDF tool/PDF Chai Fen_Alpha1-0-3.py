@@ -3,23 +3,185 @@ import sys
 sys.dont_write_bytecode = True
 
 import os
+import queue
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
-from PyPDF2 import PdfReader, PdfWriter
 import sys
 import os.path
 
 from os.path import dirname, join
 sys.path.insert(0, join(dirname(dirname(__file__)), "Tool module"))
 from BangZhu import get_help_system
+from PDFChuLi import (collect_pdf_files, outline_sections, parse_page_ranges, split_pdf_batch,
+                      split_pdf_by_count, split_pdf_by_outline, split_pdf_by_ranges, split_pdf_by_size)
+from HouTaiRenWu import BackgroundEngine
+from YanChiDaoRu import warm_up
+
+class BatchSplitWindow:
+    """
+    批量拆分窗口：把一个文件夹(或通配符匹配)中的全部PDF在多个进程中并行拆分，
+    列表中显示每个文件的状态。拆分方式使用主窗口中的拆分选项。
+    """
+
+    COLUMNS = [
+        ("file", "文件", 200),
+        ("status", "状态", 80),
+        ("result", "结果", 200),
+    ]
+
+    def __init__(self, master, get_options):
+        self.get_options = get_options
+        self.engine = BackgroundEngine(master)
+        self.job = None
+        self.items = {}
+        # 工作线程中完成的文件先放入队列，界面线程在进度回调中取出
+        self.finished = queue.Queue()
+
+        self.window = tk.Toplevel(master)
+        self.window.title("批量拆分PDF")
+        self.window.geometry("560x400")
+
+        source_frame = tk.Frame(self.window)
+        source_frame.pack(fill=tk.X, padx=10, pady=5)
+        tk.Label(source_frame, text="文件夹或通配符:").pack(side=tk.LEFT)
+        self.source_entry = tk.Entry(source_frame)
+        self.source_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        tk.Button(source_frame, text="选择文件夹", command=self.select_folder).pack(side=tk.RIGHT)
+
+        output_frame = tk.Frame(self.window)
+        output_frame.pack(fill=tk.X, padx=10, pady=5)
+        tk.Label(output_frame, text="输出目录:").pack(side=tk.LEFT)
+        self.output_entry = tk.Entry(output_frame)
+        self.output_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        tk.Button(output_frame, text="选择目录", command=self.select_output_dir).pack(side=tk.RIGHT)
+
+        action_frame = tk.Frame(self.window)
+        action_frame.pack(side=tk.BOTTOM, fill=tk.X, padx=10, pady=5)
+        self.status_var = tk.StringVar(value="")
+        tk.Label(action_frame, textvariable=self.status_var, anchor="w").pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.cancel_btn = tk.Button(action_frame, text="取消", command=self.cancel, state=tk.DISABLED)
+        self.cancel_btn.pack(side=tk.RIGHT, padx=5)
+        self.start_btn = tk.Button(action_frame, text="开始拆分", command=self.start)
+        self.start_btn.pack(side=tk.RIGHT, padx=5)
+        self.progress = ttk.Progressbar(self.window, orient=tk.HORIZONTAL, mode="determinate")
+        self.progress.pack(side=tk.BOTTOM, fill=tk.X, padx=10)
+
+        self.tree = ttk.Treeview(self.window, columns=[c[0] for c in self.COLUMNS], show="headings")
+        for key, title, width in self.COLUMNS:
+            self.tree.heading(key, text=title)
+            self.tree.column(key, width=width, anchor="w")
+        self.tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+    def select_folder(self):
+        folder = filedialog.askdirectory(title="选择PDF所在的文件夹")
+        if folder:
+            self.source_entry.delete(0, tk.END)
+            self.source_entry.insert(0, folder)
+
+    def select_output_dir(self):
+        folder = filedialog.askdirectory(title="选择输出目录")
+        if folder:
+            self.output_entry.delete(0, tk.END)
+            self.output_entry.insert(0, folder)
+
+    def start(self):
+        source = self.source_entry.get().strip()
+        output_dir = self.output_entry.get().strip()
+        if not source:
+            messagebox.showwarning("警告", "请选择文件夹或输入通配符(如 D:/扫描/*.pdf)", parent=self.window)
+            return
+        if not output_dir:
+            messagebox.showwarning("警告", "请先选择输出目录", parent=self.window)
+            return
+        options = self.get_options(self.window)
+        if options is None:
+            return
+        try:
+            files = collect_pdf_files(source)
+        except FileNotFoundError as e:
+            messagebox.showerror("错误", str(e), parent=self.window)
+            return
+        if not files:
+            messagebox.showwarning("警告", "没有找到PDF文件", parent=self.window)
+            return
+
+        self.tree.delete(*self.tree.get_children())
+        self.items = {path: self.tree.insert("", tk.END, values=(os.path.basename(path), "等待", ""))
+                      for path in files}
+        self.progress.config(maximum=len(files), value=0)
+        self.start_btn.config(state=tk.DISABLED)
+        self.cancel_btn.config(state=tk.NORMAL)
+        pages_per_file, range_str, max_mb, outline_depth = options
+        self.job = self.engine.submit(
+            split_pdf_batch, files, output_dir, pages_per_file, range_str,
+            on_file=self.finished.put, max_mb=max_mb, outline_depth=outline_depth,
+            on_progress=self._on_progress,
+            on_done=self._on_done,
+            on_error=lambda job, e: messagebox.showerror("错误", f"批量拆分失败: {str(e)}", parent=self.window),
+            on_cancelled=lambda job: self.status_var.set("已取消，正在拆分的文件完成后停止"),
+            on_finally=self._on_finally,
+        )
+
+    def _drain(self):
+        """把已完成的文件更新到列表中"""
+        while True:
+            try:
+                entry = self.finished.get_nowait()
+            except queue.Empty:
+                return
+            item = self.items.get(entry["input"])
+            if item is None:
+                continue
+            if entry["status"] == "done":
+                result = f"{entry['pages']} 页 → {len(entry['outputs'])} 个文件"
+                self.tree.item(item, values=(os.path.basename(entry["input"]), "完成", result))
+            else:
+                self.tree.item(item, values=(os.path.basename(entry["input"]), "失败", entry["error"]))
+
+    def _on_progress(self, job):
+        self._drain()
+        self.progress.config(value=job.done)
+        self.status_var.set(job.describe())
+
+    def _on_done(self, job, result):
+        self._drain()
+        done = len(result["files"]) - result["failed"]
+        message = f"批量拆分完成!\n{done} 个文件共 {result['pages']} 页拆分为 {len(result['outputs'])} 个文件"
+        if result["failed"]:
+            message += f"\n{result['failed']} 个文件拆分失败，详见列表"
+        if result.get("saved_bytes"):
+            message += f"\n去掉未用到的资源，约节省 {result['saved_bytes'] / 1024 / 1024:.1f} MB"
+        self.status_var.set(f"完成 ({result['workers']} 个进程)")
+        messagebox.showinfo("完成", message, parent=self.window)
+
+    def _on_finally(self, job):
+        self._drain()
+        self.start_btn.config(state=tk.NORMAL)
+        self.cancel_btn.config(state=tk.DISABLED)
+
+    def cancel(self):
+        if self.job is not None:
+            self.job.cancel()
+
+    def close(self):
+        self.engine.cancel_all()
+        self.window.destroy()
 
 class PDFSplitterApp:
     def __init__(self, root):
         self.root = root
         self.root.title("PDF拆分工具Alpha-1.0.3")
-        self.root.geometry("400x300")
+        # 窗口绘制完成后在后台加载 PyPDF2
+        warm_up(self.root, "PyPDF2")
+        self.root.geometry("400x420")
+        self.outline_window = None
         self.input_file = None
         self.output_dir = None
+        # 拆分在后台线程中进行，进度通过引擎交回界面线程
+        self.engine = BackgroundEngine(self.root)
+        self.job = None
+        self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
         # 主布局
         self.root.grid_rowconfigure(1, weight=1)
         self.root.grid_columnconfigure(0, weight=1)
@@ -65,12 +227,50 @@ class PDFSplitterApp:
         tk.Label(self.page_range_frame, text="页码范围(如1-3,5,7-9):").pack(side=tk.LEFT)
         self.range_entry = tk.Entry(self.page_range_frame, width=20)
         self.range_entry.pack(side=tk.LEFT)
+        # 按大小拆分选项
+        tk.Radiobutton(
+            self.option_frame,
+            text="按大小拆分",
+            variable=self.mode_var,
+            value="max_size"
+        ).grid(row=2, column=0, sticky="w", padx=5)
+        self.max_size_frame = tk.Frame(self.option_frame)
+        self.max_size_frame.grid(row=2, column=1, sticky="w")
+        tk.Label(self.max_size_frame, text="每份最大(MB):").pack(side=tk.LEFT)
+        self.size_entry = tk.Entry(self.max_size_frame, width=10)
+        self.size_entry.pack(side=tk.LEFT)
+        self.size_entry.insert(0, "10")
+        # 按书签拆分选项
+        tk.Radiobutton(
+            self.option_frame,
+            text="按书签拆分",
+            variable=self.mode_var,
+            value="outline"
+        ).grid(row=3, column=0, sticky="w", padx=5)
+        self.outline_frame = tk.Frame(self.option_frame)
+        self.outline_frame.grid(row=3, column=1, sticky="w")
+        tk.Label(self.outline_frame, text="书签层级:").pack(side=tk.LEFT)
+        self.depth_var = tk.IntVar(value=1)
+        tk.Spinbox(self.outline_frame, from_=1, to=9, width=4, textvariable=self.depth_var,
+                   command=self.refresh_outline_preview).pack(side=tk.LEFT)
+        tk.Button(self.outline_frame, text="预览章节", command=self.preview_outline).pack(side=tk.LEFT, padx=5)
         # 操作按钮区域
         self.action_frame = tk.Frame(root)
         self.action_frame.grid(row=3, column=0, sticky="ew", padx=10, pady=5)
         tk.Button(self.action_frame, text="帮助", command=self.show_help).pack(side=tk.LEFT, padx=5)
         tk.Button(self.action_frame, text="更新日志", command=self.show_changelog).pack(side=tk.LEFT, padx=5)
-        tk.Button(self.action_frame, text="拆分PDF", command=self.split_pdf).pack(side=tk.RIGHT, padx=5)
+        self.cancel_btn = tk.Button(self.action_frame, text="取消", command=self.cancel_split, state=tk.DISABLED)
+        self.cancel_btn.pack(side=tk.RIGHT, padx=5)
+        self.split_btn = tk.Button(self.action_frame, text="拆分PDF", command=self.split_pdf)
+        self.split_btn.pack(side=tk.RIGHT, padx=5)
+        tk.Button(self.action_frame, text="批量拆分", command=self.open_batch).pack(side=tk.RIGHT, padx=5)
+        # 进度区域
+        self.progress_frame = tk.Frame(root)
+        self.progress_frame.grid(row=4, column=0, sticky="ew", padx=10, pady=5)
+        self.progress = ttk.Progressbar(self.progress_frame, orient=tk.HORIZONTAL, mode="determinate")
+        self.progress.pack(fill=tk.X)
+        self.status_var = tk.StringVar(value="")
+        tk.Label(self.progress_frame, textvariable=self.status_var, anchor="w").pack(fill=tk.X)
     def select_file(self):
         file = filedialog.askopenfilename(
             title="选择PDF文件",
@@ -116,19 +316,74 @@ class PDFSplitterApp:
         """
         help_system = get_help_system()
         help_system.show_help("PDF拆分")
+    def get_split_options(self, parent=None):
+        """读取拆分选项，返回 (每份页数, 页码范围, 每份最大MB)，输入无效时提示并返回 None"""
+        if self.mode_var.get() == "page_count":
+            try:
+                pages_per_file = int(self.page_entry.get())
+                if pages_per_file <= 0:
+                    raise ValueError("页数必须大于0")
+            except ValueError:
+                messagebox.showerror("错误", "请输入有效的页数", parent=parent)
+                return None
+            return pages_per_file, "", 0, 0
+        if self.mode_var.get() == "max_size":
+            try:
+                max_mb = float(self.size_entry.get())
+                if max_mb <= 0:
+                    raise ValueError("大小必须大于0")
+            except ValueError:
+                messagebox.showerror("错误", "请输入有效的文件大小(MB)", parent=parent)
+                return None
+            return 0, "", max_mb, 0
+        if self.mode_var.get() == "outline":
+            try:
+                depth = self.depth_var.get()
+            except tk.TclError:
+                depth = 0
+            if depth <= 0:
+                messagebox.showerror("错误", "请输入有效的书签层级", parent=parent)
+                return None
+            return 0, "", 0, depth
+        range_str = self.range_entry.get().strip()
+        if not range_str:
+            messagebox.showwarning("警告", "请输入有效的页码范围", parent=parent)
+            return None
+        return 0, range_str, 0, 0
+    def preview_outline(self):
+        """在单独的窗口中列出按当前书签层级拆分出的章节"""
+        if not self.input_file:
+            messagebox.showwarning("警告", "请先选择PDF文件")
+            return
+        if self.outline_window is None or not self.outline_window.winfo_exists():
+            self.outline_window = tk.Toplevel(self.root)
+            self.outline_window.title("章节预览")
+            self.outline_window.geometry("420x360")
+            self.outline_tree = ttk.Treeview(self.outline_window, columns=("title", "pages", "count"),
+                                             show="headings")
+            for key, title, width in (("title", "章节", 240), ("pages", "页码", 100), ("count", "页数", 50)):
+                self.outline_tree.heading(key, text=title)
+                self.outline_tree.column(key, width=width, anchor="w" if key == "title" else "center")
+            self.outline_tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self.refresh_outline_preview()
+    def refresh_outline_preview(self):
+        """书签层级变化时更新章节预览(书签只读取一次，之后直接使用缓存)"""
+        if self.outline_window is None or not self.outline_window.winfo_exists() or not self.input_file:
+            return
+        self.outline_tree.delete(*self.outline_tree.get_children())
+        try:
+            sections = outline_sections(self.input_file, self.depth_var.get())
+        except (FileNotFoundError, ValueError, tk.TclError) as e:
+            self.outline_window.title(f"章节预览 - {str(e)}")
+            return
+        for title, group in sections:
+            self.outline_tree.insert("", tk.END, values=(title, f"{group.start + 1}-{group.stop}", len(group)))
+        self.outline_window.title(f"章节预览 - 共 {len(sections)} 个文件")
+    def open_batch(self):
+        BatchSplitWindow(self.root, self.get_split_options)
     def parse_page_ranges(self, range_str, total_pages):
         """解析页码范围字符串，返回页面索引列表"""
-        ranges = []
-        parts = range_str.split(',')
-        for part in parts:
-            if '-' in part:
-                start, end = map(int, part.split('-'))
-                ranges.extend(range(start-1, min(end, total_pages)))
-            else:
-                page = int(part)
-                if page <= total_pages:
-                    ranges.append(page-1)
-        return sorted(list(set(ranges)))  # 去重并排序
+        return parse_page_ranges(range_str, total_pages)
     def split_pdf(self):
         if not self.input_file:
             messagebox.showwarning("警告", "请先选择PDF文件")
@@ -136,84 +391,74 @@ class PDFSplitterApp:
         if not self.output_dir:
             messagebox.showwarning("警告", "请先选择输出目录")
             return
-        try:
-            # 验证PDF文件有效性
-            if not os.path.exists(self.input_file):
-                messagebox.showerror("错误", "PDF文件不存在")
-                return   
-            try:
-                reader = PdfReader(self.input_file)
-                if len(reader.pages) == 0:
-                    messagebox.showerror("错误", "PDF文件没有有效页面")
-                    return
-                total_pages = len(reader.pages)
-            except Exception as e:
-                messagebox.showerror("错误", f"无效的PDF文件: {str(e)}")
-                return        
-            base_name = os.path.splitext(os.path.basename(self.input_file))[0]
-            if self.mode_var.get() == "page_count":
-                # 按页数拆分模式
-                try:
-                    pages_per_file = int(self.page_entry.get())
-                    if pages_per_file <= 0:
-                        raise ValueError("页数必须大于0")
-                except ValueError:
-                    messagebox.showerror("错误", "请输入有效的页数")
-                    return
-                file_count = 0
-                for i in range(0, total_pages, pages_per_file):
-                    writer = PdfWriter()
-                    end = min(i + pages_per_file, total_pages)
-                    for j in range(i, end):
-                        writer.add_page(reader.pages[j])
-                    output_file = os.path.join(
-                        self.output_dir,
-                        f"{base_name}_p{i+1}-{end}.pdf"
-                    )
-                    with open(output_file, 'wb') as f:
-                        writer.write(f)
-                    file_count += 1
-                message = f"PDF拆分完成!\n共拆分 {total_pages} 页为 {file_count} 个文件"
-            else:
-                # 按范围拆分模式
-                range_str = self.range_entry.get().strip()
-                if not range_str:
-                    messagebox.showwarning("警告", "请输入有效的页码范围")
-                    return
-                try:
-                    page_indices = self.parse_page_ranges(range_str, total_pages)
-                    if not page_indices:
-                        raise ValueError("没有有效的页面被选择")
-                except ValueError as e:
-                    messagebox.showerror("错误", f"页码范围无效: {str(e)}")
-                    return
-                # 将连续页面分组
-                groups = []
-                current_group = [page_indices[0]]
-                for i in range(1, len(page_indices)):
-                    if page_indices[i] == page_indices[i-1] + 1:
-                        current_group.append(page_indices[i])
-                    else:
-                        groups.append(current_group)
-                        current_group = [page_indices[i]]
-                groups.append(current_group)
-                # 为每个分组创建PDF文件
-                for i, group in enumerate(groups):
-                    writer = PdfWriter()
-                    for page_idx in group:
-                        writer.add_page(reader.pages[page_idx])
-                    start_page = group[0] + 1
-                    end_page = group[-1] + 1
-                    output_file = os.path.join(
-                        self.output_dir,
-                        f"{base_name}_range_{start_page}-{end_page}.pdf"
-                    )
-                    with open(output_file, 'wb') as f:
-                        writer.write(f)
-                message = f"PDF拆分完成!\n共提取 {len(page_indices)} 页为 {len(groups)} 个文件"
-            messagebox.showinfo("成功", message)
-        except Exception as e:
-            messagebox.showerror("错误", f"拆分失败: {str(e)}")
+        options = self.get_split_options()
+        if options is None:
+            return
+        pages_per_file, range_str, max_mb, outline_depth = options
+        mode = self.mode_var.get()
+        if mode == "page_count":
+            # 按页数拆分模式
+            func, arg = split_pdf_by_count, pages_per_file
+        elif mode == "outline":
+            # 按书签拆分模式
+            func, arg = split_pdf_by_outline, outline_depth
+        elif mode == "max_size":
+            # 按大小拆分模式
+            func, arg = split_pdf_by_size, max_mb
+        else:
+            # 按范围拆分模式
+            func, arg = split_pdf_by_ranges, range_str
+        self.progress.config(value=0, maximum=100)
+        self.status_var.set("正在拆分...")
+        self.split_btn.config(state=tk.DISABLED)
+        self.cancel_btn.config(state=tk.NORMAL)
+        self.job = self.engine.submit(
+            func, self.input_file, self.output_dir, arg,
+            on_progress=self.on_progress,
+            on_done=lambda job, result: self.on_done(mode, result),
+            on_error=self.on_error,
+            on_cancelled=lambda job: self.status_var.set("已取消拆分"),
+            on_finally=self.on_finished
+        )
+    def cancel_split(self):
+        """取消正在进行的拆分，当前文件写完后停止"""
+        if self.job is not None:
+            self.job.cancel()
+            self.status_var.set("正在取消...")
+    def on_progress(self, job):
+        """更新进度条和状态(界面线程)"""
+        self.progress.config(value=job.done, maximum=job.total or 1)
+        self.status_var.set(job.describe())
+    def on_done(self, mode, result):
+        if mode == "outline":
+            message = f"PDF拆分完成!\n按书签将 {result['pages']} 页拆分为 {len(result['outputs'])} 个文件"
+        elif mode == "page_range":
+            message = f"PDF拆分完成!\n共提取 {result['pages']} 页为 {len(result['outputs'])} 个文件"
+        else:
+            message = f"PDF拆分完成!\n共拆分 {result['pages']} 页为 {len(result['outputs'])} 个文件"
+        if result.get("oversized"):
+            message += f"\n有 {len(result['oversized'])} 页单页就超过上限，无法再拆分"
+        if result.get("saved_bytes"):
+            message += f"\n去掉未用到的资源，约节省 {result['saved_bytes'] / 1024 / 1024:.1f} MB"
+        self.status_var.set("拆分完成")
+        messagebox.showinfo("成功", message)
+    def on_error(self, job, error):
+        self.status_var.set("拆分失败")
+        if isinstance(error, (FileNotFoundError, ValueError)):
+            # PDF无效或页码范围无效
+            messagebox.showerror("错误", str(error))
+        else:
+            messagebox.showerror("错误", f"拆分失败: {str(error)}")
+    def on_finished(self, job):
+        """重新启用拆分按钮并重置进度条"""
+        self.job = None
+        self.split_btn.config(state=tk.NORMAL)
+        self.cancel_btn.config(state=tk.DISABLED)
+        self.progress.config(value=0)
+    def on_closing(self):
+        """关闭窗口时取消未完成的拆分"""
+        self.engine.shutdown()
+        self.root.destroy()
 if __name__ == '__main__':
     root = tk.Tk()
     app = PDFSplitterApp(root)
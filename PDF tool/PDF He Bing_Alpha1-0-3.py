@@ -5,23 +5,34 @@ sys.dont_write_bytecode = True
 import os
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
-from PyPDF2 import PdfReader, PdfWriter
-from PIL import Image, ImageTk
-import sys
 
 from os.path import dirname, join
 sys.path.insert(0, join(dirname(dirname(__file__)), "Tool module"))
 from BangZhu import get_help_system
+from HouTaiRenWu import BackgroundEngine
+from PDFChuLi import PdfReader, get_reader_index, merge_pdfs
+from YeMaFanWei import PageSet
+from YanChiDaoRu import warm_up
 
 class PDFMergerApp:
     def __init__(self, root):
         self.root = root
         self.root.title("PDF页面合并工具Alpha-1.0.3")
+        # 窗口绘制完成后在后台加载 PyPDF2
+        warm_up(self.root, PdfReader)
         self.root.geometry("300x500")
          # self.root.minsize(500, 700)
         
         self.input_files = []
         self.selected_pages = {}
+        # 每个文件的预览区域和复选框，添加、移除文件时只更新对应的文件
+        self.file_frames = {}
+        self.page_checkbuttons = {}
+        # 页数和 PdfReader 缓存，在后台读取，合并时复用
+        self.index = get_reader_index()
+        self.engine = BackgroundEngine(self.root)
+        self.merge_job = None
+        self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
         
         # 主布局
         self.root.grid_rowconfigure(1, weight=1)
@@ -71,10 +82,22 @@ class PDFMergerApp:
         self.action_frame.grid_columnconfigure(0, weight=1)
         self.action_frame.grid_columnconfigure(1, weight=1)
         self.action_frame.grid_columnconfigure(2, weight=1)
+        self.action_frame.grid_columnconfigure(3, weight=1)
         
         tk.Button(self.action_frame, text="帮助", command=self.show_help).grid(row=0, column=0, sticky="ew", padx=5)
         tk.Button(self.action_frame, text="更新日志", command=self.show_changelog).grid(row=0, column=1, sticky="ew", padx=5)
-        tk.Button(self.action_frame, text="合并PDF", command=self.merge_pdfs).grid(row=0, column=2, sticky="ew", padx=5)
+        self.merge_btn = tk.Button(self.action_frame, text="合并PDF", command=self.merge_pdfs)
+        self.merge_btn.grid(row=0, column=2, sticky="ew", padx=5)
+        self.cancel_btn = tk.Button(self.action_frame, text="取消", command=self.cancel_merge, state=tk.DISABLED)
+        self.cancel_btn.grid(row=0, column=3, sticky="ew", padx=5)
+        
+        # 进度区域
+        self.progress_frame = tk.Frame(root)
+        self.progress_frame.grid(row=3, column=0, sticky="ew", padx=10, pady=5)
+        self.progress = ttk.Progressbar(self.progress_frame, orient=tk.HORIZONTAL, mode="determinate")
+        self.progress.pack(fill=tk.X)
+        self.status_var = tk.StringVar(value="")
+        tk.Label(self.progress_frame, textvariable=self.status_var, anchor="w").pack(fill=tk.X)
     
     def add_file(self):
         files = filedialog.askopenfilenames(
@@ -86,8 +109,8 @@ class PDFMergerApp:
                 if file not in self.input_files:
                     self.input_files.append(file)
                     self.file_listbox.insert(tk.END, os.path.basename(file))
-                    self.selected_pages[file] = []
-            self.show_preview()
+                    self.selected_pages[file] = PageSet()
+                    self._create_file_frame(file)
     
     def remove_file(self):
         selection = self.file_listbox.curselection()
@@ -96,92 +119,122 @@ class PDFMergerApp:
             del self.input_files[selection[0]]
             del self.selected_pages[file]
             self.file_listbox.delete(selection[0])
-            self.show_preview()
-    
-    def show_preview(self, force_refresh=False):
-        # 仅当不是强制刷新时才清除现有预览
-        if not force_refresh:
-            for widget in self.scrollable_frame.winfo_children():
-                widget.destroy()
-        
-        # 显示每个PDF的页面缩略图
-        for file in self.input_files:
-            try:
-                reader = PdfReader(file)
-                
-                # 查找是否已有该文件的frame
-                file_frame = None
-                if force_refresh:
-                    for widget in self.scrollable_frame.winfo_children():
-                        if hasattr(widget, 'file_path') and widget.file_path == file:
-                            file_frame = widget
-                            break
-                
-                # 如果没有找到或不是强制刷新，创建新的frame
-                if not file_frame or not force_refresh:
-                    file_frame = ttk.LabelFrame(self.scrollable_frame, text=os.path.basename(file))
-                    file_frame.pack(fill=tk.X, padx=5, pady=5)
-                    file_frame.file_path = file
-                    
-                    # 添加全选和清空选择按钮
-                    select_all_frame = ttk.Frame(file_frame)
-                    select_all_frame.pack(fill=tk.X)
-                    tk.Button(
-                        select_all_frame,
-                        text="全选",
-                        command=lambda f=file, r=reader: self.select_all_pages(f, r)
-                    ).pack(side=tk.LEFT, padx=5)
-                    tk.Button(
-                        select_all_frame,
-                        text="清空选择",
-                        command=lambda f=file: self.clear_selection(f)
-                    ).pack(side=tk.LEFT, padx=5)
-                    
-                    for i, page in enumerate(reader.pages):
-                        page_frame = ttk.Frame(file_frame)
-                        page_frame.pack(fill=tk.X)
-                        
-                        # 显示页码和选择框
-                        var = tk.IntVar(value=1 if i in self.selected_pages[file] else 0)
-                        cb = tk.Checkbutton(
-                            page_frame, 
-                            text=f"第 {i+1} 页",
-                            variable=var,
-                            command=lambda f=file, p=i: self.toggle_page(f, p)
-                        )
-                        cb.pack(side=tk.LEFT)
-                        cb.var = var
-                        cb.page = i
-                        cb.file = file
-                        
-                        if i in self.selected_pages[file]:
-                            cb.select()
-                else:
-                    # 强制刷新时，只更新选择状态
-                    for widget in file_frame.winfo_children():
-                        if isinstance(widget, ttk.Frame):  # 跳过按钮frame
-                            for child in widget.winfo_children():
-                                if hasattr(child, 'var') and hasattr(child, 'page'):
-                                    child.var.set(1 if child.page in self.selected_pages[file] else 0)
-            except Exception as e:
-                messagebox.showerror("错误", f"无法读取文件 {file}: {str(e)}")
+            self.file_frames.pop(file).destroy()
+            self.page_checkbuttons.pop(file, None)
+            self.index.discard(file)
+    
+    def show_preview(self, file=None):
+        """更新预览中的选择状态，file 为 None 时更新全部文件"""
+        for f in ([file] if file is not None else self.input_files):
+            for cb in self.page_checkbuttons.get(f, []):
+                cb.var.set(1 if cb.page in self.selected_pages[f] else 0)
+    
+    def _create_file_frame(self, file):
+        """为新添加的文件创建预览区域，页数在后台读取，不阻塞界面"""
+        file_frame = ttk.LabelFrame(self.scrollable_frame, text=os.path.basename(file))
+        file_frame.pack(fill=tk.X, padx=5, pady=5)
+        file_frame.file_path = file
+        self.file_frames[file] = file_frame
+        
+        count = self.index.cached_page_count(file)
+        if count is not None:
+            self._fill_file_frame(file, count)
+            return
+        file_frame.loading_label = ttk.Label(file_frame, text="正在读取...")
+        file_frame.loading_label.pack(anchor="w", padx=5)
+        self.engine.submit(
+            self.index.page_count, file,
+            progress_arg=None,
+            on_done=lambda job, count, f=file, frame=file_frame: self._on_loaded(f, frame, count),
+            on_error=lambda job, error, f=file, frame=file_frame: self._on_load_error(f, frame, error)
+        )
+    
+    def _on_loaded(self, file, file_frame, count):
+        # 读取期间文件可能已被移除
+        if self.file_frames.get(file) is not file_frame:
+            return
+        file_frame.loading_label.destroy()
+        self._fill_file_frame(file, count)
+    
+    def _on_load_error(self, file, file_frame, error):
+        if self.file_frames.get(file) is not file_frame:
+            return
+        file_frame.loading_label.config(text="无法读取")
+        messagebox.showerror("错误", f"无法读取文件 {file}: {str(error)}")
+    
+    def _fill_file_frame(self, file, count):
+        """创建文件的选择按钮和每页的复选框"""
+        file_frame = self.file_frames[file]
+        
+        # 添加全选和清空选择按钮
+        select_all_frame = ttk.Frame(file_frame)
+        select_all_frame.pack(fill=tk.X)
+        tk.Button(
+            select_all_frame,
+            text="全选",
+            command=lambda f=file, c=count: self.select_all_pages(f, c)
+        ).pack(side=tk.LEFT, padx=5)
+        tk.Button(
+            select_all_frame,
+            text="清空选择",
+            command=lambda f=file: self.clear_selection(f)
+        ).pack(side=tk.LEFT, padx=5)
+        # 按页码范围选择，如 1-3,5,odd,last-2
+        range_entry = tk.Entry(select_all_frame, width=12)
+        range_entry.pack(side=tk.LEFT, padx=5)
+        tk.Button(
+            select_all_frame,
+            text="按范围选择",
+            command=lambda f=file, c=count, e=range_entry: self.select_range(f, c, e.get())
+        ).pack(side=tk.LEFT)
+        
+        checkbuttons = []
+        for i in range(count):
+            page_frame = ttk.Frame(file_frame)
+            page_frame.pack(fill=tk.X)
+            
+            # 显示页码和选择框
+            var = tk.IntVar(value=1 if i in self.selected_pages[file] else 0)
+            cb = tk.Checkbutton(
+                page_frame, 
+                text=f"第 {i+1} 页",
+                variable=var,
+                command=lambda f=file, p=i: self.toggle_page(f, p)
+            )
+            cb.pack(side=tk.LEFT)
+            cb.var = var
+            cb.page = i
+            cb.file = file
+            checkbuttons.append(cb)
+        self.page_checkbuttons[file] = checkbuttons
     
     def toggle_page(self, file, page):
         if page in self.selected_pages[file]:
-            self.selected_pages[file].remove(page)
+            self.selected_pages[file].discard(page)
         else:
-            self.selected_pages[file].append(page)
+            self.selected_pages[file].add(page)
     
-    def select_all_pages(self, file, reader):
+    def select_all_pages(self, file, count):
         """选择当前文件的所有页面"""
-        self.selected_pages[file] = list(range(len(reader.pages)))
-        # 强制刷新界面以确保复选框状态更新
-        self.show_preview(force_refresh=True)
+        self.selected_pages[file] = PageSet.all(count)
+        self.show_preview(file)
+    
+    def select_range(self, file, count, range_str):
+        """按页码范围选择当前文件的页面"""
+        if not range_str.strip():
+            messagebox.showwarning("警告", "请输入页码范围，如 1-3,5,odd,last-2")
+            return
+        try:
+            self.selected_pages[file] = PageSet.parse(range_str, count)
+        except ValueError as e:
+            messagebox.showerror("错误", str(e))
+            return
+        self.show_preview(file)
     
     def clear_selection(self, file):
         """清空当前文件的所有选择"""
-        self.selected_pages[file] = []
-        self.show_preview()
+        self.selected_pages[file] = PageSet()
+        self.show_preview(file)
     
     def show_changelog(self):
         changelog = """PDF页面合并工具 - 更新日志
@@ -220,19 +273,54 @@ class PDFMergerApp:
         )
         
         if output_file:
-            try:
-                writer = PdfWriter()
-                for file in self.input_files:
-                    reader = PdfReader(file)
-                    for page_num in sorted(self.selected_pages[file]):
-                        writer.add_page(reader.pages[page_num])
-                
-                with open(output_file, 'wb') as f:
-                    writer.write(f)
-                
-                messagebox.showinfo("成功", f"PDF合并完成!\n保存到: {output_file}")
-            except Exception as e:
-                messagebox.showerror("错误", f"合并失败: {str(e)}")
+            # 页面选择在这里复制一份，合并期间继续勾选不影响本次合并
+            selections = [(file, self.selected_pages[file].copy()) for file in self.input_files]
+            self.progress.config(value=0, maximum=len(selections))
+            self.status_var.set("正在合并...")
+            self.merge_btn.config(state=tk.DISABLED)
+            self.cancel_btn.config(state=tk.NORMAL)
+            self.merge_job = self.engine.submit(
+                merge_pdfs, selections, output_file,
+                on_progress=self.on_merge_progress,
+                on_done=lambda job, result: self.on_merge_done(output_file, result),
+                on_error=self.on_merge_error,
+                on_cancelled=lambda job: self.status_var.set("已取消合并"),
+                on_finally=self.on_merge_finished
+            )
+    
+    def cancel_merge(self):
+        """取消正在进行的合并"""
+        if self.merge_job is not None:
+            self.merge_job.cancel()
+            self.status_var.set("正在取消...")
+    
+    def on_merge_progress(self, job):
+        """更新进度条和状态(界面线程)"""
+        self.progress.config(value=job.done, maximum=job.total or 1)
+        self.status_var.set(job.describe())
+    
+    def on_merge_done(self, output_file, result):
+        message = f"PDF合并完成!\n保存到: {output_file}"
+        if result.get("saved_bytes"):
+            message += f"\n去掉未用到的资源，约节省 {result['saved_bytes'] / 1024 / 1024:.1f} MB"
+        self.status_var.set("合并完成")
+        messagebox.showinfo("成功", message)
+    
+    def on_merge_error(self, job, error):
+        self.status_var.set("合并失败")
+        messagebox.showerror("错误", f"合并失败: {str(error)}")
+    
+    def on_merge_finished(self, job):
+        """重新启用合并按钮并重置进度条"""
+        self.merge_job = None
+        self.merge_btn.config(state=tk.NORMAL)
+        self.cancel_btn.config(state=tk.DISABLED)
+        self.progress.config(value=0)
+    
+    def on_closing(self):
+        """关闭窗口时取消未完成的任务"""
+        self.engine.shutdown()
+        self.root.destroy()
 
 if __name__ == '__main__':
     root = tk.Tk()
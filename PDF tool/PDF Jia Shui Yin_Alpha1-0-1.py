@@ -2,22 +2,27 @@
 import sys
 sys.dont_write_bytecode = True
 
-from PyPDF2 import PdfReader, PdfWriter
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 import os
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-import io
 
 from os.path import dirname, join
 sys.path.insert(0, join(dirname(dirname(__file__)), "Tool module"))
 from BangZhu import get_help_system
+from PDFChuLi import add_watermark, create_text_watermark
+from HouTaiRenWu import BackgroundEngine
+from YanChiDaoRu import warm_up
 
 class PDFWatermarkApp:
     def __init__(self, master):
         self.master = master
         self.master.title("PDF加水印工具Alpha1.0.1")
+        # 窗口绘制完成后在后台加载 PyPDF2 和 reportlab
+        warm_up(self.master, "PyPDF2", "reportlab.pdfgen.canvas")
+        # 加水印在后台线程中进行，进度通过引擎交回界面线程
+        self.engine = BackgroundEngine(self.master)
+        self.job = None
+        self.master.protocol("WM_DELETE_WINDOW", self.on_closing)
         
         # 主框架
         self.main_frame = ttk.Frame(self.master)
@@ -71,8 +76,16 @@ class PDFWatermarkApp:
         
         ttk.Button(self.button_frame, text="帮助", command=self.show_help).pack(side="left", padx=5)
         ttk.Button(self.button_frame, text="更新日志", command=self.show_changelog).pack(side="left", padx=5)
-        ttk.Button(self.button_frame, text="添加水印", command=self.add_watermark).pack(side="right", padx=5)
-        
+        self.cancel_btn = ttk.Button(self.button_frame, text="取消", command=self.cancel_watermark, state=tk.DISABLED)
+        self.cancel_btn.pack(side="right", padx=5)
+        self.add_btn = ttk.Button(self.button_frame, text="添加水印", command=self.add_watermark)
+        self.add_btn.pack(side="right", padx=5)
+        
+        # 进度和状态
+        self.progress = ttk.Progressbar(self.main_frame, orient="horizontal", mode="determinate")
+        self.progress.pack(fill="x", padx=5)
+        self.status_var = tk.StringVar(value="")
+        ttk.Label(self.main_frame, textvariable=self.status_var).pack(anchor="w", padx=5)
 
     
     def select_pdf(self):
@@ -85,35 +98,8 @@ class PDFWatermarkApp:
     
     def create_text_watermark(self):
         """创建文本水印PDF"""
-        packet = io.BytesIO()
-        can = canvas.Canvas(packet, pagesize=letter)
-        can.setFillColorRGB(0.5, 0.5, 0.5, self.opacity.get())
-        can.setFont("Helvetica", self.font_size.get())
-        
-        text = self.watermark_text.get()
-        width, height = letter
-        
-        # 根据位置设置文本坐标
-        position = self.position.get()
-        if position == "center":
-            x, y = width/2, height/2
-            can.drawCentredString(x, y, text)
-        elif position == "topleft":
-            x, y = 50, height - 50
-            can.drawString(x, y, text)
-        elif position == "topright":
-            x, y = width - 50, height - 50
-            can.drawRightString(x, y, text)
-        elif position == "bottomleft":
-            x, y = 50, 50
-            can.drawString(x, y, text)
-        elif position == "bottomright":
-            x, y = width - 50, 50
-            can.drawRightString(x, y, text)
-        
-        can.save()
-        packet.seek(0)
-        return PdfReader(packet)
+        return create_text_watermark(self.watermark_text.get(), self.font_size.get(),
+                                     self.opacity.get(), self.position.get())
     
     def show_help(self):
         """显示帮助信息"""
@@ -142,38 +128,67 @@ class PDFWatermarkApp:
             messagebox.showwarning("警告", "请先选择PDF文件")
             return
         
+        # 选择保存位置
+        output_path = filedialog.asksaveasfilename(
+            title="保存加水印的PDF",
+            defaultextension=".pdf",
+            filetypes=[("PDF文件", "*.pdf")]
+        )
+        if not output_path:
+            return
+        
+        # 参数在界面线程中取出，工作线程中不访问 Tk 变量
         try:
-            # 读取原始PDF
-            pdf = PdfReader(pdf_path)
-            if len(pdf.pages) == 0:
-                messagebox.showerror("错误", "PDF文件没有有效页面")
-                return
-            
-            # 获取文本水印
-            watermark = self.create_text_watermark()
-            
-            # 创建PDF写入器
-            writer = PdfWriter()
-            
-            # 为每一页添加水印
-            for page in pdf.pages:
-                page.merge_page(watermark.pages[0])
-                writer.add_page(page)
-            
-            # 保存文件
-            output_path = filedialog.asksaveasfilename(
-                title="保存加水印的PDF",
-                defaultextension=".pdf",
-                filetypes=[("PDF文件", "*.pdf")]
-            )
-            
-            if output_path:
-                with open(output_path, "wb") as output_file:
-                    writer.write(output_file)
-                messagebox.showinfo("成功", f"PDF加水印完成!\n保存到: {output_path}")
-        
-        except Exception as e:
-            messagebox.showerror("错误", f"加水印过程中发生错误: {str(e)}")
+            options = {"text": self.watermark_text.get(), "font_size": self.font_size.get(),
+                       "opacity": self.opacity.get(), "position": self.position.get()}
+        except tk.TclError:
+            messagebox.showerror("错误", "请输入有效的字体大小")
+            return
+        
+        self.progress.config(value=0, maximum=100)
+        self.status_var.set("正在添加水印...")
+        self.add_btn.config(state=tk.DISABLED)
+        self.cancel_btn.config(state=tk.NORMAL)
+        self.job = self.engine.submit(
+            add_watermark, pdf_path, output_path,
+            on_progress=self.on_progress,
+            on_done=lambda job, result: self.on_done(output_path),
+            on_error=self.on_error,
+            on_cancelled=lambda job: self.status_var.set("已取消"),
+            on_finally=self.on_finished,
+            **options
+        )
+    
+    def cancel_watermark(self):
+        """取消正在进行的加水印"""
+        if self.job is not None:
+            self.job.cancel()
+            self.status_var.set("正在取消...")
+    
+    def on_progress(self, job):
+        """更新进度条和状态(界面线程)"""
+        self.progress.config(value=job.done, maximum=job.total or 1)
+        self.status_var.set(job.describe())
+    
+    def on_done(self, output_path):
+        self.status_var.set("加水印完成")
+        messagebox.showinfo("成功", f"PDF加水印完成!\n保存到: {output_path}")
+    
+    def on_error(self, job, error):
+        self.status_var.set("加水印失败")
+        messagebox.showerror("错误", f"加水印过程中发生错误: {str(error)}")
+    
+    def on_finished(self, job):
+        """重新启用按钮并重置进度条"""
+        self.job = None
+        self.add_btn.config(state=tk.NORMAL)
+        self.cancel_btn.config(state=tk.DISABLED)
+        self.progress.config(value=0)
+    
+    def on_closing(self):
+        """关闭窗口时取消未完成的任务"""
+        self.engine.shutdown()
+        self.master.destroy()
 
 if __name__ == "__main__":
     root = tk.Tk()
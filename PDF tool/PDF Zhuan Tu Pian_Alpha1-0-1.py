@@ -4,19 +4,25 @@ sys.dont_write_bytecode = True
 
 import os
 import sys
-import threading
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from tkinter.scrolledtext import ScrolledText
-import fitz  
-from PIL import Image, ImageTk
-import tempfile
-import shutil
 from pathlib import Path
 
 from os.path import dirname, join
 sys.path.insert(0, join(dirname(dirname(__file__)), "Tool module"))
 from BangZhu import get_help_system
+from PDFChuLi import pdf_to_images, render_thumbnails
+from YeMaFanWei import PageSet
+from HouTaiRenWu import BackgroundEngine
+from YanChiDaoRu import lazy_import, warm_up
+
+fitz = lazy_import("fitz")
+Image = lazy_import("PIL.Image")
+ImageTk = lazy_import("PIL.ImageTk")
+
+# 每批在后台渲染的预览页数，渲染完一批就显示一批
+PREVIEW_BATCH = 20
 
 class PDFToImageApp:
     """PDF转图片应用程序主类"""
@@ -25,6 +31,8 @@ class PDFToImageApp:
         """初始化应用程序"""
         self.root = root
         self.root.title("PDF转图片工具Alpha1.0.1")
+        # 窗口绘制完成后在后台加载 PyMuPDF 和 Pillow
+        warm_up(self.root, fitz, Image, ImageTk)
         self.root.geometry("900x700")
         self.root.minsize(800, 600)
         
@@ -37,12 +45,15 @@ class PDFToImageApp:
         self.output_format = tk.StringVar(value="png")
         self.dpi = tk.IntVar(value=300)
         self.quality = tk.IntVar(value=90)
-        self.selected_pages = []
+        self.selected_pages = PageSet()
         self.all_pages = tk.BooleanVar(value=True)
         self.total_pages = 0
         self.pdf_document = None
         self.preview_images = []
-        self.temp_dir = tempfile.mkdtemp()
+        # 转换和预览渲染在后台线程中进行(两个线程，转换不必等预览)，结果通过引擎交回界面线程
+        self.engine = BackgroundEngine(self.root, max_workers=2)
+        self.job = None
+        self.preview_job = None
         
         # 设置样式
         self.style = ttk.Style()
@@ -99,6 +110,11 @@ class PDFToImageApp:
         ttk.Label(control_frame, text="页面选择:").pack(side=tk.LEFT, padx=5)
         self.page_info = ttk.Label(control_frame, text="未选择PDF文件")
         self.page_info.pack(side=tk.LEFT, padx=5)
+        # 按页码范围选择，如 1-3,5,odd,last-2
+        ttk.Button(control_frame, text="按范围选择", command=self._apply_page_range).pack(side=tk.RIGHT, padx=5)
+        self.page_range = tk.StringVar()
+        ttk.Entry(control_frame, textvariable=self.page_range, width=20).pack(side=tk.RIGHT, padx=5)
+        ttk.Label(control_frame, text="页码范围:").pack(side=tk.RIGHT)
         
         # 预览区域 - 使用Canvas和Scrollbar
         self.preview_canvas_frame = ttk.Frame(preview_frame)
@@ -178,6 +194,10 @@ class PDFToImageApp:
         ttk.Button(action_frame, text="帮助", command=self._show_help).pack(side=tk.RIGHT, padx=5, pady=5)
         ttk.Button(action_frame, text="更新日志", command=self._show_changelog).pack(side=tk.RIGHT, padx=5, pady=5)
         
+        # 取消按钮(转换时可用)
+        self.cancel_btn = ttk.Button(action_frame, text="取消", command=self._cancel_conversion, state=tk.DISABLED)
+        self.cancel_btn.pack(side=tk.RIGHT, padx=5, pady=5)
+        
         # 转换按钮
         self.convert_btn = ttk.Button(action_frame, text="开始转换", command=self._start_conversion)
         self.convert_btn.pack(side=tk.RIGHT, padx=5, pady=5)
@@ -202,7 +222,10 @@ class PDFToImageApp:
     def _load_pdf(self, pdf_path):
         """加载PDF文件并生成预览"""
         try:
-            # 关闭之前打开的文档
+            # 停止上一个文件的预览渲染，关闭之前打开的文档
+            if self.preview_job is not None:
+                self.preview_job.cancel()
+                self.preview_job = None
             if self.pdf_document:
                 self.pdf_document.close()
             
@@ -221,7 +244,7 @@ class PDFToImageApp:
             self.preview_images.clear()
             
             # 重置页面选择
-            self.selected_pages = list(range(self.total_pages))
+            self.selected_pages = PageSet.all(self.total_pages)
             self.all_pages.set(True)
             
             # 生成预览
@@ -238,46 +261,43 @@ class PDFToImageApp:
             self.status_var.set("加载PDF失败")
     
     def _generate_previews(self):
-        """生成PDF页面预览"""
+        """在后台分批渲染PDF页面预览"""
         if not self.pdf_document:
             return
+        self._render_preview_batch(0)
+    
+    def _render_preview_batch(self, start):
+        """提交一批预览页面的渲染，完成后在界面线程中显示并提交下一批"""
+        stop = min(start + PREVIEW_BATCH, self.total_pages)
+        self.preview_job = self.engine.submit(
+            render_thumbnails,
+            self.pdf_path.get(),
+            range(start, stop),
+            on_done=lambda job, thumbnails: self._show_previews(job, thumbnails, stop),
+            on_error=self._on_preview_error
+        )
+    
+    def _show_previews(self, job, thumbnails, stop):
+        """为一批缩略图创建预览框架(界面线程)"""
+        # 已经打开了其他文件，丢弃旧文件的预览
+        if job is not self.preview_job:
+            return
         
-        # 清理临时目录
-        for file in os.listdir(self.temp_dir):
-            os.remove(os.path.join(self.temp_dir, file))
-        
-        # 创建预览框架
-        preview_frames = []
-        
-        # 为每一页创建预览
-        for page_num in range(self.total_pages):
+        for page_num, img in thumbnails:
             # 创建页面框架
             page_frame = ttk.Frame(self.preview_content)
             page_frame.pack(side=tk.LEFT, padx=5, pady=5)
             
-            # 获取页面
-            page = self.pdf_document[page_num]
-            
-            # 渲染页面为图像
-            pix = page.get_pixmap(matrix=fitz.Matrix(0.2, 0.2))
-            
-            # 保存为临时图像
-            temp_img_path = os.path.join(self.temp_dir, f"preview_{page_num}.png")
-            pix.save(temp_img_path)
-            
-            # 使用PIL加载图像
-            img = Image.open(temp_img_path)
-            img_tk = ImageTk.PhotoImage(img)
-            
             # 保存引用以防止垃圾回收
+            img_tk = ImageTk.PhotoImage(img)
             self.preview_images.append(img_tk)
             
             # 创建图像标签
             img_label = ttk.Label(page_frame, image=img_tk)
             img_label.pack(padx=2, pady=2)
             
-            # 创建复选框
-            var = tk.BooleanVar(value=True)
+            # 创建复选框，状态与当前的页面选择一致
+            var = tk.BooleanVar(value=page_num in self.selected_pages)
             check = ttk.Checkbutton(
                 page_frame, 
                 text=f"第 {page_num + 1} 页", 
@@ -285,12 +305,22 @@ class PDFToImageApp:
                 command=lambda pn=page_num, v=var: self._toggle_page(pn, v.get())
             )
             check.pack(padx=2, pady=2)
-            
-            preview_frames.append((page_frame, var))
         
         # 更新Canvas滚动区域
-        self.preview_canvas.update_idletasks()
         self.preview_canvas.configure(scrollregion=self.preview_canvas.bbox("all"))
+        
+        if stop < self.total_pages:
+            self.page_info.config(text=f"共 {self.total_pages} 页 (正在生成预览 {stop}/{self.total_pages})")
+            self._render_preview_batch(stop)
+        else:
+            self.page_info.config(text=f"共 {self.total_pages} 页")
+            self.preview_job = None
+    
+    def _on_preview_error(self, job, error):
+        """预览渲染出错，不影响转换"""
+        if job is self.preview_job:
+            self.preview_job = None
+            self.page_info.config(text=f"共 {self.total_pages} 页 (预览生成失败: {str(error)})")
     
     def _toggle_page_selection(self):
         """切换全部页面/选择页面模式"""
@@ -307,16 +337,34 @@ class PDFToImageApp:
         
         # 更新选择的页面列表
         if all_pages:
-            self.selected_pages = list(range(self.total_pages))
+            self.selected_pages = PageSet.all(self.total_pages)
         else:
-            self.selected_pages = []
+            self.selected_pages = PageSet()
+    
+    def _apply_page_range(self):
+        """按页码范围选择页面"""
+        if not self.pdf_document:
+            messagebox.showwarning("警告", "请先选择PDF文件")
+            return
+        try:
+            self.selected_pages = PageSet.parse(self.page_range.get(), self.total_pages)
+        except ValueError as e:
+            messagebox.showerror("错误", str(e))
+            return
+        # 预览区中的第 N 个页面框架对应第 N 页
+        for page_num, widget in enumerate(self.preview_content.winfo_children()):
+            for child in widget.winfo_children():
+                if isinstance(child, ttk.Checkbutton):
+                    child.state(['selected'] if page_num in self.selected_pages else ['!selected'])
+        self.all_pages.set(len(self.selected_pages) == self.total_pages)
+        self.status_var.set(f"已选择 {len(self.selected_pages)} 页: {self.selected_pages.format()}")
     
     def _toggle_page(self, page_num, selected):
         """切换单个页面的选择状态"""
-        if selected and page_num not in self.selected_pages:
-            self.selected_pages.append(page_num)
-        elif not selected and page_num in self.selected_pages:
-            self.selected_pages.remove(page_num)
+        if selected:
+            self.selected_pages.add(page_num)
+        else:
+            self.selected_pages.discard(page_num)
         
         # 更新全选复选框状态
         if len(self.selected_pages) == self.total_pages:
@@ -347,82 +395,63 @@ class PDFToImageApp:
         
         # 禁用转换按钮
         self.convert_btn.config(state=tk.DISABLED)
-        
-        # 在新线程中执行转换
-        threading.Thread(target=self._convert_pdf_to_images, daemon=True).start()
+        self.cancel_btn.config(state=tk.NORMAL)
+        
+        # 设置进度条
+        total_pages = len(self.selected_pages)
+        self.progress["maximum"] = total_pages
+        self.progress["value"] = 0
+        
+        # 在后台线程中执行转换，参数在这里从界面取出
+        self.job = self.engine.submit(
+            pdf_to_images,
+            self.pdf_path.get(),
+            self.output_dir.get(),
+            pages=self.selected_pages.copy(),
+            img_format=self.output_format.get(),
+            dpi=self.dpi.get(),
+            quality=self.quality.get(),
+            on_progress=self._on_progress,
+            on_done=self._on_conversion_done,
+            on_error=self._on_conversion_error,
+            on_cancelled=lambda job: self.status_var.set("已取消转换"),
+            on_finally=self._on_conversion_finished
+        )
     
-    def _convert_pdf_to_images(self):
-        """将PDF转换为图像"""
-        try:
-            # 获取设置
-            pdf_path = self.pdf_path.get()
-            output_dir = self.output_dir.get()
-            img_format = self.output_format.get()
-            dpi = self.dpi.get()
-            quality = self.quality.get()
-            
-            # 确保输出目录存在
-            os.makedirs(output_dir, exist_ok=True)
-            
-            # 获取PDF文件名（不含扩展名）
-            pdf_name = os.path.splitext(os.path.basename(pdf_path))[0]
-            
-            # 创建输出子目录
-            output_subdir = os.path.join(output_dir, f"{pdf_name}_images")
-            os.makedirs(output_subdir, exist_ok=True)
-            
-            # 设置进度条
-            total_pages = len(self.selected_pages)
-            self.progress["maximum"] = total_pages
-            self.progress["value"] = 0
-            
-            # 计算缩放因子
-            zoom = dpi / 72  # 默认PDF DPI是72
-            
-            # 转换选定的页面
-            for i, page_num in enumerate(sorted(self.selected_pages)):
-                # 更新状态
-                self.status_var.set(f"正在转换第 {page_num + 1} 页 ({i + 1}/{total_pages})")
-                self.root.update_idletasks()
-                
-                # 获取页面
-                page = self.pdf_document[page_num]
-                
-                # 渲染页面为图像
-                mat = fitz.Matrix(zoom, zoom)
-                pix = page.get_pixmap(matrix=mat)
-                
-                # 确定输出文件名
-                output_filename = f"{pdf_name}_page_{page_num + 1}.{img_format}"
-                output_path = os.path.join(output_subdir, output_filename)
-                
-                # 保存图像
-                if img_format.lower() == "jpg":
-                    # 对于JPEG，我们需要特殊处理以应用质量设置
-                    pix.save(output_path, output_format="jpeg", jpg_quality=quality)
-                else:
-                    pix.save(output_path)
-                
-                # 更新进度条
-                self.progress["value"] = i + 1
-                self.root.update_idletasks()
-            
-            # 完成
-            self.status_var.set(f"转换完成! 已保存 {total_pages} 个图像到 {output_subdir}")
-            messagebox.showinfo("完成", f"已成功将 {total_pages} 页转换为图像\n保存位置: {output_subdir}")
-            
-            # 在文件资源管理器中打开输出目录
-            self._open_output_folder(output_subdir)
-        
-        except Exception as e:
-            messagebox.showerror("错误", f"转换过程中出错: {str(e)}")
-            self.status_var.set("转换失败")
-        
-        finally:
-            # 重新启用转换按钮
-            self.convert_btn.config(state=tk.NORMAL)
-            # 重置进度条
-            self.progress["value"] = 0
+    def _cancel_conversion(self):
+        """取消正在进行的转换，当前页完成后停止"""
+        if self.job is not None:
+            self.job.cancel()
+            self.status_var.set("正在取消...")
+    
+    def _on_progress(self, job):
+        """更新状态和进度条"""
+        self.status_var.set(job.describe())
+        self.progress["value"] = job.done
+    
+    def _on_conversion_done(self, job, result):
+        """转换完成"""
+        output_subdir = result["output_dir"]
+        total_pages = result["pages"]
+        self.status_var.set(f"转换完成! 已保存 {total_pages} 个图像到 {output_subdir}"
+                            f" (用时 {job.elapsed():.1f} 秒)")
+        resumed = f"\n(其中 {result['resumed']} 页在上次中断前已完成)" if result.get("resumed") else ""
+        messagebox.showinfo("完成", f"已成功将 {total_pages} 页转换为图像\n保存位置: {output_subdir}{resumed}")
+        
+        # 在文件资源管理器中打开输出目录
+        self._open_output_folder(output_subdir)
+    
+    def _on_conversion_error(self, job, error):
+        """转换出错"""
+        messagebox.showerror("错误", f"转换过程中出错: {str(error)}")
+        self.status_var.set("转换失败")
+    
+    def _on_conversion_finished(self, job):
+        """重新启用转换按钮并重置进度条"""
+        self.job = None
+        self.convert_btn.config(state=tk.NORMAL)
+        self.cancel_btn.config(state=tk.DISABLED)
+        self.progress["value"] = 0
     
     def _open_output_folder(self, folder_path):
         """在文件资源管理器中打开输出文件夹"""
@@ -477,16 +506,13 @@ class PDFToImageApp:
     
     def _on_closing(self):
         """关闭应用程序时的清理工作"""
+        # 取消未完成的转换
+        self.engine.shutdown()
+        
         # 关闭PDF文档
         if self.pdf_document:
             self.pdf_document.close()
         
-        # 清理临时目录
-        try:
-            shutil.rmtree(self.temp_dir)
-        except:
-            pass
-        
         # 关闭窗口
         self.root.destroy()
 
@@ -4,7 +4,6 @@ sys.dont_write_bytecode = True
 
 import tkinter as tk
 from tkinter import filedialog, messagebox
-from pdf2docx import Converter
 import os
 import traceback
 from typing import Callable, Optional
@@ -12,6 +11,9 @@ from typing import Callable, Optional
 from os.path import dirname, join
 sys.path.insert(0, join(dirname(dirname(__file__)), "Tool module"))
 from BangZhu import get_help_system
+from PDFChuLi import pdf_to_word
+from HouTaiRenWu import BackgroundEngine
+from YanChiDaoRu import warm_up
 
 class ConfigManager:
     """配置管理类，存储应用程序的配置信息"""
@@ -64,7 +66,8 @@ class ErrorHandler:
             return "内存不足，请尝试转换较小的PDF文件或关闭其他应用程序后重试。"
         else:
             # 记录详细错误信息到日志（这里简化为打印）
-            print(f"Error details: {traceback.format_exc()}")
+            details = "".join(traceback.format_exception(type(error), error, error.__traceback__))
+            print(f"Error details: {details}")
             return f"转换过程中发生错误:\n{error_message}"
     
     @staticmethod
@@ -80,84 +83,51 @@ class ErrorHandler:
 class PDFConverter:
     """PDF转换类，处理PDF到Word的转换逻辑"""
     
-    def __init__(self, update_status: Callable[[str], None], update_ui: Callable[[], None]):
+    def __init__(self, engine: BackgroundEngine, update_status: Callable[[str], None]):
         """初始化PDF转换器
         
         Args:
+            engine: 后台任务引擎，转换在后台线程中进行，窗口保持响应
             update_status: 更新状态栏的回调函数
-            update_ui: 更新UI的回调函数
         """
+        self.engine = engine
         self.update_status = update_status
-        self.update_ui = update_ui
-        self.cv = None
+        self.job = None
     
-    def convert(self, pdf_path: str, output_path: str) -> bool:
-        """将PDF转换为Word文档
+    def is_busy(self) -> bool:
+        """是否有转换正在进行"""
+        return self.job is not None and not self.job.is_finished()
+    
+    def convert(self, pdf_path: str, output_path: str, on_success: Optional[Callable[[str], None]] = None):
+        """在后台将PDF转换为Word文档
         
         Args:
             pdf_path: PDF文件路径
             output_path: 输出Word文件路径
-            
-        Returns:
-            转换是否成功
+            on_success: 转换成功后在界面线程中调用，参数为输出路径
         """
-        try:
-            self.update_status("正在转换...")
-            self.update_ui()
-            
-            # 创建转换器实例
-            self.cv = Converter(pdf_path)
-            total_pages = len(self.cv.pages)
-            
-            # 尝试使用tqdm进行进度显示
-            try:
-                self._convert_with_tqdm(output_path, total_pages)
-            except ImportError:
-                self._convert_simple(output_path, total_pages)
-            
+        def on_done(job, result):
             self.update_status("转换完成!")
-            return True
-            
-        except Exception as e:
-            error_message = ErrorHandler.handle_error(e, self.update_status)
-            ErrorHandler.show_error(error_message)
-            return False
-        finally:
-            if self.cv:
-                self.cv.close()
-    
-    def _convert_with_tqdm(self, output_path: str, total_pages: int):
-        """使用tqdm库进行带进度条的转换
-        
-        Args:
-            output_path: 输出Word文件路径
-            total_pages: PDF总页数
-        """
-        from tqdm import tqdm
+            if on_success is not None:
+                on_success(output_path)
         
-        # 创建进度条
-        with tqdm(total=total_pages, desc="转换进度", unit="页") as progress_bar:
-            # 一次性转换所有页面
-            self.cv.convert(output_path)
-            # 更新进度条
-            progress_bar.update(total_pages)
-            self.update_status(f"已完成转换: 共 {total_pages} 页")
-            self.update_ui()
+        self.update_status("正在读取PDF...")
+        self.job = self.engine.submit(
+            pdf_to_word, pdf_path, output_path,
+            on_progress=self._on_progress,
+            on_done=on_done,
+            on_error=self._on_error,
+            on_cancelled=lambda job: self.update_status("已取消转换")
+        )
     
-    def _convert_simple(self, output_path: str, total_pages: int):
-        """使用简单模式进行转换（无tqdm库时）
-        
-        Args:
-            output_path: 输出Word文件路径
-            total_pages: PDF总页数
-        """
-        self.update_status("正在转换(简单模式)...")
-        self.update_ui()
-        
-        # 一次性转换所有页面
-        self.cv.convert(output_path)
-        self.update_status(f"已完成转换: 共 {total_pages} 页 (简单模式)")
-        self.update_ui()
+    def _on_progress(self, job):
+        """转换进度回调(界面线程)"""
+        self.update_status(job.describe())
+    
+    def _on_error(self, job, error: Exception):
+        """转换失败回调(界面线程)"""
+        error_message = ErrorHandler.handle_error(error, self.update_status)
+        ErrorHandler.show_error(error_message)
 
 
 class UIComponents:
@@ -216,10 +186,6 @@ class UIComponents:
             message: 状态消息
         """
         self.status_var.set(message)
-    
-    def update_ui(self):
-        """强制更新UI"""
-        self.master.update()
 
 
 class PDFtoWordApp:
@@ -233,13 +199,17 @@ class PDFtoWordApp:
         """
         self.master = master
         self.master.title(ConfigManager.TITLE)
+        # pdf2docx 导入较慢，窗口绘制完成后在后台加载
+        warm_up(self.master, "pdf2docx")
         
         # 初始化UI组件
         self.ui = UIComponents(master, self)
         self.ui.create_widgets()
         
         # 初始化PDF转换器
-        self.converter = PDFConverter(self.ui.update_status, self.ui.update_ui)
+        self.engine = BackgroundEngine(master)
+        self.converter = PDFConverter(self.engine, self.ui.update_status)
+        self.master.protocol("WM_DELETE_WINDOW", self.on_close)
     
     def select_pdf(self):
         """选择PDF文件"""
@@ -266,6 +236,9 @@ class PDFtoWordApp:
         if not pdf_path:
             messagebox.showwarning("警告", "请先选择PDF文件")
             return
+        if self.converter.is_busy():
+            messagebox.showwarning("警告", "正在转换，请等待当前转换完成")
+            return
         
         output_path = filedialog.asksaveasfilename(
             title="保存Word文档",
@@ -276,8 +249,17 @@ class PDFtoWordApp:
         if not output_path:
             return
         
-        if self.converter.convert(pdf_path, output_path):
-            messagebox.showinfo("成功", f"PDF转换完成!\n保存到: {output_path}")
+        self.converter.convert(
+            pdf_path, output_path,
+            on_success=lambda path: messagebox.showinfo("成功", f"PDF转换完成!\n保存到: {path}")
+        )
+    
+    def on_close(self):
+        """关闭窗口时取消未完成的转换"""
+        if self.converter.is_busy() and not messagebox.askyesno("确认", "正在转换，是否取消转换并退出？"):
+            return
+        self.engine.shutdown()
+        self.master.destroy()
 
 
 def main():
@@ -6,13 +6,14 @@ import os
 import sys
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-from PIL import Image
-import fitz  # PyMuPDF
 from pathlib import Path
 
 from os.path import dirname, join
 sys.path.insert(0, join(dirname(dirname(__file__)), "Tool module"))
 from BangZhu import get_help_system
+from PDFChuLi import images_to_pdf
+from HouTaiRenWu import BackgroundEngine
+from YanChiDaoRu import warm_up
 
 class ImageToPDFApp:
     """图片转PDF应用程序主类"""
@@ -21,12 +22,17 @@ class ImageToPDFApp:
         """初始化应用程序"""
         self.root = root
         self.root.title("图片转PDF工具Alpha1.0.1")
+        # 窗口绘制完成后在后台加载 PyMuPDF 和 Pillow
+        warm_up(self.root, "fitz", "PIL.Image")
         self.root.geometry("800x600")
         self.root.minsize(600, 400)
         
         # 应用程序变量
         self.image_paths = []
         self.output_path = tk.StringVar()
+        # 转换在后台线程中进行，进度通过引擎交回界面线程
+        self.engine = BackgroundEngine(self.root)
+        self.job = None
         
         # 创建主框架
         self.main_frame = ttk.Frame(self.root)
@@ -36,6 +42,9 @@ class ImageToPDFApp:
         self._create_file_section()
         self._create_list_section()
         self._create_action_section()
+        
+        # 绑定关闭事件
+        self.root.protocol("WM_DELETE_WINDOW", self._on_closing)
     
     def _create_file_section(self):
         """创建文件选择区域"""
@@ -87,8 +96,13 @@ class ImageToPDFApp:
         ttk.Button(action_frame, text="帮助", command=self._show_help).pack(side=tk.RIGHT, padx=5, pady=5)
         ttk.Button(action_frame, text="更新日志", command=self._show_changelog).pack(side=tk.RIGHT, padx=5, pady=5)
         
+        # 取消按钮(转换时可用)
+        self.cancel_btn = ttk.Button(action_frame, text="取消", command=self._cancel_conversion, state=tk.DISABLED)
+        self.cancel_btn.pack(side=tk.RIGHT, padx=5, pady=5)
+        
         # 转换按钮
-        ttk.Button(action_frame, text="开始转换", command=self._start_conversion).pack(side=tk.RIGHT, padx=5, pady=5)
+        self.convert_btn = ttk.Button(action_frame, text="开始转换", command=self._start_conversion)
+        self.convert_btn.pack(side=tk.RIGHT, padx=5, pady=5)
     
     def _add_images(self):
         """添加图片到列表"""
@@ -158,46 +172,46 @@ class ImageToPDFApp:
             messagebox.showwarning("警告", "请选择输出PDF文件路径")
             return
         
-        try:
-            # 创建PDF文档
-            pdf_document = fitz.open()
-            
-            # 按顺序添加图片到PDF
-            for img_path in self.image_paths:
-                try:
-                    # 使用Pillow打开图片
-                    img = Image.open(img_path)
-                    
-                    # 创建PDF页面
-                    pdf_page = pdf_document.new_page(
-                        width=img.width,
-                        height=img.height
-                    )
-                    
-                    # 插入图片到PDF页面
-                    pdf_page.insert_image(
-                        fitz.Rect(0, 0, img.width, img.height),
-                        filename=img_path
-                    )
-                    
-                except Exception as e:
-                    messagebox.showwarning("警告", f"无法处理图片 {os.path.basename(img_path)}: {str(e)}")
-                    continue
-            
-            # 保存PDF
-            pdf_document.save(self.output_path.get())
-            pdf_document.close()
+        self.convert_btn.config(state=tk.DISABLED)
+        self.cancel_btn.config(state=tk.NORMAL)
+        output_path = self.output_path.get()
+        
+        def on_done(job, result):
+            for img_path, error in result["skipped"]:
+                messagebox.showwarning("警告", f"无法处理图片 {os.path.basename(img_path)}: {error}")
             
             # 完成提示
-            messagebox.showinfo("完成", f"已成功将 {len(self.image_paths)} 张图片转换为PDF\n保存位置: {self.output_path.get()}")
-            self.status_var.set("转换完成")
+            converted = len(job.args[0]) - len(result["skipped"])
+            messagebox.showinfo("完成", f"已成功将 {converted} 张图片转换为PDF\n保存位置: {output_path}")
+            self.status_var.set(f"转换完成 (用时 {job.elapsed():.1f} 秒)")
             
             # 在文件资源管理器中打开输出目录
-            self._open_output_folder(os.path.dirname(self.output_path.get()))
+            self._open_output_folder(os.path.dirname(output_path))
         
-        except Exception as e:
-            messagebox.showerror("错误", f"转换过程中出错: {str(e)}")
+        def on_error(job, error):
+            messagebox.showerror("错误", f"转换过程中出错: {str(error)}")
             self.status_var.set("转换失败")
+        
+        def on_finally(job):
+            self.job = None
+            self.convert_btn.config(state=tk.NORMAL)
+            self.cancel_btn.config(state=tk.DISABLED)
+        
+        # 按顺序添加图片到PDF(列表复制一份，转换期间修改列表不影响本次转换)
+        self.job = self.engine.submit(
+            images_to_pdf, list(self.image_paths), output_path,
+            on_progress=lambda job: self.status_var.set(job.describe()),
+            on_done=on_done,
+            on_error=on_error,
+            on_cancelled=lambda job: self.status_var.set("已取消转换"),
+            on_finally=on_finally
+        )
+    
+    def _cancel_conversion(self):
+        """取消正在进行的转换"""
+        if self.job is not None:
+            self.job.cancel()
+            self.status_var.set("正在取消...")
     
     def _open_output_folder(self, folder_path):
         """在文件资源管理器中打开输出文件夹"""
@@ -232,6 +246,11 @@ class ImageToPDFApp:
 
 """
         messagebox.showinfo("更新日志", changelog)
+    
+    def _on_closing(self):
+        """关闭窗口时取消未完成的转换"""
+        self.engine.shutdown()
+        self.root.destroy()
 
 
 def main():
@@ -1,12 +1,22 @@
-from PIL import Image
-import os
+import sys
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 
+from os.path import dirname, join
+sys.path.insert(0, join(dirname(dirname(__file__)), "Tool module"))
+from TuPianChuLi import split_grid
+from HouTaiRenWu import BackgroundEngine
+from YanChiDaoRu import warm_up
+
 class ImageSplitterApp:
     def __init__(self, root):
         self.root = root
         self.root.title("图片九宫格分割工具Alpha1.0.0")
+        # 窗口绘制完成后在后台加载 Pillow
+        warm_up(self.root, "PIL.Image")
+        # 分割在后台线程中进行，进度通过引擎交回界面线程
+        self.engine = BackgroundEngine(self.root)
+        self.root.protocol("WM_DELETE_WINDOW", self._on_closing)
         
         # 输入图片
         tk.Label(root, text="输入图片:").grid(row=0, column=0, padx=5, pady=5)
@@ -25,7 +35,8 @@ class ImageSplitterApp:
         self.progress.grid(row=2, column=0, columnspan=3, padx=5, pady=10)
         
         # 分割按钮和帮助按钮
-        tk.Button(root, text="开始分割", command=self.start_split).grid(row=3, column=1, pady=10)
+        self.split_button = tk.Button(root, text="开始分割", command=self.start_split)
+        self.split_button.grid(row=3, column=1, pady=10)
         tk.Button(root, text="帮助", command=self.show_help).grid(row=3, column=0, pady=10, padx=5)
     
     def show_help(self):
@@ -65,51 +76,34 @@ class ImageSplitterApp:
             messagebox.showerror("错误", "请选择输入图片和输出目录")
             return
         
-        try:
-            self.progress["value"] = 0
-            self.root.update()
-            
-            # 获取输入文件名(不带扩展名)
-            base_name = os.path.splitext(os.path.basename(input_path))[0]
-            # 创建子文件夹路径
-            save_dir = os.path.join(output_dir, base_name + "_split")
-            
-            # 确保输出目录存在
-            os.makedirs(save_dir, exist_ok=True)
-            
-            # 打开图片
-            with Image.open(input_path) as img:
-                width, height = img.size
-                
-                # 计算每个小块的尺寸
-                tile_width = width // 3
-                tile_height = height // 3
-                
-                # 分割图片
-                total = 9
-                for i in range(3):
-                    for j in range(3):
-                        left = j * tile_width
-                        upper = i * tile_height
-                        right = left + tile_width
-                        lower = upper + tile_height
-                        
-                        # 裁剪图片
-                        tile = img.crop((left, upper, right, lower))
-                        
-                        # 保存小块
-                        tile.save(os.path.join(save_dir, f'{base_name}_tile_{i}_{j}.png'))
-                        
-                        # 更新进度
-                        self.progress["value"] = ((i * 3) + j + 1) / total * 100
-                        self.root.update()
-            
-            messagebox.showinfo("完成", f"图片已成功分割为9份，保存在 {save_dir}")
-            self.progress["value"] = 0
-        
-        except Exception as e:
-            messagebox.showerror("错误", f"处理图片时出错: {e}")
-            self.progress["value"] = 0
+        self.progress["value"] = 0
+        self.split_button.config(state=tk.DISABLED)
+        self.engine.submit(
+            split_grid, input_path, output_dir,
+            on_progress=self.update_progress,
+            on_done=self.on_split_done,
+            on_error=self.on_split_error,
+            on_finally=self.on_split_finished
+        )
+    
+    def update_progress(self, job):
+        """更新进度条(界面线程)"""
+        self.progress["value"] = job.done / (job.total or 1) * 100
+    
+    def on_split_done(self, job, result):
+        messagebox.showinfo("完成", f"图片已成功分割为9份，保存在 {result['output_dir']}")
+    
+    def on_split_error(self, job, error):
+        messagebox.showerror("错误", f"处理图片时出错: {error}")
+    
+    def on_split_finished(self, job):
+        self.progress["value"] = 0
+        self.split_button.config(state=tk.NORMAL)
+    
+    def _on_closing(self):
+        """关闭窗口时取消未完成的分割"""
+        self.engine.shutdown()
+        self.root.destroy()
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -1,21 +1,23 @@
 import os
 import sys
-import threading
-from queue import Queue
 from datetime import datetime
-from PIL import Image
-from tkinter import Tk, filedialog, messagebox, StringVar, OptionMenu, IntVar
+from tkinter import Tk, TclError, filedialog, messagebox, StringVar, OptionMenu, IntVar
 from tkinter.ttk import Frame, Button, Label, Entry, Checkbutton, Radiobutton, Progressbar, Separator
 
+from os.path import dirname, join
+sys.path.insert(0, join(dirname(dirname(__file__)), "Tool module"))
+from TuPianChuLi import SUPPORTED_FORMATS, Image, convert_image, convert_images, list_images
+from HouTaiRenWu import BackgroundEngine
+from YanChiDaoRu import warm_up
+
 class ImageConverter:
-    SUPPORTED_FORMATS = [
-        'jpg', 'jpeg', 'png', 'webp', 
-        'bmp', 'gif', 'tiff', 'psd'
-    ]
+    SUPPORTED_FORMATS = SUPPORTED_FORMATS
     
     def __init__(self):
         self.root = Tk()
         self.root.title("图片格式转换工具Alpha1.0.0")
+        # 窗口绘制完成后在后台加载 Pillow
+        warm_up(self.root, Image)
         
         # 设置窗口图标
         try:
@@ -25,7 +27,8 @@ class ImageConverter:
         except:
             pass
             
-        self.task_queue = Queue()
+        # 转换在后台线程中进行，进度通过引擎交回界面线程
+        self.engine = BackgroundEngine(self.root)
         self.running = False
         self.status_var = StringVar()
         
@@ -130,50 +133,141 @@ class ImageConverter:
             self.input_entry.insert(0, filepath)
     
     def start_conversion(self):
-        """启动转换线程"""
+        """检查参数后启动后台转换"""
         if self.running:
             return
+        
+        try:
+            quality = self.quality_var.get()
+        except TclError:
+            messagebox.showerror("错误", "输出质量必须是1-100之间的整数")
+            return
+        
+        if self.mode_var.get() == 'single':
+            job_args = self.prepare_single(quality)
+        else:
+            job_args = self.prepare_batch(quality)
+        if job_args is None:
+            return
             
+        func, args, kwargs = job_args
         self.running = True
         self.progress['value'] = 0
         self.status_var.set("转换中...")
-        threading.Thread(target=self.convert, daemon=True).start()
+        self.engine.submit(
+            func, *args,
+            on_progress=self.update_progress,
+            on_error=self.on_conversion_error,
+            on_finally=self.on_conversion_finished,
+            **kwargs
+        )
         
-    def convert_single_image(self, input_path, output_path, output_format):
-        """转换单个图片"""
-        try:
-            # 检查输出文件是否已存在
-            if os.path.exists(output_path):
-                if not messagebox.askyesno("确认", f"文件 {os.path.basename(output_path)} 已存在，是否覆盖？"):
-                    return "用户取消操作"
+    def prepare_single(self, quality):
+        """确定单文件模式的输出路径，返回 (函数, 位置参数, 关键字参数)，取消时返回 None"""
+        output_format = self.format_var.get()
+        output_dir = self.output_entry.get()
+        input_path = self.input_entry.get()
+        if not input_path:
+            messagebox.showerror("错误", "请先选择输入文件")
+            return None
             
-            quality = max(1, min(100, self.quality_var.get()))
-            img = Image.open(input_path)
+        if not output_dir:
+            output_path = filedialog.asksaveasfilename(
+                title="保存为",
+                defaultextension=f".{output_format}",
+                filetypes=[(f"{output_format.upper()} 文件", f"*.{output_format}")]
+            )
+        else:
+            filename = os.path.basename(input_path)
+            name, ext = os.path.splitext(filename)
+            output_path = os.path.join(output_dir, f"{name}.{output_format}")
+        if not output_path:
+            return None
             
-            # 根据格式设置保存参数
-            save_args = {'format': output_format.upper()}
-            if output_format.lower() in ['jpg', 'jpeg', 'webp']:
-                save_args['quality'] = quality
-            elif output_format.lower() == 'png':
-                save_args['compress_level'] = 9 - int(quality / 11.11)  # 将1-100映射到9-0
+        # 检查输出文件是否已存在
+        if os.path.exists(output_path):
+            if not messagebox.askyesno("确认", f"文件 {os.path.basename(output_path)} 已存在，是否覆盖？"):
+                self.status_var.set("用户取消操作")
+                return None
+        
+        def on_done(job, result):
+            self.status_var.set("转换完成！")
+            messagebox.showinfo("成功", "图片转换完成！")
+        
+        return (convert_image, (input_path, output_path, output_format, quality),
+                {"progress_arg": None, "on_done": on_done})
+    
+    def prepare_batch(self, quality):
+        """收集批量模式的图片，返回 (函数, 位置参数, 关键字参数)，取消时返回 None"""
+        output_format = self.format_var.get()
+        output_dir = self.output_entry.get()
+        input_dir = self.batch_entry.get()
+        if not input_dir:
+            messagebox.showerror("错误", "请先选择输入目录")
+            return None
             
-            img.save(output_path, **save_args)
-            return True
+        if not output_dir:
+            messagebox.showerror("错误", "请先选择输出目录")
+            return None
             
-        except IOError as e:
-            error_msg = f"文件读写错误: {str(e)}"
-            return error_msg
-        except Image.DecompressionBombError:
-            error_msg = "图片尺寸过大，可能造成内存溢出"
-            return error_msg
+        try:
+            # 收集所有图片文件
+            image_files = list_images(input_dir)
         except Exception as e:
-            error_msg = f"未知错误: {str(e)}"
-            return error_msg
+            messagebox.showerror("错误", f"批量转换失败: {str(e)}")
+            return None
+            
+        total = len(image_files)
+        if total == 0:
+            messagebox.showwarning("警告", "指定目录中没有找到支持的图片文件")
+            return None
+        
+        # 已存在的输出文件统一询问一次，后台线程中不能弹出对话框
+        existing = [
+            filename for filename in image_files
+            if os.path.exists(os.path.join(output_dir, f"{os.path.splitext(filename)[0]}.{output_format}"))
+        ]
+        overwrite = True
+        if existing:
+            overwrite = messagebox.askyesno("确认", f"输出目录中已有 {len(existing)} 个同名文件，是否覆盖？\n"
+                                                   f"选择“否”将跳过这些文件。")
+        
+        self.progress['maximum'] = total
+        
+        def on_done(job, result):
+            success_count = len(result["outputs"])
+            self.status_var.set(f"批量转换完成 - 成功: {success_count}, 失败: {total - success_count}"
+                                f" (用时 {job.elapsed():.1f} 秒)")
+            resumed = f"\n(其中 {result['resumed']} 个在上次中断前已完成)" if result.get("resumed") else ""
+            messagebox.showinfo("完成", 
+                f"批量转换完成！\n成功: {success_count}\n失败: {total - success_count}{resumed}")
+        
+        # 全部覆盖时不传回调，这样可以使用结果缓存
+        should_overwrite = None if overwrite else (lambda path: False)
+        return (convert_images, (input_dir, output_dir, output_format, quality),
+                {"should_overwrite": should_overwrite, "on_done": on_done})
+    
+    def describe_error(self, error):
+        """将异常转换为提示信息"""
+        if isinstance(error, Image.DecompressionBombError):
+            return "图片尺寸过大，可能造成内存溢出"
+        if isinstance(error, IOError):
+            return f"文件读写错误: {str(error)}"
+        return f"未知错误: {str(error)}"
+    
+    def update_progress(self, job):
+        """更新进度条和状态(界面线程)"""
+        self.progress['maximum'] = job.total or 1
+        self.progress['value'] = job.done
+        self.status_var.set(job.describe())
+    
+    def on_conversion_error(self, job, error):
+        """转换失败(界面线程)"""
+        self.status_var.set("转换失败")
+        messagebox.showerror("错误", self.describe_error(error))
     
-    def update_progress(self, value):
-        """更新进度条"""
-        self.progress['value'] = value
-        self.root.update_idletasks()
+    def on_conversion_finished(self, job):
+        self.running = False
         
     def show_help(self):
         """显示帮助信息"""
@@ -206,85 +300,6 @@ class ImageConverter:
 
 """
         messagebox.showinfo("帮助", help_text)
-        
-    def convert(self):
-        """主转换逻辑"""
-        output_format = self.format_var.get()
-        output_dir = self.output_entry.get()
-        
-        if self.mode_var.get() == 'single':
-            input_path = self.input_entry.get()
-            if not input_path:
-                messagebox.showerror("错误", "请先选择输入文件")
-                self.running = False
-                return
-                
-            if not output_dir:
-                output_path = filedialog.asksaveasfilename(
-                    title="保存为",
-                    defaultextension=f".{output_format}",
-                    filetypes=[(f"{output_format.upper()} 文件", f"*.{output_format}")]
-                )
-            else:
-                filename = os.path.basename(input_path)
-                name, ext = os.path.splitext(filename)
-                output_path = os.path.join(output_dir, f"{name}.{output_format}")
-                
-            if output_path:
-                result = self.convert_single_image(input_path, output_path, output_format)
-                if result is True:
-                    self.status_var.set("转换完成！")
-                    messagebox.showinfo("成功", "图片转换完成！")
-                else:
-                    messagebox.showerror("错误", result)
-        else:
-            input_dir = self.batch_entry.get()
-            if not input_dir:
-                messagebox.showerror("错误", "请先选择输入目录")
-                self.running = False
-                return
-                
-            if not output_dir:
-                messagebox.showerror("错误", "请先选择输出目录")
-                self.running = False
-                return
-                
-            try:
-                # 收集所有图片文件
-                image_files = [
-                    f for f in os.listdir(input_dir) 
-                    if f.lower().endswith(('.jpg', '.jpeg', '.png', '.webp', '.bmp', '.gif', '.tiff', '.psd'))
-                ]
-                
-                total = len(image_files)
-                if total == 0:
-                    messagebox.showwarning("警告", "指定目录中没有找到支持的图片文件")
-                    self.running = False
-                    return
-                    
-                self.progress['maximum'] = total
-                
-                # 处理每个文件
-                success_count = 0
-                for i, filename in enumerate(image_files):
-                    input_path = os.path.join(input_dir, filename)
-                    name, ext = os.path.splitext(filename)
-                    output_path = os.path.join(output_dir, f"{name}.{output_format}")
-                    
-                    result = self.convert_single_image(input_path, output_path, output_format)
-                    if result is True:
-                        success_count += 1
-                    
-                    self.update_progress(i + 1)
-                
-                self.status_var.set(f"批量转换完成 - 成功: {success_count}, 失败: {total - success_count}")
-                messagebox.showinfo("完成", 
-                    f"批量转换完成！\n成功: {success_count}\n失败: {total - success_count}")
-                    
-            except Exception as e:
-                messagebox.showerror("错误", f"批量转换失败: {str(e)}")
-                
-        self.running = False
 
 if __name__ == "__main__":
     converter = ImageConverter()
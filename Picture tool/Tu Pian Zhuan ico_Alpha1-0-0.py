@@ -1,12 +1,19 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox
-from PIL import Image
 import os
+import sys
+
+from os.path import dirname, join
+sys.path.insert(0, join(dirname(dirname(__file__)), "Tool module"))
+from TuPianChuLi import image_to_ico
+from YanChiDaoRu import warm_up
 
 class IconConverterApp:
     def __init__(self, master):
         self.master = master
         master.title("图片转图标Alpha1.0.0")
+        # 窗口绘制完成后在后台加载 Pillow
+        warm_up(master, "PIL.Image")
         
         # 默认尺寸
         self.default_sizes = [16, 32, 48, 64, 128]
@@ -129,12 +136,8 @@ class IconConverterApp:
             if not output_path:
                 return
             
-            # 转换图片
-            image = Image.open(input_path)
-            resized_img = image.resize(size, Image.LANCZOS)
-            
-            # 保存ICO文件
-            resized_img.save(output_path)
+            # 转换图片并保存ICO文件
+            image_to_ico(input_path, output_path, size)
             messagebox.showinfo("成功", f"ICO文件已保存到:\n{output_path}")
             
         except Exception as e:
@@ -1,15 +1,23 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox
-from PIL import Image, ImageTk
 import os
-import threading
-import math
+import sys
+
+from os.path import dirname, join
+sys.path.insert(0, join(dirname(dirname(__file__)), "Tool module"))
+from TuPianChuLi import Image, combine_images, save_image
+from YanChiDaoRu import lazy_import, warm_up
+from HouTaiRenWu import BackgroundEngine
+
+ImageTk = lazy_import("PIL.ImageTk")
 
 class ImageCombinerApp:
 
     def __init__(self, master):
         self.master = master
         master.title("图片合成工具 Alpha1.0.0")
+        # 窗口绘制完成后在后台加载 Pillow
+        warm_up(master, Image, ImageTk)
         master.geometry("400x500")
 
         # 尝试设置图标
@@ -25,6 +33,8 @@ class ImageCombinerApp:
         self.layout_mode = tk.StringVar(value="uniform")
         self.batch_mode = tk.BooleanVar(value=False)
         self.random_distribute = tk.BooleanVar(value=False)
+        # 合成和保存在后台线程中进行，窗口保持响应
+        self.engine = BackgroundEngine(master)
         
         # 创建GUI组件
         self.create_widgets()
@@ -245,264 +255,86 @@ class ImageCombinerApp:
             defaultextension=".png"
         )
         
-        if save_path:
-            try:
-                # 获取基本文件名和扩展名
-                base, ext = os.path.splitext(save_path)
-                ext = ext.lower()
-                
-                # 保存多张图片
-                count = self.export_count.get()
-                for i in range(count):
-                    # 合成图片(每次重新合成以确保随机分布不同)
-                    combined = self.combine_images()
-                    if combined is None:
-                        return
-                    
-                    # 生成带编号的文件名
-                    if count > 1:
-                        current_path = f"{base}_{i+1}{ext}"
-                    else:
-                        current_path = save_path
-                    
-                    # 根据文件格式保存
-                    if ext in (".jpg", ".jpeg"):
-                        combined.save(current_path, "JPEG", quality=95)
-                    elif ext == ".png":
-                        combined.save(current_path, "PNG")
-                    elif ext == ".bmp":
-                        combined.save(current_path, "BMP")
-                    else:
-                        combined.save(current_path)  # 默认格式
-                
-                messagebox.showinfo("成功", f"已保存 {count} 张图片到: {os.path.dirname(save_path)}")
-                
-                # 在批量模式下继续处理
-                if self.batch_mode.get():
-                    self._batch_process(save_path)
-                    
-            except Exception as e:
-                messagebox.showerror("错误", f"保存失败: {str(e)}")
+        if not save_path:
+            return
+        
+        try:
+            count = self.export_count.get()
+            random_select = self.random_select_count.get()
+        except tk.TclError:
+            messagebox.showerror("错误", "导出数量和随机选择数量必须是整数")
+            return
+        self.btn_save.config(state=tk.DISABLED)
+        self.status_var.set("正在加载图片...")
+        
+        def on_done(job, result):
+            self.status_var.set(f"图片合成完成 (用时 {job.elapsed():.1f} 秒)")
+            messagebox.showinfo("成功", f"已保存 {count} 张图片到: {os.path.dirname(save_path)}")
+            # 在批量模式下继续处理
+            if self.batch_mode.get():
+                self._batch_process(save_path)
+        
+        def on_error(job, error):
+            messagebox.showerror("错误", f"图片合成失败: {str(error)}")
+            self.status_var.set("图片合成失败")
+        
+        self.engine.submit(
+            self._combine_and_save,
+            list(self.image_paths),
+            self.layout_mode.get(),
+            self.random_distribute.get(),
+            random_select,
+            save_path,
+            count,
+            on_progress=lambda job: self.status_var.set(job.describe()),
+            on_done=on_done,
+            on_error=on_error,
+            on_finally=lambda job: self.btn_save.config(state=tk.NORMAL)
+        )
     
     def _batch_process(self, last_save_path):
         """批量处理模式"""
         # 获取文件夹路径
         folder = os.path.dirname(last_save_path)
         
-        # 创建批量处理线程
-        thread = threading.Thread(
-            target=self._run_batch_process,
-            args=(folder,),
-            daemon=True
-        )
-        thread.start()
-        messagebox.showinfo("提示", "批量处理已在后台运行")
+        # 这里可以添加更复杂的批量处理逻辑
+        # 当前简单实现只是提示功能
+        print(f"批量处理模式已启动，结果将保存到: {folder}")
+        self.status_var.set("批量处理完成")
+        messagebox.showinfo("提示", "批量处理已完成")
     
-    def _run_batch_process(self, folder):
-        """执行批量处理"""
-        try:
-            # 这里可以添加更复杂的批量处理逻辑
-            # 当前简单实现只是提示功能
-            print(f"批量处理模式已启动，结果将保存到: {folder}")
-            self.status_var.set("批量处理进行中...")
-            
-            # 示例：可以在这里添加实际的批量处理逻辑
-            # 比如处理多个文件夹的图片
-            
-        except Exception as e:
-            print(f"批量处理出错: {str(e)}")
-            self.status_var.set("批量处理出错")
-        finally:
-            self.status_var.set("批量处理完成")
-    
-    def combine_images(self):
-        """核心图片合成方法"""
-        if not self.image_paths:
-            return None
+    @staticmethod
+    def _combine_and_save(image_paths, layout, random_distribute, random_select, save_path, count,
+                          progress=None):
+        """核心图片合成方法(在后台线程中运行，不访问界面)"""
+        # 获取基本文件名和扩展名
+        base, ext = os.path.splitext(save_path)
+        
+        # 保存多张图片
+        for i in range(count):
+            def on_progress(done, total, message, i=i):
+                # 换算为全部导出图片的总进度
+                progress(i * total + done, count * total,
+                         f"第 {i + 1}/{count} 张: {message}" if count > 1 else message)
             
-        try:
-            self.status_var.set("正在加载图片...")
-            self.master.update()
+            # 合成图片(每次重新合成以确保随机分布不同)
+            combined = combine_images(
+                image_paths,
+                layout=layout,
+                random_distribute=random_distribute,
+                random_select=random_select,
+                progress=on_progress if progress is not None else None
+            )
             
-            # 随机选择指定数量的图片
-            select_count = self.random_select_count.get()
-            if select_count > 0 and select_count < len(self.image_paths):
-                import random
-                selected_paths = random.sample(self.image_paths, select_count)
-                self.status_var.set(f"已随机选择 {select_count} 张图片")
+            # 生成带编号的文件名
+            if count > 1:
+                current_path = f"{base}_{i+1}{ext}"
             else:
-                selected_paths = self.image_paths
-                
-            # 加载选中的图片
-            images = []
-            total_size = 0
-            for i, path in enumerate(selected_paths):
-                self.status_var.set(f"正在加载图片 ({i+1}/{len(selected_paths)})...")
-                self.master.update()
-                img = Image.open(path)
-                total_size += os.path.getsize(path)
-                images.append(img)
-                
-            # 自动压缩大图片
-            if total_size > 10 * 1024 * 1024:  # 10MB
-                self.status_var.set("正在压缩大图片...")
-                self.master.update()
-                images = [self.compress_image(img) for img in images]
-                
-            # 根据布局模式合成图片
-            mode = self.layout_mode.get()
-            self.status_var.set(f"正在合成图片 ({mode}布局)...")
-            self.master.update()
-            
-            if self.random_distribute.get():
-                result = self._random_layout(images)
-            elif mode == "uniform":
-                result = self._uniform_layout(images)
-            elif mode == "horizontal":
-                result = self._horizontal_layout(images)
-            elif mode == "vertical":
-                result = self._vertical_layout(images)
-                
-            self.status_var.set("图片合成完成")
-            return result
-                
-        except Exception as e:
-            messagebox.showerror("错误", f"图片合成失败: {str(e)}")
-            self.status_var.set("图片合成失败")
-            return None
-        finally:
-            self.master.update()
-    
-    def _uniform_layout(self, images):
-        """均匀分布布局"""
-        # 计算网格行列数
-        img_count = len(images)
-        cols = math.ceil(math.sqrt(img_count))
-        rows = math.ceil(img_count / cols)
-        
-        # 计算每张图片的最大尺寸
-        max_width = max(img.size[0] for img in images)
-        max_height = max(img.size[1] for img in images)
-        
-        # 创建画布
-        canvas_width = cols * max_width
-        canvas_height = rows * max_height
-        canvas = Image.new('RGB', (canvas_width, canvas_height), (255, 255, 255))
-        
-        # 排列图片
-        for i, img in enumerate(images):
-            row = i // cols
-            col = i % cols
-            x = col * max_width
-            y = row * max_height
-            canvas.paste(img, (x, y))
-            
-        return canvas
-    
-    def _horizontal_layout(self, images):
-        """水平排列布局"""
-        # 计算总宽度和最大高度
-        total_width = sum(img.size[0] for img in images)
-        max_height = max(img.size[1] for img in images)
-        
-        # 创建画布
-        canvas = Image.new('RGB', (total_width, max_height), (255, 255, 255))
-        
-        # 水平排列图片
-        x_offset = 0
-        for img in images:
-            canvas.paste(img, (x_offset, 0))
-            x_offset += img.size[0]
-            
-        return canvas
-    
-    def _vertical_layout(self, images):
-        """垂直排列布局"""
-        # 计算最大宽度和总高度
-        max_width = max(img.size[0] for img in images)
-        total_height = sum(img.size[1] for img in images)
-        
-        # 创建画布
-        canvas = Image.new('RGB', (max_width, total_height), (255, 255, 255))
-        
-        # 垂直排列图片
-        y_offset = 0
-        for img in images:
-            canvas.paste(img, (0, y_offset))
-            y_offset += img.size[1]
-            
-        return canvas
-    
-    def _random_layout(self, images):
-        """随机分布布局"""
-        import random
-
-        # 计算画布大小 (所有图片总面积的1.5倍)
-        total_area = sum(img.size[0] * img.size[1] for img in images)
-        canvas_size = int(math.sqrt(total_area) * 1.5)
-
-        # 创建画布
-        canvas = Image.new('RGB', (canvas_size, canvas_size), (255, 255, 255))
-        
-        # 随机放置图片
-        placed = []
-        for img in images:
-            placed_success = False
-            attempts = 0
-            max_attempts = 100
-            
-            while not placed_success and attempts < max_attempts:
-                attempts += 1
-                x = random.randint(0, canvas_size - img.size[0])
-                y = random.randint(0, canvas_size - img.size[1])
-                
-                # 检查是否与其他图片重叠
-                overlap = False
-                new_rect = (x, y, x + img.size[0], y + img.size[1])
-                
-                for existing in placed:
-                    if self._check_overlap(new_rect, existing):
-                        overlap = True
-                        break
-                
-                if not overlap:
-                    canvas.paste(img, (x, y))
-                    placed.append(new_rect)
-                    placed_success = True
-        
-        return canvas
-    
-    def _check_overlap(self, rect1, rect2):
-        """检查两个矩形是否重叠"""
-        return not (rect1[2] <= rect2[0] or
-                   rect1[0] >= rect2[2] or
-                   rect1[3] <= rect2[1] or
-                   rect1[1] >= rect2[3])
-
-
-    def compress_image(self, image):
-        """图片压缩方法"""
-        try:
-            # 计算压缩比例 (目标大小: 1MB)
-            original_size = image.size[0] * image.size[1]
-            target_size = 1024 * 1024  # 1MB
-            if original_size <= target_size:
-                return image
-                
-            # 计算压缩比例
-            ratio = math.sqrt(target_size / original_size)
-            new_width = int(image.size[0] * ratio)
-            new_height = int(image.size[1] * ratio)
-            
-            # 高质量压缩
-            return image.resize(
-                (new_width, new_height),
-                Image.Resampling.LANCZOS
-            )
+                current_path = save_path
             
-        except Exception as e:
-            messagebox.showwarning("警告", f"图片压缩失败: {str(e)}")
-            return image
+            # 根据文件格式保存
+            save_image(combined, current_path)
+        return count
             
     def show_help(self):
         """显示使用帮助文档"""
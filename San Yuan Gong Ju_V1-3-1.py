@@ -2,10 +2,47 @@
 import sys
 sys.dont_write_bytecode = True
 
+# 命令行模式：python "San Yuan Gong Ju_V1-3-1.py" run <命令> ...
+# 必须在导入 tkinter 之前分派，以便在没有图形界面的服务器上运行
+if __name__ == "__main__" and len(sys.argv) > 1 and sys.argv[1] == "run":
+    from os.path import dirname, join
+    sys.path.insert(0, join(dirname(__file__), "Tool module"))
+    from MingLingHang import main
+    sys.exit(main(sys.argv[2:]))
+
+# 启动耗时分析模式：python "San Yuan Gong Ju_V1-3-1.py" --profile-startup [工具脚本]
+# 同样需要在导入 tkinter 之前开始统计
+if __name__ == "__main__" and "--profile-startup" in sys.argv:
+    from os.path import basename, dirname, join
+    sys.path.insert(0, join(dirname(__file__), "Tool module"))
+    from QiDongFenXi import StartupProfiler, profile_script
+    keep_open = "--keep-open" in sys.argv
+    profile_args = [a for a in sys.argv[1:] if a not in ("--profile-startup", "--keep-open")]
+    if profile_args:
+        sys.exit(profile_script(profile_args[0], profile_args[1:], not keep_open))
+    StartupProfiler(basename(__file__), not keep_open).start()
+
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog, simpledialog
 import subprocess
 import os
+import threading
+import time
+
+from os.path import dirname, join
+sys.path.insert(0, join(dirname(__file__), "Tool module"))
+from PeiZhi import get_config
+from GongJuJiaZai import open_tool_window
+from YuReChi import WarmPool
+from GongJuZhuCe import ToolRegistry
+from RenWuDiaoDu import JobScheduler, QUEUED, RUNNING
+from RenWuMianBan import JobPanel
+from JinChengJianKong import ProcessMonitor
+from JinChengMianBan import ProcessPanel
+from QiDongFenXi import load_history, find_regressions
+from YaoCe import load_records, summarize, log_path
+from JieGuoHuanCun import get_cache
+from LiuShuiXian import read_definition, find_variables
 
 class ToolLauncher:
     def __init__(self):
@@ -30,6 +67,18 @@ class ToolLauncher:
         refresh_button = ttk.Button(self.top_frame, text="刷新", command=self.refresh_tools)
         refresh_button.pack(side="left", padx=5)
         
+        # 添加任务队列按钮
+        jobs_button = ttk.Button(self.top_frame, text="任务", command=self.show_job_panel)
+        jobs_button.pack(side="left", padx=5)
+        
+        # 添加流水线按钮
+        pipeline_button = ttk.Button(self.top_frame, text="流水线", command=self.run_pipeline)
+        pipeline_button.pack(side="left", padx=5)
+        
+        # 添加进程监控按钮
+        processes_button = ttk.Button(self.top_frame, text="进程", command=self.show_process_panel)
+        processes_button.pack(side="left", padx=5)
+        
         # 添加帮助、关于和更新日志按钮
         help_button = ttk.Button(self.top_frame, text="帮助", command=self.show_help)
         help_button.pack(side="right", padx=5)
@@ -40,6 +89,45 @@ class ToolLauncher:
         changelog_button = ttk.Button(self.top_frame, text="更新日志", command=self.show_changelog)
         changelog_button.pack(side="right", padx=5)
         
+        # 添加设置菜单
+        self.config = get_config()
+        self.in_process_var = tk.BooleanVar(value=self.config.get("in_process"))
+        settings_button = ttk.Menubutton(self.top_frame, text="设置")
+        settings_menu = tk.Menu(settings_button, tearoff=0)
+        settings_menu.add_checkbutton(label="进程内启动工具", variable=self.in_process_var,
+                                      command=self.toggle_in_process)
+        self.warm_pool_size_var = tk.IntVar(value=self.config.get("warm_pool_size"))
+        pool_menu = tk.Menu(settings_menu, tearoff=0)
+        for size in (0, 1, 2, 4):
+            pool_menu.add_radiobutton(label=str(size) if size else "不使用", value=size,
+                                      variable=self.warm_pool_size_var,
+                                      command=self.change_warm_pool_size)
+        settings_menu.add_cascade(label="预热进程数", menu=pool_menu)
+        settings_menu.add_command(label="预热池统计", command=self.show_warm_pool_stats)
+        self.max_jobs_var = tk.IntVar(value=self.config.get("max_jobs"))
+        jobs_menu = tk.Menu(settings_menu, tearoff=0)
+        for count in (1, 2, 4, 8):
+            jobs_menu.add_radiobutton(label=str(count), value=count, variable=self.max_jobs_var,
+                                      command=self.change_max_jobs)
+        settings_menu.add_cascade(label="同时运行任务数", menu=jobs_menu)
+        settings_menu.add_separator()
+        self.profile_var = tk.BooleanVar(value=self.config.get("profile_operations"))
+        settings_menu.add_checkbutton(label="记录性能分析数据", variable=self.profile_var,
+                                      command=self.toggle_profile_operations)
+        settings_menu.add_command(label="启动耗时历史", command=self.show_startup_history)
+        settings_menu.add_command(label="分析全部工具启动耗时", command=self.profile_all_tools)
+        settings_menu.add_command(label="操作耗时统计", command=self.show_telemetry)
+        settings_menu.add_separator()
+        self.result_cache_var = tk.BooleanVar(value=self.config.get("result_cache"))
+        settings_menu.add_checkbutton(label="使用结果缓存", variable=self.result_cache_var,
+                                      command=self.toggle_result_cache)
+        settings_menu.add_command(label="结果缓存统计", command=self.show_cache_stats)
+        settings_menu.add_separator()
+        settings_menu.add_command(label="启动热文件夹监视", command=self.start_hot_folders)
+        settings_menu.add_command(label="启动HTTP服务", command=self.start_service)
+        settings_button["menu"] = settings_menu
+        settings_button.pack(side="left", padx=5)
+        
         # 工具列表
         self.tools = {
             'PDF工具': {
@@ -70,6 +158,22 @@ class ToolLauncher:
             }
         }
         
+        # 可在启动器进程内打开的工具主类，未列出的工具始终使用独立进程启动
+        self.tool_entries = {
+            'PDF拆分': 'PDFSplitterApp',
+            'PDF合并': 'PDFMergerApp',
+            'PDF转Word': 'PDFtoWordApp',
+            'PDF加水印': 'PDFWatermarkApp',
+            'PDF转图片': 'PDFToImageApp',
+            '图片转PDF': 'ImageToPDFApp',
+            '九宫格分割': 'ImageSplitterApp',
+            'ICO转换': 'IconConverterApp',
+            '图片合成': 'ImageCombinerApp',
+            '音频提取': 'AudioExtractorApp',
+            '目录树生成器': 'DirTreeGUI',
+            '空文件夹清理': 'EmptyFolderCleaner',
+        }
+        
         # 设置窗口图标
         try:
             icon_path = os.path.join(os.path.dirname(__file__), 'icon.ico')
@@ -78,32 +182,41 @@ class ToolLauncher:
         except:
             pass
         
+        # 工具注册表，缓存工具路径和可用状态，并监视工具目录的变化
+        self.registry = ToolRegistry(os.path.dirname(os.path.abspath(__file__)), self.tools,
+                                     self.config.get("tool_watch"))
+        
         # 检查工具完整性
         self.check_tools()
         
         self.setup_ui()
         
+        # 启动预热进程池
+        self.warm_pool = WarmPool(self.warm_pool_size_var.get())
+        self.warm_pool.start()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.root.after(200, self.poll_warm_pool)
+        self.root.after(1000, self.poll_tool_changes)
+        
+        # 任务调度器，任务以命令行模式在独立进程中运行
+        self.scheduler = JobScheduler(os.path.abspath(__file__), self.max_jobs_var.get(),
+                                      self.config.get("category_job_limits"))
+        self.job_panel = None
+        
+        # 进程监控，记录工具进程的内存和退出状态
+        self.monitor = ProcessMonitor(self.config.get("memory_limit_mb"),
+                                      self.config.get("tool_memory_limits"),
+                                      self.config.get("memory_warn_ratio"))
+        self.scheduler.on_process = lambda job, process: self.monitor.track(process, job.name, "job")
+        self.process_panel = None
+        self.root.after(1000, self.poll_processes)
+        
     def check_tools(self):
         """检查工具完整性"""
-        missing_tools = []
-        
-        for category, tools in self.tools.items():
-            for tool_name, file_name in tools.items():
-                # 特殊处理不同工具类型的路径
-                if category == 'PDF工具':
-                    tool_path = os.path.join(os.path.dirname(__file__), 'PDF tool', file_name)
-                elif category == '图片工具':
-                    tool_path = os.path.join(os.path.dirname(__file__), 'Picture tool', file_name)
-                elif category == '音频工具':
-                    tool_path = os.path.join(os.path.dirname(__file__), 'Audio tools', file_name)
-                elif category == '文件工具':
-                    tool_path = os.path.join(os.path.dirname(__file__), 'File tool', file_name)
-                elif category == '其他工具':
-                    tool_path = os.path.join(os.path.dirname(__file__), 'Other tool', file_name)
-                else:
-                    tool_path = os.path.join(os.path.dirname(__file__), file_name)
-                if not os.path.exists(tool_path):
-                    missing_tools.append(f"{category} - {tool_name} ({file_name})")
+        missing_tools = [
+            f"{category} - {tool_name} ({file_name})"
+            for category, tool_name, file_name in self.registry.missing_tools()
+        ]
         
         if missing_tools:
             warning_message = "以下工具未找到：\n\n" + "\n".join(missing_tools)
@@ -139,6 +252,10 @@ class ToolLauncher:
         canvas.pack(side="left", fill="both", expand=True)
         scrollbar.pack(side="right", fill="y", padx=(0,1))
         
+        # 分类控件和工具按钮，刷新时只更新状态发生变化的按钮
+        self.category_widgets = {}
+        self.tool_buttons = {}
+        
         # 动态创建工具按钮
         for category, tools in self.tools.items():
             # 创建分类标题框架
@@ -159,66 +276,39 @@ class ToolLauncher:
             tools_container = ttk.Frame(scrollable_frame)
             if not self.category_states[category]:
                 tools_container.pack(fill="x")
+            self.category_widgets[category] = (category_frame, toggle_btn, tools_container)
+            
             for tool_name, file_name in tools.items():
-                # 检查工具是否存在
-                # 特殊处理不同工具类型的路径
-                if category == 'PDF工具':
-                    tool_path = os.path.join(os.path.dirname(__file__), 'PDF tool', file_name)
-                elif category == '图片工具':
-                    tool_path = os.path.join(os.path.dirname(__file__), 'Picture tool', file_name)
-                elif category == '音频工具':
-                    tool_path = os.path.join(os.path.dirname(__file__), 'Audio tools', file_name)
-                elif category == '文件工具':
-                    tool_path = os.path.join(os.path.dirname(__file__), 'File tool', file_name)
-                elif category == '其他工具':
-                    tool_path = os.path.join(os.path.dirname(__file__), 'Other tool', file_name)
-                else:
-                    tool_path = os.path.join(os.path.dirname(__file__), file_name)
                 button = ttk.Button(tools_container, text=tool_name, width=50,
                                   command=lambda f=file_name, c=category: self.run_tool(f, c))
-                
-                # 如果工具不存在，禁用按钮
-                if not os.path.exists(tool_path):
-                    button.state(['disabled'])
-                    self.create_tooltip(button, f"工具文件不存在: {file_name}")
-                else:
-                    self.create_tooltip(button, f"启动{tool_name}")
+                self.create_context_menu(button, file_name, category)
+                self.tool_buttons[(category, file_name)] = button
+                self.update_tool_button(category, file_name)
                 button.pack(pady=2)
         # 状态栏
         self.status_var = tk.StringVar(value="就绪")
         self.status_bar = ttk.Label(self.root, textvariable=self.status_var, relief="sunken")
         self.status_bar.pack(side="bottom", fill="x", padx=10, pady=5)
         
+    def update_tool_button(self, category, file_name):
+        """根据注册表中缓存的状态更新单个工具按钮"""
+        button = self.tool_buttons[(category, file_name)]
+        tool_name = self.get_display_name(category, file_name)
+        # 如果工具不存在，禁用按钮
+        if not self.registry.is_available(category, file_name):
+            button.state(['disabled'])
+            self.create_tooltip(button, f"工具文件不存在: {file_name}")
+        else:
+            button.state(['!disabled'])
+            self.create_tooltip(button, f"启动{tool_name}")
+        
     def check_tool_exists(self, category, file_name):
         """检查工具文件是否存在"""
-        if category == 'PDF工具':
-            tool_path = os.path.join(os.path.dirname(__file__), 'PDF tool', file_name)
-        elif category == '图片工具':
-            tool_path = os.path.join(os.path.dirname(__file__), 'Picture tool', file_name)
-        elif category == '音频工具':
-            tool_path = os.path.join(os.path.dirname(__file__), 'Audio tools', file_name)
-        elif category == '文件工具':
-            tool_path = os.path.join(os.path.dirname(__file__), 'File tool', file_name)
-        elif category == '其他工具':
-            tool_path = os.path.join(os.path.dirname(__file__), 'Other tool', file_name)
-        else:
-            tool_path = os.path.join(os.path.dirname(__file__), file_name)
-        return os.path.exists(tool_path)
+        return self.registry.is_available(category, file_name)
 
     def get_tool_path(self, category, file_name):
         """获取工具文件的完整路径"""
-        if category == 'PDF工具':
-            return os.path.join(os.path.dirname(__file__), 'PDF tool', file_name)
-        elif category == '图片工具':
-            return os.path.join(os.path.dirname(__file__), 'Picture tool', file_name)
-        elif category == '音频工具':
-            return os.path.join(os.path.dirname(__file__), 'Audio tools', file_name)
-        elif category == '文件工具':
-            return os.path.join(os.path.dirname(__file__), 'File tool', file_name)
-        elif category == '其他工具':
-            return os.path.join(os.path.dirname(__file__), 'Other tool', file_name)
-        else:
-            return os.path.join(os.path.dirname(__file__), file_name)
+        return self.registry.get_path(category, file_name)
 
     def refresh_tools(self):
         """刷新工具状态并更新界面"""
@@ -226,81 +316,24 @@ class ToolLauncher:
         self.status_var.set("正在刷新工具列表...")
         self.root.update()
         
-        # 清除现有的工具列表框架
-        for widget in self.root.winfo_children():
-            if isinstance(widget, ttk.LabelFrame):
-                widget.destroy()
-        
-        # 创建新的工具列表框架
-        frame = ttk.LabelFrame(self.root, text="可用工具", padding="10")
-        frame.pack(fill="both", expand=True, padx=10, pady=5)
-        
-        # 创建Canvas和滚动条
-        canvas = tk.Canvas(frame)
-        scrollbar = ttk.Scrollbar(frame, orient="vertical", command=canvas.yview)
-        scrollable_frame = ttk.Frame(canvas)
-        
-        # 配置Canvas
-        scrollable_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(
-                scrollregion=canvas.bbox("all")
-            )
-        )
-        canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
-        
-        # 绑定鼠标滚轮事件
-        def _on_mousewheel(event):
-            canvas.yview_scroll(int(-1*(event.delta/120)), "units")
-        canvas.bind_all("<MouseWheel>", _on_mousewheel)
-        
-        # 布局Canvas和滚动条
-        canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y", padx=(0,5))
-        
-        # 动态创建工具按钮
-        available_tools = 0
-        total_tools = 0
-        
-        for category, tools in self.tools.items():
-            # 创建分类标题框架
-            category_frame = ttk.Frame(scrollable_frame)
-            category_frame.pack(fill="x", pady=(10,0))
-            
-            # 添加折叠/展开按钮
-            toggle_text = "▼" if self.category_states[category] else "▲"
-            toggle_btn = ttk.Button(category_frame, text=toggle_text, width=2,
-                                 command=lambda c=category: self.toggle_category(c))
-            toggle_btn.pack(side="left")
-            toggle_btn.category = category  # 标记按钮所属分类
-            
-            # 添加分类标签
-            ttk.Label(category_frame, text=f"{category}：", font=("", 10, "bold")).pack(side="left", anchor="w")
-            
-            # 添加工具按钮容器
-            tools_container = ttk.Frame(scrollable_frame)
-            if not self.category_states[category]:
-                tools_container.pack(fill="x")
-            
-            for tool_name, file_name in tools.items():
-                total_tools += 1
-                button = ttk.Button(tools_container, text=tool_name, width=50,
-                                  command=lambda f=file_name, c=category: self.run_tool(f, c))
-                
-                # 检查工具是否存在
-                if not self.check_tool_exists(category, file_name):
-                    button.state(['disabled'])
-                    self.create_tooltip(button, f"工具文件不存在: {file_name}")
-                else:
-                    available_tools += 1
-                    self.create_tooltip(button, f"启动{tool_name}")
-                
-                button.pack(pady=2)
+        # 重新检查所有工具目录，只更新状态发生变化的按钮
+        for category, file_name in self.registry.scan():
+            self.update_tool_button(category, file_name)
         
         # 更新状态栏
+        total_tools = len(self.tool_buttons)
+        available_tools = sum(
+            1 for category, file_name in self.tool_buttons
+            if self.registry.is_available(category, file_name)
+        )
         self.status_var.set(f"刷新完成 - 可用工具: {available_tools}/{total_tools}")
         
+    def poll_tool_changes(self):
+        """定时处理工具目录的变化"""
+        for category, file_name in self.registry.poll():
+            self.update_tool_button(category, file_name)
+        self.root.after(1000, self.poll_tool_changes)
+        
     def create_tooltip(self, widget, text):
         """为控件创建工具提示"""
         def enter(event):
@@ -325,7 +358,312 @@ class ToolLauncher:
         widget.bind('<Enter>', enter)
         widget.bind('<Leave>', leave)
         
-    def run_tool(self, tool_name, category=None):
+    def create_context_menu(self, widget, file_name, category):
+        """为工具按钮创建右键菜单"""
+        menu = tk.Menu(widget, tearoff=0)
+        menu.add_command(label="在独立进程中启动",
+                         command=lambda: self.run_tool(file_name, category, isolated=True))
+        
+        def show_menu(event):
+            # 工具文件不存在时不显示菜单
+            if widget.instate(['!disabled']):
+                menu.post(event.x_root, event.y_root)
+        
+        widget.bind('<Button-3>', show_menu)
+        
+    def toggle_in_process(self):
+        """切换进程内启动模式并保存设置"""
+        self.config.set("in_process", self.in_process_var.get())
+        
+    def change_warm_pool_size(self):
+        """修改预热进程数并保存设置"""
+        size = self.warm_pool_size_var.get()
+        self.config.set("warm_pool_size", size)
+        self.warm_pool.resize(size)
+        
+    def poll_warm_pool(self):
+        """定时读取预热池的启动报告并显示在状态栏"""
+        while not self.warm_pool.reports.empty():
+            tool_name, hit, elapsed_ms = self.warm_pool.reports.get()
+            hit_text = "预热命中" if hit else "冷启动"
+            if elapsed_ms is None:
+                self.status_var.set(f"已启动：{tool_name}（{hit_text}）")
+            else:
+                self.status_var.set(f"已启动：{tool_name}（{hit_text}，首窗口 {elapsed_ms:.0f} ms）")
+        self.root.after(200, self.poll_warm_pool)
+        
+    def show_warm_pool_stats(self):
+        """显示预热池命中率和首窗口时间统计"""
+        lines = [f"预热进程数: {self.warm_pool.size}，空闲: {len(self.warm_pool.ready)}", ""]
+        with self.warm_pool.lock:
+            stats = {name: dict(values) for name, values in self.warm_pool.stats.items()}
+        for tool_name, tool_stats in stats.items():
+            times = tool_stats["first_window_ms"]
+            average = f"{sum(times) / len(times):.0f} ms" if times else "-"
+            lines.append(f"{tool_name}: 命中 {tool_stats['hits']} 次，未命中 {tool_stats['misses']} 次，"
+                         f"平均首窗口 {average}")
+        if not stats:
+            lines.append("暂无启动记录")
+        messagebox.showinfo("预热池统计", "\n".join(lines))
+        
+    def toggle_profile_operations(self):
+        """切换核心操作的性能分析并保存设置，对之后启动的工具生效"""
+        enabled = self.profile_var.get()
+        self.config.set("profile_operations", enabled)
+        if enabled:
+            messagebox.showinfo("性能分析", "之后启动的工具和任务会在输出文件旁边保存 .prof 性能分析文件"
+                                          "和内存分配摘要。性能分析会使操作变慢，排查完问题后请关闭。")
+        
+    def change_max_jobs(self):
+        """修改同时运行的任务数并保存设置"""
+        max_jobs = self.max_jobs_var.get()
+        self.config.set("max_jobs", max_jobs)
+        self.scheduler.set_limits(max_jobs=max_jobs)
+        
+    def show_job_panel(self):
+        """打开任务队列面板(已打开时切换到前台)"""
+        if self.job_panel is not None and self.job_panel.window.winfo_exists():
+            self.job_panel.window.lift()
+            return
+        self.job_panel = JobPanel(self.root, self.scheduler)
+        
+    def run_pipeline(self):
+        """选择流水线定义文件，填写其中的变量后提交到任务队列"""
+        path = filedialog.askopenfilename(title="选择流水线文件",
+                                          filetypes=[("流水线文件", "*.json *.yaml *.yml"), ("所有文件", "*.*")])
+        if not path:
+            return
+        try:
+            definition = read_definition(path)
+        except Exception as e:
+            messagebox.showerror("错误", f"无法读取流水线文件: {str(e)}")
+            return
+        argv = ["pipeline", "--file", path]
+        for name in find_variables(definition):
+            value = simpledialog.askstring("流水线变量", f"请输入 {name} 的值：", parent=self.root)
+            if value is None:
+                return
+            argv += ["--var", f"{name}={value}"]
+        try:
+            self.scheduler.submit(argv, name=definition.get("name") or os.path.basename(path))
+        except Exception as e:
+            messagebox.showerror("错误", f"提交流水线失败: {str(e)}")
+            return
+        self.show_job_panel()
+        
+    def show_process_panel(self):
+        """打开进程监控面板(已打开时切换到前台)"""
+        if self.process_panel is not None and self.process_panel.window.winfo_exists():
+            self.process_panel.window.lift()
+            return
+        self.process_panel = ProcessPanel(self.root, self.monitor)
+        
+    def poll_processes(self):
+        """定时采样工具进程，处理内存警告和超限结束"""
+        events = self.monitor.sample()
+        self.root.after(1000, self.poll_processes)
+        for kind, tracked in events:
+            if kind == "warn":
+                self.status_var.set(f"警告：{tracked.name} 内存已达 {tracked.rss / (1024 * 1024):.0f} MB，"
+                                    f"上限 {tracked.limit_mb} MB")
+            elif kind == "kill":
+                self.status_var.set(f"{tracked.name} 内存超过上限，已被结束")
+                messagebox.showwarning("内存超限", f"{tracked.name} 使用的内存超过 {tracked.limit_mb} MB，"
+                                                  f"已被结束以防止系统卡顿。")
+        
+    def show_startup_history(self):
+        """显示启动耗时分析的历史记录，并标出最近一次明显变慢的工具"""
+        records = load_history()
+        history_window = tk.Toplevel(self.root)
+        history_window.title("启动耗时历史")
+        history_window.geometry("600x360")
+        
+        text_widget = tk.Text(history_window, wrap="none", padx=10, pady=10)
+        text_widget.pack(fill="both", expand=True)
+        if not records:
+            text_widget.insert("end", "暂无记录，可以使用\"设置 - 分析全部工具启动耗时\"，\n"
+                                      "或以 --profile-startup 参数运行启动器")
+        regressions = find_regressions(records)
+        for target, latest, median in regressions:
+            text_widget.insert("end", f"⚠ {target} 启动变慢：{latest:.0f} ms (之前中位数 {median:.0f} ms)\n")
+        if regressions:
+            text_widget.insert("end", "\n")
+        
+        def fmt(value):
+            return "-" if value is None else f"{value:.0f}"
+        
+        for record in reversed(records[-100:]):
+            text_widget.insert("end", f"{record.get('timestamp')}  {record.get('target')}  "
+                                      f"首次绘制 {fmt(record.get('first_paint_ms'))} ms  "
+                                      f"导入 {fmt(record.get('import_ms'))} ms  "
+                                      f"Tk初始化 {fmt(record.get('tk_init_ms'))} ms  "
+                                      f"界面构建 {fmt(record.get('build_ms'))} ms\n")
+        text_widget.config(state="disabled")
+        
+    def profile_all_tools(self):
+        """在后台依次以启动分析模式运行所有可用工具"""
+        scripts = [
+            self.registry.get_path(category, file_name)
+            for category, file_name in self.tool_buttons
+            if self.registry.is_available(category, file_name)
+        ]
+        if not messagebox.askyesno("启动耗时分析", f"将依次打开 {len(scripts)} 个工具并在绘制完成后自动关闭，"
+                                                 f"期间请不要操作这些窗口。是否继续？"):
+            return
+        
+        def worker():
+            for script in scripts:
+                try:
+                    subprocess.run([sys.executable, os.path.abspath(__file__), "--profile-startup", script],
+                                   timeout=120, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                except subprocess.TimeoutExpired:
+                    pass
+            self.root.after(0, lambda: self.status_var.set("启动耗时分析完成，可在\"启动耗时历史\"中查看"))
+        
+        self.status_var.set("正在分析工具启动耗时...")
+        threading.Thread(target=worker, daemon=True).start()
+        
+    def show_telemetry(self):
+        """按操作汇总遥测记录，显示耗时百分位数、吞吐量和内存峰值"""
+        telemetry_window = tk.Toplevel(self.root)
+        telemetry_window.title("操作耗时统计")
+        telemetry_window.geometry("980x400")
+        
+        group_options = {
+            "按操作": ("operation",),
+            "按操作和主机": ("operation", "host"),
+            "按操作和工具": ("operation", "tool"),
+        }
+        control_frame = ttk.Frame(telemetry_window)
+        control_frame.pack(fill="x", padx=10, pady=5)
+        ttk.Label(control_frame, text="分组：").pack(side="left")
+        group_var = tk.StringVar(value="按操作")
+        group_combo = ttk.Combobox(control_frame, textvariable=group_var, values=list(group_options),
+                                   state="readonly", width=14)
+        group_combo.pack(side="left")
+        summary_var = tk.StringVar()
+        ttk.Label(control_frame, textvariable=summary_var).pack(side="left", padx=10)
+        
+        columns = ("key", "count", "errors", "cached", "p50", "p90", "p99", "cpu", "throughput", "rss")
+        headings = ("操作", "次数", "失败", "缓存命中", "P50(秒)", "P90(秒)", "P99(秒)", "CPU P50(秒)",
+                    "吞吐量 P50", "内存峰值 P90(MB)")
+        tree = ttk.Treeview(telemetry_window, columns=columns, show="headings")
+        for column, heading in zip(columns, headings):
+            tree.heading(column, text=heading)
+            tree.column(column, width=200 if column == "key" else 80, anchor="w" if column == "key" else "e")
+        tree.pack(fill="both", expand=True, padx=10)
+        
+        def fmt(value, digits=2):
+            return "-" if value is None else f"{value:.{digits}f}"
+        
+        def refresh(event=None):
+            records = load_records()
+            tree.delete(*tree.get_children())
+            for row in summarize(records, group_options[group_var.get()]):
+                throughput = "-"
+                if row["throughput_p50"] is not None:
+                    throughput = f"{row['throughput_p50']:.1f} {row['throughput_unit']}"
+                tree.insert("", "end", values=(
+                    " / ".join(row["key"]), row["count"], row["errors"], row["cached"],
+                    fmt(row["wall_p50"]), fmt(row["wall_p90"]), fmt(row["wall_p99"]),
+                    fmt(row["cpu_p50"]), throughput, fmt(row["rss_p90"], 0)))
+            summary_var.set(f"共 {len(records)} 条记录" if records else
+                            "暂无记录，工具完成操作后会自动记录")
+        
+        group_combo.bind("<<ComboboxSelected>>", refresh)
+        button_frame = ttk.Frame(telemetry_window)
+        button_frame.pack(fill="x", padx=10, pady=5)
+        ttk.Button(button_frame, text="刷新", command=refresh).pack(side="left")
+        ttk.Label(button_frame, text=f"记录文件：{log_path()}").pack(side="left", padx=10)
+        refresh()
+        
+    def toggle_result_cache(self):
+        """切换结果缓存并保存设置，对之后启动的工具和任务生效"""
+        self.config.set("result_cache", self.result_cache_var.get())
+        
+    def show_cache_stats(self):
+        """显示结果缓存的命中统计，可以清空缓存"""
+        cache = get_cache()
+        stats_window = tk.Toplevel(self.root)
+        stats_window.title("结果缓存统计")
+        stats_window.geometry("380x260")
+        stats_var = tk.StringVar()
+        
+        def refresh():
+            stats = cache.stats()
+            lookups = stats["hits"] + stats["misses"]
+            hit_rate = f"{stats['hits'] / lookups:.0%}" if lookups else "-"
+            mb = 1024 * 1024
+            stats_var.set(
+                f"命中: {stats['hits']} 次    未命中: {stats['misses']} 次    命中率: {hit_rate}\n"
+                f"节省: {stats['bytes_saved'] / mb:.1f} MB 输出，约 {stats['seconds_saved']:.0f} 秒计算\n"
+                f"保存: {stats['stores']} 次    淘汰: {stats['evictions']} 个条目\n"
+                f"当前: {stats['entries']} 个条目，{stats['size'] / mb:.1f} MB / "
+                f"上限 {stats['max_bytes'] / mb:.0f} MB\n"
+                f"位置: {cache.directory}")
+        
+        def clear():
+            if messagebox.askyesno("清空缓存", "确定要删除所有缓存的结果吗？", parent=stats_window):
+                cache.clear()
+                refresh()
+        
+        ttk.Label(stats_window, textvariable=stats_var, justify="left", wraplength=350).pack(
+            fill="both", expand=True, padx=10, pady=10)
+        button_frame = ttk.Frame(stats_window)
+        button_frame.pack(fill="x", padx=10, pady=5)
+        ttk.Button(button_frame, text="刷新", command=refresh).pack(side="left")
+        ttk.Button(button_frame, text="清空缓存", command=clear).pack(side="left", padx=5)
+        refresh()
+        
+    def start_hot_folders(self):
+        """把热文件夹监视作为任务提交到任务队列，在任务面板中查看处理进度或停止"""
+        if not self.config.get("hot_folders"):
+            messagebox.showinfo("热文件夹", "还没有配置热文件夹。\n请在数据目录的 config.json 中添加 hot_folders，例如：\n"
+                                           '[{"path": "D:/热文件夹/水印", "action": "pdf-watermark", '
+                                           '"options": {"text": "机密"}}]')
+            return
+        self.submit_service_job(["watch"], "热文件夹监视")
+        
+    def start_service(self):
+        """把HTTP服务作为任务提交到任务队列，在任务面板中停止"""
+        self.submit_service_job(["serve"], "HTTP服务")
+        
+    def submit_service_job(self, argv, name):
+        """提交长期运行的任务，同一个命令已在队列中时只打开任务面板"""
+        with self.scheduler.lock:
+            running = any(job.argv[:1] == argv[:1] and job.state in (QUEUED, RUNNING)
+                          for job in self.scheduler.jobs)
+        if not running:
+            self.scheduler.submit(argv, name=name)
+        self.show_job_panel()
+        
+    def on_close(self):
+        """关闭启动器时结束空闲的预热进程和未完成的任务"""
+        counts = self.scheduler.counts()
+        unfinished = counts[QUEUED] + counts[RUNNING]
+        if unfinished and not messagebox.askyesno(
+                "确认退出", f"还有 {unfinished} 个任务未完成，退出将取消这些任务。是否退出？"):
+            return
+        self.scheduler.shutdown()
+        self.warm_pool.shutdown()
+        self.root.destroy()
+        
+    def get_display_name(self, category, file_name):
+        """根据工具文件名查找工具的显示名称"""
+        for tool_name, tool_file in self.tools.get(category, {}).items():
+            if tool_file == file_name:
+                return tool_name
+        return None
+        
+    def can_run_in_process(self, display_name):
+        """判断工具是否可以在启动器进程内打开"""
+        if not self.in_process_var.get():
+            return False
+        if display_name not in self.tool_entries:
+            return False
+        return display_name not in self.config.get("isolated_tools")
+        
+    def run_tool(self, tool_name, category=None, isolated=False):
         """运行指定的工具"""
         try:
             # 获取工具的完整路径
@@ -338,11 +676,30 @@ class ToolLauncher:
             self.status_var.set(f"正在启动：{tool_name}")
             self.root.update()
             
-            # 使用Python解释器运行工具
-            subprocess.Popen([sys.executable, tool_path])
+            # 进程内模式：复用启动器已导入的库，以窗口方式打开工具
+            display_name = self.get_display_name(category, tool_name)
+            fallback_note = ""
+            if not isolated and self.can_run_in_process(display_name):
+                start_time = time.perf_counter()
+                try:
+                    open_tool_window(self.root, tool_path, self.tool_entries[display_name])
+                    elapsed = (time.perf_counter() - start_time) * 1000
+                    self.status_var.set(f"已启动：{tool_name}（进程内，{elapsed:.0f} ms）")
+                    return
+                except Exception as e:
+                    # 进程内打开失败时回退到独立进程；pythonw 下没有 stdout，原因同时显示在状态栏
+                    print(f"进程内启动 {tool_name} 失败，改用独立进程: {str(e)}", file=sys.stderr)
+                    fallback_note = f"（进程内启动失败，已改用独立进程: {str(e)}）"
+            
+            # 使用Python解释器运行工具，优先交给已预热的进程
+            if self.warm_pool.size > 0:
+                process = self.warm_pool.launch(tool_path, display_name or tool_name)
+            else:
+                process = subprocess.Popen([sys.executable, tool_path])
+            self.monitor.track(process, display_name or tool_name)
             
             # 更新状态
-            self.status_var.set(f"已启动：{tool_name}")
+            self.status_var.set(f"已启动：{tool_name}{fallback_note}")
             
         except Exception as e:
             self.status_var.set("启动失败！")
@@ -423,6 +780,32 @@ V1.3.0 (2025-6-6)
 V1.3.1 (2025-6-7)
 -1.对PDF工具列表中，帮助的代码片段进行优化
 -2.对PDF列表模块添加禁止生成 .pyc 文件
+V1.4.0 (2026-10-18)
+-1.新增进程内启动模式(设置菜单)，工具以窗口方式在启动器内打开
+-2.工具按钮右键可选择在独立进程中启动
+-3.新增预热进程池，重型工具交给已导入依赖的后台进程启动
+-4.工具列表自动监视工具目录，刷新时只更新状态变化的按钮
+-5.新增命令行模式(run 命令)，无需图形界面即可运行工具，进度以JSON行输出
+-6.新增任务队列，限制同时运行的任务数和每类工具的任务数，支持优先级和取消
+-7.新增进程监控，显示工具进程的内存和CPU时间，可设置内存上限，运行记录保存在本地
+-8.新增启动耗时分析(--profile-startup)，记录导入耗时和首次绘制时间并保留历史
+-9.工具的重型依赖改为延迟导入，窗口先显示，依赖在绘制完成后于后台加载
+-10.新增性能分析开关，记录核心操作的 cProfile 数据和内存分配摘要
+-11.新增操作遥测记录和"操作耗时统计"窗口，按操作查看耗时百分位数、吞吐量和内存峰值
+-12.PDF转Word、PDF转图片、图片转PDF、格式转换和图片合成改为后台转换，窗口不再卡住，显示剩余时间并可取消
+-13.新增结果缓存，相同文件和参数再次处理时直接复用上次的输出，默认关闭，可在设置菜单中开启或查看统计
+-14.新增流水线，用JSON/YAML文件把PDF转图片、九宫格、格式转换、合成、转PDF等步骤串起来，步骤之间不写中间文件
+-15.新增热文件夹监视，放入 in 目录的文件自动加水印、转换格式或提取音频，处理后移入 done/failed，重启后不会重复处理
+-16.新增HTTP服务模式，局域网内其他机器上的脚本可以上传文件并调用拆分、合并、水印、转换等操作
+-17.PDF拆分、PDF转图片、批量格式转换和批量音频提取支持断点续传，中断后重新运行会跳过已完成的部分
+-18.新增内存预算，高分辨率PDF转PNG超过预算时分块渲染(分辨率不变)，转JPEG、大图合成和大文件PDF转Word超过预算时降低分辨率、缩小图片或排队运行
+-19.PDF拆分新增批量拆分，文件夹或通配符匹配的全部PDF在多个进程中并行拆分，逐个显示每个文件的结果
+-20.拆分出的文件较多时(如几千页逐页拆分)由多个进程并行写出，拆分大文件更快
+-21.页码范围支持 odd/even、first-N、last-N、every-N 和负数页码，PDF合并和PDF转图片也可以按页码范围选择页面
+-22.PDF拆分新增按大小拆分，每份不超过指定的MB数(命令行 run pdf-split --max-mb 10)
+-23.PDF拆分新增按书签拆分，按选定的书签层级把每章输出为一个文件，文件名取自书签标题
+-24.PDF拆分和合并的输出文件只保留页面用到的图片和字体，并合并内容相同的图片，共用资源的文件拆分后明显变小
+-25.PDF合并添加文件后在后台读取页数，添加、移除文件和全选时只更新对应的文件，合并时复用已解析的文件，文件较多时不再卡顿
 
         """
         
@@ -458,8 +841,31 @@ V1.3.1 (2025-6-7)
 2. 使用方法
    - 在界面上选择需要使用的工具，点击对应按钮
    - 工具将在独立窗口中启动
+   - 在"设置"菜单中开启"进程内启动工具"后，工具在启动器内打开，速度更快
+   - 右键点击工具按钮可强制在独立进程中启动
    - 可以同时运行多个工具
    - 状态栏会显示工具的启动状态
+   - 点击"任务"打开任务队列，可以把耗时的转换排队运行，
+     同时运行的任务数在"设置"菜单中修改，每类工具默认同时只运行一个任务
+   - 点击"进程"查看正在运行的工具的内存和CPU占用，
+     在配置文件中设置 memory_limit_mb 后，超过上限的工具会先警告再被结束
+   - "设置"菜单中可以分析各工具的启动耗时并查看历史记录，启动明显变慢的工具会被标出
+   - 每次操作完成后会在数据目录的 telemetry.jsonl 中记录耗时、输入输出大小和内存峰值，
+     "设置 - 操作耗时统计"可以按操作或主机查看耗时百分位数，找出慢的机器和慢的输入
+   - 相同的文件用相同的参数再次处理时会直接使用缓存的结果，
+     可在"设置"菜单中关闭缓存或查看命中统计，命令行可用 run --no-cache 命令 ...
+   - 在 config.json 的 hot_folders 中配置热文件夹后，"设置 - 启动热文件夹监视"会自动处理放入
+     各热文件夹 in 目录的文件，结果在 out 目录，输入文件移入 done 或 failed 目录
+   - "设置 - 启动HTTP服务"在任务队列中启动HTTP服务(默认只监听本机 127.0.0.1:8765)，
+     局域网访问需要在 config.json 中把 service_host 改为 0.0.0.0，并且必须设置 service_token
+   - 批量转换、PDF转图片等长任务中断后，用相同的文件和参数重新运行会自动从中断处继续，
+     已完成的输出文件会先校验再跳过
+   - 高分辨率渲染、大图合成和PDF转Word共用一个内存预算(默认为可用内存的一半，可在 config.json 的
+     memory_budget_mb 中设置)，超过预算时PNG分块渲染，JPEG降低分辨率、大图合成缩小图片，并在状态栏中说明；
+     降低了分辨率的结果不会写入结果缓存
+   - PDF拆分工具的"批量拆分"可以一次拆分整个文件夹的PDF，同时使用的进程数默认为CPU核心数
+     (config.json 的 batch_workers)；命令行：run pdf-split --in "扫描/*.pdf" --every 10 --out 输出目录
+   - 点击"流水线"选择流水线文件，文件中的 ${变量} 会逐个询问，流水线作为任务在任务队列中运行
 
 3. 工具说明
    PDF工具：
@@ -478,6 +884,18 @@ V1.3.1 (2025-6-7)
    - 音频提取：从视频文件中提取音频
    文件工具：
    - 目录树生成器：生成目录树结构
+
+4. 命令行模式
+   在没有图形界面的服务器或脚本中，可以直接运行工具：
+   python "San Yuan Gong Ju_V1-3-1.py" run pdf-split --in a.pdf --every 10 --out 输出目录
+   运行 python "San Yuan Gong Ju_V1-3-1.py" run --help 查看全部命令
+   进度以JSON行输出，失败时退出码不为0
+   运行流水线：python "San Yuan Gong Ju_V1-3-1.py" run pipeline --file 流水线.json --var in=a.pdf
+   监视热文件夹：python "San Yuan Gong Ju_V1-3-1.py" run watch [--config 热文件夹.json]
+   启动HTTP服务：python "San Yuan Gong Ju_V1-3-1.py" run serve --host 0.0.0.0 --port 8765(需要先设置 service_token)，接口说明见 FuWu.py
+   流水线的写法见 LiuShuiXian.py 开头的说明，可用步骤：pdf-pages、images、pdf、grid、convert、
+   combine、to-pdf、watermark、save-images、save-pdf
+   分析启动耗时：python "San Yuan Gong Ju_V1-3-1.py" --profile-startup [工具脚本路径]
         """
         
         # 创建帮助窗口
@@ -504,29 +922,16 @@ V1.3.1 (2025-6-7)
     def toggle_category(self, category):
         """切换分类的折叠状态"""
         self.category_states[category] = not self.category_states[category]
+        category_frame, toggle_btn, tools_container = self.category_widgets[category]
         
         # 更新按钮文本
-        for widget in self.root.winfo_children():
-            if isinstance(widget, ttk.LabelFrame):
-                for child in widget.winfo_children():
-                    if isinstance(child, tk.Canvas):
-                        for grandchild in child.winfo_children():
-                            if isinstance(grandchild, ttk.Frame):  # scrollable_frame
-                                for greatgrandchild in grandchild.winfo_children():
-                                    if hasattr(greatgrandchild, 'category') and greatgrandchild.category == category:
-                                        # 更新按钮文本
-                                        for btn in greatgrandchild.winfo_children():
-                                            if hasattr(btn, 'category') and btn.category == category:
-                                                btn.config(text="▼" if self.category_states[category] else "▲")
-                                        
-                                        # 切换工具按钮的显示状态
-                                        for tool in greatgrandchild.winfo_children()[2:]:  # 跳过前两个控件(按钮和标签)
-                                            if self.category_states[category]:
-                                                tool.pack_forget()
-                                            else:
-                                                tool.pack(fill="x")
-                                        return
-        self.refresh_tools()  # 如果没找到，回退到完整刷新
+        toggle_btn.config(text="▼" if self.category_states[category] else "▲")
+        
+        # 切换工具按钮的显示状态
+        if self.category_states[category]:
+            tools_container.pack_forget()
+        else:
+            tools_container.pack(fill="x", after=category_frame)
         
     def run(self):
         """运行启动器"""
@@ -41,6 +41,19 @@ PDF拆分工具使用帮助
 1. 点击"选择文件"选择要拆分的PDF文件
 2. 在拆分选项框中选择按页拆分还是按范围拆分
 3. 点击"开始拆分"按钮进行处理
+页码范围写法(逗号分隔)：
+- 5、1-3、10-(第10页到最后)、-1(倒数第1页)、-3--1(最后3页)
+- odd/even(奇数页/偶数页)、first-5(前5页)、last-5(最后5页)、every-3(第3、6、9…页)
+按大小拆分：
+- 输入每份的最大MB数(如网上提交限制的10MB)，每份装入尽量多的页面，写出后会校验实际大小
+按书签拆分：
+- 每个书签(章节)输出为一个文件，文件名取自书签标题；书签层级为2时同时按第二层书签(如各节)拆分
+- 点击"预览章节"查看将拆分出的文件，修改层级时预览会立即更新
+批量拆分：
+- 点击"批量拆分"选择文件夹，文件夹中的全部PDF会在多个进程中同时拆分
+输出文件大小：
+- 每个文件只保留其页面用到的图片和字体，内容相同的图片只保存一份；完成后会显示节省的大小
+- 如果输出的页面显示异常，可以在 config.json 中设置 "prune_resources": false 关闭
 """,
 # PDF合并帮助内容
                         "PDF合并":
@@ -50,7 +63,7 @@ PDF合并工具使用帮助
 - 支持多个PDF文件合并
 使用步骤：
 1. 点击"添加文件"按钮选择要合并的PDF文件
-2. 选择那些哪些页面需要合并
+2. 选择那些哪些页面需要合并，也可以输入页码范围(如 1-3,5,odd,last-2)后点击"按范围选择"
 3. 点击"开始合并"按钮进行处理
 """,
 # PDF转图片帮助内容
@@ -69,7 +82,7 @@ PDF转图片工具使用帮助
    - 输出格式: PNG/JPEG/TIFF/BMP
    - DPI: 控制输出图片的分辨率(72-600)
    - JPEG质量: 仅对JPEG格式有效(1-100)
-4. 选择要转换的页面 - 默认转换所有页面
+4. 选择要转换的页面 - 默认转换所有页面，也可以输入页码范围(如 1-10,even)后点击"按范围选择"
 5. 点击"开始转换"按钮开始转换
 """,
 
@@ -0,0 +1,188 @@
+# 禁止生成 .pyc 文件
+import sys
+sys.dont_write_bytecode = True
+
+import hashlib
+import json
+import os
+import time
+
+from PeiZhi import get_config, get_data_dir
+
+# 长任务的断点续传。
+# 批量格式转换、PDF逐页转图片、PDF拆分、批量音频提取等逐项处理的操作，每完成一项就向检查点日志
+# 追加一行：{"i": 项目, "o": [[输出路径, 大小, 修改时间, 哈希], ...]}。
+# 任务中断(取消、崩溃、断电)后用相同的输入、参数和输出位置重新运行时，先校验日志中记录的输出文件
+# (存在、大小一致；修改时间变化时重新计算哈希比对)，通过校验的项目直接跳过。
+# 任务正常完成后删除日志，日志只在中断的任务中保留。
+#
+# 每项的额外开销是一次输出文件哈希(BLAKE2b，刚写入的文件在系统缓存中)和一行缓冲写入，
+# 日志只在任务结束时 fsync，崩溃时最多丢失最后几行，对应的项目重新处理即可。
+#
+# 日志保存在数据目录的 checkpoints 目录中，超过 MAX_AGE_DAYS 天未更新的日志自动删除；
+# 配置项 checkpoints 设为 false 可以关闭。
+
+CHECKPOINT_DIR = "checkpoints"
+# 项目数少于该值的任务不写日志
+MIN_ITEMS = 10
+MAX_AGE_DAYS = 30
+# 日志格式版本，格式变化时旧日志自动失效
+JOURNAL_VERSION = 1
+
+def is_enabled() -> bool:
+    return bool(get_config().get("checkpoints"))
+
+def checkpoint_dir() -> str:
+    directory = os.path.join(get_data_dir(), CHECKPOINT_DIR)
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+def output_digest(path: str) -> str:
+    """输出文件的哈希(BLAKE2b-128)"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def file_identity(path: str) -> list:
+    """用于标识输入文件的 [绝对路径, 大小, 修改时间]，文件被修改后标识随之变化"""
+    stat = os.stat(path)
+    return [os.path.abspath(path), stat.st_size, stat.st_mtime_ns]
+
+def _prune(directory: str) -> None:
+    expired = time.time() - MAX_AGE_DAYS * 86400
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        try:
+            if os.path.getmtime(path) < expired:
+                os.remove(path)
+        except OSError:
+            continue
+
+class Checkpoint:
+    """
+    一个任务的检查点日志。
+
+    Args:
+        operation (str): 操作名称
+        identity: 任务标识(输入文件标识、参数和输出位置)，可以被JSON序列化；
+                  标识相同的任务共用同一个日志
+        items (int): 任务的项目数，少于 min_items 时不写日志
+        min_items (int): 启用日志的最少项目数
+
+    在 with 语句中使用：正常结束时删除日志，出现异常(包括取消)时保留日志。
+
+    使用示例：
+    with Checkpoint("pdf-to-image", [file_identity(pdf_path), output_dir, dpi], len(pages)) as checkpoint:
+        for page in pages:
+            if checkpoint.is_done(page):
+                continue
+            ...
+            checkpoint.record(page, [output_path])
+    """
+
+    def __init__(self, operation: str, identity, items: int = 0, min_items: int = MIN_ITEMS):
+        self.operation = operation
+        self.enabled = items >= min_items and is_enabled()
+        self.completed = {}
+        self.resumed = 0
+        self._file = None
+        self.path = None
+        if not self.enabled:
+            return
+        key = hashlib.sha256(json.dumps([JOURNAL_VERSION, operation, identity], sort_keys=True,
+                                        ensure_ascii=False, default=str).encode("utf-8")).hexdigest()
+        directory = checkpoint_dir()
+        _prune(directory)
+        self.path = os.path.join(directory, f"{operation}_{key[:24]}.jsonl")
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # 崩溃时最后一行可能只写了一半
+                        continue
+                    if "i" in entry:
+                        self.completed[self._item_key(entry["i"])] = entry.get("o") or []
+        except OSError:
+            pass
+
+    @staticmethod
+    def _item_key(item) -> str:
+        return json.dumps(item, sort_keys=True, ensure_ascii=False, default=str)
+
+    def is_done(self, item) -> bool:
+        """项目是否已在之前的运行中完成，并且输出文件仍然有效"""
+        if not self.enabled:
+            return False
+        outputs = self.completed.get(self._item_key(item))
+        if outputs is None:
+            return False
+        for path, size, mtime, digest in outputs:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                return False
+            if stat.st_size != size:
+                return False
+            if stat.st_mtime_ns != mtime and output_digest(path) != digest:
+                return False
+        self.resumed += 1
+        return True
+
+    def outputs(self, item) -> list:
+        """已完成项目的输出文件路径"""
+        return [entry[0] for entry in self.completed.get(self._item_key(item)) or []]
+
+    def record(self, item, outputs) -> None:
+        """记录一个已完成的项目及其输出文件"""
+        if not self.enabled:
+            return
+        entries = []
+        for path in outputs:
+            stat = os.stat(path)
+            entries.append([os.path.abspath(path), stat.st_size, stat.st_mtime_ns, output_digest(path)])
+        if self._file is None:
+            is_new = not os.path.exists(self.path)
+            self._file = open(self.path, "a", encoding="utf-8")
+            if is_new:
+                self._file.write(json.dumps({"operation": self.operation, "version": JOURNAL_VERSION,
+                                             "created": time.strftime("%Y-%m-%d %H:%M:%S")},
+                                            ensure_ascii=False) + "\n")
+        self._file.write(json.dumps({"i": item, "o": entries}, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self.completed[self._item_key(item)] = entries
+
+    def close(self) -> None:
+        """保留日志(任务中断时调用)"""
+        if self._file is not None:
+            try:
+                os.fsync(self._file.fileno())
+            except OSError:
+                pass
+            self._file.close()
+            self._file = None
+
+    def finish(self) -> None:
+        """任务已全部完成，删除日志"""
+        self.close()
+        if self.path:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.finish()
+        else:
+            self.close()
+        return False
@@ -0,0 +1,608 @@
+# 禁止生成 .pyc 文件
+import sys
+sys.dont_write_bytecode = True
+
+import collections
+import hmac
+import ipaddress
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+import uuid
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlparse
+
+from PeiZhi import get_config, get_data_dir
+from HouTaiRenWu import CancelToken, JobCancelled
+from YaoCe import percentile
+
+# HTTP/JSON 服务模式，让局域网内其他机器上的脚本(任何语言)调用PDF和图片工具。
+# 只使用标准库 http.server，处理逻辑直接调用 PDFChuLi / TuPianChuLi 中的核心函数。
+#
+# 接口：
+#   GET    /health                          服务状态
+#   GET    /operations                      可用的操作及参数
+#   POST   /uploads?name=a.pdf              上传文件(请求体为文件内容)，返回 {"upload": 编号}
+#   POST   /jobs                            提交任务，请求体 {"operation": "pdf-split", "inputs": [...], "params": {...}}
+#                                           inputs 中的每一项是上传编号，或 {"path": 共享目录中的路径}
+#   GET    /jobs                            全部任务
+#   GET    /jobs/<编号>?wait=30             任务状态，wait 表示最多等待多少秒直到任务结束
+#   GET    /jobs/<编号>/outputs/<序号>      下载第几个输出文件(从0开始)
+#   GET    /jobs/<编号>/archive             把全部输出文件打包为zip下载
+#   DELETE /jobs/<编号>                     取消任务并删除它的文件
+#   GET    /metrics                         队列长度、运行数和各操作的等待/运行耗时百分位数
+#
+# 共享路径只允许位于配置项 service_shared_roots 中的目录下；配置了 service_token 时，
+# 请求需要带上 "Authorization: Bearer <令牌>" 头。监听本机以外的地址(如 0.0.0.0)时必须设置令牌，
+# 否则局域网内任何人都可以调用，在受信任的网络中可以设置 service_allow_anonymous 为 true 跳过该检查。上传文件和任务输出保存在数据目录的 service 目录中，
+# 超过 service_keep_hours 小时后自动删除。
+#
+# 命令行：python "San Yuan Gong Ju_V1-3-1.py" run serve [--host 0.0.0.0] [--port 8765] [--workers 2]
+
+SERVICE_DIR = "service"
+# 每个操作保留最近多少次的耗时用于计算百分位数
+LATENCY_WINDOW = 1000
+# 上传和下载时每次读写的字节数
+CHUNK_SIZE = 256 * 1024
+# 清理过期文件的间隔(秒)
+CLEANUP_INTERVAL = 600
+
+class ServiceError(Exception):
+    """请求错误，带有HTTP状态码"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+def _base_name(path: str) -> str:
+    return os.path.splitext(os.path.basename(path))[0]
+
+# ---- 操作 ----
+# 每个操作是 func(输入文件列表, 输出目录, 参数字典, progress)，返回核心函数的结果字典。
+
+def _pdf_split(inputs, out_dir, params, progress):
+    from PDFChuLi import split_pdf_by_count, split_pdf_by_outline, split_pdf_by_ranges, split_pdf_by_size
+    if params.get("outline"):
+        return split_pdf_by_outline(inputs[0], out_dir, int(params["outline"]), progress)
+    if params.get("max_mb"):
+        return split_pdf_by_size(inputs[0], out_dir, float(params["max_mb"]), progress)
+    if params.get("ranges"):
+        return split_pdf_by_ranges(inputs[0], out_dir, params["ranges"], progress)
+    return split_pdf_by_count(inputs[0], out_dir, int(params.get("every", 1)), progress)
+
+def _pdf_merge(inputs, out_dir, params, progress):
+    from PDFChuLi import load_pdf, merge_pdfs, parse_page_ranges
+    pages = params.get("pages") or []
+    selections = []
+    for i, path in enumerate(inputs):
+        ranges = pages[i] if i < len(pages) else None
+        selections.append((path, parse_page_ranges(ranges, len(load_pdf(path).pages)) if ranges else None))
+    return merge_pdfs(selections, os.path.join(out_dir, os.path.basename(params.get("name") or "merged.pdf")), progress)
+
+def _pdf_watermark(inputs, out_dir, params, progress):
+    from PDFChuLi import add_watermark
+    return add_watermark(inputs[0], os.path.join(out_dir, os.path.basename(inputs[0])),
+                         params.get("text", "机密"), int(params.get("font_size", 36)),
+                         float(params.get("opacity", 0.5)), params.get("position", "center"), progress)
+
+def _pdf_to_image(inputs, out_dir, params, progress):
+    from PDFChuLi import load_pdf, parse_page_ranges, pdf_to_images
+    pages = None
+    if params.get("pages"):
+        pages = parse_page_ranges(params["pages"], len(load_pdf(inputs[0]).pages))
+    return pdf_to_images(inputs[0], out_dir, pages, params.get("format", "png"),
+                         int(params.get("dpi", 300)), int(params.get("quality", 90)), progress)
+
+def _pdf_to_word(inputs, out_dir, params, progress):
+    from PDFChuLi import pdf_to_word
+    return pdf_to_word(inputs[0], os.path.join(out_dir, _base_name(inputs[0]) + ".docx"), progress)
+
+def _image_to_pdf(inputs, out_dir, params, progress):
+    from PDFChuLi import images_to_pdf
+    name = os.path.basename(params.get("name") or _base_name(inputs[0]) + ".pdf")
+    return images_to_pdf(inputs, os.path.join(out_dir, name), progress)
+
+def _image_convert(inputs, out_dir, params, progress):
+    from TuPianChuLi import convert_image
+    output_format = params.get("format", "png")
+    quality = int(params.get("quality", 100))
+    outputs = []
+    for i, path in enumerate(inputs):
+        output_path = os.path.join(out_dir, f"{_base_name(path)}.{output_format}")
+        convert_image(path, output_path, output_format, quality)
+        outputs.append(output_path)
+        if progress is not None:
+            progress(i + 1, len(inputs), os.path.basename(path))
+    return {"outputs": outputs}
+
+def _image_grid(inputs, out_dir, params, progress):
+    from TuPianChuLi import split_grid
+    return split_grid(inputs[0], out_dir, int(params.get("rows", 3)), int(params.get("cols", 3)), progress)
+
+# 操作名称 -> (函数, 最少输入数, 最多输入数(None表示不限), 参数说明)
+OPERATIONS = {
+    "pdf-split": (_pdf_split, 1, 1, {"every": "每份的页数", "ranges": "页码范围，如 1-3,5",
+                                        "max_mb": "每份的大小上限(MB)", "outline": "按书签拆分的层级"}),
+    "pdf-merge": (_pdf_merge, 1, None, {"pages": "与输入对应的页码范围列表，null 表示全部",
+                                        "name": "输出文件名，默认 merged.pdf"}),
+    "pdf-watermark": (_pdf_watermark, 1, 1, {"text": "水印文字", "font_size": "字号", "opacity": "透明度",
+                                             "position": "center/topleft/topright/bottomleft/bottomright"}),
+    "pdf-to-image": (_pdf_to_image, 1, 1, {"pages": "页码范围", "format": "png/jpg/tiff/bmp",
+                                           "dpi": "分辨率", "quality": "JPEG质量"}),
+    "pdf-to-word": (_pdf_to_word, 1, 1, {}),
+    "image-to-pdf": (_image_to_pdf, 1, None, {"name": "输出文件名"}),
+    "image-convert": (_image_convert, 1, None, {"format": "输出格式", "quality": "输出质量(1-100)"}),
+    "image-grid": (_image_grid, 1, 1, {"rows": "行数", "cols": "列数"}),
+}
+
+class ServiceJob:
+    """服务中的一个任务"""
+
+    def __init__(self, job_id: str, operation: str, inputs, params: dict, directory: str):
+        self.id = job_id
+        self.operation = operation
+        self.inputs = inputs
+        self.params = params
+        self.directory = directory
+        self.state = "queued"
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.done = 0
+        self.total = 0
+        self.message = ""
+        self.outputs = []
+        self.result = None
+        self.error = None
+        self.token = CancelToken()
+        self.finished_event = threading.Event()
+
+    def report(self, done, total, message="") -> None:
+        """进度回调，任务已取消时抛出 JobCancelled"""
+        self.token.check()
+        self.done = done
+        self.total = total
+        if message:
+            self.message = self.public_text(message)
+
+    def public_text(self, text: str) -> str:
+        """去掉文本中服务器端的目录，只把文件名返回给远程客户端"""
+        if os.path.isabs(text):
+            return os.path.basename(text)
+        service_root = os.path.dirname(os.path.dirname(self.directory))
+        for root in (self.directory, service_root):
+            text = text.replace(root + os.sep, "")
+        return text
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "operation": self.operation,
+            "state": self.state,
+            "params": self.params,
+            "submitted": self.submitted,
+            "wait_s": round((self.started or time.time()) - self.submitted, 3),
+            "run_s": round((self.finished or time.time()) - self.started, 3) if self.started else None,
+            "done": self.done,
+            "total": self.total,
+            "message": self.message,
+            "outputs": [{"index": i, "name": os.path.basename(path), "bytes": os.path.getsize(path)}
+                        for i, path in enumerate(self.outputs) if os.path.isfile(path)],
+            "error": self.error,
+        }
+
+class ToolService:
+    """
+    任务队列和工作线程，与HTTP无关，可以单独使用。
+
+    Args:
+        workers (int): 同时运行的任务数
+        directory (str): 上传文件和任务输出的保存目录
+        shared_roots: 允许直接引用的共享目录
+        keep_hours (float): 上传文件和已结束任务保留的小时数
+
+    使用示例：
+    service = ToolService(workers=2)
+    job = service.submit("pdf-split", [service.save_upload("a.pdf", f)], {"every": 10})
+    job.finished_event.wait()
+    """
+
+    def __init__(self, workers: int = 2, directory: str = None, shared_roots=None, keep_hours: float = 24,
+                 max_upload_mb: int = 512):
+        self.directory = directory or os.path.join(get_data_dir(), SERVICE_DIR)
+        self.upload_dir = os.path.join(self.directory, "uploads")
+        self.job_dir = os.path.join(self.directory, "jobs")
+        os.makedirs(self.upload_dir, exist_ok=True)
+        os.makedirs(self.job_dir, exist_ok=True)
+        self.shared_roots = [os.path.realpath(root) for root in (shared_roots or [])]
+        self.keep_seconds = keep_hours * 3600
+        self.max_upload_bytes = max_upload_mb * 1024 * 1024
+        self.jobs = collections.OrderedDict()
+        self.lock = threading.Lock()
+        self.pending = queue.Queue()
+        self.running = 0
+        self.counts = collections.Counter()
+        # 操作 -> 最近的 (等待秒数, 运行秒数)
+        self.latency = collections.defaultdict(lambda: collections.deque(maxlen=LATENCY_WINDOW))
+        self.started = time.time()
+        self.last_cleanup = 0
+        self.workers = []
+        for i in range(max(1, int(workers))):
+            worker = threading.Thread(target=self._worker, name=f"sanyuan-service-{i + 1}", daemon=True)
+            self.workers.append(worker)
+            worker.start()
+
+    # ---- 输入 ----
+
+    def save_upload(self, name: str, stream, length: int = None) -> str:
+        """
+        保存上传的文件。
+
+        Args:
+            name (str): 文件名(只使用其中的文件名部分)
+            stream: 可读取的文件对象
+            length (int): 内容长度，None 表示读到结束
+
+        Returns:
+            str: 上传编号
+        """
+        name = os.path.basename(name) if name else "upload"
+        if name in ("", ".", ".."):
+            raise ServiceError(400, "无效的文件名")
+        if length is not None and length > self.max_upload_bytes:
+            raise ServiceError(413, f"上传文件超过 {self.max_upload_bytes // (1024 * 1024)} MB")
+        upload_id = uuid.uuid4().hex
+        directory = os.path.join(self.upload_dir, upload_id)
+        os.makedirs(directory)
+        remaining = length
+        written = 0
+        with open(os.path.join(directory, name), "wb") as f:
+            while remaining is None or remaining > 0:
+                chunk = stream.read(CHUNK_SIZE if remaining is None else min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                f.write(chunk)
+                written += len(chunk)
+                if remaining is not None:
+                    remaining -= len(chunk)
+                if written > self.max_upload_bytes:
+                    break
+        if written > self.max_upload_bytes:
+            shutil.rmtree(directory, ignore_errors=True)
+            raise ServiceError(413, f"上传文件超过 {self.max_upload_bytes // (1024 * 1024)} MB")
+        return upload_id
+
+    def resolve_input(self, item) -> str:
+        """把上传编号或共享路径转换为本机路径"""
+        if isinstance(item, dict) and "path" in item:
+            path = os.path.realpath(str(item["path"]))
+            if not any(path == root or path.startswith(root + os.sep) for root in self.shared_roots):
+                raise ServiceError(403, f"不允许访问的路径: {item['path']}")
+            if not os.path.isfile(path):
+                raise ServiceError(404, f"文件不存在: {item['path']}")
+            return path
+        upload_id = item.get("upload") if isinstance(item, dict) else item
+        if not isinstance(upload_id, str) or not upload_id.isalnum():
+            raise ServiceError(400, f"无效的输入: {item}")
+        directory = os.path.join(self.upload_dir, upload_id)
+        try:
+            names = os.listdir(directory)
+        except OSError:
+            names = []
+        if not names:
+            raise ServiceError(404, f"上传文件不存在或已过期: {upload_id}")
+        return os.path.join(directory, names[0])
+
+    # ---- 任务 ----
+
+    def submit(self, operation: str, inputs, params: dict = None) -> ServiceJob:
+        """
+        提交任务。
+
+        Raises:
+            ServiceError: 操作、输入或参数无效
+        """
+        if operation not in OPERATIONS:
+            raise ServiceError(400, f"未知的操作: {operation}，可用的操作: {', '.join(OPERATIONS)}")
+        _func, min_inputs, max_inputs, allowed = OPERATIONS[operation]
+        params = dict(params or {})
+        unknown = [key for key in params if key not in allowed]
+        if unknown:
+            raise ServiceError(400, f"{operation} 不支持的参数: {', '.join(unknown)}")
+        if not isinstance(inputs, list) or len(inputs) < min_inputs or \
+                (max_inputs is not None and len(inputs) > max_inputs):
+            expected = f"{min_inputs} 个" if max_inputs == min_inputs else f"至少 {min_inputs} 个"
+            raise ServiceError(400, f"{operation} 需要{expected}输入")
+        paths = [self.resolve_input(item) for item in inputs]
+
+        self._cleanup()
+        job_id = uuid.uuid4().hex[:12]
+        job = ServiceJob(job_id, operation, paths, params, os.path.join(self.job_dir, job_id))
+        with self.lock:
+            self.jobs[job_id] = job
+        self.pending.put(job)
+        return job
+
+    def get_job(self, job_id: str) -> ServiceJob:
+        with self.lock:
+            job = self.jobs.get(job_id)
+        if job is None:
+            raise ServiceError(404, f"任务不存在: {job_id}")
+        return job
+
+    def list_jobs(self) -> list:
+        with self.lock:
+            return list(self.jobs.values())
+
+    def delete_job(self, job_id: str) -> None:
+        """取消任务；已结束的任务删除输出文件"""
+        job = self.get_job(job_id)
+        job.token.cancel()
+        if job.finished_event.is_set() or job.state == "queued":
+            with self.lock:
+                self.jobs.pop(job_id, None)
+            shutil.rmtree(job.directory, ignore_errors=True)
+
+    def _worker(self) -> None:
+        while True:
+            job = self.pending.get()
+            if job is None:
+                return
+            self._run(job)
+
+    def _run(self, job: ServiceJob) -> None:
+        func = OPERATIONS[job.operation][0]
+        job.started = time.time()
+        with self.lock:
+            self.running += 1
+        try:
+            job.token.check()
+            job.state = "running"
+            os.makedirs(job.directory, exist_ok=True)
+            result = func(job.inputs, job.directory, job.params, job.report)
+            job.result = {key: value for key, value in (result or {}).items() if key != "outputs"}
+            job.outputs = [path for path in (result or {}).get("outputs") or [] if os.path.isfile(path)]
+            job.state = "done"
+        except JobCancelled:
+            job.state = "cancelled"
+        except Exception as e:
+            job.state = "failed"
+            job.error = job.public_text(f"{type(e).__name__}: {str(e)}")
+        job.finished = time.time()
+        with self.lock:
+            self.running -= 1
+            self.counts[job.state] += 1
+            if job.state == "done":
+                self.latency[job.operation].append((job.started - job.submitted, job.finished - job.started))
+        job.finished_event.set()
+        if job.state == "cancelled":
+            shutil.rmtree(job.directory, ignore_errors=True)
+
+    def _cleanup(self) -> None:
+        """删除过期的上传文件和已结束的任务"""
+        now = time.time()
+        if now - self.last_cleanup < CLEANUP_INTERVAL:
+            return
+        self.last_cleanup = now
+        expired = now - self.keep_seconds
+        with self.lock:
+            old_jobs = [job for job in self.jobs.values() if job.finished and job.finished < expired]
+            for job in old_jobs:
+                del self.jobs[job.id]
+        for job in old_jobs:
+            shutil.rmtree(job.directory, ignore_errors=True)
+        for name in os.listdir(self.upload_dir):
+            path = os.path.join(self.upload_dir, name)
+            try:
+                if os.path.getmtime(path) < expired:
+                    shutil.rmtree(path, ignore_errors=True)
+            except OSError:
+                continue
+
+    def metrics(self) -> dict:
+        """队列长度、运行中任务数、各状态任务数和各操作的耗时百分位数"""
+        with self.lock:
+            latency = {operation: list(values) for operation, values in self.latency.items()}
+            result = {
+                "uptime_s": round(time.time() - self.started, 1),
+                "workers": len(self.workers),
+                "queue_depth": self.pending.qsize(),
+                "running": self.running,
+                "jobs": dict(self.counts),
+            }
+        def p(values, q):
+            value = percentile(values, q)
+            return round(value, 4) if value is not None else None
+
+        result["latency"] = {}
+        for operation, values in sorted(latency.items()):
+            waits = [wait for wait, _ in values]
+            runs = [run for _, run in values]
+            result["latency"][operation] = {
+                "count": len(values),
+                "wait_p50": p(waits, 50),
+                "wait_p90": p(waits, 90),
+                "run_p50": p(runs, 50),
+                "run_p90": p(runs, 90),
+                "run_p99": p(runs, 99),
+            }
+        return result
+
+    def shutdown(self) -> None:
+        """取消排队和运行中的任务，结束工作线程"""
+        for job in self.list_jobs():
+            job.token.cancel()
+        for _ in self.workers:
+            self.pending.put(None)
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    """HTTP请求处理，服务实例通过 self.server.service 访问"""
+
+    server_version = "SanYuanTools"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args) -> None:
+        sys.stderr.write(f"{self.address_string()} - {format % args}\n")
+
+    # ---- 响应 ----
+
+    def _send_json(self, status: int, data) -> None:
+        body = json.dumps(data, ensure_ascii=False, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_file(self, path: str, name: str = None) -> None:
+        """分块发送文件，大文件不需要整个读入内存"""
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(os.path.getsize(path)))
+        self.send_header("Content-Disposition",
+                         f"attachment; filename*=UTF-8''{quote(name or os.path.basename(path))}")
+        self.end_headers()
+        with open(path, "rb") as f:
+            shutil.copyfileobj(f, self.wfile, CHUNK_SIZE)
+
+    def _content_length(self) -> int:
+        value = self.headers.get("Content-Length") or "0"
+        if not value.isdigit():
+            raise ServiceError(400, f"无效的 Content-Length: {value}")
+        return int(value)
+
+    def _read_json(self) -> dict:
+        length = self._content_length()
+        try:
+            data = json.loads(self.rfile.read(length).decode("utf-8")) if length else {}
+        except ValueError as e:
+            raise ServiceError(400, f"请求体不是有效的JSON: {str(e)}")
+        if not isinstance(data, dict):
+            raise ServiceError(400, "请求体必须是JSON对象")
+        return data
+
+    def _check_token(self) -> None:
+        token = self.server.token
+        supplied = self.headers.get("Authorization") or ""
+        if token and not hmac.compare_digest(supplied.encode("utf-8"), f"Bearer {token}".encode("utf-8")):
+            raise ServiceError(401, "缺少或错误的访问令牌")
+
+    def _dispatch(self, method: str) -> None:
+        url = urlparse(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        parts = [part for part in url.path.split("/") if part]
+        try:
+            self._check_token()
+            self._route(method, parts, query)
+        except ServiceError as e:
+            # 出错时请求体可能没有读完，不能继续复用这个连接
+            self.close_connection = True
+            self._send_json(e.status, {"error": str(e)})
+        except Exception as e:
+            self.close_connection = True
+            self._send_json(500, {"error": f"{type(e).__name__}: {str(e)}"})
+
+    def _route(self, method: str, parts: list, query: dict) -> None:
+        service = self.server.service
+        if method == "GET" and parts == ["health"]:
+            self._send_json(200, {"status": "ok", "queue_depth": service.pending.qsize()})
+        elif method == "GET" and parts == ["operations"]:
+            self._send_json(200, {name: {"min_inputs": spec[1], "max_inputs": spec[2], "params": spec[3]}
+                                  for name, spec in OPERATIONS.items()})
+        elif method == "GET" and parts == ["metrics"]:
+            self._send_json(200, service.metrics())
+        elif method == "POST" and parts == ["uploads"]:
+            if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+                raise ServiceError(411, "请提供 Content-Length")
+            length = self._content_length()
+            upload_id = service.save_upload(query.get("name"), self.rfile, length)
+            self._send_json(201, {"upload": upload_id})
+        elif method == "POST" and parts == ["jobs"]:
+            data = self._read_json()
+            job = service.submit(data.get("operation"), data.get("inputs"), data.get("params"))
+            self._send_json(202, job.to_dict())
+        elif method == "GET" and parts == ["jobs"]:
+            self._send_json(200, [job.to_dict() for job in service.list_jobs()])
+        elif len(parts) >= 2 and parts[0] == "jobs":
+            job = service.get_job(parts[1])
+            if method == "GET" and len(parts) == 2:
+                try:
+                    wait = min(float(query.get("wait") or 0), 300)
+                except ValueError:
+                    raise ServiceError(400, f"wait 必须是秒数: {query.get('wait')}")
+                if wait > 0:
+                    job.finished_event.wait(wait)
+                self._send_json(200, job.to_dict())
+            elif method == "DELETE" and len(parts) == 2:
+                service.delete_job(job.id)
+                self._send_json(200, {"id": job.id, "deleted": True})
+            elif method == "GET" and len(parts) == 4 and parts[2] == "outputs":
+                try:
+                    path = job.outputs[int(parts[3])]
+                except (ValueError, IndexError):
+                    raise ServiceError(404, "输出文件不存在")
+                self._send_file(path)
+            elif method == "GET" and len(parts) == 3 and parts[2] == "archive":
+                if job.state != "done":
+                    raise ServiceError(409, f"任务尚未完成: {job.state}")
+                archive = os.path.join(job.directory, f"{job.id}.zip")
+                if not os.path.exists(archive):
+                    with zipfile.ZipFile(archive + ".tmp", "w", zipfile.ZIP_DEFLATED) as zf:
+                        for path in job.outputs:
+                            zf.write(path, os.path.relpath(path, job.directory))
+                    os.replace(archive + ".tmp", archive)
+                self._send_file(archive)
+            else:
+                raise ServiceError(404, "未知的接口")
+        else:
+            raise ServiceError(404, "未知的接口")
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+def _is_loopback(host: str) -> bool:
+    """监听地址是否只允许本机访问"""
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        # 空地址表示全部网卡，其他主机名按对外开放处理
+        return False
+
+def create_server(host: str = None, port: int = None, workers: int = None) -> ThreadingHTTPServer:
+    """
+    根据配置创建HTTP服务(尚未开始监听循环)，参数为 None 时使用配置项 service_*。
+
+    Returns:
+        ThreadingHTTPServer: server.service 为 ToolService 实例
+
+    Raises:
+        ValueError: 监听本机以外的地址但没有设置 service_token
+    """
+    config = get_config()
+    host = host if host is not None else config.get("service_host")
+    token = config.get("service_token") or None
+    if token is None and not _is_loopback(host) and not config.get("service_allow_anonymous"):
+        raise ValueError(f"监听 {host or '全部网卡'} 时局域网内任何人都可以调用服务，"
+                         f"请在 config.json 中设置 service_token"
+                         f"(受信任的网络中可以设置 service_allow_anonymous 为 true)")
+    server = ThreadingHTTPServer((host, port if port is not None else config.get("service_port")),
+                                 ServiceHandler)
+    server.daemon_threads = True
+    server.token = token
+    server.service = ToolService(workers or config.get("service_workers"),
+                                 shared_roots=config.get("service_shared_roots"),
+                                 keep_hours=config.get("service_keep_hours"),
+                                 max_upload_mb=config.get("service_max_upload_mb"))
+    return server
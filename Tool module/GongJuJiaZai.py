@@ -0,0 +1,75 @@
+# 禁止生成 .pyc 文件
+import sys
+sys.dont_write_bytecode = True
+
+import importlib.util
+import os
+import re
+import tkinter as tk
+
+def _module_name(tool_path: str) -> str:
+    """根据工具文件名生成合法且唯一的模块名"""
+    base_name = os.path.splitext(os.path.basename(tool_path))[0]
+    return "sanyuan_tool_" + re.sub(r"\W", "_", base_name)
+
+def load_tool_module(tool_path: str):
+    """
+    以模块方式加载工具脚本。
+
+    工具脚本的 if __name__ == "__main__" 部分不会执行。
+    加载过的模块会缓存在 sys.modules 中，第二次打开同一工具时无需重新导入。
+
+    Args:
+        tool_path (str): 工具脚本的完整路径
+
+    Returns:
+        module: 加载后的工具模块
+
+    Raises:
+        ImportError: 工具脚本无法加载时抛出
+    """
+    module_name = _module_name(tool_path)
+    module = sys.modules.get(module_name)
+    if module is not None:
+        return module
+
+    spec = importlib.util.spec_from_file_location(module_name, tool_path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"无法加载工具脚本: {tool_path}")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        # 加载失败时不保留半初始化的模块
+        del sys.modules[module_name]
+        raise
+    return module
+
+def open_tool_window(master: tk.Misc, tool_path: str, entry: str) -> tk.Toplevel:
+    """
+    在当前进程中以 Toplevel 窗口打开工具。
+
+    Args:
+        master (tk.Misc): 启动器的主窗口
+        tool_path (str): 工具脚本的完整路径
+        entry (str): 工具主类的类名，该类需要以窗口对象作为唯一参数
+
+    Returns:
+        tk.Toplevel: 工具所在的窗口
+
+    Raises:
+        加载或创建工具时的所有异常都会向外抛出，调用方可以回退到独立进程启动
+    """
+    module = load_tool_module(tool_path)
+    app_class = getattr(module, entry)
+
+    window = tk.Toplevel(master)
+    try:
+        app = app_class(window)
+    except BaseException:
+        window.destroy()
+        raise
+    # 保持引用，防止工具对象被垃圾回收
+    window.app = app
+    return window
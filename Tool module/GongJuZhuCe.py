@@ -0,0 +1,242 @@
+# 禁止生成 .pyc 文件
+import sys
+sys.dont_write_bytecode = True
+
+import ctypes
+import ctypes.util
+import os
+import struct
+
+# 工具分类与所在目录的对应关系
+CATEGORY_DIRS = {
+    'PDF工具': 'PDF tool',
+    '图片工具': 'Picture tool',
+    '音频工具': 'Audio tools',
+    '文件工具': 'File tool',
+    '其他工具': 'Other tool',
+}
+
+# inotify 事件掩码
+IN_ATTRIB = 0x00000004
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_IGNORED = 0x00008000
+WATCH_MASK = (IN_ATTRIB | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE |
+              IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF)
+EVENT_HEADER = struct.Struct("iIII")
+
+class DirectoryWatcher:
+    """
+    目录变化监视器。
+
+    在Linux上使用 inotify，由内核通知目录中文件的增删；
+    其他系统或 inotify 不可用时，退化为按目录修改时间轮询，每个目录每次只需一次 stat。
+
+    注意：网络共享目录上的 inotify 收不到其他机器的修改，
+    可以在配置中将 tool_watch 设置为 "polling" 强制使用轮询。
+
+    使用示例：
+    watcher = DirectoryWatcher(["/path/a", "/path/b"])
+    changed = watcher.poll()  # 返回发生变化的目录集合
+    """
+
+    def __init__(self, directories, mode: str = "auto"):
+        self.directories = list(directories)
+        self.mode = "polling"
+        self.mtimes = {}
+        self.watches = {}
+        self.fd = None
+        if mode in ("auto", "inotify") and sys.platform.startswith("linux"):
+            try:
+                self._init_inotify()
+                self.mode = "inotify"
+            except OSError:
+                if mode == "inotify":
+                    raise
+        if self.mode == "polling":
+            for directory in self.directories:
+                self.mtimes[directory] = self._mtime(directory)
+
+    def poll(self) -> set:
+        """
+        检查自上次调用以来发生变化的目录。
+
+        Returns:
+            set: 发生变化的目录路径
+        """
+        if self.mode == "inotify":
+            return self._poll_inotify()
+        changed = set()
+        for directory in self.directories:
+            mtime = self._mtime(directory)
+            if mtime != self.mtimes.get(directory):
+                self.mtimes[directory] = mtime
+                changed.add(directory)
+        return changed
+
+    def close(self) -> None:
+        """释放 inotify 文件描述符"""
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    def _mtime(self, directory):
+        try:
+            return os.stat(directory).st_mtime_ns
+        except OSError:
+            return None
+
+    def _init_inotify(self) -> None:
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 失败")
+        self.fd = fd
+        for directory in self.directories:
+            self._add_watch(directory)
+
+    def _add_watch(self, directory) -> bool:
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            return False
+        self.watches[wd] = directory
+        return True
+
+    def _poll_inotify(self) -> set:
+        changed = set()
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _cookie, name_len = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size + name_len
+                directory = self.watches.get(wd)
+                if directory is None:
+                    continue
+                changed.add(directory)
+                if mask & IN_IGNORED:
+                    # 目录被删除或移走，监视自动失效
+                    del self.watches[wd]
+        # 尚未存在的目录每次检查一下是否已被创建
+        watched = set(self.watches.values())
+        for directory in self.directories:
+            if directory not in watched and os.path.isdir(directory) and self._add_watch(directory):
+                changed.add(directory)
+        return changed
+
+class ToolRegistry:
+    """
+    工具注册表，统一管理所有工具的路径和可用状态。
+
+    每个工具的完整路径只计算一次；是否存在的结果会被缓存，
+    只有在目录监视器报告目录变化或手动刷新时才重新检查，
+    并且每个目录只需一次 listdir，而不是对每个工具文件单独 stat。
+
+    使用示例：
+    registry = ToolRegistry(base_dir, tools)
+    registry.is_available('PDF工具', 'PDF Chai Fen_Alpha1-0-3.py')
+    changed = registry.poll()  # 返回状态发生变化的工具
+    """
+
+    def __init__(self, base_dir: str, tools: dict, watch_mode: str = "auto"):
+        self.base_dir = base_dir
+        self.tools = tools
+        self.paths = {}
+        self.available = {}
+        # 目录 -> 该目录下的工具键列表
+        self.directory_tools = {}
+        for category, category_tools in tools.items():
+            directory = self.get_directory(category)
+            for file_name in category_tools.values():
+                key = (category, file_name)
+                self.paths[key] = os.path.join(directory, file_name)
+                self.directory_tools.setdefault(directory, []).append(key)
+        self.scan()
+        self.watcher = DirectoryWatcher(self.directory_tools.keys(), watch_mode)
+
+    def get_directory(self, category: str) -> str:
+        """
+        获取分类对应的工具目录。
+
+        Args:
+            category (str): 工具分类名称
+
+        Returns:
+            str: 工具目录的完整路径，未知分类返回启动器所在目录
+        """
+        if category in CATEGORY_DIRS:
+            return os.path.join(self.base_dir, CATEGORY_DIRS[category])
+        return self.base_dir
+
+    def get_path(self, category: str, file_name: str) -> str:
+        """获取工具文件的完整路径"""
+        key = (category, file_name)
+        if key not in self.paths:
+            self.paths[key] = os.path.join(self.get_directory(category), file_name)
+        return self.paths[key]
+
+    def is_available(self, category: str, file_name: str) -> bool:
+        """返回缓存的工具文件是否存在"""
+        key = (category, file_name)
+        if key not in self.available:
+            self.available[key] = os.path.exists(self.get_path(category, file_name))
+        return self.available[key]
+
+    def scan(self, directories=None) -> list:
+        """
+        重新检查指定目录中的工具文件。
+
+        Args:
+            directories: 需要检查的目录，默认检查全部目录
+
+        Returns:
+            list: 可用状态发生变化的工具键 (分类, 文件名)
+        """
+        if directories is None:
+            directories = self.directory_tools.keys()
+        changed = []
+        for directory in directories:
+            try:
+                entries = set(os.listdir(directory))
+            except OSError:
+                entries = set()
+            for key in self.directory_tools.get(directory, []):
+                available = key[1] in entries
+                if self.available.get(key) != available:
+                    self.available[key] = available
+                    changed.append(key)
+        return changed
+
+    def poll(self) -> list:
+        """
+        处理目录监视器报告的变化。
+
+        Returns:
+            list: 可用状态发生变化的工具键 (分类, 文件名)
+        """
+        directories = self.watcher.poll()
+        if not directories:
+            return []
+        return self.scan(directories)
+
+    def missing_tools(self) -> list:
+        """
+        获取缺失的工具列表。
+
+        Returns:
+            list: (分类, 工具名, 文件名) 元组列表
+        """
+        missing = []
+        for category, category_tools in self.tools.items():
+            for tool_name, file_name in category_tools.items():
+                if not self.is_available(category, file_name):
+                    missing.append((category, tool_name, file_name))
+        return missing
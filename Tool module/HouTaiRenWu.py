@@ -0,0 +1,247 @@
+# 禁止生成 .pyc 文件
+import sys
+sys.dont_write_bytecode = True
+
+import queue
+import threading
+import time
+
+# 工具窗口共用的后台任务引擎。
+# 耗时操作在后台线程池中运行(守护线程，关闭窗口后不会阻止进程退出)，
+# 进度、结果和错误通过队列交回界面线程，界面线程用 root.after 定时取出并调用回调。
+# 工作线程中不会出现任何 Tk 调用，处理上千页的文件时窗口也能正常响应。
+#
+# 核心模块的函数都接受 progress(done, total, message) 回调，引擎把 job.report 作为该回调传入：
+# 取消任务后，下一次进度回调会抛出 JobCancelled，核心函数随之中止。
+#
+# 需要进程隔离的长时间任务请使用启动器的任务队列(RenWuDiaoDu)，它以独立进程运行命令行命令。
+
+class JobCancelled(Exception):
+    """任务已被取消"""
+
+class CancelToken:
+    """
+    取消标记，可以在任意线程中调用 cancel()。
+
+    使用示例：
+    token = CancelToken()
+    token.cancel()
+    token.check()  # 抛出 JobCancelled
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    def is_cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def check(self) -> None:
+        """已取消时抛出 JobCancelled"""
+        if self._event.is_set():
+            raise JobCancelled("任务已取消")
+
+def format_seconds(seconds) -> str:
+    """将秒数格式化为 "1小时2分" / "3分4秒" / "5秒" """
+    seconds = int(round(seconds))
+    if seconds >= 3600:
+        return f"{seconds // 3600}小时{seconds % 3600 // 60}分"
+    if seconds >= 60:
+        return f"{seconds // 60}分{seconds % 60}秒"
+    return f"{seconds}秒"
+
+class BackgroundJob:
+    """
+    一个后台任务的状态。
+
+    done、total、message 由工作线程更新，界面线程只在回调中读取。
+    """
+
+    def __init__(self, engine, func, args, kwargs, callbacks):
+        self.engine = engine
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.callbacks = callbacks
+        self.token = CancelToken()
+        self.done = 0
+        self.total = 0
+        self.message = ""
+        self.started = None
+        self.finished = None
+        self.result = None
+        self.error = None
+        self._progress_pending = False
+
+    def cancel(self) -> None:
+        """请求取消任务，任务在下一次进度回调时中止"""
+        self.token.cancel()
+
+    def is_cancelled(self) -> bool:
+        return self.token.is_cancelled()
+
+    def is_finished(self) -> bool:
+        return self.finished is not None
+
+    def elapsed(self) -> float:
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.perf_counter()) - self.started
+
+    def eta(self):
+        """按已完成的比例估算剩余秒数，无法估算时返回 None"""
+        if self.started is None or not self.total or self.done <= 0:
+            return None
+        return self.elapsed() * (self.total - self.done) / self.done
+
+    def describe(self) -> str:
+        """用于状态栏的进度文字，如 "正在转换第 3 页 (剩余约 20秒)"，没有进度说明时显示 "3/100" """
+        text = self.message or (f"{self.done}/{self.total}" if self.total else "")
+        eta = self.eta()
+        if eta is not None and self.done < self.total:
+            text = f"{text} (剩余约 {format_seconds(eta)})" if text else f"剩余约 {format_seconds(eta)}"
+        return text
+
+    def report(self, done, total, message="") -> None:
+        """进度回调(在工作线程中调用)，任务已取消时抛出 JobCancelled"""
+        self.token.check()
+        self.done = done
+        self.total = total
+        if message:
+            self.message = message
+        # 界面线程还没有处理上一条进度时不再入队，只更新数值，避免上千页的文件塞满队列
+        if not self._progress_pending:
+            self._progress_pending = True
+            self.engine._events.put(("progress", self))
+
+class BackgroundEngine:
+    """
+    后台任务引擎。
+
+    回调都在界面线程中调用：
+        on_progress(job)        进度变化，可用 job.done、job.total、job.describe()
+        on_done(job, result)    成功完成
+        on_error(job, error)    抛出异常
+        on_cancelled(job)       被取消
+        on_finally(job)         以上任一情况之后调用，用于恢复按钮状态等
+
+    使用示例：
+    engine = BackgroundEngine(root)
+    job = engine.submit(pdf_to_images, pdf_path, output_dir,
+                        on_progress=lambda job: status_var.set(job.describe()),
+                        on_done=lambda job, result: messagebox.showinfo("完成", "转换完成"))
+    job.cancel()
+    """
+
+    def __init__(self, root, max_workers: int = 1, interval: int = 50):
+        self.root = root
+        self.interval = interval
+        self.max_workers = max_workers
+        self.workers = []
+        self.jobs = []
+        self._pending = queue.Queue()
+        self._events = queue.Queue()
+        self._polling = False
+
+    def submit(self, func, *args, on_progress=None, on_done=None, on_error=None,
+               on_cancelled=None, on_finally=None, progress_arg: str = "progress", **kwargs) -> BackgroundJob:
+        """
+        提交任务(在界面线程中调用)。
+
+        Args:
+            func: 在工作线程中运行的函数，不能访问任何 Tk 控件
+            args, kwargs: 传给 func 的参数，Tk 变量的值需要提前取出
+            progress_arg (str): 进度回调的参数名，func 不接受进度回调时设为 None
+
+        Returns:
+            BackgroundJob: 任务对象，可用于取消和查询进度
+        """
+        callbacks = {"progress": on_progress, "done": on_done, "error": on_error,
+                     "cancelled": on_cancelled, "finally": on_finally}
+        job = BackgroundJob(self, func, args, kwargs, callbacks)
+        if progress_arg:
+            kwargs[progress_arg] = job.report
+        self.jobs.append(job)
+        self._pending.put(job)
+        if len(self.workers) < min(self.max_workers, len(self.jobs)):
+            worker = threading.Thread(target=self._worker, name=f"sanyuan-job-{len(self.workers) + 1}",
+                                      daemon=True)
+            self.workers.append(worker)
+            worker.start()
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.interval, self._poll)
+        return job
+
+    def _worker(self) -> None:
+        while True:
+            job = self._pending.get()
+            if job is None:
+                return
+            self._run(job)
+
+    def _run(self, job) -> None:
+        job.started = time.perf_counter()
+        try:
+            job.token.check()
+            job.result = job.func(*job.args, **job.kwargs)
+            event = "done"
+        except JobCancelled:
+            event = "cancelled"
+        except Exception as e:
+            job.error = e
+            event = "cancelled" if job.is_cancelled() else "error"
+        job.finished = time.perf_counter()
+        self._events.put((event, job))
+
+    def _call(self, job, name, *args) -> None:
+        callback = job.callbacks.get(name)
+        if callback is None:
+            return
+        try:
+            callback(job, *args)
+        except Exception as e:
+            print(f"后台任务回调出错: {str(e)}", file=sys.stderr)
+
+    def _poll(self) -> None:
+        """在界面线程中取出事件并调用回调"""
+        while True:
+            try:
+                event, job = self._events.get_nowait()
+            except queue.Empty:
+                break
+            if event == "progress":
+                job._progress_pending = False
+                if not job.is_finished():
+                    self._call(job, "progress")
+                continue
+            if event == "done":
+                self._call(job, "done", job.result)
+            elif event == "error":
+                self._call(job, "error", job.error)
+            else:
+                self._call(job, "cancelled")
+            self._call(job, "finally")
+            if job in self.jobs:
+                self.jobs.remove(job)
+
+        if self.jobs:
+            self.root.after(self.interval, self._poll)
+        else:
+            self._polling = False
+
+    def is_busy(self) -> bool:
+        return bool(self.jobs)
+
+    def cancel_all(self) -> None:
+        for job in self.jobs:
+            job.cancel()
+
+    def shutdown(self) -> None:
+        """取消所有任务并结束工作线程，窗口关闭时调用"""
+        self.cancel_all()
+        for _ in self.workers:
+            self._pending.put(None)
+        self.workers = []
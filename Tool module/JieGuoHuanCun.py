@@ -0,0 +1,449 @@
+# 禁止生成 .pyc 文件
+import sys
+sys.dont_write_bytecode = True
+
+import functools
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+
+from PeiZhi import get_config, get_data_dir
+from NeiCunGuanLi import degraded_count
+
+# 按内容寻址的结果缓存，PDF、图片、音频工具共用。
+# 缓存键由以下内容计算：操作名、核心函数及其源文件内容、输入文件的内容哈希和文件名、
+# 其他参数(进度回调除外)以及输出文件的扩展名。输入文件的路径不参与计算，
+# 同一个文件复制到别的目录后仍然可以命中。
+#
+# 命中时把上次的输出文件复制(或硬链接)到本次的输出位置，直接返回结果，不再重新计算。
+# 缓存保存在数据目录的 cache 目录中，超过 cache_max_mb 后按最近使用时间淘汰。
+#
+# 缓存会再保存一份输出文件，默认关闭：配置项 result_cache 设为 true 或在启动器"设置"菜单勾选
+# "使用结果缓存"后开启。输出超过 cache_max_entry_mb 的操作不缓存。
+# 临时关闭：设置环境变量 SANYUAN_NO_CACHE=1(命令行可用 run --no-cache)。
+
+CACHE_DIR = "cache"
+NO_CACHE_ENV = "SANYUAN_NO_CACHE"
+# 缓存格式版本，修改键的计算方式或条目格式时加1
+CACHE_VERSION = 1
+
+class Uncacheable(Exception):
+    """参数无法用于计算缓存键(如包含回调函数)，本次调用直接执行"""
+
+def is_enabled() -> bool:
+    """是否使用结果缓存"""
+    value = os.environ.get(NO_CACHE_ENV)
+    if value is not None and value.strip().lower() not in ("", "0", "false", "no", "off"):
+        return False
+    return bool(get_config().get("result_cache"))
+
+# 文件哈希的内存缓存：(路径, 大小, 修改时间) -> sha256
+_digests = {}
+_digest_lock = threading.Lock()
+
+def file_digest(path: str) -> str:
+    """计算文件内容的 sha256，文件未修改时直接使用上次的结果"""
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    with _digest_lock:
+        digest = _digests.get(memo_key)
+    if digest is None:
+        sha = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                sha.update(chunk)
+        digest = sha.hexdigest()
+        with _digest_lock:
+            _digests[memo_key] = digest
+    return digest
+
+def dir_digest(path: str) -> str:
+    """目录中所有文件(不含子目录)的文件名和内容哈希"""
+    sha = hashlib.sha256()
+    for name in sorted(os.listdir(path)):
+        full_path = os.path.join(path, name)
+        if os.path.isfile(full_path):
+            sha.update(f"{name}\0{file_digest(full_path)}\0".encode("utf-8"))
+    return sha.hexdigest()
+
+_source_digests = {}
+
+def _source_digest(func) -> str:
+    """核心函数所在源文件的哈希，代码修改后旧的缓存自动失效"""
+    path = inspect.getsourcefile(inspect.unwrap(func))
+    if path not in _source_digests:
+        _source_digests[path] = file_digest(path) if path and os.path.isfile(path) else ""
+    return _source_digests[path]
+
+def _describe_input(value, paths: list):
+    """把输入参数中的路径替换为文件名和内容哈希，并按顺序收集路径"""
+    if isinstance(value, (list, tuple)):
+        return [_describe_input(item, paths) for item in value]
+    if isinstance(value, str):
+        if os.path.isfile(value):
+            paths.append(value)
+            return {"name": os.path.basename(value), "sha256": file_digest(value)}
+        if os.path.isdir(value):
+            paths.append(value)
+            return {"dir": dir_digest(value)}
+        # 输入文件不存在时交给核心函数报告错误
+        raise Uncacheable(f"输入不存在: {value}")
+    return value
+
+def _json_default(value):
+    if isinstance(value, (range, set, frozenset)):
+        return sorted(value)
+    if hasattr(value, "intervals"):
+        # 页码范围 PageSet 按区间参与计算，不展开成页面列表
+        return {"intervals": [list(interval) for interval in value.intervals],
+                "strides": [list(stride) for stride in value.strides]}
+    raise Uncacheable(f"无法缓存的参数类型: {type(value).__name__}")
+
+def _matches(text: str, anchor: str) -> bool:
+    if not text.startswith(anchor):
+        return False
+    return len(text) == len(anchor) or text[len(anchor)] in "/\\" or anchor[-1] in "/\\"
+
+def _to_template(value, anchors):
+    """把结果中的输入、输出路径替换为占位符，如 /out/a.png -> {out}/a.png"""
+    if isinstance(value, dict):
+        return {k: _to_template(v, anchors) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_template(item, anchors) for item in value]
+    if isinstance(value, str):
+        for anchor, placeholder in anchors:
+            if _matches(value, anchor):
+                return placeholder + value[len(anchor):]
+    return value
+
+def _from_template(value, anchors):
+    """把占位符替换回本次调用的路径"""
+    if isinstance(value, dict):
+        return {k: _from_template(v, anchors) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_from_template(item, anchors) for item in value]
+    if isinstance(value, str):
+        for anchor, placeholder in anchors:
+            if value.startswith(placeholder):
+                return anchor + value[len(placeholder):]
+    return value
+
+class ResultCache:
+    """
+    结果缓存存储。
+
+    每个缓存条目是 cache/objects/<键前两位>/<键> 目录，包含输出文件的副本和 meta.json，
+    meta.json 的修改时间就是最近使用时间。统计数据保存在 cache/stats.json。
+
+    使用示例：
+    cache = get_cache()
+    print(cache.stats())
+    cache.clear()
+    """
+
+    def __init__(self, directory: str = None, max_bytes: int = None, hardlink: bool = None,
+                 max_entry_bytes: int = None):
+        config = get_config()
+        self.directory = directory or os.path.join(get_data_dir(), CACHE_DIR)
+        if max_bytes is None:
+            max_bytes = int(config.get("cache_max_mb")) * 1024 * 1024
+        self.max_bytes = max_bytes
+        if max_entry_bytes is None:
+            max_entry_bytes = int(config.get("cache_max_entry_mb") * 1024 * 1024)
+        # 单个条目不超过总上限的一半
+        self.max_entry_bytes = min(max_entry_bytes, max_bytes // 2)
+        self.hardlink = config.get("cache_hardlink") if hardlink is None else hardlink
+        self.objects_dir = os.path.join(self.directory, "objects")
+        self.stats_path = os.path.join(self.directory, "stats.json")
+        self.lock = threading.Lock()
+        os.makedirs(self.objects_dir, exist_ok=True)
+
+    def entry_dir(self, key: str) -> str:
+        return os.path.join(self.objects_dir, key[:2], key)
+
+    def _place(self, source: str, destination: str) -> None:
+        """把缓存中的文件放到输出位置，开启 cache_hardlink 时优先使用硬链接"""
+        directory = os.path.dirname(destination)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if os.path.lexists(destination):
+            os.remove(destination)
+        if self.hardlink:
+            try:
+                os.link(source, destination)
+                return
+            except OSError:
+                pass
+        shutil.copyfile(source, destination)
+
+    def fetch(self, key: str, anchors):
+        """
+        查找缓存并恢复输出文件。
+
+        Returns:
+            命中时返回结果(带有 "cached": True)，未命中返回 None
+        """
+        entry = self.entry_dir(key)
+        meta_path = os.path.join(entry, "meta.json")
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            self._update_stats(misses=1)
+            return None
+
+        try:
+            for i, template in enumerate(meta["files"]):
+                self._place(os.path.join(entry, "files", str(i)), _from_template(template, anchors))
+        except OSError:
+            # 条目损坏(文件被删除等)，删除后重新计算
+            shutil.rmtree(entry, ignore_errors=True)
+            self._update_stats(misses=1)
+            return None
+
+        os.utime(meta_path)
+        self._update_stats(hits=1, bytes_saved=meta["size"], seconds_saved=meta["seconds"])
+        result = _from_template(meta["result"], anchors)
+        if isinstance(result, dict):
+            result["cached"] = True
+        return result
+
+    def store(self, key: str, operation: str, result, anchors, seconds: float) -> bool:
+        """
+        保存一次计算的结果和输出文件。
+
+        只保存返回 {"outputs": [...]} 且所有输出都位于输出参数指定位置内、总大小不超过
+        max_entry_bytes 的结果。
+
+        Returns:
+            bool: 是否保存
+        """
+        if not isinstance(result, dict) or not result.get("outputs"):
+            return False
+        output_anchor = [a for a in anchors if a[1] == "{out}"]
+        files = [_to_template(path, output_anchor) for path in result["outputs"]]
+        if not all(isinstance(f, str) and f.startswith("{out}") for f in files):
+            return False
+        size = sum(os.path.getsize(path) for path in result["outputs"])
+        if size > self.max_entry_bytes:
+            return False
+
+        entry = self.entry_dir(key)
+        tmp_entry = f"{entry}.{uuid.uuid4().hex}.tmp"
+        os.makedirs(os.path.join(tmp_entry, "files"))
+        try:
+            for i, path in enumerate(result["outputs"]):
+                # 复制而不是链接，之后修改输出文件不会影响缓存
+                shutil.copyfile(path, os.path.join(tmp_entry, "files", str(i)))
+            meta = {
+                "version": CACHE_VERSION,
+                "operation": operation,
+                "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "size": size,
+                "seconds": round(seconds, 3),
+                "files": files,
+                "result": _to_template(result, anchors),
+            }
+            with open(os.path.join(tmp_entry, "meta.json"), "w", encoding="utf-8") as f:
+                json.dump(meta, f, ensure_ascii=False)
+            try:
+                os.rename(tmp_entry, entry)
+            except OSError:
+                # 其他进程已经保存了同一个结果
+                shutil.rmtree(tmp_entry, ignore_errors=True)
+                return False
+        except BaseException:
+            shutil.rmtree(tmp_entry, ignore_errors=True)
+            raise
+        self._update_stats(stores=1)
+        self.evict()
+        return True
+
+    def entries(self) -> list:
+        """
+        Returns:
+            list: (最近使用时间, 大小, 条目目录) 列表，按最近使用时间从旧到新排列
+        """
+        entries = []
+        for prefix in os.listdir(self.objects_dir):
+            prefix_dir = os.path.join(self.objects_dir, prefix)
+            if not os.path.isdir(prefix_dir):
+                continue
+            for name in os.listdir(prefix_dir):
+                if name.endswith(".tmp"):
+                    continue
+                entry = os.path.join(prefix_dir, name)
+                meta_path = os.path.join(entry, "meta.json")
+                try:
+                    with open(meta_path, "r", encoding="utf-8") as f:
+                        size = json.load(f)["size"]
+                    entries.append((os.path.getmtime(meta_path), size, entry))
+                except (OSError, ValueError, KeyError):
+                    continue
+        entries.sort()
+        return entries
+
+    def evict(self) -> int:
+        """按最近使用时间淘汰条目，直到总大小不超过上限，返回淘汰的条目数"""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+        for _, size, entry in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+            evicted += 1
+        if evicted:
+            self._update_stats(evictions=evicted)
+        return evicted
+
+    def clear(self) -> None:
+        """删除所有缓存条目(保留统计数据)"""
+        shutil.rmtree(self.objects_dir, ignore_errors=True)
+        os.makedirs(self.objects_dir, exist_ok=True)
+
+    def _read_stats(self) -> dict:
+        try:
+            with open(self.stats_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _update_stats(self, **deltas) -> None:
+        # 多个工具进程同时更新时可能丢失少量计数，统计只用于参考
+        with self.lock:
+            stats = self._read_stats()
+            for name, delta in deltas.items():
+                stats[name] = stats.get(name, 0) + delta
+            tmp_path = f"{self.stats_path}.{uuid.uuid4().hex}.tmp"
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(stats, f)
+                os.replace(tmp_path, self.stats_path)
+            except OSError:
+                pass
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            dict: hits、misses、stores、evictions、bytes_saved、seconds_saved、entries、size、max_bytes
+        """
+        stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "bytes_saved": 0, "seconds_saved": 0}
+        stats.update(self._read_stats())
+        entries = self.entries()
+        stats["entries"] = len(entries)
+        stats["size"] = sum(size for _, size, _ in entries)
+        stats["max_bytes"] = self.max_bytes
+        return stats
+
+_cache = None
+
+def get_cache() -> ResultCache:
+    """
+    获取全局缓存实例(首次调用时创建)。
+
+    Returns:
+        ResultCache: 全局唯一的缓存实例
+    """
+    global _cache
+    if _cache is None:
+        _cache = ResultCache()
+    return _cache
+
+def make_key(func, operation: str, arguments: dict, inputs, output):
+    """
+    计算缓存键。
+
+    Returns:
+        tuple: (键, 路径占位符列表)
+    """
+    paths = []
+    params = {}
+    for name, value in arguments.items():
+        if name == "progress":
+            continue
+        if name == output:
+            # 输出位置不参与计算，只有扩展名(决定输出格式)参与
+            params[name] = os.path.splitext(value)[1].lower() if isinstance(value, str) else None
+        elif name in inputs:
+            params[name] = _describe_input(value, paths)
+        elif callable(value):
+            raise Uncacheable(f"参数 {name} 是回调函数")
+        else:
+            params[name] = value
+    material = {
+        "version": CACHE_VERSION,
+        "operation": operation,
+        "function": f"{func.__module__}.{func.__qualname__}",
+        "source": _source_digest(func),
+        "params": params,
+    }
+    key = hashlib.sha256(json.dumps(material, sort_keys=True, ensure_ascii=False,
+                                    default=_json_default).encode("utf-8")).hexdigest()
+    anchors = [(path, f"{{in{i}}}") for i, path in enumerate(paths)]
+    if isinstance(arguments.get(output), str) and arguments[output]:
+        anchors.append((arguments[output], "{out}"))
+    # 长的路径优先匹配，避免输出目录位于输入目录中时被错误替换
+    anchors.sort(key=lambda a: len(a[0]), reverse=True)
+    return key, anchors
+
+def cached(operation: str, inputs=(), output: str = None):
+    """
+    结果缓存装饰器。
+
+    Args:
+        operation (str): 操作名称
+        inputs: 输入参数名，参数值可以是文件、目录或它们的列表
+        output (str): 输出参数名(输出文件或输出目录)
+
+    使用示例：
+    @cached("pdf-to-image", inputs=("pdf_path",), output="output_dir")
+    def pdf_to_images(pdf_path, output_dir, ..., progress=None):
+        ...
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not is_enabled():
+                return func(*args, **kwargs)
+            try:
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                key, anchors = make_key(func, operation, bound.arguments, inputs, output)
+                cache = get_cache()
+                result = cache.fetch(key, anchors)
+            except Uncacheable:
+                return func(*args, **kwargs)
+            except OSError as e:
+                print(f"结果缓存不可用: {str(e)}", file=sys.stderr)
+                return func(*args, **kwargs)
+
+            progress = bound.arguments.get("progress")
+            if result is not None:
+                if progress is not None:
+                    progress(1, 1, "已使用缓存的结果")
+                return result
+
+            start = time.perf_counter()
+            degraded = degraded_count()
+            result = func(*args, **kwargs)
+            if degraded_count() != degraded:
+                # 内存预算不足时降低了分辨率或缩小了图片，不能当作完整的结果保存
+                return result
+            try:
+                cache.store(key, operation, result, anchors, time.perf_counter() - start)
+            except (OSError, TypeError, ValueError) as e:
+                # 缓存写入失败不影响操作本身
+                print(f"结果缓存写入失败: {str(e)}", file=sys.stderr)
+            return result
+
+        return wrapper
+    return decorator
@@ -0,0 +1,239 @@
+# 禁止生成 .pyc 文件
+import sys
+sys.dont_write_bytecode = True
+
+import json
+import os
+import signal
+import threading
+import time
+
+from PeiZhi import get_data_dir
+
+PROC_DIR = "/proc"
+
+def _clock_ticks() -> int:
+    try:
+        return os.sysconf("SC_CLK_TCK")
+    except (AttributeError, ValueError, OSError):
+        return 100
+
+CLOCK_TICKS = _clock_ticks()
+
+def read_proc_stat(pid: int):
+    """
+    读取 /proc/<pid>/stat 中的父进程号和CPU时间。
+
+    Returns:
+        tuple: (父进程号, CPU时间秒数)，进程不存在时返回 None
+    """
+    try:
+        with open(f"{PROC_DIR}/{pid}/stat", "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    # 进程名可能包含空格和括号，从最后一个 ")" 之后开始解析
+    fields = data[data.rfind(b")") + 2:].split()
+    ppid = int(fields[1])
+    cpu_seconds = (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+    return ppid, cpu_seconds
+
+def read_proc_rss(pid: int):
+    """读取进程的常驻内存(字节)，进程不存在时返回 None"""
+    try:
+        with open(f"{PROC_DIR}/{pid}/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+def list_children() -> dict:
+    """扫描 /proc，返回 {父进程号: [子进程号]}"""
+    children = {}
+    try:
+        names = os.listdir(PROC_DIR)
+    except OSError:
+        return children
+    for name in names:
+        if not name.isdigit():
+            continue
+        stat = read_proc_stat(int(name))
+        if stat is not None:
+            children.setdefault(stat[0], []).append(int(name))
+    return children
+
+class TrackedProcess:
+    """被监控的一个工具进程"""
+
+    def __init__(self, process, name: str, kind: str, limit_mb: float):
+        self.process = process
+        self.pid = process.pid
+        self.name = name
+        self.kind = kind
+        self.limit_mb = limit_mb
+        self.started = time.time()
+        self.finished = None
+        self.rss = None
+        self.peak_rss = 0
+        self.cpu_seconds = 0.0
+        self.warned = False
+        self.killed = False
+        self.returncode = None
+
+    def elapsed(self) -> float:
+        return (self.finished or time.time()) - self.started
+
+class ProcessMonitor:
+    """
+    工具子进程监控器。
+
+    记录启动器启动的所有工具进程，定时从 /proc 采样进程(包括其子进程，如 FFmpeg)的
+    常驻内存和CPU时间。设置了内存上限的工具超过上限的 warn_ratio 时先发出警告，
+    超过上限时结束进程。进程退出后，退出码和峰值内存写入数据目录下的 run_log.jsonl。
+
+    没有 /proc 的系统上只记录退出状态，内存和CPU显示为空。
+
+    使用示例：
+    monitor = ProcessMonitor(limit_mb=2048)
+    monitor.track(subprocess.Popen(...), "PDF转图片")
+    events = monitor.sample()  # 由界面定时调用，返回警告和结束事件
+    """
+
+    def __init__(self, limit_mb: float = 0, tool_limits=None, warn_ratio: float = 0.8, log_path=None):
+        self.limit_mb = limit_mb
+        self.tool_limits = dict(tool_limits or {})
+        self.warn_ratio = warn_ratio
+        self.log_path = log_path or os.path.join(get_data_dir(), "run_log.jsonl")
+        self.processes = []
+        self.lock = threading.Lock()
+        self.has_proc = os.path.isdir(PROC_DIR)
+
+    def track(self, process, name: str, kind: str = "tool") -> TrackedProcess:
+        """
+        开始监控一个子进程(可以在任意线程中调用)。
+
+        Args:
+            process: subprocess.Popen 对象
+            name (str): 工具或任务名称
+            kind (str): tool(工具窗口) / job(任务队列)
+        """
+        limit_mb = self.tool_limits.get(name, self.limit_mb)
+        tracked = TrackedProcess(process, name, kind, limit_mb)
+        with self.lock:
+            self.processes.append(tracked)
+        return tracked
+
+    def running(self) -> list:
+        with self.lock:
+            return [p for p in self.processes if p.finished is None]
+
+    def sample(self) -> list:
+        """
+        采样所有运行中的进程，处理内存上限并记录已退出的进程。
+
+        Returns:
+            list: 事件列表 (类型, TrackedProcess)，类型为 warn / kill / exit
+        """
+        events = []
+        running = self.running()
+        if not running:
+            return events
+        children = list_children() if self.has_proc else {}
+        for tracked in running:
+            returncode = tracked.process.poll()
+            if returncode is not None:
+                tracked.returncode = returncode
+                tracked.finished = time.time()
+                self._write_log(tracked)
+                events.append(("exit", tracked))
+                continue
+            if not self.has_proc:
+                continue
+
+            rss_total = 0
+            cpu_total = 0.0
+            pids = self._descendants(tracked.pid, children)
+            for pid in pids:
+                rss = read_proc_rss(pid)
+                stat = read_proc_stat(pid)
+                if rss is not None:
+                    rss_total += rss
+                if stat is not None:
+                    cpu_total += stat[1]
+            tracked.rss = rss_total
+            tracked.peak_rss = max(tracked.peak_rss, rss_total)
+            # 已退出的子进程的CPU时间不再计入，只保留最大值
+            tracked.cpu_seconds = max(tracked.cpu_seconds, cpu_total)
+
+            if tracked.limit_mb:
+                rss_mb = rss_total / (1024 * 1024)
+                if rss_mb >= tracked.limit_mb:
+                    self._kill(pids)
+                    tracked.killed = True
+                    events.append(("kill", tracked))
+                elif rss_mb >= tracked.limit_mb * self.warn_ratio and not tracked.warned:
+                    tracked.warned = True
+                    events.append(("warn", tracked))
+        return events
+
+    def terminate(self, pid: int) -> bool:
+        """结束指定的工具进程及其子进程"""
+        for tracked in self.running():
+            if tracked.pid == pid:
+                children = list_children() if self.has_proc else {}
+                self._kill(self._descendants(pid, children))
+                tracked.killed = True
+                return True
+        return False
+
+    def clear_finished(self) -> None:
+        with self.lock:
+            self.processes = [p for p in self.processes if p.finished is None]
+
+    def read_log(self, limit: int = 100) -> list:
+        """读取最近的运行记录"""
+        try:
+            with open(self.log_path, "r", encoding="utf-8") as f:
+                lines = f.readlines()[-limit:]
+        except OSError:
+            return []
+        records = []
+        for line in lines:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+        return records
+
+    def _descendants(self, pid: int, children: dict) -> list:
+        pids = [pid]
+        index = 0
+        while index < len(pids):
+            pids.extend(children.get(pids[index], []))
+            index += 1
+        return pids
+
+    def _kill(self, pids) -> None:
+        # 先结束子进程，再结束工具进程本身
+        for pid in reversed(pids):
+            try:
+                os.kill(pid, getattr(signal, "SIGKILL", signal.SIGTERM))
+            except OSError:
+                pass
+
+    def _write_log(self, tracked: TrackedProcess) -> None:
+        record = {
+            "tool": tracked.name,
+            "kind": tracked.kind,
+            "pid": tracked.pid,
+            "start": round(tracked.started, 3),
+            "duration": round(tracked.elapsed(), 3),
+            "exit_code": tracked.returncode,
+            "peak_rss_mb": round(tracked.peak_rss / (1024 * 1024), 1) if self.has_proc else None,
+            "cpu_seconds": round(tracked.cpu_seconds, 2) if self.has_proc else None,
+            "killed": tracked.killed,
+        }
+        try:
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except OSError:
+            pass
@@ -0,0 +1,122 @@
+# 禁止生成 .pyc 文件
+import sys
+sys.dont_write_bytecode = True
+
+import time
+import tkinter as tk
+from tkinter import ttk, messagebox
+
+class ProcessPanel:
+    """
+    进程状态面板，显示启动器启动的工具进程的内存、CPU时间和运行时间，
+    并可以查看最近的运行记录。
+
+    采样由启动器定时完成，面板只负责显示。
+
+    使用示例：
+    panel = ProcessPanel(root, monitor)
+    """
+
+    COLUMNS = [
+        ("pid", "PID", 60),
+        ("name", "工具", 120),
+        ("kind", "类型", 50),
+        ("rss", "内存(MB)", 70),
+        ("peak", "峰值(MB)", 70),
+        ("limit", "上限(MB)", 70),
+        ("cpu", "CPU(s)", 60),
+        ("elapsed", "运行时间", 70),
+    ]
+
+    KIND_NAMES = {"tool": "工具", "job": "任务"}
+
+    def __init__(self, master, monitor, refresh_ms: int = 1000):
+        self.master = master
+        self.monitor = monitor
+        self.refresh_ms = refresh_ms
+
+        self.window = tk.Toplevel(master)
+        self.window.title("进程监控")
+        self.window.geometry("600x320")
+
+        self.tree = ttk.Treeview(self.window, columns=[c[0] for c in self.COLUMNS],
+                                 show="headings", selectmode="browse")
+        for key, title, width in self.COLUMNS:
+            self.tree.heading(key, text=title)
+            self.tree.column(key, width=width, anchor="center")
+        self.tree.column("name", anchor="w")
+
+        button_frame = ttk.Frame(self.window)
+        button_frame.pack(side="bottom", fill="x", padx=10, pady=5)
+        ttk.Button(button_frame, text="结束进程", command=self.terminate_selected).pack(side="left", padx=5)
+        ttk.Button(button_frame, text="运行记录", command=self.show_log).pack(side="left", padx=5)
+        if not self.monitor.has_proc:
+            ttk.Label(button_frame, text="当前系统不支持内存采样",
+                      foreground="gray").pack(side="right", padx=5)
+
+        self.tree.pack(fill="both", expand=True, padx=10, pady=5)
+        self.refresh()
+
+    def refresh(self):
+        """更新进程列表"""
+        if not self.window.winfo_exists():
+            return
+        running = self.monitor.running()
+        existing = set(self.tree.get_children())
+        current = set()
+        for tracked in running:
+            item = str(tracked.pid)
+            current.add(item)
+            values = (
+                tracked.pid,
+                tracked.name,
+                self.KIND_NAMES.get(tracked.kind, tracked.kind),
+                self._mb(tracked.rss),
+                self._mb(tracked.peak_rss) if tracked.peak_rss else "-",
+                tracked.limit_mb or "-",
+                f"{tracked.cpu_seconds:.1f}",
+                f"{tracked.elapsed():.0f}s",
+            )
+            if item in existing:
+                self.tree.item(item, values=values)
+            else:
+                self.tree.insert("", "end", iid=item, values=values)
+        for item in existing - current:
+            self.tree.delete(item)
+        self.window.after(self.refresh_ms, self.refresh)
+
+    def _mb(self, value):
+        if value is None:
+            return "-"
+        return f"{value / (1024 * 1024):.0f}"
+
+    def terminate_selected(self):
+        """结束选中的进程"""
+        selection = self.tree.selection()
+        if not selection:
+            messagebox.showinfo("提示", "请先选择进程", parent=self.window)
+            return
+        pid = int(selection[0])
+        if messagebox.askyesno("确认", f"确定要结束进程 {pid} 吗？未保存的内容将丢失。",
+                               parent=self.window):
+            self.monitor.terminate(pid)
+
+    def show_log(self):
+        """显示最近的运行记录"""
+        records = self.monitor.read_log(50)
+        log_window = tk.Toplevel(self.window)
+        log_window.title("运行记录")
+        log_window.geometry("560x300")
+
+        text_widget = tk.Text(log_window, wrap="none", padx=10, pady=10)
+        text_widget.pack(fill="both", expand=True)
+        if not records:
+            text_widget.insert("end", "暂无运行记录")
+        for record in reversed(records):
+            start = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(record.get("start", 0)))
+            peak = record.get("peak_rss_mb")
+            status = "被结束" if record.get("killed") else f"退出码 {record.get('exit_code')}"
+            text_widget.insert("end", f"{start}  {record.get('tool')}  {status}  "
+                                      f"耗时 {record.get('duration', 0):.1f}s  "
+                                      f"峰值内存 {'-' if peak is None else f'{peak} MB'}\n")
+        text_widget.config(state="disabled")
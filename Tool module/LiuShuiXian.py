@@ -0,0 +1,464 @@
+# 禁止生成 .pyc 文件
+import sys
+sys.dont_write_bytecode = True
+
+import inspect
+import io
+import json
+import os
+import queue
+import string
+import threading
+
+from YaoCe import recorded
+from XingNengFenXi import profiled
+
+# 多步骤流水线。
+# 把已有的核心操作串成若干个步骤，步骤之间直接传递内存中的页面图片、PIL 图片和 PDF 数据，不写中间文件。
+# 每个步骤在自己的线程中运行，相邻步骤之间是有上限的队列：
+# 上游比下游快时会在队列满时等待，内存占用不会随页数增长；任一步骤出错时整条流水线停止。
+#
+# 流水线用一个 JSON(或安装了 PyYAML 时的 YAML)文件定义：
+#   {
+#     "name": "PDF九宫格",
+#     "stages": [
+#       {"stage": "pdf-pages", "input": "${in}", "dpi": 150},
+#       {"stage": "grid", "rows": 3, "cols": 3},
+#       {"stage": "to-pdf", "name": "九宫格"},
+#       {"stage": "save-pdf", "output": "${out}"}
+#     ]
+#   }
+# 字符串参数中的 ${变量} 在运行时替换(命令行 --var in=a.pdf)，input/output 的相对路径相对于流水线文件所在目录。
+# 最后一步必须是 save-images 或 save-pdf。
+#
+# 命令行：python "San Yuan Gong Ju_V1-3-1.py" run pipeline --file 流水线.json --var in=a.pdf --var out=结果
+
+# 步骤之间传递的数据类型
+IMAGE = "image"
+PDF = "pdf"
+FILE = "file"
+
+DEFAULT_QUEUE_SIZE = 4
+
+class Item:
+    """
+    在步骤之间传递的一份数据。
+
+    Attributes:
+        name (str): 名称，保存时用作文件名
+        image: PIL 图片(图片类型)
+        data (bytes): PDF 数据(PDF类型)，或格式转换后已编码的图片数据
+        format (str): data 对应的图片格式
+    """
+
+    def __init__(self, name: str, image=None, data: bytes = None, format: str = None):
+        self.name = name
+        self.image = image
+        self.data = data
+        self.format = format
+
+# ---- 步骤 ----
+# 每个步骤是一个生成器函数 func(items, **参数)：items 是上游数据的迭代器(第一步为 None)，产生的数据交给下一步。
+# 保存步骤产生输出文件的路径。
+
+def _as_list(value) -> list:
+    if value is None:
+        return []
+    return list(value) if isinstance(value, (list, tuple)) else [value]
+
+def _base_name(path: str) -> str:
+    return os.path.splitext(os.path.basename(path))[0]
+
+def _pdf_pages(items, input=None, pages=None, dpi: int = 150):
+    """PDF 逐页渲染为图片，可以作为第一步(读取 input)或接在 PDF 数据之后"""
+    from PDFChuLi import iter_page_images, load_pdf, parse_page_ranges, PdfReader
+
+    if items is None:
+        if not input:
+            raise ValueError("pdf-pages 作为第一步时需要 input 参数")
+        sources = ((_base_name(path), path, lambda path=path: len(load_pdf(path).pages))
+                   for path in _as_list(input))
+    else:
+        sources = ((item.name, item.data, lambda item=item: len(PdfReader(io.BytesIO(item.data)).pages))
+                   for item in items)
+
+    for name, source, page_count in sources:
+        if isinstance(source, str) and not os.path.exists(source):
+            raise FileNotFoundError(f"PDF文件不存在: {source}")
+        page_list = parse_page_ranges(pages, page_count()) if pages else None
+        for page_num, image in iter_page_images(source, page_list, dpi):
+            yield Item(f"{name}_page_{page_num + 1}", image=image)
+
+def _images(items, input=None):
+    """读取图片文件，input 可以是图片、图片列表或目录"""
+    from PIL import Image
+    from TuPianChuLi import list_images
+
+    paths = []
+    for path in _as_list(input):
+        if os.path.isdir(path):
+            paths.extend(os.path.join(path, f) for f in sorted(list_images(path)))
+        else:
+            paths.append(path)
+    if not paths:
+        raise ValueError("images 步骤没有找到图片")
+    for path in paths:
+        image = Image.open(path)
+        image.load()
+        yield Item(_base_name(path), image=image)
+
+def _pdf(items, input=None):
+    """读取PDF文件的数据"""
+    paths = _as_list(input)
+    if not paths:
+        raise ValueError("pdf 步骤需要 input 参数")
+    for path in paths:
+        with open(path, "rb") as f:
+            yield Item(_base_name(path), data=f.read())
+
+def _grid(items, rows: int = 3, cols: int = 3):
+    """每张图片按网格切分(九宫格)"""
+    from TuPianChuLi import split_image
+
+    for item in items:
+        for (i, j), tile in split_image(item.image, rows, cols):
+            yield Item(f"{item.name}_tile_{i}_{j}", image=tile)
+
+def _convert(items, format: str = "jpg", quality: int = 90):
+    """在内存中转换图片格式，后面的保存步骤直接写出编码后的数据"""
+    from PIL import Image
+    from TuPianChuLi import encode_image
+
+    for item in items:
+        data = encode_image(item.image, format, quality)
+        image = Image.open(io.BytesIO(data))
+        image.load()
+        yield Item(item.name, image=image, data=data, format=format.lower())
+
+def _combine(items, layout: str = "uniform", random: bool = False, select: int = 0, name: str = "combined"):
+    """把上游的全部图片合成为一张(需要等待上游全部完成)"""
+    from random import sample
+    from TuPianChuLi import layout_images
+
+    images = [item.image for item in items]
+    if 0 < select < len(images):
+        images = sample(images, select)
+    yield Item(name, image=layout_images(images, layout, random))
+
+def _to_pdf(items, name: str = None, image_format: str = "png"):
+    """把上游的图片逐张写入一个PDF，每张图片一页"""
+    from PDFChuLi import images_to_pdf_bytes
+
+    names = []
+
+    def images():
+        for item in items:
+            names.append(item.name)
+            yield item.image
+
+    data = images_to_pdf_bytes(images(), image_format)
+    yield Item(name or names[0], data=data)
+
+def _watermark(items, text: str = "机密", font_size: int = 36, opacity: float = 0.5, position: str = "center"):
+    """为PDF数据添加文字水印"""
+    from PDFChuLi import watermark_pdf_bytes
+
+    for item in items:
+        yield Item(item.name, data=watermark_pdf_bytes(item.data, text, font_size, opacity, position))
+
+def _save_images(items, output=None, format: str = None, quality: int = 90):
+    """把图片保存到 output 目录，未指定格式时使用转换步骤的格式，否则为 png"""
+    from TuPianChuLi import encode_image
+
+    if not output:
+        raise ValueError("save-images 需要 output 参数")
+    os.makedirs(output, exist_ok=True)
+    for item in items:
+        image_format = (format or item.format or "png").lower()
+        path = os.path.join(output, f"{item.name}.{image_format}")
+        data = item.data if item.data is not None and item.format == image_format else \
+            encode_image(item.image, image_format, quality)
+        with open(path, "wb") as f:
+            f.write(data)
+        yield path
+
+def _save_pdf(items, output=None):
+    """
+    保存PDF数据。
+
+    output 以 .pdf 结尾时作为文件路径(可以包含 {name})，否则作为目录，文件名为 <名称>.pdf。
+    """
+    if not output:
+        raise ValueError("save-pdf 需要 output 参数")
+    for item in items:
+        if output.lower().endswith(".pdf"):
+            path = output.replace("{name}", item.name)
+        else:
+            path = os.path.join(output, f"{item.name}.pdf")
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(item.data)
+        yield path
+
+# 步骤名称 -> (函数, 接受的数据类型, 产生的数据类型)，接受类型中的 None 表示可以作为第一步
+STAGES = {
+    "pdf-pages": (_pdf_pages, (None, PDF), IMAGE),
+    "images": (_images, (None,), IMAGE),
+    "pdf": (_pdf, (None,), PDF),
+    "grid": (_grid, (IMAGE,), IMAGE),
+    "convert": (_convert, (IMAGE,), IMAGE),
+    "combine": (_combine, (IMAGE,), IMAGE),
+    "to-pdf": (_to_pdf, (IMAGE,), PDF),
+    "watermark": (_watermark, (PDF,), PDF),
+    "save-images": (_save_images, (IMAGE,), FILE),
+    "save-pdf": (_save_pdf, (PDF,), FILE),
+}
+
+# 相对路径按流水线文件所在目录解析的参数
+PATH_PARAMS = ("input", "output")
+
+# ---- 读取定义 ----
+
+def _substitute(value, variables: dict):
+    """替换字符串(包括列表中的字符串)里的 ${变量}"""
+    if isinstance(value, str):
+        return string.Template(value).safe_substitute(variables)
+    if isinstance(value, list):
+        return [_substitute(v, variables) for v in value]
+    return value
+
+def find_variables(definition: dict) -> list:
+    """按出现顺序列出定义中用到的 ${变量} 名称(不重复)"""
+    names = []
+
+    def scan(value):
+        if isinstance(value, str):
+            for match in string.Template.pattern.finditer(value):
+                name = match.group("named") or match.group("braced")
+                if name and name not in names:
+                    names.append(name)
+        elif isinstance(value, list):
+            for v in value:
+                scan(v)
+        elif isinstance(value, dict):
+            for v in value.values():
+                scan(v)
+
+    scan(definition.get("stages") or [])
+    return names
+
+def _resolve_path(value, base_dir: str):
+    if isinstance(value, list):
+        return [_resolve_path(v, base_dir) for v in value]
+    if isinstance(value, str) and value and not os.path.isabs(value):
+        return os.path.normpath(os.path.join(base_dir, value))
+    return value
+
+def read_definition(path: str) -> dict:
+    """
+    读取流水线定义文件(.json，或 .yaml/.yml)。
+
+    Raises:
+        ValueError: 文件格式错误，或读取YAML但没有安装 PyYAML
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    if path.lower().endswith((".yaml", ".yml")):
+        try:
+            import yaml
+        except ImportError:
+            raise ValueError("读取YAML流水线需要安装 PyYAML，请执行: pip install pyyaml，或改用JSON格式")
+        definition = yaml.safe_load(text)
+    else:
+        try:
+            definition = json.loads(text)
+        except ValueError as e:
+            raise ValueError(f"流水线文件不是有效的JSON: {str(e)}")
+    if not isinstance(definition, dict):
+        raise ValueError("流水线文件的顶层必须是对象")
+    return definition
+
+class Pipeline:
+    """
+    多步骤流水线，每个步骤在单独的线程中运行，步骤之间用有上限的队列连接。
+
+    Args:
+        stages: [(步骤名称, 参数字典)] 列表
+        name (str): 流水线名称
+        queue_size (int): 每个队列最多缓存的数据份数
+
+    使用示例：
+    pipeline = Pipeline.load("九宫格.json", {"in": "a.pdf", "out": "结果"})
+    result = pipeline.run(progress)
+    print(result["outputs"])
+    """
+
+    def __init__(self, stages, name: str = "流水线", queue_size: int = DEFAULT_QUEUE_SIZE):
+        self.name = name
+        self.queue_size = max(1, int(queue_size))
+        self.stages = [(stage, dict(params or {})) for stage, params in stages]
+        self.validate()
+        self._stop = threading.Event()
+        self._error = None
+        self._error_lock = threading.Lock()
+
+    @classmethod
+    def from_definition(cls, definition: dict, variables: dict = None, base_dir: str = None):
+        """根据定义字典创建流水线，并替换变量和解析相对路径"""
+        variables = variables or {}
+        stages = []
+        for index, entry in enumerate(definition.get("stages") or []):
+            if not isinstance(entry, dict) or "stage" not in entry:
+                raise ValueError(f"第 {index + 1} 步缺少 stage 字段")
+            params = {key: _substitute(value, variables) for key, value in entry.items() if key != "stage"}
+            if base_dir:
+                for key in PATH_PARAMS:
+                    if key in params:
+                        params[key] = _resolve_path(params[key], base_dir)
+            stages.append((entry["stage"], params))
+        return cls(stages, definition.get("name") or "流水线",
+                   definition.get("queue_size", DEFAULT_QUEUE_SIZE))
+
+    @classmethod
+    def load(cls, path: str, variables: dict = None):
+        """从 JSON/YAML 文件创建流水线"""
+        base_dir = os.path.dirname(os.path.abspath(path))
+        return cls.from_definition(read_definition(path), variables, base_dir)
+
+    def validate(self) -> None:
+        """
+        检查步骤名称、参数和相邻步骤的数据类型是否匹配。
+
+        Raises:
+            ValueError: 流水线定义有误
+        """
+        if len(self.stages) < 2:
+            raise ValueError("流水线至少需要两个步骤")
+        produced = None
+        for index, (stage, params) in enumerate(self.stages):
+            label = f"第 {index + 1} 步 {stage}"
+            if stage not in STAGES:
+                raise ValueError(f"{label}: 未知的步骤，可用的步骤: {', '.join(STAGES)}")
+            func, accepts, produces = STAGES[stage]
+            if produced == FILE:
+                raise ValueError(f"{label}: 保存步骤之后不能再有其他步骤")
+            if produced not in accepts:
+                if produced is None:
+                    raise ValueError(f"{label}: 不能作为第一步")
+                raise ValueError(f"{label}: 不接受上一步产生的{'图片' if produced == IMAGE else 'PDF'}")
+            try:
+                inspect.signature(func).bind(None, **params)
+            except TypeError as e:
+                raise ValueError(f"{label}: 参数错误 ({str(e)})")
+            produced = produces
+        if produced != FILE:
+            raise ValueError("流水线的最后一步必须是 save-images 或 save-pdf")
+
+    # ---- 运行 ----
+
+    def _fail(self, error) -> None:
+        """记录第一个错误并通知所有步骤停止"""
+        with self._error_lock:
+            if self._error is None:
+                self._error = error
+        self._stop.set()
+
+    def _put(self, channel, item) -> bool:
+        """放入队列，队列满时等待；流水线已停止时返回 False"""
+        while not self._stop.is_set():
+            try:
+                channel.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _iter_channel(self, channel):
+        """逐个取出上游数据，直到收到结束标记"""
+        while True:
+            try:
+                item = channel.get(timeout=0.1)
+            except queue.Empty:
+                if self._stop.is_set():
+                    raise _Stopped()
+                continue
+            if item is _END:
+                return
+            yield item
+
+    def _run_stage(self, func, items, params, channel) -> None:
+        try:
+            for item in func(items, **params):
+                if not self._put(channel, item):
+                    return
+            self._put(channel, _END)
+        except _Stopped:
+            pass
+        except BaseException as e:
+            self._fail(e)
+
+    def run(self, progress=None) -> dict:
+        """
+        运行流水线，保存步骤在调用线程中运行，其他步骤各占一个线程。
+
+        Args:
+            progress: 进度回调，每保存一个文件调用一次(总数未知，为0)
+
+        Returns:
+            dict: {"outputs": 输出文件列表, "pipeline": 名称, "stages": 步骤数}
+        """
+        self._stop.clear()
+        self._error = None
+        threads = []
+        items = None
+        for index, (stage, params) in enumerate(self.stages[:-1]):
+            channel = queue.Queue(maxsize=self.queue_size)
+            thread = threading.Thread(target=self._run_stage, args=(STAGES[stage][0], items, params, channel),
+                                      name=f"pipeline-{index + 1}-{stage}", daemon=True)
+            threads.append(thread)
+            items = self._iter_channel(channel)
+
+        stage, params = self.stages[-1]
+        outputs = []
+        for thread in threads:
+            thread.start()
+        try:
+            for path in STAGES[stage][0](items, **params):
+                outputs.append(path)
+                if progress is not None:
+                    progress(len(outputs), 0, f"已保存 {os.path.basename(path)}")
+        except _Stopped:
+            pass
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+
+        if self._error is not None:
+            raise self._error
+        return {"outputs": outputs, "pipeline": self.name, "stages": len(self.stages)}
+
+class _Stopped(Exception):
+    """其他步骤出错，流水线已停止"""
+
+# 队列结束标记
+_END = object()
+
+@recorded("pipeline")
+@profiled("pipeline")
+def run_pipeline(path: str, variables: dict = None, progress=None) -> dict:
+    """
+    读取并运行流水线文件。
+
+    Args:
+        path (str): 流水线定义文件(.json/.yaml)
+        variables (dict): ${变量} 的值
+        progress: 进度回调
+
+    Returns:
+        dict: {"outputs": 输出文件列表, "pipeline": 名称, "stages": 步骤数}
+    """
+    return Pipeline.load(path, variables).run(progress)
@@ -0,0 +1,405 @@
+# 禁止生成 .pyc 文件
+import sys
+sys.dont_write_bytecode = True
+
+import argparse
+import json
+import os
+import time
+
+# 命令行运行器，在没有图形界面的服务器上运行各个工具。
+# 通过启动器调用：python "San Yuan Gong Ju_V1-3-1.py" run pdf-split --in a.pdf --every 10 --out dir
+# 整个调用路径不导入 tkinter，核心模块也在子命令内部才导入，
+# 这样 PDF 命令不需要安装 Pillow，图片命令也不需要安装 PyPDF2。
+#
+# 每个事件输出为一行 JSON：
+#   {"event": "start", "command": ...}
+#   {"event": "progress", "done": 1, "total": 10, "message": ...}
+#   {"event": "file", "input": ..., "status": "done"/"failed", ...}   (批量处理时每个文件一行)
+#   {"event": "done", "elapsed": 秒数, "result": {...}}
+#   {"event": "error", "error": 错误信息, "type": 异常类型}
+# 成功时退出码为 0，失败时为 1，参数错误时为 2。
+
+def emit(event: str, **fields) -> None:
+    """输出一行 JSON 事件"""
+    fields = dict(event=event, **fields)
+    sys.stdout.write(json.dumps(fields, ensure_ascii=False, default=str) + "\n")
+    sys.stdout.flush()
+
+def progress(done, total, message=""):
+    """核心函数使用的进度回调"""
+    emit("progress", done=done, total=total, message=message)
+
+def parse_size(text: str):
+    """解析 "宽x高" 或单个数字形式的尺寸"""
+    parts = text.lower().replace("*", "x").split("x")
+    if len(parts) == 1:
+        parts = parts * 2
+    if len(parts) != 2:
+        raise argparse.ArgumentTypeError(f"无效的尺寸: {text}")
+    try:
+        return int(parts[0]), int(parts[1])
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"无效的尺寸: {text}")
+
+def _page_list(path: str, range_str):
+    """将页码范围转换为页面索引，None 表示全部页面"""
+    if not range_str:
+        return None
+    from PDFChuLi import load_pdf, parse_page_ranges
+    return parse_page_ranges(range_str, len(load_pdf(path).pages))
+
+# ---- PDF 工具 ----
+
+def cmd_pdf_split(args):
+    from PDFChuLi import (collect_pdf_files, split_pdf_batch, split_pdf_by_count, split_pdf_by_outline,
+                          split_pdf_by_ranges, split_pdf_by_size)
+    os.makedirs(args.output, exist_ok=True)
+    import glob
+    if len(args.input) > 1 or os.path.isdir(args.input[0]) or glob.has_magic(args.input[0]) or args.workers:
+        # 多个文件、文件夹或通配符：在多个进程中批量拆分
+        files = collect_pdf_files(args.input)
+        if not files:
+            raise FileNotFoundError("没有找到PDF文件")
+        result = split_pdf_batch(files, args.output, args.every or 0, args.ranges or "", args.workers or 0,
+                                 progress, on_file=lambda entry: emit("file", **entry), max_mb=args.max_mb or 0,
+                                 outline_depth=args.outline or 0)
+        if result["failed"]:
+            raise RuntimeError(f"{result['failed']} 个文件拆分失败")
+        return result
+    args.input = args.input[0]
+    if args.outline:
+        return split_pdf_by_outline(args.input, args.output, args.outline, progress)
+    if args.max_mb:
+        return split_pdf_by_size(args.input, args.output, args.max_mb, progress)
+    if args.ranges:
+        return split_pdf_by_ranges(args.input, args.output, args.ranges, progress)
+    return split_pdf_by_count(args.input, args.output, args.every, progress)
+
+def cmd_pdf_merge(args):
+    from PDFChuLi import merge_pdfs
+    selections = []
+    for item in args.input:
+        # 支持 "文件.pdf:1-3,5" 的形式只合并部分页面
+        path, sep, range_str = item.rpartition(":")
+        if not sep or not range_str or os.path.exists(item):
+            path, range_str = item, None
+        selections.append((path, _page_list(path, range_str)))
+    return merge_pdfs(selections, args.output, progress)
+
+def cmd_pdf_watermark(args):
+    from PDFChuLi import add_watermark
+    return add_watermark(args.input, args.output, args.text, args.font_size,
+                         args.opacity, args.position, progress)
+
+def cmd_pdf_to_image(args):
+    from PDFChuLi import pdf_to_images
+    pages = _page_list(args.input, args.pages)
+    return pdf_to_images(args.input, args.output, pages, args.format,
+                         args.dpi, args.quality, progress)
+
+def cmd_image_to_pdf(args):
+    from PDFChuLi import images_to_pdf
+    return images_to_pdf(args.input, args.output, progress)
+
+def cmd_pdf_to_word(args):
+    from PDFChuLi import pdf_to_word
+    return pdf_to_word(args.input, args.output, progress)
+
+# ---- 图片工具 ----
+
+def cmd_image_convert(args):
+    from TuPianChuLi import convert_images
+    os.makedirs(args.output, exist_ok=True)
+    return convert_images(args.input, args.output, args.format, args.quality,
+                          progress=progress)
+
+def cmd_image_grid(args):
+    from TuPianChuLi import split_grid
+    return split_grid(args.input, args.output, args.rows, args.cols, progress)
+
+def cmd_image_ico(args):
+    from TuPianChuLi import image_to_ico
+    return image_to_ico(args.input, args.output, args.size)
+
+def cmd_image_combine(args):
+    from TuPianChuLi import combine_images, save_image
+    image = combine_images(args.input, args.layout, args.random, args.select, progress)
+    save_image(image, args.output)
+    return {"outputs": [args.output], "size": list(image.size)}
+
+# ---- 流水线 ----
+
+def parse_variable(text: str):
+    """解析 "名称=值" 形式的流水线变量"""
+    name, sep, value = text.partition("=")
+    if not sep or not name:
+        raise argparse.ArgumentTypeError(f"无效的变量: {text}，应为 名称=值")
+    return name, value
+
+def cmd_pipeline(args):
+    from LiuShuiXian import run_pipeline
+    return run_pipeline(args.file, dict(args.var), progress)
+
+# ---- 热文件夹 ----
+
+def cmd_watch(args):
+    import signal
+    from PeiZhi import get_config
+    from ReWenJianJia import HotFolderDaemon, load_folders
+    config = get_config()
+    daemon = HotFolderDaemon(load_folders(args.config),
+                             args.workers or config.get("hot_folder_workers"),
+                             args.settle if args.settle is not None else config.get("hot_folder_settle_seconds"),
+                             watch_mode=config.get("tool_watch"))
+    # Ctrl+C 或任务队列结束进程时，等正在处理的文件完成后再退出
+    for name in ("SIGINT", "SIGTERM"):
+        if hasattr(signal, name):
+            signal.signal(getattr(signal, name), lambda signum, frame: daemon.stop())
+    return daemon.run(progress, once=args.once)
+
+# ---- HTTP服务 ----
+
+def cmd_serve(args):
+    import signal
+    import threading
+    from FuWu import create_server
+    from YaoCe import set_tool
+    set_tool("HTTP服务")
+    server = create_server(args.host, args.port, args.workers)
+    host, port = server.server_address[:2]
+    progress(0, 0, f"正在监听 http://{host}:{port}")
+    stopped = threading.Event()
+    for name in ("SIGINT", "SIGTERM"):
+        if hasattr(signal, name):
+            signal.signal(getattr(signal, name), lambda signum, frame: stopped.set())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    while not stopped.wait(0.5):
+        pass
+    server.shutdown()
+    metrics = server.service.metrics()
+    server.service.shutdown()
+    server.server_close()
+    return {"metrics": metrics}
+
+# ---- 音频工具 ----
+
+def cmd_audio_extract(args):
+    from YinPinChuLi import extract_audio, extract_audio_batch
+    if len(args.input) > 1 or os.path.isdir(args.output):
+        return extract_audio_batch(args.input, args.output, args.format, progress)
+    return extract_audio(args.input[0], args.output, progress)
+
+# ---- 文件工具 ----
+
+def cmd_dir_tree(args):
+    from WenJianChuLi import generate_dir_tree
+    if not os.path.isdir(args.input):
+        raise FileNotFoundError(f"目录不存在: {args.input}")
+    tree = os.path.basename(os.path.abspath(args.input)) + "\n" + generate_dir_tree(args.input, args.ignore)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(tree)
+        return {"outputs": [args.output]}
+    return {"tree": tree}
+
+def cmd_clean_empty(args):
+    from WenJianChuLi import remove_empty_folders
+    if not os.path.isdir(args.input):
+        raise FileNotFoundError(f"目录不存在: {args.input}")
+    return {"removed": remove_empty_folders(args.input)}
+
+# ---- 其他工具 ----
+
+def cmd_rmb_upper(args):
+    from QiTaChuLi import RMBUpperConverter
+    converter = RMBUpperConverter()
+    error = converter.validate_input(args.number)
+    if error or not args.number:
+        raise ValueError(error or "请输入数字")
+    return {"result": converter.convert(args.number)}
+
+def cmd_length(args):
+    from QiTaChuLi import length_converter
+    return {"result": length_converter(args.value, args.from_unit, args.to_unit)}
+
+def build_parser() -> argparse.ArgumentParser:
+    """构建命令行参数解析器"""
+    parser = argparse.ArgumentParser(
+        prog="San Yuan Gong Ju_V1-3-1.py run",
+        description="在命令行中运行工具，进度以 JSON 行输出"
+    )
+    parser.add_argument("--no-cache", action="store_true", help="不使用结果缓存，总是重新计算")
+    sub = parser.add_subparsers(dest="command", metavar="命令")
+    sub.required = True
+
+    p = sub.add_parser("pdf-split", help="PDF拆分")
+    p.add_argument("--in", dest="input", nargs="+", required=True,
+                   help="输入PDF；多个文件、文件夹或通配符(如 \"扫描/*.pdf\")时在多个进程中批量拆分")
+    group = p.add_mutually_exclusive_group(required=True)
+    group.add_argument("--every", type=int, help="每份的页数")
+    group.add_argument("--ranges", help="页码范围，如 1-3,5,7-9")
+    group.add_argument("--max-mb", type=float, help="每份的大小上限(MB)")
+    group.add_argument("--outline", type=int, metavar="层级", help="按书签拆分，1为最顶层书签(如各章)")
+    p.add_argument("--out", dest="output", required=True, help="输出目录")
+    p.add_argument("--workers", type=int, help="批量拆分的进程数，默认为CPU核心数")
+    p.set_defaults(func=cmd_pdf_split)
+
+    p = sub.add_parser("pdf-merge", help="PDF合并")
+    p.add_argument("--in", dest="input", nargs="+", required=True,
+                   help="输入PDF，可用 文件.pdf:1-3 指定页码")
+    p.add_argument("--out", dest="output", required=True, help="输出PDF")
+    p.set_defaults(func=cmd_pdf_merge)
+
+    p = sub.add_parser("pdf-watermark", help="PDF加水印")
+    p.add_argument("--in", dest="input", required=True, help="输入PDF")
+    p.add_argument("--out", dest="output", required=True, help="输出PDF")
+    p.add_argument("--text", default="机密", help="水印文字")
+    p.add_argument("--font-size", type=int, default=36)
+    p.add_argument("--opacity", type=float, default=0.5)
+    p.add_argument("--position", default="center",
+                   choices=["center", "topleft", "topright", "bottomleft", "bottomright"])
+    p.set_defaults(func=cmd_pdf_watermark)
+
+    p = sub.add_parser("pdf-to-image", help="PDF转图片")
+    p.add_argument("--in", dest="input", required=True, help="输入PDF")
+    p.add_argument("--out", dest="output", required=True, help="输出目录")
+    p.add_argument("--pages", help="页码范围，默认全部页面")
+    p.add_argument("--format", default="png", choices=["png", "jpg", "tiff", "bmp"])
+    p.add_argument("--dpi", type=int, default=300)
+    p.add_argument("--quality", type=int, default=90)
+    p.set_defaults(func=cmd_pdf_to_image)
+
+    p = sub.add_parser("image-to-pdf", help="图片转PDF")
+    p.add_argument("--in", dest="input", nargs="+", required=True, help="输入图片(按顺序)")
+    p.add_argument("--out", dest="output", required=True, help="输出PDF")
+    p.set_defaults(func=cmd_image_to_pdf)
+
+    p = sub.add_parser("pdf-to-word", help="PDF转Word")
+    p.add_argument("--in", dest="input", required=True, help="输入PDF")
+    p.add_argument("--out", dest="output", required=True, help="输出docx")
+    p.set_defaults(func=cmd_pdf_to_word)
+
+    p = sub.add_parser("image-convert", help="图片格式转换")
+    p.add_argument("--in", dest="input", required=True, help="输入目录")
+    p.add_argument("--out", dest="output", required=True, help="输出目录")
+    p.add_argument("--format", required=True, help="输出格式，如 png/jpg/webp")
+    p.add_argument("--quality", type=int, default=100)
+    p.set_defaults(func=cmd_image_convert)
+
+    p = sub.add_parser("image-grid", help="图片分割九宫格")
+    p.add_argument("--in", dest="input", required=True, help="输入图片")
+    p.add_argument("--out", dest="output", required=True, help="输出目录")
+    p.add_argument("--rows", type=int, default=3)
+    p.add_argument("--cols", type=int, default=3)
+    p.set_defaults(func=cmd_image_grid)
+
+    p = sub.add_parser("image-ico", help="图片转ico")
+    p.add_argument("--in", dest="input", required=True, help="输入图片")
+    p.add_argument("--out", dest="output", required=True, help="输出ico")
+    p.add_argument("--size", type=parse_size, default=(256, 256), help="尺寸，如 64x64")
+    p.set_defaults(func=cmd_image_ico)
+
+    p = sub.add_parser("image-combine", help="图片合成")
+    p.add_argument("--in", dest="input", nargs="+", required=True, help="输入图片")
+    p.add_argument("--out", dest="output", required=True, help="输出图片")
+    p.add_argument("--layout", default="uniform", choices=["uniform", "horizontal", "vertical"])
+    p.add_argument("--random", action="store_true", help="随机分布")
+    p.add_argument("--select", type=int, default=0, help="随机选择的图片数量")
+    p.set_defaults(func=cmd_image_combine)
+
+    p = sub.add_parser("pipeline", help="运行多步骤流水线")
+    p.add_argument("--file", required=True, help="流水线定义文件(.json/.yaml)")
+    p.add_argument("--var", type=parse_variable, action="append", default=[],
+                   help="流水线变量，如 in=a.pdf，可重复")
+    p.set_defaults(func=cmd_pipeline)
+
+    p = sub.add_parser("watch", help="监视热文件夹并自动处理放入的文件")
+    p.add_argument("--config", help="热文件夹配置JSON，默认使用配置项 hot_folders")
+    p.add_argument("--workers", type=int, help="同时处理的文件数")
+    p.add_argument("--settle", type=float, help="文件保持不变多少秒后开始处理")
+    p.add_argument("--once", action="store_true", help="处理完已有的文件后退出")
+    p.set_defaults(func=cmd_watch)
+
+    p = sub.add_parser("serve", help="启动HTTP服务，供其他机器上的脚本调用")
+    p.add_argument("--host", help="监听地址，默认使用配置项 service_host")
+    p.add_argument("--port", type=int, help="端口，默认使用配置项 service_port")
+    p.add_argument("--workers", type=int, help="同时运行的任务数")
+    p.set_defaults(func=cmd_serve)
+
+    p = sub.add_parser("audio-extract", help="音频提取")
+    p.add_argument("--in", dest="input", nargs="+", required=True, help="输入视频，多个视频时批量提取")
+    p.add_argument("--out", dest="output", required=True, help="输出音频(mp3/wav)，批量提取时为输出目录")
+    p.add_argument("--format", default="mp3", choices=["mp3", "wav"], help="批量提取的音频格式")
+    p.set_defaults(func=cmd_audio_extract)
+
+    p = sub.add_parser("dir-tree", help="目录树生成")
+    p.add_argument("--in", dest="input", required=True, help="目录")
+    p.add_argument("--out", dest="output", help="输出文本文件，默认随结果输出")
+    p.add_argument("--ignore", nargs="*", default=[], help="忽略的文件或目录名")
+    p.set_defaults(func=cmd_dir_tree)
+
+    p = sub.add_parser("clean-empty", help="空文件夹清理")
+    p.add_argument("--in", dest="input", required=True, help="目录")
+    p.set_defaults(func=cmd_clean_empty)
+
+    p = sub.add_parser("rmb-upper", help="数字小写转大写")
+    p.add_argument("number", help="金额数字")
+    p.set_defaults(func=cmd_rmb_upper)
+
+    p = sub.add_parser("length", help="长度单位换算")
+    p.add_argument("value", type=float)
+    p.add_argument("from_unit", help="原单位，如 m/km/inch/尺")
+    p.add_argument("to_unit", help="目标单位")
+    p.set_defaults(func=cmd_length)
+
+    return parser
+
+def list_commands() -> list:
+    """
+    获取所有命令及其说明。
+
+    Returns:
+        list: (命令名, 说明) 元组列表
+    """
+    for action in build_parser()._actions:
+        if isinstance(action, argparse._SubParsersAction):
+            return [(choice.dest, choice.help) for choice in action._choices_actions]
+    return []
+
+def main(argv=None) -> int:
+    """
+    命令行入口。
+
+    Args:
+        argv: 参数列表，默认使用 sys.argv[1:]
+
+    Returns:
+        int: 退出码
+    """
+    parser = build_parser()
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else 2
+
+    if args.no_cache:
+        from JieGuoHuanCun import NO_CACHE_ENV
+        os.environ[NO_CACHE_ENV] = "1"
+    from YaoCe import set_tool
+    set_tool("命令行")
+    emit("start", command=args.command)
+    start_time = time.perf_counter()
+    try:
+        result = args.func(args)
+    except Exception as e:
+        emit("error", command=args.command, error=str(e), type=type(e).__name__,
+             elapsed=round(time.perf_counter() - start_time, 3))
+        return 1
+    emit("done", command=args.command, elapsed=round(time.perf_counter() - start_time, 3),
+         result=result)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,236 @@
+# 禁止生成 .pyc 文件
+import sys
+sys.dont_write_bytecode = True
+
+import math
+import os
+import threading
+
+from PeiZhi import get_config
+
+# 全局内存预算。
+# 大图渲染和合成是最容易耗尽内存的地方：600 DPI 的 A4 页面渲染一次就要约 100MB，
+# 图片合成会同时持有所有图片和画布，pdf2docx 会把整个文档的版面分析结果留在内存中。
+# 核心函数在分配大块内存之前先估算开销(像素数 × 通道数、页数 × 每页开销)并向预算管理器申请：
+#   - reserve()   申请预算，预算不足时等待其他任务释放，从而限制同一进程中同时运行的大任务数
+#                 (HTTP服务、热文件夹、流水线的多个线程共用同一个预算)
+#   - tile_rows() 单页渲染超过预算时按多少行一块分块渲染(PNG 边渲染边写入，不需要整页的像素)
+#   - fit_dpi()   无法分块输出(如 JPEG)时降低分辨率
+#   - fit_scale() 图片合成超过预算时在加载时按比例缩小(JPEG 直接以缩小的尺寸解码)
+# 做出的调整通过进度回调显示在状态栏，并写入遥测记录的 "governor" 字段。
+# 降低了分辨率或缩小了图片的结果不会写入结果缓存和断点记录，预算充足时再次运行(或续传)会得到完整的结果。
+#
+# 预算由配置项 memory_budget_mb 指定；为 0 时自动选择：
+# 设置了进程内存上限(memory_limit_mb)时取其 80%，否则取启动时可用内存的一半。
+
+# 无法获取可用内存时使用的预算
+DEFAULT_BUDGET_MB = 1024
+# 单个工作单元最多使用预算的比例，其余留给输出编码和其他任务
+UNIT_SHARE = 0.5
+# pdf2docx 每页大约占用的内存(MB)
+PDF2DOCX_PAGE_MB = 6
+# 分块渲染时每块的大小上限(MB)
+TILE_MB = 32
+MB = 1024 * 1024
+
+def available_memory():
+    """系统当前可用的物理内存(字节)，无法获取时返回 None"""
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if sys.platform == "win32":
+        try:
+            import ctypes
+
+            class MEMORYSTATUSEX(ctypes.Structure):
+                _fields_ = [("dwLength", ctypes.c_ulong), ("dwMemoryLoad", ctypes.c_ulong),
+                            ("ullTotalPhys", ctypes.c_ulonglong), ("ullAvailPhys", ctypes.c_ulonglong),
+                            ("ullTotalPageFile", ctypes.c_ulonglong), ("ullAvailPageFile", ctypes.c_ulonglong),
+                            ("ullTotalVirtual", ctypes.c_ulonglong), ("ullAvailVirtual", ctypes.c_ulonglong),
+                            ("ullAvailExtendedVirtual", ctypes.c_ulonglong)]
+
+            status = MEMORYSTATUSEX()
+            status.dwLength = ctypes.sizeof(status)
+            if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+                return status.ullAvailPhys
+        except Exception:
+            return None
+        return None
+    try:
+        pages = os.sysconf("SC_AVPHYS_PAGES")
+        return pages * os.sysconf("SC_PAGE_SIZE")
+    except (ValueError, OSError, AttributeError):
+        return None
+
+def default_budget() -> int:
+    """根据配置和可用内存确定预算(字节)"""
+    config = get_config()
+    budget_mb = config.get("memory_budget_mb") or 0
+    if budget_mb > 0:
+        return int(budget_mb * MB)
+    limit_mb = config.get("memory_limit_mb") or 0
+    if limit_mb > 0:
+        return int(limit_mb * 0.8 * MB)
+    available = available_memory()
+    if available:
+        return int(available / 2)
+    return DEFAULT_BUDGET_MB * MB
+
+def pixmap_bytes(width_pt: float, height_pt: float, dpi: int, channels: int = 3) -> int:
+    """PDF页面(尺寸单位为点，1/72英寸)按指定分辨率渲染后的像素数据大小"""
+    zoom = dpi / 72
+    return int(math.ceil(width_pt * zoom) * math.ceil(height_pt * zoom) * channels)
+
+def format_mb(size: int) -> str:
+    return f"{size / MB:.0f} MB"
+
+class _Reservation:
+    def __init__(self, governor, cost: int):
+        self.governor = governor
+        self.cost = cost
+
+    def __enter__(self):
+        self.governor._acquire(self.cost)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.governor._release(self.cost)
+        return False
+
+class MemoryGovernor:
+    """
+    进程内共享的内存预算管理器。
+
+    Args:
+        budget (int): 预算(字节)
+
+    使用示例：
+    governor = get_governor()
+    dpi = governor.fit_dpi(page.rect.width, page.rect.height, 600)
+    with governor.reserve(pixmap_bytes(page.rect.width, page.rect.height, dpi)):
+        pix = page.get_pixmap(dpi=dpi)
+        ...
+    """
+
+    def __init__(self, budget: int):
+        self.budget = max(int(budget), 64 * MB)
+        self.in_use = 0
+        self.peak = 0
+        self.waits = 0
+        self.condition = threading.Condition()
+
+    def reserve(self, cost: int) -> _Reservation:
+        """
+        在 with 语句中申请预算，预算不足时阻塞到其他任务释放为止。
+
+        超过整个预算的单元不会永远等待，而是等到没有其他任务占用预算后单独运行。
+        """
+        return _Reservation(self, max(0, int(cost)))
+
+    def _acquire(self, cost: int) -> None:
+        with self.condition:
+            if self.in_use and self.in_use + cost > self.budget:
+                self.waits += 1
+            while self.in_use and self.in_use + cost > self.budget:
+                self.condition.wait()
+            self.in_use += cost
+            self.peak = max(self.peak, self.in_use)
+
+    def _release(self, cost: int) -> None:
+        with self.condition:
+            self.in_use -= cost
+            self.condition.notify_all()
+
+    def unit_limit(self) -> int:
+        """单个工作单元可以使用的内存"""
+        return int(self.budget * UNIT_SHARE)
+
+    def fit_dpi(self, width_pt: float, height_pt: float, dpi: int, channels: int = 3, limit: int = None) -> int:
+        """
+        在单元预算(或指定的 limit 字节)内可以使用的最高分辨率(不超过 dpi)。
+
+        Returns:
+            int: 调整后的分辨率，不低于 72
+        """
+        if limit is None:
+            limit = self.unit_limit()
+        if pixmap_bytes(width_pt, height_pt, dpi, channels) <= limit:
+            return dpi
+        fitted = int(72 * math.sqrt(limit / max(1.0, width_pt * height_pt * channels)))
+        return max(72, min(dpi, fitted))
+
+    def tile_rows(self, width_pt: float, height_pt: float, dpi: int, channels: int = 3) -> int:
+        """
+        分块渲染时每块的像素行数，整页在单元预算内时返回 0(不需要分块)。
+        """
+        if pixmap_bytes(width_pt, height_pt, dpi, channels) <= self.unit_limit():
+            return 0
+        row_bytes = math.ceil(width_pt * dpi / 72) * channels
+        return max(1, min(TILE_MB * MB, self.unit_limit()) // row_bytes)
+
+    def fit_scale(self, pixels: int, channels: int = 4) -> float:
+        """
+        像素数据在单元预算内需要的缩放比例(边长比例，1 表示不需要缩放)。
+
+        Args:
+            pixels (int): 需要同时保存在内存中的像素总数(如全部图片加上合成画布)
+        """
+        limit = self.unit_limit()
+        size = pixels * channels
+        if size <= limit:
+            return 1.0
+        return math.sqrt(limit / size)
+
+    def stats(self) -> dict:
+        with self.condition:
+            return {"budget_mb": round(self.budget / MB), "in_use_mb": round(self.in_use / MB),
+                    "peak_mb": round(self.peak / MB), "waits": self.waits}
+
+_governor = None
+_governor_lock = threading.Lock()
+
+def get_governor() -> MemoryGovernor:
+    """
+    获取全局预算管理器实例。
+
+    Returns:
+        MemoryGovernor: 全局唯一的实例，第一次调用时按配置确定预算
+    """
+    global _governor
+    with _governor_lock:
+        if _governor is None:
+            _governor = MemoryGovernor(default_budget())
+        return _governor
+
+# 当前线程中降低了输出质量的调整次数
+_degraded = threading.local()
+
+def degraded_count() -> int:
+    """
+    当前线程中降低了输出质量(分辨率、尺寸)的调整次数。
+
+    结果缓存在操作前后比较该值，操作期间发生过这类调整时不缓存结果。
+    """
+    return getattr(_degraded, "count", 0)
+
+def report_decision(progress, done: int, total: int, message: str, degraded: bool = False, **fields) -> None:
+    """
+    报告一次调整：显示在状态栏(通过进度回调)，并附加到当前操作的遥测记录。
+
+    Args:
+        progress: 进度回调，可以为 None
+        done, total: 当前进度，原样传给进度回调
+        message (str): 显示给用户的说明
+        degraded (bool): 调整是否降低了输出质量(如降低分辨率)，为 True 时本次结果不写入结果缓存
+        fields: 写入遥测记录的字段，如 action="lower-dpi"
+    """
+    from YaoCe import note
+    if degraded:
+        _degraded.count = degraded_count() + 1
+    note("governor", dict(fields, message=message))
+    if progress is not None:
+        progress(done, total, message)
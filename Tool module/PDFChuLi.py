@@ -0,0 +1,1466 @@
+# 禁止生成 .pyc 文件
+import sys
+sys.dont_write_bytecode = True
+
+import functools
+import hashlib
+import io
+import math
+import os
+import re
+import struct
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from YanChiDaoRu import lazy_import
+from XingNengFenXi import profiled
+from YaoCe import recorded
+from JieGuoHuanCun import cached
+from DuanDianXuChuan import Checkpoint, file_identity
+from NeiCunGuanLi import PDF2DOCX_PAGE_MB, MB, format_mb, get_governor, pixmap_bytes, report_decision
+from YeMaFanWei import PageSet
+
+# PyPDF2 在第一次处理PDF时才导入，工具窗口可以先显示出来
+PdfReader = lazy_import("PyPDF2", "PdfReader")
+PdfWriter = lazy_import("PyPDF2", "PdfWriter")
+
+# PDF工具的核心处理逻辑。
+# 本模块不依赖 tkinter，图形界面工具和命令行都调用这里的函数。
+# 所有函数都可以传入 progress 回调 progress(已完成数, 总数, 说明) 来报告进度，
+# 出错时抛出异常，由调用方决定如何提示用户。
+
+def _report(progress, done, total, message=""):
+    """调用进度回调(如果有)"""
+    if progress is not None:
+        progress(done, total, message)
+
+def load_pdf(pdf_path: str) -> PdfReader:
+    """
+    打开并验证PDF文件。
+
+    Args:
+        pdf_path (str): PDF文件路径
+
+    Returns:
+        PdfReader: 已打开的PDF
+
+    Raises:
+        FileNotFoundError: 文件不存在
+        ValueError: 文件无效或没有页面
+    """
+    if not os.path.exists(pdf_path):
+        raise FileNotFoundError("PDF文件不存在")
+    try:
+        reader = PdfReader(pdf_path)
+        total_pages = len(reader.pages)
+    except Exception as e:
+        raise ValueError(f"无效的PDF文件: {str(e)}")
+    if total_pages == 0:
+        raise ValueError("PDF文件没有有效页面")
+    return reader
+
+# 已打开的 PdfReader 缓存的文件总大小上限(PdfReader 会把整个文件读入内存)
+READER_CACHE_MB = 256
+
+class ReaderIndex:
+    """
+    按文件(路径、大小、修改时间)缓存已打开的 PdfReader 和页数，文件被修改后自动重新解析。
+
+    PDF合并窗口每次添加、移除文件都要知道各文件的页数，合并时又要再打开一次；
+    缓存后每个文件只解析一次。页数一直保留，PdfReader 超过 READER_CACHE_MB 时淘汰最久未用的。
+    同一个 PdfReader 不能被多个线程同时读取，open() 在使用期间对它加锁。
+
+    使用示例：
+    index = get_reader_index()
+    pages = index.page_count("a.pdf")        # 第一次调用时解析
+    with index.open("a.pdf") as reader:       # 复用已解析的 PdfReader
+        writer.add_page(reader.pages[0])
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._readers = OrderedDict()
+        self._page_counts = {}
+        self._loading = {}
+        self._lock = threading.Lock()
+
+    def _entry(self, path: str) -> tuple:
+        """(PdfReader, 锁)，没有缓存时解析文件"""
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"PDF文件不存在: {path}")
+        key = tuple(file_identity(path))
+        with self._lock:
+            entry = self._readers.get(key)
+            if entry is not None:
+                self._readers.move_to_end(key)
+                return entry
+            loading = self._loading.setdefault(key, threading.Lock())
+        # 同一个文件只解析一次，其他线程等待解析完成
+        with loading:
+            with self._lock:
+                entry = self._readers.get(key)
+            if entry is not None:
+                return entry
+            try:
+                entry = (load_pdf(path), threading.RLock())
+            finally:
+                with self._lock:
+                    self._loading.pop(key, None)
+            with self._lock:
+                # 文件被修改前的缓存不会再用到
+                for stale in [k for k in self._readers if k[0] == key[0]]:
+                    del self._readers[stale]
+                for stale in [k for k in self._page_counts if k[0] == key[0]]:
+                    del self._page_counts[stale]
+                self._readers[key] = entry
+                self._page_counts[key] = len(entry[0].pages)
+                self._evict()
+        return entry
+
+    def _evict(self) -> None:
+        total = sum(key[1] for key in self._readers)
+        while total > self.max_bytes and len(self._readers) > 1:
+            key, _ = self._readers.popitem(last=False)
+            total -= key[1]
+
+    @contextmanager
+    def open(self, path: str):
+        """在 with 语句中使用缓存的 PdfReader"""
+        reader, lock = self._entry(path)
+        with lock:
+            yield reader
+
+    def page_count(self, path: str) -> int:
+        """文件的页数，没有缓存时解析文件"""
+        count = self.cached_page_count(path)
+        if count is None:
+            count = len(self._entry(path)[0].pages)
+        return count
+
+    def cached_page_count(self, path: str):
+        """已缓存的页数，没有缓存时返回 None(不解析文件，可以在界面线程中调用)"""
+        try:
+            key = tuple(file_identity(path))
+        except OSError:
+            return None
+        with self._lock:
+            return self._page_counts.get(key)
+
+    def discard(self, path: str) -> None:
+        """不再使用某个文件时释放它的 PdfReader"""
+        path = os.path.abspath(path)
+        with self._lock:
+            for key in [key for key in self._readers if key[0] == path]:
+                del self._readers[key]
+
+_reader_index = None
+_reader_index_lock = threading.Lock()
+
+def get_reader_index() -> ReaderIndex:
+    """
+    获取全局 PdfReader 缓存。
+
+    Returns:
+        ReaderIndex: 全局唯一的实例
+    """
+    global _reader_index
+    with _reader_index_lock:
+        if _reader_index is None:
+            _reader_index = ReaderIndex(READER_CACHE_MB * MB)
+        return _reader_index
+
+def parse_page_ranges(range_str: str, total_pages: int) -> PageSet:
+    """
+    解析页码范围字符串(如 "1-3,5,odd,last-10"，写法见 YeMaFanWei)。
+
+    Returns:
+        PageSet: 有序、去重的页面索引集合，可以像列表一样迭代和计数
+    """
+    return PageSet.parse(range_str, total_pages)
+
+def _write_pages(reader: PdfReader, page_indices, output_file: str, pruner=None) -> int:
+    """将指定页面写入新的PDF文件，指定 pruner 时精简资源并返回估算节省的字节数"""
+    if pruner is not None:
+        return pruner.write_pages(page_indices, output_file)
+    writer = PdfWriter()
+    for page_idx in page_indices:
+        writer.add_page(reader.pages[page_idx])
+    with open(output_file, 'wb') as f:
+        writer.write(f)
+    return 0
+
+def _make_pruner(reader: PdfReader):
+    """按配置 prune_resources 创建 ResourcePruner，关闭时返回 None"""
+    from PeiZhi import get_config
+
+    if not get_config().get("prune_resources", True):
+        return None
+    return ResourcePruner(reader)
+
+# 拆分出的文件数达到该值，或者总页数达到 PARALLEL_MIN_PAGES 时由多个进程写出
+PARALLEL_MIN_CHUNKS = 50
+PARALLEL_MIN_PAGES = 500
+# 每个进程分到的批次数，批次越多负载越均衡，进度也越及时
+SHARDS_PER_WORKER = 4
+# 当前进程是否是批量处理的工作进程(工作进程中不再启动进程池)
+_in_worker = False
+# 工作进程中缓存的 PdfReader 和 ResourcePruner，同一个进程处理同一文件的多个批次时只解析一次
+_worker_reader = None
+
+def _init_split_worker(tool: str) -> None:
+    """拆分工作进程初始化：遥测记录沿用主进程的工具名"""
+    global _in_worker
+    from YaoCe import set_tool
+    _in_worker = True
+    set_tool(tool)
+
+def _write_chunk_shard(input_file: str, shard) -> int:
+    """
+    在工作进程中写出一批连续的部分，shard 为 [(页面索引 range, 输出文件), ...]
+
+    Returns:
+        int: 精简资源估算节省的字节数
+    """
+    global _worker_reader
+    key = file_identity(input_file)
+    if _worker_reader is None or _worker_reader[0] != key:
+        reader = load_pdf(input_file)
+        _worker_reader = (key, reader, _make_pruner(reader))
+    _, reader, pruner = _worker_reader
+    saved = 0
+    for page_indices, output_file in shard:
+        saved += _write_pages(reader, page_indices, output_file, pruner)
+    return saved
+
+def _split_workers(chunks: int, pages: int) -> int:
+    """写出 chunks 个部分(共 pages 页)使用的进程数，1 表示在当前进程中顺序写出"""
+    from PeiZhi import get_config
+
+    if _in_worker or chunks < 2:
+        return 1
+    if chunks >= PARALLEL_MIN_CHUNKS:
+        limit = chunks // (PARALLEL_MIN_CHUNKS // 2)
+    elif pages >= PARALLEL_MIN_PAGES:
+        # 文件数不多但每份很大(如按章节拆分)
+        limit = chunks
+    else:
+        return 1
+    workers = get_config().get("batch_workers") or os.cpu_count() or 1
+    return max(1, min(workers, limit))
+
+def _write_chunks(input_file: str, reader: PdfReader, chunks, checkpoint, progress, total: int,
+                  pruner=None) -> int:
+    """
+    写出拆分的各个部分。
+
+    Args:
+        chunks: [(检查点项目, 页面索引, 输出文件, 完成后的进度值), ...]
+        total: 进度总数
+        pruner: 当前进程使用的 ResourcePruner，为 None 时按配置创建
+
+    Returns:
+        int: 精简资源估算节省的字节数(不含从上次中断处跳过的文件)
+
+    部分较多时按顺序分成连续的批次，由多个进程(各自打开 PdfReader)并行写出，
+    当前进程只负责分配、记录检查点和汇总进度。
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    from YaoCe import get_tool
+
+    pending = [chunk for chunk in chunks if not checkpoint.is_done(chunk[0])]
+    workers = _split_workers(len(pending), sum(len(chunk[1]) for chunk in pending))
+    saved = 0
+    if workers == 1:
+        if pruner is None:
+            pruner = _make_pruner(reader)
+        pending_keys = {chunk[0] for chunk in pending}
+        for key, page_indices, output_file, done in chunks:
+            if key in pending_keys:
+                saved += _write_pages(reader, page_indices, output_file, pruner)
+                checkpoint.record(key, [output_file])
+            _report(progress, done, total, output_file)
+        return saved
+
+    shard_size = math.ceil(len(pending) / (workers * SHARDS_PER_WORKER))
+    shards = [pending[i:i + shard_size] for i in range(0, len(pending), shard_size)]
+    completed = len(chunks) - len(pending)
+    _report(progress, completed, len(chunks), f"正在用 {workers} 个进程写出 {len(pending)} 个文件...")
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_split_worker, initargs=(get_tool(),))
+    futures = {executor.submit(_write_chunk_shard, input_file,
+                               [(page_indices, output_file) for _, page_indices, output_file, _ in shard]): shard
+               for shard in shards}
+    try:
+        for future in as_completed(futures):
+            saved += future.result()
+            shard = futures[future]
+            for key, _, output_file, _ in shard:
+                checkpoint.record(key, [output_file])
+            completed += len(shard)
+            _report(progress, completed, len(chunks), f"已写出 {completed}/{len(chunks)} 个文件")
+    finally:
+        # 出错或取消时不再启动排队中的批次
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=True)
+    return saved
+
+@recorded("pdf-split")
+@cached("pdf-split", inputs=("input_file",), output="output_dir")
+@profiled("pdf-split")
+def split_pdf_by_count(input_file: str, output_dir: str, pages_per_file: int, progress=None) -> dict:
+    """
+    按页数拆分PDF。
+
+    Args:
+        input_file (str): 输入PDF路径
+        output_dir (str): 输出目录
+        pages_per_file (int): 每份的页数
+        progress: 进度回调
+
+    Returns:
+        dict: {"outputs": 输出文件列表, "pages": 总页数, "resumed": 从上次中断处跳过的文件数,
+               "saved_bytes": 精简资源估算节省的字节数}
+    """
+    if pages_per_file <= 0:
+        raise ValueError("页数必须大于0")
+    reader = load_pdf(input_file)
+    total_pages = len(reader.pages)
+    base_name = os.path.splitext(os.path.basename(input_file))[0]
+
+    chunks = []
+    for i in range(0, total_pages, pages_per_file):
+        end = min(i + pages_per_file, total_pages)
+        output_file = os.path.join(output_dir, f"{base_name}_p{i+1}-{end}.pdf")
+        chunks.append((i, range(i, end), output_file, end))
+    identity = [file_identity(input_file), os.path.abspath(output_dir), pages_per_file]
+    with Checkpoint("pdf-split", identity, len(chunks)) as checkpoint:
+        saved = _write_chunks(input_file, reader, chunks, checkpoint, progress, total_pages)
+    return {"outputs": [chunk[2] for chunk in chunks], "pages": total_pages, "resumed": checkpoint.resumed,
+            "saved_bytes": saved}
+
+@recorded("pdf-split")
+@cached("pdf-split", inputs=("input_file",), output="output_dir")
+@profiled("pdf-split")
+def split_pdf_by_ranges(input_file: str, output_dir: str, range_str: str, progress=None) -> dict:
+    """
+    按页码范围拆分PDF，每组连续页面输出为一个文件。
+
+    Args:
+        input_file (str): 输入PDF路径
+        output_dir (str): 输出目录
+        range_str (str): 页码范围，如 "1-3,5,7-9"
+        progress: 进度回调
+
+    Returns:
+        dict: {"outputs": 输出文件列表, "pages": 提取的页数, "resumed": 从上次中断处跳过的文件数,
+               "saved_bytes": 精简资源估算节省的字节数}
+    """
+    reader = load_pdf(input_file)
+    total_pages = len(reader.pages)
+    try:
+        page_indices = parse_page_ranges(range_str, total_pages)
+        if not page_indices:
+            raise ValueError("没有有效的页面被选择")
+    except ValueError as e:
+        raise ValueError(f"页码范围无效: {str(e)}")
+    base_name = os.path.splitext(os.path.basename(input_file))[0]
+
+    chunks = []
+    for i, group in enumerate(page_indices.groups()):
+        start_page = group[0] + 1
+        end_page = group[-1] + 1
+        output_file = os.path.join(output_dir, f"{base_name}_range_{start_page}-{end_page}.pdf")
+        chunks.append((i, group, output_file, i + 1))
+    identity = [file_identity(input_file), os.path.abspath(output_dir), range_str]
+    with Checkpoint("pdf-split", identity, len(chunks)) as checkpoint:
+        saved = _write_chunks(input_file, reader, chunks, checkpoint, progress, len(chunks))
+    return {"outputs": [chunk[2] for chunk in chunks], "pages": len(page_indices), "resumed": checkpoint.resumed,
+            "saved_bytes": saved}
+
+# 按大小拆分时的估算参数：每个文件的固定开销(文件头、目录、页面树、交叉引用表)和每个对象的开销
+SIZE_FILE_OVERHEAD = 2048
+SIZE_OBJECT_OVERHEAD = 40
+# 按估算大小装入时只用到上限的这个比例，给估算误差留出余量
+SIZE_TARGET_RATIO = 0.95
+# 估算页面引用的资源时不跟随的键：这些键指向父节点或其他页面，写出单个页面时不会(全部)带上
+_SIZE_SKIP_KEYS = {"/Parent", "/P", "/Dest", "/D", "/Prev", "/Next", "/First", "/Last", "/B"}
+
+class PageSizeEstimator:
+    """
+    估算每个页面写入新PDF后占用的字节数，不需要实际写出。
+
+    页面的大小是它引用的全部对象(内容流、图片、字体等)的大小之和，对象按编号记录，
+    同一个文件中多个页面共用的对象(如字体)只计算一次。流对象按其中已编码数据的长度计算。
+
+    使用示例：
+    estimator = PageSizeEstimator(reader)
+    objects = estimator.page_objects(0)      # {对象编号: 字节数}
+    estimator.estimate(range(0, 10))         # 前10页合成一个文件的估算大小
+    """
+
+    def __init__(self, reader: PdfReader, pruner=None):
+        self.reader = reader
+        # 指定 ResourcePruner 时按精简后的资源估算
+        self.pruner = pruner
+        self._sizes = {}
+        self._pages = {}
+        self._reachable = {}
+
+    def _object_size(self, obj) -> int:
+        from PyPDF2.generic import DictionaryObject, StreamObject
+
+        if isinstance(obj, StreamObject):
+            return len(getattr(obj, "_data", b"") or b"") + 100 + 20 * len(obj)
+        if isinstance(obj, DictionaryObject) and len(obj) > 20:
+            # 大的字典(如字体宽度表所在的字典)按条目数估算，避免逐个序列化
+            return 20 * len(obj) + SIZE_OBJECT_OVERHEAD
+        buffer = io.BytesIO()
+        try:
+            obj.write_to_stream(buffer, None)
+        except Exception:
+            return 64 + SIZE_OBJECT_OVERHEAD
+        return buffer.tell() + SIZE_OBJECT_OVERHEAD
+
+    def page_objects(self, page_index: int) -> dict:
+        """页面引用的全部对象 {对象编号: 字节数}，页面自身以 ("page", 页面索引) 表示"""
+        objects = self._pages.get(page_index)
+        if objects is not None:
+            return objects
+        page = self.reader.pages[page_index]
+        objects = {("page", page_index): self._object_size(page)}
+        items = dict(dict.items(page))
+        if self.pruner is not None:
+            resources = self.pruner.page_resources(page_index)[0]
+            if resources is not None:
+                items["/Resources"] = resources
+        self._collect([value for key, value in items.items() if key not in _SIZE_SKIP_KEYS], objects)
+        self._pages[page_index] = objects
+        return objects
+
+    def reachable(self, value) -> dict:
+        """从一个对象出发能到达的全部间接对象 {对象编号: 字节数}"""
+        from PyPDF2.generic import IndirectObject
+
+        if not isinstance(value, IndirectObject):
+            objects = {}
+            self._collect([value], objects)
+            return objects
+        key = (value.idnum, value.generation)
+        objects = self._reachable.get(key)
+        if objects is None:
+            objects = {}
+            self._collect([value], objects)
+            self._reachable[key] = objects
+        return objects
+
+    def _collect(self, stack, objects: dict) -> None:
+        from PyPDF2.generic import ArrayObject, DictionaryObject, IndirectObject
+
+        while stack:
+            obj = stack.pop()
+            if isinstance(obj, IndirectObject):
+                key = (obj.idnum, obj.generation)
+                if key in objects:
+                    continue
+                target = obj.get_object()
+                if key not in self._sizes:
+                    self._sizes[key] = self._object_size(target)
+                objects[key] = self._sizes[key]
+                obj = target
+            if isinstance(obj, DictionaryObject):
+                if obj.get("/Type") == "/Page":
+                    # 链接等指向的其他页面
+                    continue
+                stack.extend(value for key, value in dict.items(obj) if key not in _SIZE_SKIP_KEYS)
+            elif isinstance(obj, ArrayObject):
+                stack.extend(list.__iter__(obj))
+
+    def estimate(self, page_indices) -> int:
+        """多个页面写入同一个文件的估算大小"""
+        objects = {}
+        for page_index in page_indices:
+            objects.update(self.page_objects(page_index))
+        return SIZE_FILE_OVERHEAD + sum(objects.values())
+
+# 精简资源时处理的资源类别，其中只保留页面内容中用到的名称
+_PRUNABLE_RESOURCES = ("/XObject", "/Font", "/ExtGState", "/Pattern", "/Shading", "/ColorSpace", "/Properties")
+# 内容流中的名称，如 /Im0、/F1
+_NAME_TOKEN = re.compile(rb"/([^\s/\[\]()<>{}%]+)")
+_NAME_ESCAPE = re.compile(rb"#([0-9a-fA-F]{2})")
+
+class ResourcePruner:
+    """
+    写出拆分或合并的页面时精简资源。
+
+    很多PDF(尤其是扫描件和设计稿)的所有页面共用同一个资源字典，其中列出了整个文件的图片和字体，
+    直接 add_page 时每个输出文件都会带上全部资源。这里按页面内容流中实际出现的名称只保留用到的资源，
+    同时把内容完全相同的图片等流对象合并为一个(按哈希比较)。
+    内容流无法解析，或者页面中有没有自带资源的表单对象(会使用页面的资源)时不精简该页。
+
+    使用示例：
+    pruner = ResourcePruner(reader)
+    saved = pruner.write_pages(range(0, 10), "out.pdf")   # 返回估算节省的字节数
+    """
+
+    def __init__(self, reader: PdfReader):
+        self.reader = reader
+        self.estimator = PageSizeEstimator(reader)
+        self._resources = {}
+        self._stream_keys = {}
+        self._canonical = {}
+
+    def _used_names(self, page):
+        """页面内容流中出现的全部名称(字节串)，无法解析时返回 None"""
+        contents = page.get("/Contents")
+        if contents is None:
+            return set()
+        streams = contents if isinstance(contents, list) else [contents]
+        names = set()
+        try:
+            for stream in streams:
+                data = stream.get_object().get_data()
+                names.update(_NAME_ESCAPE.sub(lambda m: bytes([int(m.group(1), 16)]), token)
+                             for token in _NAME_TOKEN.findall(data))
+        except Exception:
+            return None
+        return names
+
+    def _canonical_ref(self, ref):
+        """内容相同的流对象统一使用第一次遇到的引用"""
+        from PyPDF2.generic import IndirectObject, StreamObject
+
+        if not isinstance(ref, IndirectObject):
+            return ref
+        key = (ref.idnum, ref.generation)
+        digest = self._stream_keys.get(key)
+        if digest is None:
+            target = ref.get_object()
+            if not isinstance(target, StreamObject):
+                return ref
+            hasher = hashlib.blake2b(digest_size=16)
+            hasher.update(repr(sorted((k, repr(v)) for k, v in dict.items(target) if k != "/Length")).encode())
+            hasher.update(getattr(target, "_data", b"") or b"")
+            digest = self._stream_keys[key] = hasher.hexdigest()
+        return self._canonical.setdefault(digest, ref)
+
+    def page_resources(self, page_index: int) -> tuple:
+        """
+        页面精简后的资源。
+
+        Returns:
+            tuple: (资源字典, 去掉的引用列表, 保留的引用列表)，不精简时资源字典为 None
+        """
+        cached = self._resources.get(page_index)
+        if cached is not None:
+            return cached
+        from PyPDF2.generic import DictionaryObject
+
+        page = self.reader.pages[page_index]
+        resources = page.get("/Resources")
+        resources = resources.get_object() if resources is not None else None
+        used = self._used_names(page)
+        result = (None, [], [])
+        if isinstance(resources, DictionaryObject) and used is not None:
+            result = self._prune(resources, used)
+        self._resources[page_index] = result
+        return result
+
+    def _prune(self, resources, used: set) -> tuple:
+        """按用到的名称精简资源字典，无法精简时返回 (None, [], [])"""
+        from PyPDF2.generic import DictionaryObject, NameObject
+
+        pruned = DictionaryObject()
+        dropped, kept = [], []
+        for category, value in dict.items(resources):
+            entries = value.get_object()
+            if category not in _PRUNABLE_RESOURCES or not isinstance(entries, DictionaryObject):
+                pruned[category] = value
+                continue
+            subset = DictionaryObject()
+            for name, ref in dict.items(entries):
+                if name[1:].encode("utf-8") not in used:
+                    dropped.append(ref)
+                    continue
+                target = ref.get_object()
+                if (category == "/XObject" and isinstance(target, DictionaryObject)
+                        and target.get("/Subtype") == "/Form" and "/Resources" not in target):
+                    # 表单对象没有自带资源时会使用页面的资源，不能精简
+                    return None, [], []
+                canonical = self._canonical_ref(ref)
+                if canonical is not ref:
+                    dropped.append(ref)
+                kept.append(canonical)
+                subset[NameObject(name)] = canonical
+            pruned[NameObject(category)] = subset
+        return pruned, dropped, kept
+
+    def add_page(self, writer: PdfWriter, page_index: int, usage: dict) -> None:
+        """
+        把页面(使用精简后的资源)加入 writer。
+
+        Args:
+            usage: 同一个输出文件共用的统计 {"dropped": {}, "kept": {}}，用于计算节省的字节数
+        """
+        from PyPDF2 import PageObject
+        from PyPDF2.generic import NameObject
+
+        page = self.reader.pages[page_index]
+        resources, dropped, kept = self.page_resources(page_index)
+        if resources is None:
+            writer.add_page(page)
+            return
+        # 用一个只替换了资源的页面代替原页面，原页面不做修改
+        proxy = PageObject(self.reader, page.indirect_reference)
+        proxy.update(dict.items(page))
+        proxy[NameObject("/Resources")] = resources
+        writer.add_page(proxy)
+        for ref in dropped:
+            usage["dropped"].update(self.estimator.reachable(ref))
+        for ref in kept:
+            usage["kept"].update(self.estimator.reachable(ref))
+
+    @staticmethod
+    def saved_bytes(usage: dict) -> int:
+        """估算节省的字节数：去掉的对象中没有被其他页面保留的部分"""
+        kept = usage["kept"]
+        return sum(size for key, size in usage["dropped"].items() if key not in kept)
+
+    def write_pages(self, page_indices, output_file: str) -> int:
+        """把指定页面写入新的PDF文件，返回估算节省的字节数"""
+        writer = PdfWriter()
+        usage = {"dropped": {}, "kept": {}}
+        for page_index in page_indices:
+            self.add_page(writer, page_index, usage)
+        with open(output_file, 'wb') as f:
+            writer.write(f)
+        return self.saved_bytes(usage)
+
+def _pack_pages(estimator: PageSizeEstimator, page_indices: range, limit: int) -> list:
+    """按顺序把页面装入估算大小不超过 limit 的连续分组(单页超过 limit 时单独成组)"""
+    groups = []
+    start = page_indices.start
+    seen = set()
+    size = SIZE_FILE_OVERHEAD
+    for page_index in page_indices:
+        objects = estimator.page_objects(page_index)
+        added = sum(value for key, value in objects.items() if key not in seen)
+        if page_index > start and size + added > limit:
+            groups.append(range(start, page_index))
+            start = page_index
+            seen = set()
+            size = SIZE_FILE_OVERHEAD
+            added = sum(objects.values())
+        seen.update(objects)
+        size += added
+    groups.append(range(start, page_indices.stop))
+    return groups
+
+@recorded("pdf-split")
+@cached("pdf-split", inputs=("input_file",), output="output_dir")
+@profiled("pdf-split")
+def split_pdf_by_size(input_file: str, output_dir: str, max_mb: float, progress=None) -> dict:
+    """
+    按文件大小拆分PDF，每份不超过 max_mb。
+
+    先估算每页的大小(包括它引用的图片、字体等资源，共用的资源在同一份中只计算一次)，
+    按页面顺序把尽量多的页面装入同一份；写出后逐个校验实际大小，超过上限的文件按实际与估算的
+    比例重新拆分。单个页面本身超过上限时无法再拆，保留该页并在结果的 oversized 中列出。
+
+    Args:
+        input_file (str): 输入PDF路径
+        output_dir (str): 输出目录
+        max_mb (float): 每份的大小上限(MB)
+        progress: 进度回调
+
+    Returns:
+        dict: {"outputs": 输出文件列表, "pages": 总页数, "resumed": 从上次中断处跳过的文件数,
+               "resplit": 校验后重新拆分的文件数, "oversized": 单页就超过上限的文件,
+               "saved_bytes": 精简资源估算节省的字节数}
+    """
+    max_bytes = int(max_mb * MB)
+    if max_bytes <= 0:
+        raise ValueError("文件大小上限必须大于0")
+    reader = load_pdf(input_file)
+    total_pages = len(reader.pages)
+    base_name = os.path.splitext(os.path.basename(input_file))[0]
+
+    def output_path(group):
+        return os.path.join(output_dir, f"{base_name}_p{group.start + 1}-{group.stop}.pdf")
+
+    _report(progress, 0, total_pages, "正在估算每页的大小...")
+    # 输出文件会精简资源，按精简后的资源估算，否则共用资源字典的文件会被拆得过细
+    pruner = _make_pruner(reader)
+    estimator = PageSizeEstimator(reader, pruner)
+    groups = _pack_pages(estimator, range(total_pages), int(max_bytes * SIZE_TARGET_RATIO))
+    chunks = [(group.start, group, output_path(group), group.stop) for group in groups]
+    identity = [file_identity(input_file), os.path.abspath(output_dir), "size", max_bytes]
+    with Checkpoint("pdf-split", identity, len(chunks)) as checkpoint:
+        saved = _write_chunks(input_file, reader, chunks, checkpoint, progress, total_pages, pruner)
+
+    # 校验实际大小，超过上限的文件重新拆分
+    final = []
+    oversized = []
+    resplit = 0
+    pending = list(groups)
+    while pending:
+        group = pending.pop(0)
+        path = output_path(group)
+        size = os.path.getsize(path)
+        if size <= max_bytes or len(group) == 1:
+            final.append(group)
+            if size > max_bytes:
+                oversized.append(path)
+            continue
+        resplit += 1
+        _report(progress, total_pages, total_pages,
+                f"{os.path.basename(path)} 实际 {size / MB:.1f} MB，超过上限，重新拆分")
+        os.remove(path)
+        ratio = size / estimator.estimate(group)
+        parts = _pack_pages(estimator, group, int(max_bytes * SIZE_TARGET_RATIO / ratio))
+        if len(parts) == 1:
+            middle = group.start + len(group) // 2
+            parts = [range(group.start, middle), range(middle, group.stop)]
+        for part in parts:
+            saved += _write_pages(reader, part, output_path(part), pruner)
+        pending[0:0] = parts
+
+    return {"outputs": [output_path(group) for group in final], "pages": total_pages,
+            "resumed": checkpoint.resumed, "resplit": resplit, "oversized": oversized, "saved_bytes": saved}
+
+# 书签标题中不能用于文件名的字符
+_UNSAFE_FILENAME = re.compile(r'[\\/:*?"<>|\x00-\x1f]+')
+# 最多缓存几个文件的书签
+OUTLINE_CACHE_SIZE = 8
+
+@functools.lru_cache(maxsize=OUTLINE_CACHE_SIZE)
+def _read_outline(path: str, size: int, mtime_ns: int) -> tuple:
+    reader = load_pdf(path)
+    entries = []
+
+    def walk(items, level):
+        for item in items:
+            if isinstance(item, list):
+                # 列表是前一个书签的子书签
+                walk(item, level + 1)
+                continue
+            try:
+                page_index = reader.get_destination_page_number(item)
+            except Exception:
+                continue
+            if page_index is None or page_index < 0:
+                continue
+            title = str(item.title or "").strip() or f"第{page_index + 1}页"
+            entries.append((level, title, page_index))
+
+    try:
+        outline = reader.outline
+    except Exception as e:
+        raise ValueError(f"无法读取书签: {str(e)}")
+    walk(outline, 1)
+    return tuple(entries), len(reader.pages)
+
+def read_outline(input_file: str) -> tuple:
+    """
+    读取PDF的书签树。
+
+    结果按文件(路径、大小、修改时间)缓存，预览不同层级时不会重复解析。
+
+    Returns:
+        tuple: (书签列表, 总页数)，书签列表按文档中的顺序排列，每项为 (层级, 标题, 页面索引)，层级从1开始
+    """
+    if not os.path.exists(input_file):
+        raise FileNotFoundError("PDF文件不存在")
+    path, size, mtime_ns = file_identity(input_file)
+    return _read_outline(path, size, mtime_ns)
+
+def outline_sections(input_file: str, depth: int = 1) -> list:
+    """
+    按书签层级划分章节。
+
+    层级不超过 depth 的每个书签开始一个章节，到下一个章节开始前结束；第一个书签之前的页面作为"前置页"。
+    多个书签指向同一页时使用第一个书签的标题。
+
+    Returns:
+        list: [(标题, range(起始页面索引, 结束页面索引 + 1)), ...]
+    """
+    if depth <= 0:
+        raise ValueError("书签层级必须大于0")
+    entries, total_pages = read_outline(input_file)
+    if not entries:
+        raise ValueError("PDF文件没有书签")
+    starts = {}
+    for level, title, page_index in entries:
+        if level <= depth and page_index not in starts:
+            starts[page_index] = title
+    if 0 not in starts:
+        starts[0] = "前置页"
+    pages = sorted(starts)
+    return [(starts[start], range(start, end))
+            for start, end in zip(pages, pages[1:] + [total_pages])]
+
+def _outline_filename(base_name: str, number: int, width: int, title: str) -> str:
+    title = _UNSAFE_FILENAME.sub("_", title).strip(" ._")[:80] or "未命名"
+    return f"{base_name}_{number:0{width}d}_{title}.pdf"
+
+@recorded("pdf-split")
+@cached("pdf-split", inputs=("input_file",), output="output_dir")
+@profiled("pdf-split")
+def split_pdf_by_outline(input_file: str, output_dir: str, depth: int = 1, progress=None) -> dict:
+    """
+    按书签拆分PDF，每个章节输出为一个文件，文件名取自书签标题(前面加上序号)。
+
+    Args:
+        input_file (str): 输入PDF路径
+        output_dir (str): 输出目录
+        depth (int): 书签层级，1表示只按最顶层的书签(如各章)拆分，2表示同时按第二层(如各节)拆分
+        progress: 进度回调
+
+    Returns:
+        dict: {"outputs": 输出文件列表, "pages": 总页数, "sections": 章节标题列表,
+               "resumed": 从上次中断处跳过的文件数, "saved_bytes": 精简资源估算节省的字节数}
+    """
+    sections = outline_sections(input_file, depth)
+    reader = load_pdf(input_file)
+    total_pages = len(reader.pages)
+    base_name = os.path.splitext(os.path.basename(input_file))[0]
+    width = len(str(len(sections)))
+
+    chunks = []
+    for number, (title, group) in enumerate(sections, 1):
+        output_file = os.path.join(output_dir, _outline_filename(base_name, number, width, title))
+        chunks.append((group.start, group, output_file, group.stop))
+    identity = [file_identity(input_file), os.path.abspath(output_dir), "outline", depth]
+    with Checkpoint("pdf-split", identity, len(chunks)) as checkpoint:
+        saved = _write_chunks(input_file, reader, chunks, checkpoint, progress, total_pages)
+    return {"outputs": [chunk[2] for chunk in chunks], "pages": total_pages,
+            "sections": [title for title, _ in sections], "resumed": checkpoint.resumed, "saved_bytes": saved}
+
+def collect_pdf_files(sources) -> list:
+    """
+    把文件、文件夹和通配符展开为PDF文件列表(去重并保持顺序)。
+
+    文件夹只取其中的 .pdf 文件(不含子文件夹)，通配符支持 ** 匹配任意层子文件夹。
+    """
+    import glob
+
+    if isinstance(sources, str):
+        sources = [sources]
+    files = []
+    for source in sources:
+        if os.path.isdir(source):
+            matches = sorted(os.path.join(source, name) for name in os.listdir(source))
+        elif glob.has_magic(source):
+            matches = sorted(glob.glob(source, recursive=True))
+        else:
+            matches = [source]
+        for path in matches:
+            if path.lower().endswith(".pdf") and os.path.isfile(path):
+                files.append(os.path.abspath(path))
+            elif path == source:
+                raise FileNotFoundError(f"PDF文件不存在: {source}")
+    return list(dict.fromkeys(files))
+
+def _split_one(input_file: str, output_dir: str, pages_per_file: int, range_str: str, max_mb: float,
+               outline_depth: int) -> dict:
+    """在工作进程中拆分一个文件，每个进程自己打开 PdfReader"""
+    if outline_depth:
+        return split_pdf_by_outline(input_file, output_dir, outline_depth)
+    if max_mb:
+        return split_pdf_by_size(input_file, output_dir, max_mb)
+    if range_str:
+        return split_pdf_by_ranges(input_file, output_dir, range_str)
+    return split_pdf_by_count(input_file, output_dir, pages_per_file)
+
+@recorded("pdf-split-batch")
+@profiled("pdf-split-batch")
+def split_pdf_batch(input_files, output_dir: str, pages_per_file: int = 0, range_str: str = "",
+                    workers: int = 0, progress=None, on_file=None, max_mb: float = 0,
+                    outline_depth: int = 0) -> dict:
+    """
+    在多个工作进程中并行拆分多个PDF。
+
+    每个文件的拆分方式与单个文件的拆分函数(split_pdf_by_count 等)相同，输出文件都写入 output_dir
+    (文件名以各自的PDF文件名开头)。单个文件失败不影响其他文件。
+
+    Args:
+        input_files: PDF路径列表
+        output_dir (str): 输出目录
+        pages_per_file (int): 每份的页数(按页数拆分)
+        range_str (str): 页码范围(按范围拆分，优先于 pages_per_file)
+        workers (int): 工作进程数，0表示按配置 batch_workers(默认CPU核心数)
+        progress: 进度回调，按完成的文件数报告
+        max_mb (float): 每份的大小上限(按大小拆分，优先于页数和范围)
+        outline_depth (int): 书签层级(按书签拆分，优先于其他方式)
+        on_file: 每个文件完成时调用 on_file(entry)，entry 是 {"input", "status": "done"/"failed",
+                 "outputs", "pages", "resumed", "saved_bytes", "error"}；在调用 split_pdf_batch 的线程中调用
+
+    Returns:
+        dict: {"outputs": 全部输出文件, "files": 每个文件的 entry(按输入顺序), "pages": 总页数,
+               "failed": 失败的文件数, "workers": 使用的进程数, "saved_bytes": 精简资源估算节省的字节数}
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    from PeiZhi import get_config
+    from YaoCe import get_tool
+
+    input_files = list(input_files)
+    if not input_files:
+        raise ValueError("没有需要拆分的PDF文件")
+    if not outline_depth and not max_mb and not range_str and pages_per_file <= 0:
+        raise ValueError("页数必须大于0")
+    # 输出文件名以PDF文件名开头，不同文件夹中的同名文件会互相覆盖
+    names = {}
+    for path in input_files:
+        stem = os.path.splitext(os.path.basename(path))[0].lower()
+        if stem in names:
+            raise ValueError(f"文件名重复，拆分结果会互相覆盖: {names[stem]} 和 {path}")
+        names[stem] = path
+    os.makedirs(output_dir, exist_ok=True)
+
+    workers = workers or get_config().get("batch_workers") or os.cpu_count() or 1
+    workers = max(1, min(workers, len(input_files)))
+    entries = {}
+
+    def finish(path, result=None, error=None):
+        if error is None:
+            entry = {"input": path, "status": "done", "outputs": result["outputs"],
+                     "pages": result["pages"], "resumed": result.get("resumed", 0),
+                     "saved_bytes": result.get("saved_bytes", 0), "error": None}
+        else:
+            entry = {"input": path, "status": "failed", "outputs": [], "pages": 0, "resumed": 0,
+                     "saved_bytes": 0, "error": str(error) or type(error).__name__}
+        entries[path] = entry
+        if on_file is not None:
+            on_file(entry)
+        status = "完成" if error is None else f"失败: {entry['error']}"
+        _report(progress, len(entries), len(input_files), f"{os.path.basename(path)} {status}")
+
+    _report(progress, 0, len(input_files), f"正在用 {workers} 个进程拆分 {len(input_files)} 个文件...")
+    if workers == 1:
+        # 只有一个进程时直接在当前进程中拆分，省去启动进程的开销
+        for path in input_files:
+            try:
+                result = _split_one(path, output_dir, pages_per_file, range_str, max_mb, outline_depth)
+            except Exception as e:
+                finish(path, error=e)
+            else:
+                finish(path, result)
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_split_worker,
+                                       initargs=(get_tool(),))
+        futures = {executor.submit(_split_one, path, output_dir, pages_per_file, range_str, max_mb,
+                                   outline_depth): path
+                   for path in input_files}
+        try:
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    finish(path, error=e)
+                else:
+                    finish(path, result)
+        finally:
+            # 取消(进度回调抛出 JobCancelled)或出错时不再启动排队中的文件，正在拆分的文件完成后退出
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+    files = [entries[path] for path in input_files]
+    return {
+        "outputs": [output for entry in files for output in entry["outputs"]],
+        "files": files,
+        "pages": sum(entry["pages"] for entry in files),
+        "failed": sum(1 for entry in files if entry["status"] == "failed"),
+        "workers": workers,
+        "saved_bytes": sum(entry["saved_bytes"] for entry in files),
+    }
+
+@recorded("pdf-merge")
+@cached("pdf-merge", inputs=("selections",), output="output_file")
+@profiled("pdf-merge")
+def merge_pdfs(selections, output_file: str, progress=None) -> dict:
+    """
+    合并多个PDF的指定页面。
+
+    配置 prune_resources 开启时(默认)每页只保留用到的资源，同一文件中内容相同的图片等只保留一份。
+
+    Args:
+        selections: (文件路径, 页面索引列表) 的列表，页面索引为 None 表示全部页面
+        output_file (str): 输出PDF路径
+        progress: 进度回调
+
+    Returns:
+        dict: {"outputs": [输出文件], "pages": 合并的页数, "saved_bytes": 精简资源估算节省的字节数}
+    """
+    writer = PdfWriter()
+    page_count = 0
+    saved = 0
+    index = get_reader_index()
+    for i, (file, pages) in enumerate(selections):
+        # 复用合并窗口预览时已经解析的 PdfReader；add_page 会复制页面，之后不再读取 reader
+        with index.open(file) as reader:
+            if pages is None:
+                pages = range(len(reader.pages))
+            pruner = _make_pruner(reader)
+            usage = {"dropped": {}, "kept": {}}
+            for page_num in sorted(pages):
+                if pruner is None:
+                    writer.add_page(reader.pages[page_num])
+                else:
+                    pruner.add_page(writer, page_num, usage)
+                page_count += 1
+            if pruner is not None:
+                saved += pruner.saved_bytes(usage)
+        _report(progress, i + 1, len(selections), file)
+
+    with open(output_file, 'wb') as f:
+        writer.write(f)
+    return {"outputs": [output_file], "pages": page_count, "saved_bytes": saved}
+
+def create_text_watermark(text: str, font_size: int = 36, opacity: float = 0.5,
+                          position: str = "center") -> PdfReader:
+    """创建文本水印PDF"""
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.pagesizes import letter
+
+    packet = io.BytesIO()
+    can = canvas.Canvas(packet, pagesize=letter)
+    can.setFillColorRGB(0.5, 0.5, 0.5, opacity)
+    can.setFont("Helvetica", font_size)
+
+    width, height = letter
+
+    # 根据位置设置文本坐标
+    if position == "center":
+        x, y = width/2, height/2
+        can.drawCentredString(x, y, text)
+    elif position == "topleft":
+        x, y = 50, height - 50
+        can.drawString(x, y, text)
+    elif position == "topright":
+        x, y = width - 50, height - 50
+        can.drawRightString(x, y, text)
+    elif position == "bottomleft":
+        x, y = 50, 50
+        can.drawString(x, y, text)
+    elif position == "bottomright":
+        x, y = width - 50, 50
+        can.drawRightString(x, y, text)
+    else:
+        raise ValueError(f"未知的水印位置: {position}")
+
+    can.save()
+    packet.seek(0)
+    return PdfReader(packet)
+
+@recorded("pdf-watermark")
+@cached("pdf-watermark", inputs=("pdf_path",), output="output_path")
+@profiled("pdf-watermark")
+def add_watermark(pdf_path: str, output_path: str, text: str = "机密", font_size: int = 36,
+                  opacity: float = 0.5, position: str = "center", progress=None) -> dict:
+    """
+    为PDF的每一页添加文字水印。
+
+    Args:
+        pdf_path (str): 输入PDF路径
+        output_path (str): 输出PDF路径
+        text (str): 水印文字
+        font_size (int): 字体大小
+        opacity (float): 透明度(0-1)
+        position (str): center/topleft/topright/bottomleft/bottomright
+        progress: 进度回调
+
+    Returns:
+        dict: {"outputs": [输出文件], "pages": 页数}
+    """
+    pdf = load_pdf(pdf_path)
+    watermark = create_text_watermark(text, font_size, opacity, position)
+    writer = _apply_watermark(pdf, watermark, progress)
+
+    with open(output_path, "wb") as output_file:
+        writer.write(output_file)
+    return {"outputs": [output_path], "pages": len(pdf.pages)}
+
+def _apply_watermark(pdf: PdfReader, watermark: PdfReader, progress=None) -> PdfWriter:
+    """把水印页叠加到每一页上，返回新的 PdfWriter"""
+    writer = PdfWriter()
+    total_pages = len(pdf.pages)
+    for i, page in enumerate(pdf.pages):
+        page.merge_page(watermark.pages[0])
+        writer.add_page(page)
+        _report(progress, i + 1, total_pages)
+    return writer
+
+def watermark_pdf_bytes(data: bytes, text: str = "机密", font_size: int = 36, opacity: float = 0.5,
+                        position: str = "center") -> bytes:
+    """在内存中为PDF数据添加文字水印，参数同 add_watermark"""
+    pdf = PdfReader(io.BytesIO(data))
+    watermark = create_text_watermark(text, font_size, opacity, position)
+    buffer = io.BytesIO()
+    _apply_watermark(pdf, watermark).write(buffer)
+    return buffer.getvalue()
+
+class _PngStreamWriter:
+    """
+    逐行写入的PNG(8位RGB)，分块渲染的页面边渲染边压缩写入，不需要在内存中保存整页的像素。
+
+    使用示例：
+    with _PngStreamWriter("out.png", width, height, dpi) as png:
+        png.write_rows(pix.samples, pix.stride)
+    """
+
+    def __init__(self, path: str, width: int, height: int, dpi: int):
+        import zlib
+
+        self.width = width
+        self.file = open(path, "wb")
+        self.compressor = zlib.compressobj(6)
+        self.file.write(b"\x89PNG\r\n\x1a\n")
+        self._chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        # 分辨率(每米像素数)
+        ppm = round(dpi / 0.0254)
+        self._chunk(b"pHYs", struct.pack(">IIB", ppm, ppm, 1))
+
+    def _chunk(self, kind: bytes, data: bytes) -> None:
+        import zlib
+
+        self.file.write(struct.pack(">I", len(data)) + kind + data)
+        self.file.write(struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF))
+
+    def write_rows(self, samples: bytes, stride: int) -> None:
+        """写入若干行像素，samples 为连续的RGB行，每行 stride 字节"""
+        row_bytes = self.width * 3
+        view = memoryview(samples)
+        parts = []
+        for offset in range(0, len(view), stride):
+            # 每行前面是过滤类型 0(不过滤)
+            parts.append(b"\x00")
+            parts.append(view[offset:offset + row_bytes])
+        data = self.compressor.compress(b"".join(parts))
+        if data:
+            self._chunk(b"IDAT", data)
+
+    def close(self) -> None:
+        self._chunk(b"IDAT", self.compressor.flush())
+        self._chunk(b"IEND", b"")
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.file.close()
+        return False
+
+def _page_strips(page, zoom: float, rows: int):
+    """
+    按 rows 行一块渲染页面，逐块返回 Pixmap。
+
+    各块以像素行为边界裁剪，拼接后与整页渲染的结果完全相同。
+    """
+    import fitz
+
+    matrix = fitz.Matrix(zoom, zoom)
+    full = (page.rect * matrix).irect
+    for top in range(full.y0, full.y1, rows):
+        bottom = min(top + rows, full.y1)
+        clip = fitz.Rect(page.rect.x0, top / zoom, page.rect.x1, bottom / zoom)
+        yield page.get_pixmap(matrix=matrix, clip=clip, alpha=False)
+
+@recorded("pdf-to-image")
+@cached("pdf-to-image", inputs=("pdf_path",), output="output_dir")
+@profiled("pdf-to-image")
+def pdf_to_images(pdf_path: str, output_dir: str, pages=None, img_format: str = "png",
+                  dpi: int = 300, quality: int = 90, progress=None) -> dict:
+    """
+    将PDF页面渲染为图片。
+
+    图片保存在输出目录下的 "<PDF文件名>_images" 子目录中。
+    页面在指定分辨率下超过内存预算时，PNG 分块渲染并逐块写入，分辨率不变；
+    JPEG 无法分块写入，降低该页的分辨率(这样的页面不会写入结果缓存和断点记录)。同时运行的渲染共用内存预算。
+
+    Args:
+        pdf_path (str): 输入PDF路径
+        output_dir (str): 输出目录
+        pages: 页面索引列表，None 表示全部页面
+        img_format (str): png/jpg/tiff/bmp
+        dpi (int): 输出分辨率
+        quality (int): JPEG质量(1-100)
+        progress: 进度回调
+
+    Returns:
+        dict: {"outputs": 图片文件列表, "output_dir": 输出子目录, "pages": 转换的页数,
+               "resumed": 从上次中断处跳过的页数, "lowered_dpi_pages": 因内存预算降低了分辨率的页数,
+               "tiled_pages": 分块渲染的页数}
+    """
+    import fitz
+
+    pdf_name = os.path.splitext(os.path.basename(pdf_path))[0]
+    output_subdir = os.path.join(output_dir, f"{pdf_name}_images")
+    os.makedirs(output_subdir, exist_ok=True)
+
+    governor = get_governor()
+    lowered = 0
+    tiled = 0
+    outputs = []
+    with fitz.open(pdf_path) as document:
+        if pages is None:
+            pages = range(len(document))
+        pages = sorted(pages)
+        total_pages = len(pages)
+        identity = [file_identity(pdf_path), os.path.abspath(output_subdir), img_format, dpi, quality]
+        with Checkpoint("pdf-to-image", identity, total_pages) as checkpoint:
+            for i, page_num in enumerate(pages):
+                output_path = os.path.join(output_subdir, f"{pdf_name}_page_{page_num + 1}.{img_format}")
+                outputs.append(output_path)
+                if checkpoint.is_done(page_num):
+                    continue
+                _report(progress, i, total_pages, f"正在转换第 {page_num + 1} 页 ({i + 1}/{total_pages})")
+                page = document[page_num]
+                rows = governor.tile_rows(page.rect.width, page.rect.height, dpi)
+                if rows and img_format.lower() == "png":
+                    if not tiled:
+                        size = pixmap_bytes(page.rect.width, page.rect.height, dpi)
+                        report_decision(progress, i, total_pages,
+                                        f"第 {page_num + 1} 页在 {dpi} DPI 下需要约 {format_mb(size)} 内存，"
+                                        f"超过内存预算，分块渲染",
+                                        action="tile", page=page_num + 1, dpi=dpi, rows=rows)
+                    tiled += 1
+                    _render_png_tiled(page, dpi, rows, output_path, governor)
+                    checkpoint.record(page_num, [output_path])
+                    continue
+
+                page_dpi = governor.fit_dpi(page.rect.width, page.rect.height, dpi)
+                if page_dpi < dpi:
+                    if not lowered:
+                        size = pixmap_bytes(page.rect.width, page.rect.height, dpi)
+                        report_decision(progress, i, total_pages,
+                                        f"第 {page_num + 1} 页在 {dpi} DPI 下需要约 {format_mb(size)} 内存，"
+                                        f"超过内存预算，降为 {page_dpi} DPI",
+                                        degraded=True, action="lower-dpi", page=page_num + 1, dpi=dpi,
+                                        fitted_dpi=page_dpi)
+                    lowered += 1
+
+                # 计算缩放因子，默认PDF DPI是72
+                zoom = page_dpi / 72
+                with governor.reserve(pixmap_bytes(page.rect.width, page.rect.height, page_dpi)):
+                    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom))
+                    if img_format.lower() == "jpg":
+                        # 对于JPEG，需要特殊处理以应用质量设置
+                        pix.save(output_path, output="jpeg", jpg_quality=quality)
+                    else:
+                        pix.save(output_path)
+                    pix = None
+                if page_dpi == dpi:
+                    # 降低了分辨率的页面不记入断点，续传时按当时的预算重新渲染
+                    checkpoint.record(page_num, [output_path])
+        _report(progress, total_pages, total_pages)
+    return {"outputs": outputs, "output_dir": output_subdir, "pages": total_pages,
+            "resumed": checkpoint.resumed, "lowered_dpi_pages": lowered, "tiled_pages": tiled}
+
+def _render_png_tiled(page, dpi: int, rows: int, output_path: str, governor) -> None:
+    """分块渲染页面并逐块写入PNG，内存中只保存一块的像素"""
+    import fitz
+
+    zoom = dpi / 72
+    full = (page.rect * fitz.Matrix(zoom, zoom)).irect
+    with governor.reserve(full.width * rows * 3 * 2):
+        with _PngStreamWriter(output_path, full.width, full.height, dpi) as png:
+            for pix in _page_strips(page, zoom, rows):
+                png.write_rows(pix.samples, pix.stride)
+                pix = None
+
+def iter_page_images(source, pages=None, dpi: int = 300):
+    """
+    逐页把PDF渲染为内存中的 PIL 图片，不写临时文件。
+
+    页面在指定分辨率下超过单元预算时分块渲染后拼接到图片中(省去整页 Pixmap 的一份内存)，
+    图片本身超过整个内存预算时才降低该页的分辨率。
+
+    Args:
+        source: PDF路径或PDF数据(bytes)
+        pages: 页面索引列表，None 表示全部页面
+        dpi (int): 渲染分辨率
+
+    Yields:
+        (页面索引, PIL.Image.Image)
+    """
+    import fitz
+    from PIL import Image
+
+    if isinstance(source, (bytes, bytearray)):
+        document = fitz.open(stream=bytes(source), filetype="pdf")
+    else:
+        document = fitz.open(source)
+    governor = get_governor()
+    with document:
+        page_numbers = range(len(document)) if pages is None else sorted(pages)
+        for page_num in page_numbers:
+            page = document[page_num]
+            page_dpi = governor.fit_dpi(page.rect.width, page.rect.height, dpi, limit=governor.budget)
+            if page_dpi < dpi:
+                report_decision(None, 0, 0, f"第 {page_num + 1} 页超过内存预算，降为 {page_dpi} DPI",
+                                degraded=True, action="lower-dpi", page=page_num + 1, dpi=dpi,
+                                fitted_dpi=page_dpi)
+            zoom = page_dpi / 72
+            rows = governor.tile_rows(page.rect.width, page.rect.height, page_dpi)
+            if rows:
+                report_decision(None, 0, 0, f"第 {page_num + 1} 页超过内存预算，分块渲染",
+                                action="tile", page=page_num + 1, dpi=page_dpi, rows=rows)
+                full = (page.rect * fitz.Matrix(zoom, zoom)).irect
+                with governor.reserve(pixmap_bytes(page.rect.width, page.rect.height, page_dpi)):
+                    image = Image.new("RGB", (full.width, full.height))
+                    top = 0
+                    for pix in _page_strips(page, zoom, rows):
+                        image.paste(Image.frombytes("RGB", (pix.width, pix.height), pix.samples), (0, top))
+                        top += pix.height
+                        pix = None
+            else:
+                with governor.reserve(pixmap_bytes(page.rect.width, page.rect.height, page_dpi)):
+                    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+                    image = Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+                    pix = None
+            yield page_num, image
+
+def render_thumbnails(pdf_path: str, pages, zoom: float = 0.2, progress=None) -> list:
+    """
+    把指定页面渲染为缩略图，用于界面预览。
+
+    只返回 PIL 图片，不创建任何 Tk 对象，可以在工作线程中调用；
+    界面线程再用 ImageTk.PhotoImage 显示。
+
+    Args:
+        pdf_path (str): PDF路径
+        pages: 页面索引列表
+        zoom (float): 缩放比例(相对于72 DPI)
+        progress: 进度回调，任务取消时由回调抛出异常中止渲染
+
+    Returns:
+        list: [(页面索引, PIL.Image.Image), ...]
+    """
+    import fitz
+    from PIL import Image
+
+    pages = list(pages)
+    thumbnails = []
+    with fitz.open(pdf_path) as document:
+        for i, page_num in enumerate(pages):
+            _report(progress, i, len(pages))
+            pix = document[page_num].get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+            thumbnails.append((page_num, Image.frombytes("RGB", (pix.width, pix.height), pix.samples)))
+            pix = None
+    _report(progress, len(pages), len(pages))
+    return thumbnails
+
+def images_to_pdf_bytes(images, image_format: str = "png", progress=None) -> bytes:
+    """
+    将内存中的图片按顺序合成为PDF数据，每张图片一页。
+
+    images 可以是生成器，图片逐张插入后即可释放，不需要同时保存在内存中。
+
+    Args:
+        images: PIL 图片的可迭代对象
+        image_format (str): 图片在PDF中的编码格式 png(无损)/jpg(体积小)
+
+    Returns:
+        bytes: PDF数据
+    """
+    import fitz
+    from TuPianChuLi import encode_image
+
+    pdf_document = fitz.open()
+    try:
+        for i, image in enumerate(images):
+            width, height = image.size
+            pdf_page = pdf_document.new_page(width=width, height=height)
+            pdf_page.insert_image(fitz.Rect(0, 0, width, height),
+                                  stream=encode_image(image, image_format, 90))
+            _report(progress, i + 1, 0)
+        if len(pdf_document) == 0:
+            raise ValueError("没有可以写入PDF的图片")
+        return pdf_document.tobytes()
+    finally:
+        pdf_document.close()
+
+@recorded("image-to-pdf")
+@cached("image-to-pdf", inputs=("image_paths",), output="output_path")
+@profiled("image-to-pdf")
+def images_to_pdf(image_paths, output_path: str, progress=None) -> dict:
+    """
+    将图片按顺序合成为PDF，每张图片一页。
+
+    无法处理的图片会被跳过并记录在返回结果中。
+
+    Args:
+        image_paths: 图片路径列表
+        output_path (str): 输出PDF路径
+        progress: 进度回调
+
+    Returns:
+        dict: {"outputs": [输出文件], "pages": 页数, "skipped": [(图片路径, 错误信息)]}
+    """
+    import fitz
+    from PIL import Image
+
+    pdf_document = fitz.open()
+    skipped = []
+    try:
+        for i, img_path in enumerate(image_paths):
+            try:
+                with Image.open(img_path) as img:
+                    width, height = img.width, img.height
+                pdf_page = pdf_document.new_page(width=width, height=height)
+                pdf_page.insert_image(fitz.Rect(0, 0, width, height), filename=img_path)
+            except Exception as e:
+                skipped.append((img_path, str(e)))
+            _report(progress, i + 1, len(image_paths), img_path)
+        pages = len(pdf_document)
+        pdf_document.save(output_path)
+    finally:
+        pdf_document.close()
+    return {"outputs": [output_path], "pages": pages, "skipped": skipped}
+
+@recorded("pdf-to-word")
+@cached("pdf-to-word", inputs=("pdf_path",), output="output_path")
+@profiled("pdf-to-word")
+def pdf_to_word(pdf_path: str, output_path: str, progress=None) -> dict:
+    """
+    将PDF转换为Word文档。
+
+    Args:
+        pdf_path (str): 输入PDF路径
+        output_path (str): 输出docx路径
+        progress: 进度回调
+
+    Returns:
+        dict: {"outputs": [输出文件], "pages": 页数}
+    """
+    from pdf2docx import Converter
+
+    cv = Converter(pdf_path)
+    try:
+        total_pages = len(cv.pages)
+        # pdf2docx 会把所有页面的版面分析结果保存在内存中，按页数申请预算：
+        # 预算不足时等待同一进程中的其他任务完成后再转换
+        governor = get_governor()
+        cost = total_pages * PDF2DOCX_PAGE_MB * MB
+        if governor.in_use and governor.in_use + cost > governor.budget:
+            report_decision(progress, 0, total_pages, "内存预算不足，等待其他任务完成后开始转换...",
+                            action="wait", estimate_mb=round(cost / MB))
+        elif cost > governor.budget:
+            report_decision(progress, 0, total_pages,
+                            f"预计需要约 {format_mb(cost)} 内存，超过内存预算 {format_mb(governor.budget)}，"
+                            f"大文件可以先用PDF拆分分成几部分再转换",
+                            action="over-budget", estimate_mb=round(cost / MB))
+        with governor.reserve(cost):
+            _report(progress, 0, total_pages, "正在转换...")
+            # 一次性转换所有页面
+            cv.convert(output_path)
+        _report(progress, total_pages, total_pages, f"已完成转换: 共 {total_pages} 页")
+    finally:
+        cv.close()
+    return {"outputs": [output_path], "pages": total_pages}
@@ -0,0 +1,154 @@
+# 禁止生成 .pyc 文件
+import sys
+sys.dont_write_bytecode = True
+
+import json
+import os
+
+def get_data_dir() -> str:
+    """
+    获取三垣工具的本地数据目录。
+
+    配置、日志、缓存等运行数据统一保存在该目录下，
+    可以通过环境变量 SANYUAN_HOME 指定其他位置。
+
+    Returns:
+        str: 数据目录的绝对路径(不存在时自动创建)
+    """
+    data_dir = os.environ.get("SANYUAN_HOME") or os.path.join(os.path.expanduser("~"), ".sanyuan")
+    os.makedirs(data_dir, exist_ok=True)
+    return data_dir
+
+class ConfigStore:
+    """
+    启动器与工具共用的配置存储类。
+
+    配置以JSON格式保存在数据目录下的 config.json 中，
+    读取不到的配置项使用 DEFAULTS 中的默认值。
+
+    使用示例：
+    config = get_config()
+    if config.get("in_process"):
+        ...
+    config.set("in_process", True)
+    """
+    # 默认配置
+    DEFAULTS = {
+        # 是否在启动器进程内以窗口方式打开工具
+        "in_process": False,
+        # 即使开启进程内模式，也始终使用独立进程启动的工具
+        "isolated_tools": ["PDF转Word", "音频提取"],
+        # 预热进程池的大小，0表示不使用预热进程
+        "warm_pool_size": 2,
+        # 工具目录监视方式: auto / inotify / polling
+        "tool_watch": "auto",
+        # 任务队列同时运行的任务数
+        "max_jobs": 2,
+        # 每个工具分类同时运行的任务数，未列出的分类只受总数限制
+        "category_job_limits": {"PDF工具": 1, "图片工具": 1, "音频工具": 1},
+        # 工具进程的内存上限(MB)，0表示不限制；超过上限的 memory_warn_ratio 时先警告
+        "memory_limit_mb": 0,
+        # 单个工具的内存上限(MB)，如 {"PDF转图片": 2048}，优先于 memory_limit_mb
+        "tool_memory_limits": {},
+        "memory_warn_ratio": 0.8,
+        # 核心操作共用的内存预算(MB)，渲染、合成等大块内存在预算内分配；0表示自动(可用内存的一半)
+        "memory_budget_mb": 0,
+        # 是否对工具的核心操作进行性能分析(cProfile + tracemalloc)，也可用环境变量 SANYUAN_PROFILE 开启
+        "profile_operations": False,
+        # 是否在每个核心操作结束后向 telemetry.jsonl 追加一条耗时和规模记录
+        "telemetry": True,
+        # 是否使用结果缓存(相同输入和参数直接复用上次的输出)。缓存会再保存一份输出文件，默认关闭；
+        # 开启后也可用环境变量 SANYUAN_NO_CACHE=1 临时关闭
+        "result_cache": False,
+        # 结果缓存的大小上限(MB)，超过后按最近使用时间淘汰
+        "cache_max_mb": 2048,
+        # 一次操作的输出超过该大小(MB)时不缓存，避免大文件拆分、转换等把输出写两遍
+        "cache_max_entry_mb": 8,
+        # 命中缓存时使用硬链接代替复制(更快、不占额外空间，但不要直接修改输出文件)
+        "cache_hardlink": False,
+        # 批量拆分等批处理同时使用的进程数，0表示CPU核心数
+        "batch_workers": 0,
+        # 拆分和合并时每页只保留用到的资源，并合并内容相同的图片等对象(输出更小，写出稍慢)
+        "prune_resources": True,
+        # 长任务是否写检查点日志，中断后重新运行时跳过已完成的部分
+        "checkpoints": True,
+        # 热文件夹，如 [{"path": "D:/热文件夹/水印", "action": "pdf-watermark", "options": {"text": "机密"}}]
+        "hot_folders": [],
+        # 热文件夹同时处理的文件数
+        "hot_folder_workers": 2,
+        # 文件大小和修改时间保持不变多少秒后才开始处理
+        "hot_folder_settle_seconds": 2,
+        # HTTP服务监听的地址和端口，局域网访问时把地址改为 0.0.0.0
+        "service_host": "127.0.0.1",
+        "service_port": 8765,
+        # HTTP服务同时运行的任务数
+        "service_workers": 2,
+        # 访问令牌，设置后请求需要带上 Authorization: Bearer <令牌>；监听本机以外的地址时必须设置
+        "service_token": "",
+        # 在受信任的网络中不设置令牌也允许监听本机以外的地址
+        "service_allow_anonymous": False,
+        # 允许以路径直接引用的共享目录
+        "service_shared_roots": [],
+        # 上传文件和任务输出保留的小时数
+        "service_keep_hours": 24,
+        # 单个上传文件的大小上限(MB)
+        "service_max_upload_mb": 512,
+    }
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(get_data_dir(), "config.json")
+        self.values = {}
+        self.load()
+
+    def load(self) -> None:
+        """从配置文件读取配置，文件不存在或损坏时使用默认配置"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.values = json.load(f)
+        except (OSError, ValueError):
+            self.values = {}
+
+    def save(self) -> None:
+        """将当前配置写入配置文件"""
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.values, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def get(self, key: str, default=None):
+        """
+        获取配置项。
+
+        Args:
+            key (str): 配置项名称
+            default: 配置文件和默认配置中都没有该项时返回的值
+
+        Returns:
+            配置项的值
+        """
+        if key in self.values:
+            return self.values[key]
+        return self.DEFAULTS.get(key, default)
+
+    def set(self, key: str, value) -> None:
+        """
+        修改配置项并立即保存。
+
+        Args:
+            key (str): 配置项名称
+            value: 新的值(必须可以被JSON序列化)
+        """
+        self.values[key] = value
+        self.save()
+
+# 创建全局配置实例
+config = ConfigStore()
+
+def get_config() -> ConfigStore:
+    """
+    获取全局配置实例。
+
+    Returns:
+        ConfigStore: 全局唯一的配置实例
+    """
+    return config
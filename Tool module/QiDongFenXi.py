@@ -0,0 +1,306 @@
+# 禁止生成 .pyc 文件
+import sys
+sys.dont_write_bytecode = True
+
+import atexit
+import builtins
+import json
+import os
+import threading
+import time
+
+from PeiZhi import get_data_dir
+
+# 启动耗时分析。
+# 记录启动过程中每个包的导入耗时(类似 python -X importtime，但按顶层包汇总)、
+# Tk 初始化耗时、界面构建耗时和首个窗口完成绘制的时间，结果保存为JSON报告，
+# 并在数据目录的 startup_history.jsonl 中保留历史记录，便于发现版本之间的启动变慢。
+#
+# 使用方法：
+#   python "San Yuan Gong Ju_V1-3-1.py" --profile-startup                 分析启动器
+#   python "San Yuan Gong Ju_V1-3-1.py" --profile-startup "PDF tool/PDF Chai Fen_Alpha1-0-3.py"
+# 分析模式下窗口绘制完成后会自动关闭，加上 --keep-open 可以保持窗口打开。
+
+HISTORY_FILE = "startup_history.jsonl"
+REPORT_DIR = "startup_reports"
+
+def _process_age_ms():
+    """当前进程从创建到现在的毫秒数(仅Linux)，用于计算解释器自身的启动时间"""
+    try:
+        with open("/proc/self/stat", "rb") as f:
+            data = f.read()
+        with open("/proc/uptime", "rb") as f:
+            uptime = float(f.read().split()[0])
+        start_ticks = int(data[data.rfind(b")") + 2:].split()[19])
+        return (uptime - start_ticks / os.sysconf("SC_CLK_TCK")) * 1000
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+class ImportTimer:
+    """
+    通过替换 builtins.__import__ 统计每个新导入模块的耗时。
+
+    cumulative 为包含子模块导入的总耗时，self 为扣除其他包导入后的自身耗时，
+    两者都按顶层包名汇总。已经导入过的模块直接跳过，几乎没有额外开销。
+    """
+
+    def __init__(self):
+        self.packages = {}
+        self.total = 0.0
+        self.local = threading.local()
+        self.original = None
+        self.on_import = None
+
+    def install(self) -> None:
+        self.original = builtins.__import__
+        builtins.__import__ = self._import
+
+    def uninstall(self) -> None:
+        if self.original is not None:
+            builtins.__import__ = self.original
+            self.original = None
+
+    def total_ms(self) -> float:
+        """所有最外层导入的总耗时"""
+        return self.total
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        original = self.original or builtins.__import__
+        full_name = name
+        if level:
+            package = (globals or {}).get("__package__") or ""
+            parts = package.rsplit(".", level - 1) if level > 1 else [package]
+            full_name = f"{parts[0]}.{name}" if name else parts[0]
+        if not full_name or full_name in sys.modules:
+            return original(name, globals, locals, fromlist, level)
+
+        stack = getattr(self.local, "stack", None)
+        if stack is None:
+            stack = self.local.stack = []
+        package_name = full_name.split(".")[0]
+        frame = [package_name, 0.0]
+        stack.append(frame)
+        start = time.perf_counter()
+        try:
+            return original(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            stack.pop()
+            stats = self.packages.setdefault(package_name, {
+                "cumulative_ms": 0.0, "self_ms": 0.0, "modules": 0})
+            stats["modules"] += 1
+            stats["self_ms"] += elapsed - frame[1]
+            parent = stack[-1] if stack else None
+            if parent is None:
+                self.total += elapsed
+            else:
+                parent[1] += elapsed
+            if parent is None or parent[0] != package_name:
+                # 只在进入该包时计入累计耗时，避免包内子模块重复计算
+                stats["cumulative_ms"] += elapsed
+            if self.on_import is not None:
+                self.on_import(full_name)
+
+class StartupProfiler:
+    """
+    启动耗时分析器。
+
+    需要在导入 tkinter 等依赖之前调用 start()，首个Tk窗口绘制完成后自动生成报告。
+
+    使用示例：
+    profiler = StartupProfiler("PDF Chai Fen_Alpha1-0-3.py")
+    profiler.start()
+    ...  # 导入依赖、创建窗口、进入 mainloop
+    """
+
+    def __init__(self, target: str, auto_exit: bool = True):
+        self.target = target
+        self.auto_exit = auto_exit
+        self.imports = ImportTimer()
+        self.marks = {}
+        self.start_time = None
+        self.report_path = None
+        self.tk_patched = False
+
+    def start(self) -> None:
+        """开始计时并安装导入统计和Tk钩子"""
+        self.start_time = time.perf_counter()
+        self.marks["interpreter_ms"] = _process_age_ms()
+        self.imports.on_import = self._check_tkinter
+        self.imports.install()
+        self._check_tkinter()
+        # 没有创建窗口就退出的脚本也生成报告
+        atexit.register(self.finish)
+
+    def mark(self, name: str) -> None:
+        """记录从开始到现在的毫秒数"""
+        self.marks[name] = round((time.perf_counter() - self.start_time) * 1000, 2)
+
+    def _check_tkinter(self, name=None) -> None:
+        if not self.tk_patched and "tkinter" in sys.modules and hasattr(sys.modules["tkinter"], "Tk"):
+            self.tk_patched = True
+            self._patch_tk(sys.modules["tkinter"])
+
+    def _patch_tk(self, tkinter) -> None:
+        profiler = self
+        original_init = tkinter.Tk.__init__
+
+        def patched_init(self, *args, **kwargs):
+            if "tk_init_start_ms" not in profiler.marks:
+                profiler.mark("tk_init_start_ms")
+                original_init(self, *args, **kwargs)
+                profiler.mark("tk_init_end_ms")
+                self.after_idle(lambda: profiler._first_paint(self))
+            else:
+                original_init(self, *args, **kwargs)
+
+        def patched_mainloop(self, n=0):
+            if "mainloop_ms" not in profiler.marks:
+                profiler.mark("mainloop_ms")
+            return tkinter.Misc.mainloop(self, n)
+
+        tkinter.Tk.__init__ = patched_init
+        tkinter.Tk.mainloop = patched_mainloop
+
+    def _first_paint(self, root) -> None:
+        # 先完成挂起的布局和绘制，再记录首次绘制时间
+        root.update_idletasks()
+        self.mark("first_paint_ms")
+        self.finish()
+        if self.auto_exit:
+            root.after(0, root.destroy)
+
+    def build_report(self) -> dict:
+        """生成报告数据"""
+        marks = self.marks
+        packages = sorted(
+            ({"package": name, **{k: (round(v, 2) if isinstance(v, float) else v)
+                                  for k, v in stats.items()}}
+             for name, stats in self.imports.packages.items()),
+            key=lambda p: p["cumulative_ms"], reverse=True)
+        tk_init = None
+        if "tk_init_end_ms" in marks:
+            tk_init = round(marks["tk_init_end_ms"] - marks["tk_init_start_ms"], 2)
+        build = None
+        if "mainloop_ms" in marks and "tk_init_end_ms" in marks:
+            build = round(marks["mainloop_ms"] - marks["tk_init_end_ms"], 2)
+        interpreter = marks.get("interpreter_ms")
+        return {
+            "target": self.target,
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": sys.version.split()[0],
+            "platform": sys.platform,
+            "interpreter_ms": round(interpreter, 2) if interpreter is not None else None,
+            "import_ms": round(self.imports.total_ms(), 2),
+            "tk_init_ms": tk_init,
+            "build_ms": build,
+            "first_paint_ms": marks.get("first_paint_ms"),
+            "marks": {k: v for k, v in marks.items() if k != "interpreter_ms"},
+            "imports": packages,
+        }
+
+    def finish(self) -> str:
+        """
+        生成报告并写入历史记录，重复调用只生成一次。
+
+        Returns:
+            str: 报告文件路径
+        """
+        if self.report_path is not None:
+            return self.report_path
+        self.imports.uninstall()
+        report = self.build_report()
+        report_dir = os.path.join(get_data_dir(), REPORT_DIR)
+        os.makedirs(report_dir, exist_ok=True)
+        safe_name = "".join(c if c.isalnum() or c in "-_." else "_" for c in self.target)
+        self.report_path = os.path.join(report_dir, f"{safe_name}_{time.strftime('%Y%m%d_%H%M%S')}.json")
+        with open(self.report_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+        summary = {k: report[k] for k in ("target", "timestamp", "python", "interpreter_ms",
+                                           "import_ms", "tk_init_ms", "build_ms", "first_paint_ms")}
+        summary["report"] = self.report_path
+        with open(os.path.join(get_data_dir(), HISTORY_FILE), "a", encoding="utf-8") as f:
+            f.write(json.dumps(summary, ensure_ascii=False) + "\n")
+        print(f"启动分析报告: {self.report_path}", file=sys.stderr)
+        return self.report_path
+
+def profile_script(script: str, args=(), auto_exit: bool = True) -> int:
+    """
+    在启动分析模式下运行工具脚本。
+
+    Args:
+        script (str): 工具脚本路径
+        args: 传给工具的命令行参数
+        auto_exit (bool): 首次绘制完成后是否自动关闭窗口
+
+    Returns:
+        int: 退出码
+    """
+    import runpy
+
+    if not os.path.isfile(script):
+        print(f"找不到工具文件：{script}", file=sys.stderr)
+        return 1
+    profiler = StartupProfiler(os.path.basename(script), auto_exit)
+    profiler.start()
+    sys.argv = [script] + list(args)
+    sys.path[0] = os.path.dirname(os.path.abspath(script))
+    runpy.run_path(script, run_name="__main__")
+    profiler.finish()
+    return 0
+
+def load_history(target: str = None) -> list:
+    """
+    读取启动耗时历史记录。
+
+    Args:
+        target (str): 只返回该目标的记录，默认返回全部
+
+    Returns:
+        list: 按时间顺序排列的记录
+    """
+    path = os.path.join(get_data_dir(), HISTORY_FILE)
+    records = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if target is None or record.get("target") == target:
+                    records.append(record)
+    except OSError:
+        pass
+    return records
+
+def find_regressions(records, threshold: float = 1.2, window: int = 5) -> list:
+    """
+    找出最近一次启动明显变慢的目标。
+
+    最近一次的首次绘制时间超过之前 window 次中位数的 threshold 倍即视为变慢。
+
+    Returns:
+        list: (目标, 最近耗时, 之前的中位数) 元组列表
+    """
+    by_target = {}
+    for record in records:
+        if record.get("first_paint_ms") is not None:
+            by_target.setdefault(record["target"], []).append(record["first_paint_ms"])
+    regressions = []
+    for target, times in by_target.items():
+        if len(times) < 2:
+            continue
+        previous = sorted(times[-window - 1:-1])
+        median = previous[len(previous) // 2]
+        if times[-1] > median * threshold:
+            regressions.append((target, times[-1], median))
+    return regressions
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if a != "--keep-open"]
+    if not args:
+        print("用法: python QiDongFenXi.py [--keep-open] 工具脚本 [参数...]", file=sys.stderr)
+        sys.exit(2)
+    sys.exit(profile_script(args[0], args[1:], "--keep-open" not in sys.argv))
@@ -0,0 +1,404 @@
+# 禁止生成 .pyc 文件
+import sys
+sys.dont_write_bytecode = True
+
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from PeiZhi import get_config, get_data_dir
+from GongJuZhuCe import DirectoryWatcher
+
+# 热文件夹监视。
+# 把文件放进热文件夹的 in 目录后自动处理，例如PDF加固定水印、图片转为WebP、视频提取为MP3。
+# 每个热文件夹的目录结构(不存在时自动创建)：
+#   <热文件夹>/in      放入待处理的文件
+#   <热文件夹>/out     处理结果
+#   <热文件夹>/done    处理成功的输入文件
+#   <热文件夹>/failed  处理失败的输入文件，旁边的 <文件名>.error.txt 是错误信息
+#
+# 热文件夹在配置项 hot_folders 中定义(也可以用 --config 指定单独的JSON文件)：
+#   [{"path": "D:/热文件夹/水印", "action": "pdf-watermark", "options": {"text": "机密"}},
+#    {"path": "D:/热文件夹/webp", "action": "image-convert", "options": {"format": "webp", "quality": 80}}]
+#
+# 目录变化由 DirectoryWatcher 发现(inotify，不可用时轮询)；文件的大小和修改时间在 settle_seconds 内
+# 不再变化、并且可以打开时才认为已经写完，避免处理还在复制中的文件。
+# 处理中的文件记录在数据目录的 hot_folder_state.json 中：重启后已处理完但还没移走的文件直接移到
+# done/failed，不会重复处理；处理到一半中断的文件重新处理。
+#
+# 命令行：python "San Yuan Gong Ju_V1-3-1.py" run watch [--config 热文件夹.json] [--once]
+
+STATE_FILE = "hot_folder_state.json"
+
+# 正在写入的临时文件
+IGNORED_SUFFIXES = (".tmp", ".part", ".crdownload", ".download", ".error.txt")
+
+# 没有目录变化通知时，每隔多少秒重新扫描一次全部 in 目录(防止漏掉事件)
+RESCAN_SECONDS = 30
+
+def _base_name(path: str) -> str:
+    return os.path.splitext(os.path.basename(path))[0]
+
+# ---- 处理动作 ----
+# 每个动作是 func(输入文件, 输出目录, 选项字典, progress)，返回核心函数的结果字典。
+
+def _pdf_watermark(path, out_dir, options, progress):
+    from PDFChuLi import add_watermark
+    return add_watermark(path, os.path.join(out_dir, os.path.basename(path)), progress=progress, **options)
+
+def _pdf_to_image(path, out_dir, options, progress):
+    from PDFChuLi import pdf_to_images
+    return pdf_to_images(path, out_dir, progress=progress, **options)
+
+def _pdf_to_word(path, out_dir, options, progress):
+    from PDFChuLi import pdf_to_word
+    return pdf_to_word(path, os.path.join(out_dir, _base_name(path) + ".docx"), progress)
+
+def _image_to_pdf(path, out_dir, options, progress):
+    from PDFChuLi import images_to_pdf
+    result = images_to_pdf([path], os.path.join(out_dir, _base_name(path) + ".pdf"), progress)
+    if result["skipped"]:
+        raise ValueError(result["skipped"][0][1])
+    return result
+
+def _image_convert(path, out_dir, options, progress):
+    from TuPianChuLi import convert_image
+    output_format = options.get("format", "webp")
+    output_path = os.path.join(out_dir, f"{_base_name(path)}.{output_format}")
+    convert_image(path, output_path, output_format, options.get("quality", 90))
+    return {"outputs": [output_path]}
+
+def _image_grid(path, out_dir, options, progress):
+    from TuPianChuLi import split_grid
+    return split_grid(path, out_dir, progress=progress, **options)
+
+def _audio_extract(path, out_dir, options, progress):
+    from YinPinChuLi import extract_audio
+    output_format = options.get("format", "mp3")
+    return extract_audio(path, os.path.join(out_dir, f"{_base_name(path)}.{output_format}"), progress)
+
+def _pipeline(path, out_dir, options, progress):
+    from LiuShuiXian import run_pipeline
+    if not options.get("file"):
+        raise ValueError("pipeline 动作需要在 options 中指定流水线文件 file")
+    variables = dict(options.get("vars") or {}, **{"in": path, "out": out_dir, "name": _base_name(path)})
+    return run_pipeline(options["file"], variables, progress)
+
+PDF_EXTENSIONS = (".pdf",)
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".bmp", ".gif", ".tiff", ".psd")
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mkv", ".mov", ".flv", ".wmv")
+
+# 动作名称 -> (处理函数, 默认接受的扩展名)，扩展名为 None 表示接受所有文件
+ACTIONS = {
+    "pdf-watermark": (_pdf_watermark, PDF_EXTENSIONS),
+    "pdf-to-image": (_pdf_to_image, PDF_EXTENSIONS),
+    "pdf-to-word": (_pdf_to_word, PDF_EXTENSIONS),
+    "image-to-pdf": (_image_to_pdf, IMAGE_EXTENSIONS),
+    "image-convert": (_image_convert, IMAGE_EXTENSIONS),
+    "image-grid": (_image_grid, IMAGE_EXTENSIONS),
+    "audio-extract": (_audio_extract, VIDEO_EXTENSIONS),
+    "pipeline": (_pipeline, None),
+}
+
+class HotFolder:
+    """
+    一个热文件夹的配置。
+
+    Args:
+        path (str): 热文件夹目录，其中的 in/out/done/failed 子目录会自动创建
+        action (str): ACTIONS 中的动作名称
+        options (dict): 传给动作的选项
+        extensions: 接受的扩展名，默认使用动作的默认值
+    """
+
+    def __init__(self, path: str, action: str, options: dict = None, extensions=None):
+        if action not in ACTIONS:
+            raise ValueError(f"热文件夹 {path}: 未知的动作 {action}，可用的动作: {', '.join(ACTIONS)}")
+        self.path = os.path.abspath(path)
+        self.action = action
+        self.options = dict(options or {})
+        self.func, default_extensions = ACTIONS[action]
+        extensions = extensions or default_extensions
+        self.extensions = tuple(e.lower() for e in extensions) if extensions else None
+        self.in_dir = os.path.join(self.path, "in")
+        self.out_dir = os.path.join(self.path, "out")
+        self.done_dir = os.path.join(self.path, "done")
+        self.failed_dir = os.path.join(self.path, "failed")
+
+    @classmethod
+    def from_dict(cls, entry: dict):
+        if not isinstance(entry, dict) or not entry.get("path") or not entry.get("action"):
+            raise ValueError(f"热文件夹配置需要 path 和 action: {entry}")
+        return cls(entry["path"], entry["action"], entry.get("options"), entry.get("extensions"))
+
+    def create_dirs(self) -> None:
+        for directory in (self.in_dir, self.out_dir, self.done_dir, self.failed_dir):
+            os.makedirs(directory, exist_ok=True)
+
+    def accepts(self, name: str) -> bool:
+        lower = name.lower()
+        if name.startswith(".") or lower.endswith(IGNORED_SUFFIXES):
+            return False
+        return self.extensions is None or lower.endswith(self.extensions)
+
+def load_folders(config_path: str = None) -> list:
+    """
+    读取热文件夹配置。
+
+    Args:
+        config_path (str): 单独的JSON配置文件，默认使用配置项 hot_folders
+
+    Returns:
+        list: HotFolder 列表
+    """
+    if config_path:
+        with open(config_path, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+        if isinstance(entries, dict):
+            entries = entries.get("hot_folders") or []
+    else:
+        entries = get_config().get("hot_folders") or []
+    return [HotFolder.from_dict(entry) for entry in entries]
+
+class HotFolderState:
+    """
+    处理中文件的持久化状态，每次修改后立即写入文件。
+
+    键为 "输入路径|大小|修改时间"，文件被替换成同名的新文件时会重新处理。
+    状态: running(处理中) / done(处理成功，待移入 done) / failed(处理失败，待移入 failed)
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or os.path.join(get_data_dir(), STATE_FILE)
+        self.lock = threading.Lock()
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    @staticmethod
+    def key(path: str, stat) -> str:
+        return f"{path}|{stat.st_size}|{stat.st_mtime_ns}"
+
+    def get(self, key: str):
+        with self.lock:
+            return self.entries.get(key)
+
+    def set(self, key: str, **fields) -> None:
+        with self.lock:
+            self.entries[key] = dict(fields, time=time.strftime("%Y-%m-%d %H:%M:%S"))
+            self._save()
+
+    def remove(self, key: str) -> None:
+        with self.lock:
+            if self.entries.pop(key, None) is not None:
+                self._save()
+
+    def items(self) -> list:
+        with self.lock:
+            return list(self.entries.items())
+
+    def _save(self) -> None:
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+def _move(path: str, directory: str) -> str:
+    """把文件移入目录，重名时在文件名后加时间"""
+    target = os.path.join(directory, os.path.basename(path))
+    if os.path.exists(target):
+        name, ext = os.path.splitext(os.path.basename(path))
+        target = os.path.join(directory, f"{name}_{time.strftime('%Y%m%d_%H%M%S')}{ext}")
+    shutil.move(path, target)
+    return target
+
+class HotFolderDaemon:
+    """
+    热文件夹监视进程。
+
+    Args:
+        folders: HotFolder 列表
+        workers (int): 同时处理的文件数
+        settle_seconds (float): 文件大小和修改时间保持不变多久后开始处理
+        interval (float): 检查间隔(秒)
+        watch_mode (str): auto / inotify / polling
+        state: HotFolderState，默认使用数据目录下的状态文件
+
+    使用示例：
+    daemon = HotFolderDaemon(load_folders(), workers=2)
+    daemon.run(progress)  # 一直运行，直到调用 daemon.stop()
+    """
+
+    def __init__(self, folders, workers: int = 2, settle_seconds: float = 2.0, interval: float = 0.5,
+                 watch_mode: str = "auto", state: HotFolderState = None):
+        if not folders:
+            raise ValueError("没有配置热文件夹，请在配置项 hot_folders 中添加")
+        self.folders = {folder.in_dir: folder for folder in folders}
+        self.workers = max(1, int(workers))
+        self.settle_seconds = settle_seconds
+        self.interval = interval
+        self.watch_mode = watch_mode
+        self.state = state or HotFolderState()
+        # 路径 -> (大小, 修改时间, 开始保持不变的时间)
+        self.pending = {}
+        # 路径 -> Future
+        self.running = {}
+        self.processed = 0
+        self.failed = 0
+        self._stop = threading.Event()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def recover(self) -> None:
+        """处理上次运行留下的状态：已完成的文件直接移走，中断的文件重新处理"""
+        for key, entry in self.state.items():
+            path = key.rsplit("|", 2)[0]
+            folder = self.folders.get(os.path.dirname(path))
+            status = entry.get("status")
+            try:
+                stat = os.stat(path)
+            except OSError:
+                self.state.remove(key)
+                continue
+            if folder is None or HotFolderState.key(path, stat) != key or status == "running":
+                self.state.remove(key)
+                continue
+            _move(path, folder.done_dir if status == "done" else folder.failed_dir)
+            self.state.remove(key)
+
+    def scan(self, in_dir: str) -> None:
+        """把 in 目录中新出现的文件加入等待列表"""
+        folder = self.folders[in_dir]
+        try:
+            names = os.listdir(in_dir)
+        except OSError:
+            return
+        for name in names:
+            path = os.path.join(in_dir, name)
+            if path in self.pending or path in self.running or not folder.accepts(name):
+                continue
+            if os.path.isfile(path):
+                self.pending[path] = (None, None, None)
+
+    def _ready(self, now: float) -> list:
+        """返回已经写完(在 settle_seconds 内没有变化且可以打开)的文件"""
+        ready = []
+        for path, (size, mtime, since) in list(self.pending.items()):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                # 文件被删除或移走
+                del self.pending[path]
+                continue
+            if (stat.st_size, stat.st_mtime_ns) != (size, mtime):
+                self.pending[path] = (stat.st_size, stat.st_mtime_ns, now)
+                continue
+            if now - since < self.settle_seconds:
+                continue
+            try:
+                # Windows 上正在被其他程序写入的文件无法打开
+                with open(path, "rb"):
+                    pass
+            except OSError:
+                continue
+            del self.pending[path]
+            ready.append((path, stat))
+        return ready
+
+    def process(self, path: str, stat) -> dict:
+        """
+        处理一个文件并把它移入 done 或 failed(在工作线程中调用)。
+
+        Returns:
+            dict: {"input": 输入文件, "status": "done"/"failed", "outputs": [...], "error": 错误信息}
+        """
+        folder = self.folders[os.path.dirname(path)]
+        key = HotFolderState.key(path, stat)
+        os.makedirs(folder.out_dir, exist_ok=True)
+        self.state.set(key, status="running")
+        outputs = []
+        error = None
+        try:
+            result = folder.func(path, folder.out_dir, folder.options, None)
+            outputs = (result or {}).get("outputs") or []
+        except Exception as e:
+            error = f"{type(e).__name__}: {str(e)}"
+        status = "done" if error is None else "failed"
+        self.state.set(key, status=status, outputs=outputs, error=error)
+
+        target = _move(path, folder.done_dir if error is None else folder.failed_dir)
+        if error is not None:
+            with open(target + ".error.txt", "w", encoding="utf-8") as f:
+                f.write(error + "\n")
+        self.state.remove(key)
+        return {"input": path, "status": status, "outputs": outputs, "error": error, "moved_to": target}
+
+    def _collect(self, progress) -> None:
+        """取出已完成的处理结果"""
+        for path, future in list(self.running.items()):
+            if not future.done():
+                continue
+            del self.running[path]
+            try:
+                result = future.result()
+            except Exception as e:
+                # 移动文件或写状态失败，文件留在 in 目录中，下次扫描时重试
+                self.failed += 1
+                message = f"无法完成 {os.path.basename(path)}: {str(e)}"
+            else:
+                if result["status"] == "done":
+                    self.processed += 1
+                    message = f"已处理 {os.path.basename(path)}"
+                else:
+                    self.failed += 1
+                    message = f"处理失败 {os.path.basename(path)}: {result['error']}"
+            if progress is not None:
+                progress(self.processed + self.failed, 0, message)
+
+    def run(self, progress=None, once: bool = False) -> dict:
+        """
+        开始监视，直到调用 stop()。
+
+        Args:
+            progress: 进度回调，每处理完一个文件调用一次(总数未知，为0)
+            once (bool): 处理完当前已有的文件后退出
+
+        Returns:
+            dict: {"processed": 成功数, "failed": 失败数}
+        """
+        for folder in self.folders.values():
+            folder.create_dirs()
+        self.recover()
+        watcher = DirectoryWatcher(list(self.folders), self.watch_mode)
+        if progress is not None:
+            progress(0, 0, f"正在监视 {len(self.folders)} 个热文件夹 ({watcher.mode})")
+        last_scan = 0
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                while not self._stop.is_set():
+                    now = time.monotonic()
+                    changed = watcher.poll()
+                    if now - last_scan >= RESCAN_SECONDS:
+                        changed = set(self.folders)
+                        last_scan = now
+                    for in_dir in changed:
+                        self.scan(in_dir)
+                    for path, stat in self._ready(now):
+                        self.running[path] = pool.submit(self.process, path, stat)
+                    self._collect(progress)
+                    if once and not self.pending and not self.running:
+                        break
+                    self._stop.wait(self.interval)
+                # 停止时等待正在处理的文件完成
+                for future in self.running.values():
+                    future.exception()
+                self._collect(progress)
+        finally:
+            watcher.close()
+        return {"processed": self.processed, "failed": self.failed}
@@ -0,0 +1,287 @@
+# 禁止生成 .pyc 文件
+import sys
+sys.dont_write_bytecode = True
+
+import itertools
+import json
+import os
+import subprocess
+import threading
+import time
+
+# 命令行命令所属的工具分类，用于分类并发限制(按前缀匹配，先匹配先生效)
+COMMAND_CATEGORIES = [
+    ("image-to-pdf", "PDF工具"),
+    ("pdf-", "PDF工具"),
+    ("image-", "图片工具"),
+    ("audio-", "音频工具"),
+    ("dir-tree", "文件工具"),
+    ("clean-empty", "文件工具"),
+    ("pipeline", "流水线"),
+    ("watch", "热文件夹"),
+    ("serve", "HTTP服务"),
+]
+
+# 长期运行的服务命令(不会自己结束)，不占用并发名额，提交后立即启动
+SERVICE_COMMANDS = {"watch", "serve"}
+
+# 任务状态
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+STATE_NAMES = {
+    QUEUED: "排队中",
+    RUNNING: "运行中",
+    DONE: "已完成",
+    FAILED: "失败",
+    CANCELLED: "已取消",
+}
+
+def get_command_category(command: str) -> str:
+    """根据命令名获取所属的工具分类"""
+    for prefix, category in COMMAND_CATEGORIES:
+        if command.startswith(prefix):
+            return category
+    return "其他工具"
+
+class Job:
+    """
+    调度器中的一个任务，对应一次命令行工具的运行。
+
+    进度字段由后台线程根据命令行输出的JSON事件更新，
+    界面线程只读取这些字段。
+    """
+
+    def __init__(self, job_id: int, argv, name: str, category: str, priority: int, service: bool = False):
+        self.id = job_id
+        self.argv = list(argv)
+        self.name = name
+        self.category = category
+        self.priority = priority
+        self.service = service
+        self.state = QUEUED
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.done = 0
+        self.total = 0
+        self.message = ""
+        self.result = None
+        self.error = None
+        self.process = None
+        self.cancel_requested = False
+
+    def elapsed(self) -> float:
+        """运行时间(秒)，尚未开始时为0"""
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+    def throughput(self) -> float:
+        """每秒完成的进度单位数(页、图片等)"""
+        elapsed = self.elapsed()
+        if elapsed <= 0:
+            return 0.0
+        return self.done / elapsed
+
+    def is_finished(self) -> bool:
+        return self.state in (DONE, FAILED, CANCELLED)
+
+class JobScheduler:
+    """
+    启动器级别的任务调度器。
+
+    任务以独立进程运行命令行模式(run 命令)，调度器限制全局同时运行的任务数，
+    以及每个工具分类同时运行的任务数，避免多个大任务同时争抢CPU和内存。
+    优先级高的任务先运行，同优先级按提交顺序运行。
+    热文件夹监视等服务任务不会自己结束，不计入并发限制，提交后立即启动。
+
+    使用示例：
+    scheduler = JobScheduler(launcher_path, max_jobs=2, category_limits={"PDF工具": 1})
+    job = scheduler.submit(["pdf-to-image", "--in", "a.pdf", "--out", "out"], priority=1)
+    scheduler.cancel(job.id)
+    """
+
+    def __init__(self, runner: str, max_jobs: int = 2, category_limits=None):
+        self.runner = runner
+        self.max_jobs = max_jobs
+        self.category_limits = dict(category_limits or {})
+        self.jobs = []
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1)
+        self.closed = False
+        # 任务进程启动后的回调 on_process(任务, Popen)，在后台线程中调用，用于进程监控
+        self.on_process = None
+
+    def submit(self, argv, name: str = None, category: str = None, priority: int = 0,
+               service: bool = None) -> Job:
+        """
+        提交一个任务。
+
+        Args:
+            argv: 命令行参数，如 ["pdf-split", "--in", "a.pdf", "--every", "10", "--out", "dir"]
+            name (str): 显示名称，默认使用命令名
+            category (str): 工具分类，默认根据命令名推断
+            priority (int): 优先级，数字越大越先运行
+            service (bool): 是否是长期运行的服务任务，默认根据命令名(SERVICE_COMMANDS)判断
+
+        Returns:
+            Job: 新建的任务
+        """
+        if not argv:
+            raise ValueError("任务命令不能为空")
+        with self.lock:
+            if service is None:
+                service = argv[0] in SERVICE_COMMANDS
+            job = Job(next(self.ids), argv, name or argv[0],
+                      category or get_command_category(argv[0]), priority, service)
+            self.jobs.append(job)
+        self._dispatch()
+        return job
+
+    def cancel(self, job_id: int) -> bool:
+        """
+        取消任务。排队中的任务直接移出队列，运行中的任务会被结束。
+
+        Returns:
+            bool: 任务是否被取消
+        """
+        with self.lock:
+            job = self.get_job(job_id)
+            if job is None or job.is_finished():
+                return False
+            job.cancel_requested = True
+            if job.state == QUEUED:
+                job.state = CANCELLED
+                job.finished = time.time()
+                return True
+            process = job.process
+        if process is not None:
+            process.terminate()
+        return True
+
+    def get_job(self, job_id: int):
+        """根据编号查找任务"""
+        for job in self.jobs:
+            if job.id == job_id:
+                return job
+        return None
+
+    def set_limits(self, max_jobs: int = None, category_limits=None) -> None:
+        """修改并发限制，放宽限制后会立即启动等待中的任务"""
+        with self.lock:
+            if max_jobs is not None:
+                self.max_jobs = max_jobs
+            if category_limits is not None:
+                self.category_limits = dict(category_limits)
+        self._dispatch()
+
+    def clear_finished(self) -> None:
+        """从列表中移除已结束的任务"""
+        with self.lock:
+            self.jobs = [job for job in self.jobs if not job.is_finished()]
+
+    def counts(self) -> dict:
+        """各状态的任务数量"""
+        counts = {state: 0 for state in STATE_NAMES}
+        with self.lock:
+            for job in self.jobs:
+                counts[job.state] += 1
+        return counts
+
+    def shutdown(self) -> None:
+        """取消所有未结束的任务"""
+        self.closed = True
+        with self.lock:
+            job_ids = [job.id for job in self.jobs if not job.is_finished()]
+        for job_id in job_ids:
+            self.cancel(job_id)
+
+    def _dispatch(self) -> None:
+        """在并发限制允许的范围内启动排队中的任务"""
+        to_start = []
+        with self.lock:
+            if self.closed:
+                return
+            # 服务任务一直运行，计入并发限制会永久占用名额，使其他任务一直排队
+            running = [job for job in self.jobs if job.state == RUNNING and not job.service]
+            per_category = {}
+            for job in running:
+                per_category[job.category] = per_category.get(job.category, 0) + 1
+            queued = sorted((job for job in self.jobs if job.state == QUEUED),
+                            key=lambda job: (-job.priority, job.id))
+            slots = self.max_jobs - len(running)
+            for job in queued:
+                if not job.service:
+                    if slots <= 0:
+                        continue
+                    limit = self.category_limits.get(job.category)
+                    if limit is not None and per_category.get(job.category, 0) >= limit:
+                        continue
+                    per_category[job.category] = per_category.get(job.category, 0) + 1
+                    slots -= 1
+                job.state = RUNNING
+                job.started = time.time()
+                to_start.append(job)
+        for job in to_start:
+            threading.Thread(target=self._run, args=(job,), daemon=True).start()
+
+    def _run(self, job: Job) -> None:
+        """在后台线程中运行任务并读取进度"""
+        env = dict(os.environ, PYTHONIOENCODING="utf-8")
+        try:
+            process = subprocess.Popen(
+                [sys.executable, self.runner, "run"] + job.argv,
+                stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                stdin=subprocess.DEVNULL, encoding="utf-8", errors="replace", env=env
+            )
+        except OSError as e:
+            self._finish(job, FAILED, error=str(e))
+            return
+        with self.lock:
+            job.process = process
+            cancelled = job.cancel_requested
+        if self.on_process is not None:
+            self.on_process(job, process)
+        if cancelled:
+            process.terminate()
+
+        # 标准错误合并到标准输出，避免管道写满阻塞；非JSON的行只保留最后几行用于报错
+        other_lines = []
+        for line in process.stdout:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                other_lines = (other_lines + [line.rstrip()])[-10:]
+                continue
+            if not isinstance(event, dict):
+                continue
+            kind = event.get("event")
+            if kind == "progress":
+                job.done = event.get("done", 0)
+                job.total = event.get("total", 0)
+                job.message = event.get("message", "")
+            elif kind == "done":
+                job.result = event.get("result")
+            elif kind == "error":
+                job.error = event.get("error")
+        returncode = process.wait()
+
+        if job.cancel_requested:
+            self._finish(job, CANCELLED)
+        elif returncode == 0:
+            self._finish(job, DONE)
+        else:
+            self._finish(job, FAILED, error=job.error or "\n".join(other_lines) or f"退出码 {returncode}")
+
+    def _finish(self, job: Job, state: str, error: str = None) -> None:
+        with self.lock:
+            job.state = state
+            job.finished = time.time()
+            job.process = None
+            if error:
+                job.error = error
+        self._dispatch()
@@ -0,0 +1,189 @@
+# 禁止生成 .pyc 文件
+import sys
+sys.dont_write_bytecode = True
+
+import shlex
+import tkinter as tk
+from tkinter import ttk, messagebox
+
+from RenWuDiaoDu import STATE_NAMES, QUEUED, RUNNING
+from MingLingHang import list_commands
+
+class JobPanel:
+    """
+    任务队列面板，显示排队中、运行中和已结束的任务。
+
+    面板打开期间每隔 refresh_ms 毫秒从调度器读取一次任务状态，
+    关闭面板不会影响任务的运行。
+
+    使用示例：
+    panel = JobPanel(root, scheduler)
+    """
+
+    COLUMNS = [
+        ("id", "编号", 40),
+        ("name", "任务", 140),
+        ("category", "分类", 70),
+        ("priority", "优先级", 50),
+        ("state", "状态", 60),
+        ("progress", "进度", 70),
+        ("elapsed", "耗时", 60),
+        ("rate", "速度", 60),
+    ]
+
+    def __init__(self, master, scheduler, refresh_ms: int = 500):
+        self.master = master
+        self.scheduler = scheduler
+        self.refresh_ms = refresh_ms
+
+        self.window = tk.Toplevel(master)
+        self.window.title("任务队列")
+        self.window.geometry("620x360")
+
+        # 任务列表
+        self.tree = ttk.Treeview(self.window, columns=[c[0] for c in self.COLUMNS],
+                                 show="headings", selectmode="extended")
+        for key, title, width in self.COLUMNS:
+            self.tree.heading(key, text=title)
+            self.tree.column(key, width=width, anchor="center")
+        self.tree.column("name", anchor="w")
+        scrollbar = ttk.Scrollbar(self.window, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+
+        # 操作按钮
+        button_frame = ttk.Frame(self.window)
+        button_frame.pack(side="bottom", fill="x", padx=10, pady=5)
+        ttk.Button(button_frame, text="新建任务", command=self.new_job).pack(side="left", padx=5)
+        ttk.Button(button_frame, text="取消任务", command=self.cancel_selected).pack(side="left", padx=5)
+        ttk.Button(button_frame, text="清除已结束", command=self.clear_finished).pack(side="left", padx=5)
+        self.summary_var = tk.StringVar()
+        ttk.Label(button_frame, textvariable=self.summary_var).pack(side="right", padx=5)
+
+        self.tree.pack(side="left", fill="both", expand=True, padx=(10, 0), pady=5)
+        scrollbar.pack(side="right", fill="y", padx=(0, 10), pady=5)
+        self.tree.bind("<Double-1>", self.show_details)
+
+        self.refresh()
+
+    def refresh(self):
+        """根据调度器的任务列表更新表格"""
+        if not self.window.winfo_exists():
+            return
+        with self.scheduler.lock:
+            jobs = list(self.scheduler.jobs)
+        existing = set(self.tree.get_children())
+        current = set()
+        for job in jobs:
+            item = str(job.id)
+            current.add(item)
+            progress = f"{job.done}/{job.total}" if job.total else "-"
+            rate = f"{job.throughput():.1f}/s" if job.state == RUNNING or job.done else "-"
+            elapsed = f"{job.elapsed():.1f}s" if job.started else "-"
+            values = (job.id, job.name, job.category, job.priority,
+                      STATE_NAMES[job.state], progress, elapsed, rate)
+            if item in existing:
+                self.tree.item(item, values=values)
+            else:
+                self.tree.insert("", "end", iid=item, values=values)
+        for item in existing - current:
+            self.tree.delete(item)
+
+        counts = self.scheduler.counts()
+        self.summary_var.set(f"排队 {counts[QUEUED]}，运行 {counts[RUNNING]}，"
+                             f"最多同时 {self.scheduler.max_jobs} 个")
+        self.window.after(self.refresh_ms, self.refresh)
+
+    def selected_jobs(self):
+        return [self.scheduler.get_job(int(item)) for item in self.tree.selection()]
+
+    def cancel_selected(self):
+        """取消选中的任务"""
+        jobs = [job for job in self.selected_jobs() if job is not None and not job.is_finished()]
+        if not jobs:
+            messagebox.showinfo("提示", "请先选择未结束的任务", parent=self.window)
+            return
+        for job in jobs:
+            self.scheduler.cancel(job.id)
+
+    def clear_finished(self):
+        self.scheduler.clear_finished()
+
+    def show_details(self, event=None):
+        """显示任务的命令、结果或错误信息"""
+        jobs = [job for job in self.selected_jobs() if job is not None]
+        if not jobs:
+            return
+        job = jobs[0]
+        lines = [f"命令: {' '.join(shlex.quote(arg) for arg in job.argv)}",
+                 f"状态: {STATE_NAMES[job.state]}"]
+        if job.message:
+            lines.append(f"当前: {job.message}")
+        if job.error:
+            lines.append(f"错误: {job.error}")
+        if job.result:
+            outputs = job.result.get("outputs") if isinstance(job.result, dict) else None
+            if outputs:
+                lines.append(f"输出文件: {len(outputs)} 个")
+                lines.extend(outputs[:10])
+        messagebox.showinfo(f"任务 {job.id}", "\n".join(lines), parent=self.window)
+
+    def new_job(self):
+        """打开新建任务对话框"""
+        NewJobDialog(self.window, self.scheduler)
+
+class NewJobDialog:
+    """新建任务对话框，选择命令并填写命令行参数"""
+
+    def __init__(self, master, scheduler):
+        self.scheduler = scheduler
+        self.commands = list_commands()
+
+        self.window = tk.Toplevel(master)
+        self.window.title("新建任务")
+        self.window.resizable(False, False)
+        self.window.transient(master)
+
+        frame = ttk.Frame(self.window, padding=10)
+        frame.pack(fill="both", expand=True)
+
+        ttk.Label(frame, text="命令:").grid(row=0, column=0, sticky="w", pady=5)
+        self.command_var = tk.StringVar()
+        names = [f"{name} - {help_text}" for name, help_text in self.commands]
+        command_box = ttk.Combobox(frame, textvariable=self.command_var, values=names,
+                                   state="readonly", width=40)
+        command_box.grid(row=0, column=1, sticky="ew", pady=5)
+        if names:
+            command_box.current(0)
+
+        ttk.Label(frame, text="参数:").grid(row=1, column=0, sticky="w", pady=5)
+        self.args_var = tk.StringVar()
+        ttk.Entry(frame, textvariable=self.args_var, width=42).grid(row=1, column=1, sticky="ew", pady=5)
+        ttk.Label(frame, text='例如: --in "a.pdf" --every 10 --out "输出目录"',
+                  foreground="gray").grid(row=2, column=1, sticky="w")
+
+        ttk.Label(frame, text="优先级:").grid(row=3, column=0, sticky="w", pady=5)
+        self.priority_var = tk.IntVar(value=0)
+        ttk.Spinbox(frame, from_=-10, to=10, width=5,
+                    textvariable=self.priority_var).grid(row=3, column=1, sticky="w", pady=5)
+
+        button_frame = ttk.Frame(frame)
+        button_frame.grid(row=4, column=0, columnspan=2, sticky="e", pady=(10, 0))
+        ttk.Button(button_frame, text="提交", command=self.submit).pack(side="left", padx=5)
+        ttk.Button(button_frame, text="取消", command=self.window.destroy).pack(side="left", padx=5)
+
+    def submit(self):
+        command = self.command_var.get().split(" - ")[0]
+        if not command:
+            messagebox.showwarning("警告", "请选择命令", parent=self.window)
+            return
+        try:
+            args = shlex.split(self.args_var.get(), posix=(sys.platform != "win32"))
+            priority = self.priority_var.get()
+        except (ValueError, tk.TclError) as e:
+            messagebox.showerror("错误", f"参数无效: {str(e)}", parent=self.window)
+            return
+        if sys.platform == "win32":
+            # Windows 下 shlex 非 posix 模式会保留引号
+            args = [arg[1:-1] if len(arg) > 1 and arg[0] == arg[-1] == '"' else arg for arg in args]
+        self.scheduler.submit([command] + args, priority=priority)
+        self.window.destroy()
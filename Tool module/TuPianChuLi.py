@@ -0,0 +1,405 @@
+# 禁止生成 .pyc 文件
+import sys
+sys.dont_write_bytecode = True
+
+import io
+import math
+import os
+import random
+
+from YanChiDaoRu import lazy_import
+from XingNengFenXi import profiled
+from YaoCe import recorded
+from JieGuoHuanCun import cached
+from DuanDianXuChuan import Checkpoint
+from NeiCunGuanLi import format_mb, get_governor, report_decision
+
+# Pillow 在第一次处理图片时才导入
+Image = lazy_import("PIL.Image")
+
+# 图片工具的核心处理逻辑。
+# 本模块不依赖 tkinter，图形界面工具和命令行都调用这里的函数。
+# 所有函数都可以传入 progress 回调 progress(已完成数, 总数, 说明) 来报告进度，
+# 出错时抛出异常，由调用方决定如何提示用户。
+
+# 格式转换支持的图片格式
+SUPPORTED_FORMATS = [
+    'jpg', 'jpeg', 'png', 'webp',
+    'bmp', 'gif', 'tiff', 'psd'
+]
+
+def _report(progress, done, total, message=""):
+    """调用进度回调(如果有)"""
+    if progress is not None:
+        progress(done, total, message)
+
+def convert_image(input_path: str, output_path: str, output_format: str, quality: int = 100) -> None:
+    """
+    转换单个图片的格式。
+
+    Args:
+        input_path (str): 输入图片路径
+        output_path (str): 输出图片路径
+        output_format (str): 输出格式，如 png/jpg/webp
+        quality (int): 输出质量(1-100)，对JPEG/WEBP为压缩质量，对PNG映射为压缩级别
+    """
+    with Image.open(input_path) as img:
+        img.save(output_path, **_save_args(output_format, quality))
+
+def _save_args(output_format: str, quality: int) -> dict:
+    """根据输出格式和质量生成 Image.save 的参数"""
+    quality = max(1, min(100, quality))
+    # PIL 使用 JPEG 作为 jpg 的格式名
+    format_name = 'JPEG' if output_format.lower() == 'jpg' else output_format.upper()
+    save_args = {'format': format_name}
+    if output_format.lower() in ['jpg', 'jpeg', 'webp']:
+        save_args['quality'] = quality
+    elif output_format.lower() == 'png':
+        save_args['compress_level'] = 9 - int(quality / 11.11)  # 将1-100映射到9-0
+    return save_args
+
+def encode_image(image, output_format: str, quality: int = 100) -> bytes:
+    """
+    在内存中将图片编码为指定格式。
+
+    JPEG 不支持透明通道，带透明通道或调色板的图片会先转换为RGB。
+
+    Returns:
+        bytes: 编码后的图片数据
+    """
+    save_args = _save_args(output_format, quality)
+    if save_args['format'] == 'JPEG' and image.mode not in ('RGB', 'L', 'CMYK'):
+        image = image.convert('RGB')
+    buffer = io.BytesIO()
+    image.save(buffer, **save_args)
+    return buffer.getvalue()
+
+def list_images(input_dir: str) -> list:
+    """列出目录中格式转换支持的图片文件名"""
+    extensions = tuple('.' + fmt for fmt in SUPPORTED_FORMATS)
+    return [f for f in os.listdir(input_dir) if f.lower().endswith(extensions)]
+
+@recorded("image-convert")
+@cached("image-convert", inputs=("input_dir",), output="output_dir")
+@profiled("image-convert")
+def convert_images(input_dir: str, output_dir: str, output_format: str, quality: int = 100,
+                   should_overwrite=None, progress=None) -> dict:
+    """
+    批量转换目录中的图片格式。
+
+    Args:
+        input_dir (str): 输入目录
+        output_dir (str): 输出目录
+        output_format (str): 输出格式
+        quality (int): 输出质量(1-100)
+        should_overwrite: 输出文件已存在时的回调 should_overwrite(路径) -> bool，默认直接覆盖
+        progress: 进度回调
+
+    Returns:
+        dict: {"outputs": 成功的输出文件, "failed": [(输入文件, 错误信息)], "resumed": 从上次中断处跳过的文件数}
+    """
+    image_files = list_images(input_dir)
+    total = len(image_files)
+    outputs = []
+    failed = []
+    identity = [os.path.abspath(input_dir), os.path.abspath(output_dir), output_format, quality]
+    with Checkpoint("image-convert", identity, total) as checkpoint:
+        for i, filename in enumerate(image_files):
+            input_path = os.path.join(input_dir, filename)
+            name, ext = os.path.splitext(filename)
+            output_path = os.path.join(output_dir, f"{name}.{output_format}")
+            try:
+                # 输入文件被修改后项目标识随之变化，会重新转换
+                stat = os.stat(input_path)
+                item = [filename, stat.st_size, stat.st_mtime_ns]
+                if checkpoint.is_done(item):
+                    outputs.append(output_path)
+                elif os.path.exists(output_path) and should_overwrite is not None and \
+                        not should_overwrite(output_path):
+                    failed.append((input_path, "用户取消操作"))
+                else:
+                    convert_image(input_path, output_path, output_format, quality)
+                    checkpoint.record(item, [output_path])
+                    outputs.append(output_path)
+            except Exception as e:
+                failed.append((input_path, str(e)))
+            _report(progress, i + 1, total, filename)
+    return {"outputs": outputs, "failed": failed, "resumed": checkpoint.resumed}
+
+@recorded("image-grid")
+@cached("image-grid", inputs=("input_path",), output="output_dir")
+@profiled("image-grid")
+def split_grid(input_path: str, output_dir: str, rows: int = 3, cols: int = 3, progress=None) -> dict:
+    """
+    将图片分割为网格(默认九宫格)。
+
+    小图保存在输出目录下的 "<图片名>_split" 子目录中。
+
+    Args:
+        input_path (str): 输入图片路径
+        output_dir (str): 输出目录
+        rows (int): 行数
+        cols (int): 列数
+        progress: 进度回调
+
+    Returns:
+        dict: {"outputs": 小图文件列表, "output_dir": 输出子目录, "pixels": 原图像素数}
+    """
+    # 获取输入文件名(不带扩展名)
+    base_name = os.path.splitext(os.path.basename(input_path))[0]
+    # 创建子文件夹路径
+    save_dir = os.path.join(output_dir, base_name + "_split")
+    os.makedirs(save_dir, exist_ok=True)
+
+    outputs = []
+    with Image.open(input_path) as img:
+        width, height = img.size
+        total = rows * cols
+        for (i, j), tile in split_image(img, rows, cols):
+            output_path = os.path.join(save_dir, f'{base_name}_tile_{i}_{j}.png')
+            tile.save(output_path)
+            outputs.append(output_path)
+            _report(progress, (i * cols) + j + 1, total, output_path)
+    return {"outputs": outputs, "output_dir": save_dir, "pixels": width * height}
+
+def split_image(img, rows: int = 3, cols: int = 3):
+    """
+    将内存中的图片按网格切分。
+
+    Yields:
+        ((行, 列), 小图)
+    """
+    width, height = img.size
+
+    # 计算每个小块的尺寸
+    tile_width = width // cols
+    tile_height = height // rows
+
+    for i in range(rows):
+        for j in range(cols):
+            left = j * tile_width
+            upper = i * tile_height
+            yield (i, j), img.crop((left, upper, left + tile_width, upper + tile_height))
+
+@recorded("image-ico")
+@cached("image-ico", inputs=("input_path",), output="output_path")
+@profiled("image-ico")
+def image_to_ico(input_path: str, output_path: str, size) -> dict:
+    """
+    将图片缩放后保存为ICO图标。
+
+    Args:
+        input_path (str): 输入图片路径
+        output_path (str): 输出ICO路径
+        size: (宽, 高)
+
+    Returns:
+        dict: {"outputs": [输出文件], "pixels": 原图像素数}
+    """
+    width, height = size
+    if not (16 <= width <= 256 and 16 <= height <= 256):
+        raise ValueError("尺寸必须在16x16到256x256之间")
+    with Image.open(input_path) as image:
+        pixels = image.size[0] * image.size[1]
+        resized_img = image.resize((width, height), Image.LANCZOS)
+    resized_img.save(output_path)
+    return {"outputs": [output_path], "pixels": pixels}
+
+def _compressed_size(size):
+    """compress_image 压缩后的尺寸"""
+    original_size = size[0] * size[1]
+    target_size = 1024 * 1024
+    if original_size <= target_size:
+        return size
+
+    # 计算压缩比例
+    ratio = math.sqrt(target_size / original_size)
+    return int(size[0] * ratio), int(size[1] * ratio)
+
+def compress_image(image):
+    """将超过约1百万像素的图片等比例缩小"""
+    new_size = _compressed_size(image.size)
+    if new_size == image.size:
+        return image
+
+    # 高质量压缩
+    return image.resize(new_size, Image.Resampling.LANCZOS)
+
+def uniform_layout(images):
+    """均匀分布布局"""
+    # 计算网格行列数
+    img_count = len(images)
+    cols = math.ceil(math.sqrt(img_count))
+    rows = math.ceil(img_count / cols)
+
+    # 计算每张图片的最大尺寸
+    max_width = max(img.size[0] for img in images)
+    max_height = max(img.size[1] for img in images)
+
+    canvas = Image.new('RGB', (cols * max_width, rows * max_height), (255, 255, 255))
+    for i, img in enumerate(images):
+        row = i // cols
+        col = i % cols
+        canvas.paste(img, (col * max_width, row * max_height))
+    return canvas
+
+def horizontal_layout(images):
+    """水平排列布局"""
+    total_width = sum(img.size[0] for img in images)
+    max_height = max(img.size[1] for img in images)
+
+    canvas = Image.new('RGB', (total_width, max_height), (255, 255, 255))
+    x_offset = 0
+    for img in images:
+        canvas.paste(img, (x_offset, 0))
+        x_offset += img.size[0]
+    return canvas
+
+def vertical_layout(images):
+    """垂直排列布局"""
+    max_width = max(img.size[0] for img in images)
+    total_height = sum(img.size[1] for img in images)
+
+    canvas = Image.new('RGB', (max_width, total_height), (255, 255, 255))
+    y_offset = 0
+    for img in images:
+        canvas.paste(img, (0, y_offset))
+        y_offset += img.size[1]
+    return canvas
+
+def _check_overlap(rect1, rect2):
+    """检查两个矩形是否重叠"""
+    return not (rect1[2] <= rect2[0] or
+                rect1[0] >= rect2[2] or
+                rect1[3] <= rect2[1] or
+                rect1[1] >= rect2[3])
+
+def random_layout(images):
+    """随机分布布局"""
+    # 计算画布大小 (所有图片总面积的1.5倍)
+    total_area = sum(img.size[0] * img.size[1] for img in images)
+    canvas_size = int(math.sqrt(total_area) * 1.5)
+
+    canvas = Image.new('RGB', (canvas_size, canvas_size), (255, 255, 255))
+
+    # 随机放置图片，每张最多尝试100次
+    placed = []
+    for img in images:
+        for _ in range(100):
+            x = random.randint(0, max(0, canvas_size - img.size[0]))
+            y = random.randint(0, max(0, canvas_size - img.size[1]))
+            new_rect = (x, y, x + img.size[0], y + img.size[1])
+            if not any(_check_overlap(new_rect, existing) for existing in placed):
+                canvas.paste(img, (x, y))
+                placed.append(new_rect)
+                break
+    return canvas
+
+LAYOUTS = {
+    "uniform": uniform_layout,
+    "horizontal": horizontal_layout,
+    "vertical": vertical_layout,
+}
+
+def _canvas_pixels(sizes, layout: str, random_distribute: bool) -> int:
+    """按布局模式估算合成画布的像素数"""
+    widths = [w for w, _ in sizes]
+    heights = [h for _, h in sizes]
+    if random_distribute:
+        # 画布边长是总面积平方根的1.5倍
+        return int(sum(w * h for w, h in sizes) * 2.25)
+    if layout == "horizontal":
+        return sum(widths) * max(heights)
+    if layout == "vertical":
+        return max(widths) * sum(heights)
+    cols = math.ceil(math.sqrt(len(sizes)))
+    rows = math.ceil(len(sizes) / cols)
+    return cols * max(widths) * rows * max(heights)
+
+@recorded("image-combine")
+@profiled("image-combine")
+def combine_images(image_paths, layout: str = "uniform", random_distribute: bool = False,
+                   random_select: int = 0, progress=None):
+    """
+    将多张图片合成为一张。
+
+    合成前按图片尺寸和布局估算内存(全部图片加上画布)，超过内存预算时在加载时按比例缩小图片。
+
+    Args:
+        image_paths: 图片路径列表
+        layout (str): uniform/horizontal/vertical
+        random_distribute (bool): 是否随机分布(优先于布局模式)
+        random_select (int): 大于0时随机选择指定数量的图片
+        progress: 进度回调
+
+    Returns:
+        PIL.Image.Image: 合成后的图片
+    """
+    if not image_paths:
+        raise ValueError("请先选择图片")
+    if layout not in LAYOUTS:
+        raise ValueError(f"未知的布局模式: {layout}")
+
+    # 随机选择指定数量的图片
+    if 0 < random_select < len(image_paths):
+        selected_paths = random.sample(list(image_paths), random_select)
+    else:
+        selected_paths = list(image_paths)
+
+    # 先只读取图片尺寸(不解码像素)，估算合成需要的内存
+    sizes = []
+    total_size = 0
+    for path in selected_paths:
+        with Image.open(path) as img:
+            sizes.append(img.size)
+        total_size += os.path.getsize(path)
+
+    # 自动压缩大图片
+    if total_size > 10 * 1024 * 1024:  # 10MB
+        sizes = [_compressed_size(size) for size in sizes]
+
+    governor = get_governor()
+    pixels = sum(w * h for w, h in sizes) + _canvas_pixels(sizes, layout, random_distribute)
+    scale = governor.fit_scale(pixels)
+    if scale < 1:
+        report_decision(progress, 0, len(selected_paths),
+                        f"图片合成需要约 {format_mb(pixels * 4)} 内存，超过内存预算，"
+                        f"按 {scale:.0%} 缩小后合成",
+                        degraded=True, action="downscale", images=len(sizes), scale=round(scale, 3))
+        sizes = [(max(1, int(w * scale)), max(1, int(h * scale))) for w, h in sizes]
+
+    with governor.reserve(int(pixels * min(scale, 1.0) ** 2 * 4)):
+        # 加载选中的图片，需要缩小的图片加载后立即缩小(JPEG 直接以接近目标的尺寸解码)
+        images = []
+        for i, (path, size) in enumerate(zip(selected_paths, sizes)):
+            _report(progress, i, len(selected_paths), f"正在加载图片 ({i+1}/{len(selected_paths)})...")
+            img = Image.open(path)
+            if img.size != size:
+                img.draft(img.mode, size)
+                img = img.resize(size, Image.Resampling.LANCZOS)
+            images.append(img)
+
+        _report(progress, len(selected_paths), len(selected_paths), f"正在合成图片 ({layout}布局)...")
+        return layout_images(images, layout, random_distribute)
+
+def layout_images(images, layout: str = "uniform", random_distribute: bool = False):
+    """按布局模式把内存中的图片合成为一张(random_distribute 优先于布局模式)"""
+    if not images:
+        raise ValueError("没有可以合成的图片")
+    if random_distribute:
+        return random_layout(images)
+    if layout not in LAYOUTS:
+        raise ValueError(f"未知的布局模式: {layout}")
+    return LAYOUTS[layout](images)
+
+def save_image(image, path: str) -> None:
+    """根据扩展名保存合成后的图片"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".jpg", ".jpeg"):
+        image.save(path, "JPEG", quality=95)
+    elif ext == ".png":
+        image.save(path, "PNG")
+    elif ext == ".bmp":
+        image.save(path, "BMP")
+    else:
+        image.save(path)  # 默认格式
@@ -0,0 +1,59 @@
+# 禁止生成 .pyc 文件
+import sys
+sys.dont_write_bytecode = True
+
+import os
+
+from XingNengFenXi import profiled
+from YaoCe import recorded
+
+# 文件工具的核心处理逻辑。
+# 本模块不依赖 tkinter，图形界面工具和命令行都调用这里的函数。
+
+@recorded("dir-tree")
+@profiled("dir-tree")
+def generate_dir_tree(path='.', ignore=None, prefix=''):
+    """生成目录树文本"""
+    if ignore is None:
+        ignore = []
+    try:
+        items = sorted(os.listdir(path))
+    except PermissionError:
+        return f"无法访问 {path}：权限不足\n"
+    result = ""
+    for i, item in enumerate(items):
+        if item in ignore:
+            continue
+        full_path = os.path.join(path, item)
+        is_last = i == len(items) - 1
+        # 添加当前项到结果
+        result += prefix + ('└── ' if is_last else '├── ') + item + '\n'
+        # 如果是目录，递归处理
+        if os.path.isdir(full_path):
+            new_prefix = prefix + ('    ' if is_last else '│   ')
+            result += generate_dir_tree(full_path, ignore, new_prefix)
+    return result
+
+@recorded("clean-empty")
+@profiled("clean-empty")
+def remove_empty_folders(folder: str) -> int:
+    """
+    递归删除目录下的所有空文件夹。
+
+    Args:
+        folder (str): 要清理的目录
+
+    Returns:
+        int: 删除的空文件夹数量
+    """
+    count = 0
+    for root, dirs, files in os.walk(folder, topdown=False):
+        for dir_name in dirs:
+            dir_path = os.path.join(root, dir_name)
+            try:
+                if not os.listdir(dir_path):
+                    os.rmdir(dir_path)
+                    count += 1
+            except Exception:
+                continue
+    return count
@@ -0,0 +1,122 @@
+# 禁止生成 .pyc 文件
+import sys
+sys.dont_write_bytecode = True
+
+import functools
+import os
+import threading
+import time
+
+from PeiZhi import get_config, get_data_dir
+
+# 可选的性能分析钩子。
+# 设置环境变量 SANYUAN_PROFILE=1，或在启动器"设置"菜单中开启"记录性能分析数据"后，
+# 被 @profiled 装饰的核心操作会在 cProfile 和 tracemalloc 下运行，
+# 并在输出文件旁边写入 <操作>_<时间>.prof 和内存分配摘要 <操作>_<时间>_内存.txt。
+# 没有输出文件的操作写入数据目录下的 profiles 目录。
+#
+# 未开启时装饰器直接返回原函数，不增加任何开销；开关在模块导入时读取，修改后对新启动的工具生效。
+#
+# 查看 .prof 文件：python -m pstats 文件.prof，或使用 snakeviz 等工具。
+
+ENV_VAR = "SANYUAN_PROFILE"
+TOP_ENV_VAR = "SANYUAN_PROFILE_TOP"
+
+def is_enabled() -> bool:
+    """是否开启了性能分析"""
+    value = os.environ.get(ENV_VAR)
+    if value is not None:
+        return value.strip().lower() not in ("", "0", "false", "no", "off")
+    return bool(get_config().get("profile_operations"))
+
+ENABLED = is_enabled()
+
+# 同一时间只能有一个 cProfile 在运行，嵌套或并发的操作直接执行
+_active = threading.Lock()
+
+def _output_dir(result) -> str:
+    """根据操作结果确定分析文件的保存位置"""
+    outputs = result.get("outputs") if isinstance(result, dict) else None
+    if outputs:
+        directory = os.path.dirname(os.path.abspath(outputs[0]))
+        if os.path.isdir(directory):
+            return directory
+    directory = os.path.join(get_data_dir(), "profiles")
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+def _write_memory_summary(path, operation, elapsed, peak, before, after, top) -> None:
+    stats = after.compare_to(before, "lineno")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"操作: {operation}\n")
+        f.write(f"耗时: {elapsed:.3f} 秒\n")
+        f.write(f"Python 内存峰值: {peak / (1024 * 1024):.1f} MB\n")
+        f.write(f"\n内存增长最多的 {top} 处代码:\n")
+        for stat in stats[:top]:
+            frame = stat.traceback[0]
+            f.write(f"{stat.size_diff / 1024:>10.1f} KB  {stat.count_diff:>+8} 个对象  "
+                    f"{frame.filename}:{frame.lineno}\n")
+        f.write("\n注意: tracemalloc 只统计Python分配的内存，PyMuPDF 等C扩展内部的内存不包括在内。\n")
+
+def _run_profiled(func, operation, top, args, kwargs):
+    import cProfile
+    import tracemalloc
+
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    if hasattr(tracemalloc, "reset_peak"):
+        tracemalloc.reset_peak()
+    before = tracemalloc.take_snapshot()
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    result = None
+    try:
+        result = profiler.runcall(func, *args, **kwargs)
+        return result
+    finally:
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+        if started_tracing:
+            tracemalloc.stop()
+        try:
+            directory = _output_dir(result)
+            base = os.path.join(directory, f"{operation}_{time.strftime('%Y%m%d_%H%M%S')}")
+            profiler.dump_stats(base + ".prof")
+            _write_memory_summary(base + "_内存.txt", operation, elapsed, peak, before, after, top)
+            print(f"性能分析已保存: {base}.prof", file=sys.stderr)
+        except Exception as e:
+            # 分析数据写入失败不影响操作本身
+            print(f"性能分析保存失败: {str(e)}", file=sys.stderr)
+
+def profiled(operation: str = None, top: int = None):
+    """
+    性能分析装饰器。
+
+    Args:
+        operation (str): 操作名称，用于文件名，默认使用函数名
+        top (int): 内存摘要中列出的代码行数，默认20(可用环境变量 SANYUAN_PROFILE_TOP 修改)
+
+    使用示例：
+    @profiled("pdf-split")
+    def split_pdf_by_count(...):
+        ...
+    """
+    def decorator(func):
+        if not ENABLED:
+            return func
+        name = operation or func.__name__
+        count = top or int(os.environ.get(TOP_ENV_VAR, "20"))
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _active.acquire(blocking=False):
+                return func(*args, **kwargs)
+            try:
+                return _run_profiled(func, name, count, args, kwargs)
+            finally:
+                _active.release()
+
+        return wrapper
+    return decorator
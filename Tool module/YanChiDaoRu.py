@@ -0,0 +1,100 @@
+# 禁止生成 .pyc 文件
+import sys
+sys.dont_write_bytecode = True
+
+import importlib
+import threading
+
+class LazyImport:
+    """
+    延迟导入的模块或模块属性。
+
+    第一次访问属性或调用时才真正导入，之后直接使用缓存的对象，
+    因此工具窗口可以先显示出来，重型依赖(PyPDF2、fitz、PIL等)在用到时再加载，
+    或者在窗口绘制完成后由 warm_up 在后台线程中提前加载。
+
+    使用示例：
+    fitz = lazy_import("fitz")
+    PdfReader = lazy_import("PyPDF2", "PdfReader")
+    reader = PdfReader("a.pdf")  # 此时才导入 PyPDF2
+    """
+
+    def __init__(self, module_name: str, attr: str = None):
+        self._module_name = module_name
+        self._attr = attr
+        self._target = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        """导入并返回目标对象(线程安全，只导入一次)"""
+        target = self._target
+        if target is None:
+            with self._lock:
+                if self._target is None:
+                    module = importlib.import_module(self._module_name)
+                    self._target = getattr(module, self._attr) if self._attr else module
+                target = self._target
+        return target
+
+    def is_loaded(self) -> bool:
+        return self._target is not None
+
+    def __getattr__(self, name):
+        # 只有在实例上找不到的属性才会进入这里
+        if name in ("_module_name", "_attr", "_target", "_lock"):
+            raise AttributeError(name)
+        return getattr(self.load(), name)
+
+    def __call__(self, *args, **kwargs):
+        return self.load()(*args, **kwargs)
+
+    def __repr__(self):
+        name = f"{self._module_name}.{self._attr}" if self._attr else self._module_name
+        state = "已导入" if self.is_loaded() else "未导入"
+        return f"<LazyImport {name} ({state})>"
+
+def lazy_import(module_name: str, attr: str = None) -> LazyImport:
+    """
+    创建延迟导入对象。
+
+    Args:
+        module_name (str): 模块名，如 "fitz"、"PIL.Image"
+        attr (str): 模块中的属性名，如 "PdfReader"，为空时返回模块本身
+
+    Returns:
+        LazyImport: 首次使用时才导入的代理对象
+    """
+    return LazyImport(module_name, attr)
+
+def preload(*targets) -> None:
+    """
+    在当前线程中导入指定的依赖，导入失败的依赖直接跳过(在真正使用时再报告错误)。
+
+    Args:
+        targets: LazyImport 对象或模块名字符串
+    """
+    for target in targets:
+        try:
+            if isinstance(target, LazyImport):
+                target.load()
+            else:
+                importlib.import_module(target)
+        except Exception:
+            pass
+
+def warm_up(root, *targets, delay: int = 0) -> None:
+    """
+    窗口首次绘制完成后，在后台线程中提前导入重型依赖。
+
+    这样窗口出现的速度不受依赖导入的影响，用户开始操作时依赖通常已经加载完成。
+
+    Args:
+        root: Tk 根窗口或任意控件
+        targets: LazyImport 对象或模块名字符串
+        delay (int): 首次绘制后再等待的毫秒数
+    """
+    def start():
+        threading.Thread(target=preload, args=targets, daemon=True).start()
+
+    # after_idle 在主循环空闲(即窗口绘制完成)后才执行
+    root.after_idle(lambda: root.after(delay, start))
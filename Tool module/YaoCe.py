@@ -0,0 +1,360 @@
+# 禁止生成 .pyc 文件
+import sys
+sys.dont_write_bytecode = True
+
+import functools
+import json
+import os
+import platform
+import threading
+import time
+
+from PeiZhi import get_config, get_data_dir
+
+# 操作遥测记录。
+# 每个被 @recorded 装饰的核心操作完成(成功或失败)后，向数据目录下的 telemetry.jsonl 追加一行JSON：
+#   {"time": ..., "host": ..., "tool": ..., "operation": "pdf-split", "outcome": "ok",
+#    "input": {"bytes": ..., "files": ..., "pages": ..., "pixels": ...},
+#    "output": {"bytes": ..., "files": ..., "pixels": ...},
+#    "wall_s": ..., "cpu_s": ..., "peak_rss_mb": ...}
+# 文件超过 MAX_BYTES 后轮转为 telemetry.jsonl.1 ~ .N，最多保留 BACKUPS 个旧文件。
+# 启动器"设置 - 操作耗时统计"按操作汇总这些记录并显示耗时百分位数。
+#
+# 只在操作结束时写一行，不影响操作本身的速度；配置项 telemetry 设为 false 可以关闭。
+#
+# 服务、热文件夹和流水线会在同一进程里并行执行多个操作：
+#   cpu_s        调用线程的CPU时间加上期间结束的子进程(FFmpeg、拆分进程池)的CPU时间，
+#                不包含同时运行的其他操作的线程
+#   peak_rss_mb  整个进程的内存峰值，只在没有其他操作运行时重置；
+#                与其他操作时间重叠的记录带有 "concurrent": true，峰值包含了其他操作，汇总时不计入
+
+LOG_FILE = "telemetry.jsonl"
+MAX_BYTES = 2 * 1024 * 1024
+BACKUPS = 3
+
+_lock = threading.Lock()
+_local = threading.local()
+_active_lock = threading.Lock()
+_active = 0
+_started = 0
+_tool_name = None
+
+def set_tool(name: str) -> None:
+    """设置记录中的工具名称，默认使用启动脚本的文件名"""
+    global _tool_name
+    _tool_name = name
+
+def get_tool() -> str:
+    if _tool_name:
+        return _tool_name
+    script = sys.argv[0] if sys.argv and sys.argv[0] else "python"
+    return os.path.splitext(os.path.basename(script))[0]
+
+def is_enabled() -> bool:
+    return bool(get_config().get("telemetry"))
+
+def note(key: str, value) -> None:
+    """
+    为当前线程正在记录的操作附加一条说明(如内存预算的调整)，写入记录的 key 字段。
+
+    不在被记录的操作中调用时忽略。
+    """
+    notes = getattr(_local, "notes", None)
+    if notes is not None:
+        notes.setdefault(key, []).append(value)
+
+def log_path() -> str:
+    return os.path.join(get_data_dir(), LOG_FILE)
+
+def _reset_peak_rss() -> None:
+    """重置进程的内存峰值(仅Linux)，使峰值反映单个操作而不是整个进程"""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+def peak_rss_mb():
+    """当前进程的内存峰值(MB)，无法获取时返回 None"""
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    if sys.platform == "win32":
+        try:
+            import ctypes
+            from ctypes import wintypes
+
+            class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+                _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                            ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                            ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                            ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+            counters = PROCESS_MEMORY_COUNTERS()
+            counters.cb = ctypes.sizeof(counters)
+            process = ctypes.windll.kernel32.GetCurrentProcess()
+            if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+                return counters.PeakWorkingSetSize / (1024 * 1024)
+        except Exception:
+            return None
+        return None
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS 的单位是字节，其他系统是KB
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except (ImportError, OSError):
+        return None
+
+def _cpu_seconds() -> float:
+    """当前线程加上已结束子进程(如 FFmpeg)的CPU时间"""
+    times = os.times()
+    return time.thread_time() + times.children_user + times.children_system
+
+def _begin() -> tuple:
+    """登记一个开始的操作，返回 (序号, 开始时是否有其他操作在运行)"""
+    global _active, _started
+    with _active_lock:
+        overlapped = _active > 0
+        if not overlapped:
+            # 只有没有其他操作运行时才重置峰值，否则会抹掉它们的峰值
+            _reset_peak_rss()
+        _active += 1
+        _started += 1
+        return _started, overlapped
+
+def _end(ticket: int, overlapped: bool) -> bool:
+    """登记一个结束的操作，返回运行期间是否与其他操作重叠"""
+    global _active
+    with _active_lock:
+        _active -= 1
+        return overlapped or _started != ticket
+
+def _file_sizes(value) -> dict:
+    """统计路径或路径列表对应文件的数量和总字节数，目录和不存在的路径不计入"""
+    if isinstance(value, (str, os.PathLike)):
+        value = [value]
+    elif not isinstance(value, (list, tuple)):
+        return {}
+    files = 0
+    total = 0
+    for item in value:
+        # PDF合并的输入是 (路径, 页码) 元组
+        if isinstance(item, (list, tuple)) and item:
+            item = item[0]
+        if not isinstance(item, (str, os.PathLike)):
+            continue
+        try:
+            if os.path.isfile(item):
+                total += os.path.getsize(item)
+                files += 1
+        except OSError:
+            continue
+    return {"bytes": total, "files": files} if files else {}
+
+def _measure(args, result) -> tuple:
+    """根据第一个参数和返回值计算输入和输出的规模"""
+    inputs = _file_sizes(args[0]) if args else {}
+    outputs = {}
+    if isinstance(result, dict):
+        if result.get("pages") is not None:
+            inputs["pages"] = result["pages"]
+        if result.get("pixels") is not None:
+            inputs["pixels"] = result["pixels"]
+        outputs = _file_sizes(result.get("outputs") or [])
+    elif isinstance(result, str):
+        outputs = {"bytes": len(result.encode("utf-8"))}
+    elif isinstance(result, int) and not isinstance(result, bool):
+        outputs = {"items": result}
+    elif hasattr(result, "size") and isinstance(getattr(result, "size"), tuple):
+        # 图片合成返回 PIL 图片
+        width, height = result.size
+        outputs = {"pixels": width * height}
+    return inputs, outputs
+
+def _rotate(path: str) -> None:
+    for i in range(BACKUPS - 1, 0, -1):
+        if os.path.exists(f"{path}.{i}"):
+            os.replace(f"{path}.{i}", f"{path}.{i + 1}")
+    os.replace(path, f"{path}.1")
+
+def append(record: dict) -> None:
+    """追加一条记录，文件过大时先轮转"""
+    path = log_path()
+    line = json.dumps(record, ensure_ascii=False) + "\n"
+    with _lock:
+        try:
+            if os.path.getsize(path) + len(line) > MAX_BYTES:
+                _rotate(path)
+        except OSError:
+            pass
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+def recorded(operation: str = None):
+    """
+    遥测记录装饰器，操作结束后追加一条记录。
+
+    递归或嵌套调用只记录最外层；写入失败不影响操作本身。
+
+    Args:
+        operation (str): 操作名称，默认使用函数名
+
+    使用示例：
+    @recorded("pdf-split")
+    def split_pdf_by_count(...):
+        ...
+    """
+    def decorator(func):
+        name = operation or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if getattr(_local, "active", False) or not is_enabled():
+                return func(*args, **kwargs)
+            _local.active = True
+            _local.notes = {}
+            ticket, overlapped = _begin()
+            start = time.perf_counter()
+            cpu_start = _cpu_seconds()
+            result = None
+            error = None
+            try:
+                result = func(*args, **kwargs)
+                return result
+            except BaseException as e:
+                error = e
+                raise
+            finally:
+                _local.active = False
+                notes = _local.notes
+                _local.notes = None
+                wall = time.perf_counter() - start
+                cpu = _cpu_seconds() - cpu_start
+                peak = peak_rss_mb()
+                concurrent = _end(ticket, overlapped)
+                try:
+                    inputs, outputs = _measure(args, result)
+                    record = {
+                        "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+                        "host": platform.node(),
+                        "tool": get_tool(),
+                        "operation": name,
+                        "outcome": "ok" if error is None else "error",
+                        "input": inputs,
+                        "output": outputs,
+                        "wall_s": round(wall, 4),
+                        "cpu_s": round(cpu, 4),
+                        "peak_rss_mb": round(peak, 1) if peak is not None else None,
+                    }
+                    if isinstance(result, dict) and result.get("cached"):
+                        # 结果缓存命中，统计耗时时单独计算
+                        record["cached"] = True
+                    if concurrent:
+                        record["concurrent"] = True
+                    record.update(notes)
+                    if error is not None:
+                        record["error"] = f"{type(error).__name__}: {str(error)}"[:200]
+                    append(record)
+                except Exception as e:
+                    print(f"遥测记录写入失败: {str(e)}", file=sys.stderr)
+
+        return wrapper
+    return decorator
+
+def load_records(operation: str = None) -> list:
+    """
+    读取全部遥测记录(包括轮转后的旧文件)，按时间顺序返回。
+
+    Args:
+        operation (str): 只返回该操作的记录，默认返回全部
+    """
+    path = log_path()
+    records = []
+    for file_path in [f"{path}.{i}" for i in range(BACKUPS, 0, -1)] + [path]:
+        try:
+            with open(file_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if operation is None or record.get("operation") == operation:
+                        records.append(record)
+        except OSError:
+            continue
+    return records
+
+def percentile(values, p: float):
+    """最近秩法计算百分位数，values 为空时返回 None"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, int(-(-p * len(ordered) // 100)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+def _throughput(record):
+    """单条成功记录的吞吐量：有页数时为 页/秒，否则为输入 MB/秒"""
+    wall = record.get("wall_s") or 0
+    if wall <= 0 or record.get("outcome") != "ok":
+        return None, None
+    inputs = record.get("input") or {}
+    if inputs.get("pages"):
+        return inputs["pages"] / wall, "页/秒"
+    if inputs.get("bytes"):
+        return inputs["bytes"] / (1024 * 1024) / wall, "MB/秒"
+    return None, None
+
+def summarize(records, group_by=("operation",)) -> list:
+    """
+    按操作(以及主机、工具等字段)汇总记录。
+
+    Args:
+        records: load_records() 返回的记录
+        group_by: 分组字段，如 ("operation", "host")
+
+    Returns:
+        list: 每组一个字典，包含 key、count、errors、cached、wall_p50/p90/p99、cpu_p50、rss_p90、
+              throughput_p50 和 throughput_unit，按操作名排序；耗时只统计实际计算(未命中缓存)的记录
+    """
+    groups = {}
+    for record in records:
+        key = tuple(record.get(field) or "-" for field in group_by)
+        groups.setdefault(key, []).append(record)
+
+    rows = []
+    for key, items in sorted(groups.items()):
+        ok = [r for r in items if r.get("outcome") == "ok" and not r.get("cached")]
+        cached = sum(1 for r in items if r.get("cached"))
+        walls = [r["wall_s"] for r in ok if r.get("wall_s") is not None]
+        cpus = [r["cpu_s"] for r in ok if r.get("cpu_s") is not None]
+        # 与其他操作重叠的记录，峰值是整个进程的，不代表单个操作
+        peaks = [r["peak_rss_mb"] for r in items
+                 if r.get("peak_rss_mb") is not None and not r.get("concurrent")]
+        rates = {}
+        for record in ok:
+            rate, unit = _throughput(record)
+            if rate is not None:
+                rates.setdefault(unit, []).append(rate)
+        unit = max(rates, key=lambda u: len(rates[u])) if rates else None
+        rows.append({
+            "key": key,
+            "count": len(items),
+            "errors": len(items) - len(ok) - cached,
+            "cached": cached,
+            "wall_p50": percentile(walls, 50),
+            "wall_p90": percentile(walls, 90),
+            "wall_p99": percentile(walls, 99),
+            "cpu_p50": percentile(cpus, 50),
+            "rss_p90": percentile(peaks, 90),
+            "throughput_p50": percentile(rates[unit], 50) if unit else None,
+            "throughput_unit": unit,
+        })
+    return rows
@@ -0,0 +1,273 @@
+# 禁止生成 .pyc 文件
+import sys
+sys.dont_write_bytecode = True
+
+import re
+from bisect import bisect_right
+from heapq import merge
+from itertools import zip_longest
+
+# 页码范围。
+# 连续的页面保存为合并后的有序区间 [(起始索引, 结束索引), ...](从0开始，包含两端)，
+# "1-99999" 只占一个区间，拆分时直接按区间输出连续页面组，不需要展开成列表再去重、排序、分组。
+# 奇数页、偶数页、every-N 这类等间隔的页面保存为步长项 [(起始索引, 结束索引, 步长), ...]，
+# "odd" 无论文档多少页都只占一项；计数、判断、迭代都直接由区间和步长项算出。
+#
+# 页码范围的写法(页码从1开始，多项用逗号分隔，结果取并集)：
+#   5           第5页
+#   1-3         第1到3页；结束页超过总页数时截断到最后一页
+#   10-         第10页到最后一页
+#   -1          倒数第1页(负数从最后一页倒数)，-3--1 为最后3页
+#   odd / even  奇数页 / 偶数页(也可以写 奇数 / 偶数)
+#   first-N     前N页
+#   last-N      最后N页
+#   every-N     每隔N页取一页：第N、2N、3N…页(也可以写 every-3rd)
+# 超出总页数的单个页码会被忽略，与原来的写法保持一致。
+
+_NUMBER = r"-?\d+"
+_RANGE = re.compile(rf"^({_NUMBER})?-({_NUMBER})?$")
+_KEYWORD = re.compile(r"^(first|last|every)-(\d+)(?:st|nd|rd|th)?$")
+_ALIASES = {"奇数": "odd", "偶数": "even"}
+
+def _merge(intervals) -> list:
+    """合并重叠或相邻的区间"""
+    merged = []
+    for start, end in sorted(intervals):
+        if start > end:
+            continue
+        if merged and start <= merged[-1][1] + 1:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+def _find(intervals, index: int) -> int:
+    """返回包含 index 的区间位置，不存在时返回 -1"""
+    position = bisect_right(intervals, (index, float("inf"))) - 1
+    if position >= 0 and intervals[position][0] <= index <= intervals[position][1]:
+        return position
+    return -1
+
+def _count_below(stride, limit: int) -> int:
+    """步长项中小于 limit 的页数"""
+    start, end, step = stride
+    return len(range(start, min(limit, end + 1), step))
+
+class PageSet:
+    """
+    用合并区间和步长项保存的有序页面索引集合(从0开始)。
+
+    可以像列表一样使用：len()、in、按从小到大的顺序迭代；
+    groups() 按连续页面分组，适合拆分时逐组输出。
+
+    使用示例：
+    pages = PageSet.parse("1-3,5,last-2", total_pages=100)
+    list(pages)                      # [0, 1, 2, 4, 98, 99]
+    [list(g) for g in pages.groups()]  # [[0, 1, 2], [4], [98, 99]]
+    pages.format()                   # "1-3,5,99-100"
+    """
+
+    __slots__ = ("intervals", "strides")
+
+    def __init__(self, intervals=(), strides=()):
+        intervals = list(intervals)
+        kept = []
+        for start, end, step in strides:
+            if start > end:
+                continue
+            # 结束索引对齐到最后一个实际取到的页面
+            end = start + (end - start) // step * step
+            if step == 1 or start == end:
+                intervals.append((start, end))
+            else:
+                kept.append((start, end, step))
+        self.intervals = _merge(intervals)
+        # 已被某个区间完全覆盖的步长项不再保留
+        self.strides = sorted({stride for stride in kept if not self._covered(stride)})
+
+    def _covered(self, stride) -> bool:
+        position = _find(self.intervals, stride[0])
+        return position >= 0 and self.intervals[position][1] >= stride[1]
+
+    @classmethod
+    def parse(cls, spec: str, total_pages: int) -> "PageSet":
+        """
+        解析页码范围字符串。
+
+        Args:
+            spec (str): 页码范围，写法见模块开头的说明
+            total_pages (int): 文档总页数
+
+        Raises:
+            ValueError: 写法无效
+        """
+        intervals, strides = [], []
+        for term in re.split(r"[,，]", spec):
+            term = re.sub(r"\s+", "", term).lower()
+            if term:
+                for item in cls._parse_term(term, total_pages):
+                    (strides if len(item) == 3 else intervals).append(item)
+        return cls(intervals, strides)
+
+    @staticmethod
+    def _page_index(text: str, total_pages: int, term: str) -> int:
+        number = int(text)
+        if number == 0:
+            raise ValueError(f"页码从1开始: {term}")
+        return number - 1 if number > 0 else total_pages + number
+
+    @classmethod
+    def _parse_term(cls, term: str, total_pages: int) -> list:
+        last = total_pages - 1
+        term = _ALIASES.get(term, term)
+        if term == "odd":
+            return [(0, last, 2)]
+        if term == "even":
+            return [(1, last, 2)]
+
+        match = _KEYWORD.match(term)
+        if match:
+            keyword, count = match.group(1), int(match.group(2))
+            if count <= 0:
+                raise ValueError(f"页数必须大于0: {term}")
+            if keyword == "first":
+                return [(0, min(count, total_pages) - 1)]
+            if keyword == "last":
+                return [(max(0, total_pages - count), last)]
+            return [(count - 1, last, count)]
+
+        if re.fullmatch(_NUMBER, term):
+            index = cls._page_index(term, total_pages, term)
+            return [(index, index)] if 0 <= index <= last else []
+
+        match = _RANGE.match(term)
+        if not match or not (match.group(1) or match.group(2)):
+            raise ValueError(f"无效的页码范围: {term}")
+        start = cls._page_index(match.group(1), total_pages, term) if match.group(1) else 0
+        end = cls._page_index(match.group(2), total_pages, term) if match.group(2) else last
+        if start > end:
+            raise ValueError(f"起始页大于结束页: {term}")
+        start, end = max(start, 0), min(end, last)
+        return [(start, end)] if start <= end else []
+
+    @classmethod
+    def from_indices(cls, indices) -> "PageSet":
+        """由页面索引(可以无序、重复)创建"""
+        return cls((index, index) for index in indices)
+
+    @classmethod
+    def all(cls, total_pages: int) -> "PageSet":
+        """全部页面"""
+        return cls([(0, total_pages - 1)] if total_pages > 0 else [])
+
+    def copy(self) -> "PageSet":
+        return PageSet(self.intervals, self.strides)
+
+    def groups(self):
+        """按连续页面分组，逐个返回 range"""
+        if not self.strides:
+            for start, end in self.intervals:
+                yield range(start, end + 1)
+            return
+        start = end = None
+        for index in self:
+            if start is not None and index == end + 1:
+                end = index
+                continue
+            if start is not None:
+                yield range(start, end + 1)
+            start = end = index
+        if start is not None:
+            yield range(start, end + 1)
+
+    def add(self, index: int) -> None:
+        if index in self:
+            return
+        position = bisect_right(self.intervals, (index, index))
+        start = end = index
+        # 只与左右相邻的区间合并，不重新排序整个列表
+        if position > 0 and self.intervals[position - 1][1] == index - 1:
+            position -= 1
+            start = self.intervals[position][0]
+            del self.intervals[position]
+        if position < len(self.intervals) and self.intervals[position][0] == index + 1:
+            end = self.intervals[position][1]
+            del self.intervals[position]
+        self.intervals.insert(position, (start, end))
+
+    def discard(self, index: int) -> None:
+        position = _find(self.intervals, index)
+        if position >= 0:
+            start, end = self.intervals[position]
+            pieces = [(start, index - 1), (index + 1, end)]
+            self.intervals[position:position + 1] = [(s, e) for s, e in pieces if s <= e]
+        if any(self._in_stride(stride, index) for stride in self.strides):
+            strides = []
+            for stride in self.strides:
+                start, end, step = stride
+                if self._in_stride(stride, index):
+                    strides += [(start, index - step, step), (index + step, end, step)]
+                else:
+                    strides.append(stride)
+            rebuilt = PageSet(self.intervals, strides)
+            self.intervals, self.strides = rebuilt.intervals, rebuilt.strides
+
+    @staticmethod
+    def _in_stride(stride, index: int) -> bool:
+        start, end, step = stride
+        return start <= index <= end and (index - start) % step == 0
+
+    def format(self) -> str:
+        """转换为页码范围字符串(页码从1开始)，如 "1-3,5" """
+        return ",".join(str(group[0] + 1) if len(group) == 1 else f"{group[0] + 1}-{group[-1] + 1}"
+                        for group in self.groups())
+
+    def __len__(self) -> int:
+        count = sum(end - start + 1 for start, end in self.intervals)
+        if not self.strides:
+            return count
+        if len(self.strides) > 1:
+            # 多个步长项之间可能互相重叠(如 odd 和 every-3)，逐页计数
+            return sum(1 for _ in self)
+        stride = self.strides[0]
+        count += _count_below(stride, stride[1] + 1)
+        # 减去落在区间内、已经计过的页面
+        for start, end in self.intervals:
+            count -= _count_below(stride, end + 1) - _count_below(stride, start)
+        return count
+
+    def __bool__(self) -> bool:
+        return bool(self.intervals or self.strides)
+
+    def __iter__(self):
+        ranges = (range(start, end + 1) for start, end in self.intervals)
+        if not self.strides:
+            for pages in ranges:
+                yield from pages
+            return
+        previous = None
+        sources = [(index for pages in ranges for index in pages)]
+        sources += [range(start, end + 1, step) for start, end, step in self.strides]
+        for index in merge(*sources):
+            if index != previous:
+                yield index
+                previous = index
+
+    def __contains__(self, index) -> bool:
+        return (_find(self.intervals, index) >= 0
+                or any(self._in_stride(stride, index) for stride in self.strides))
+
+    def __or__(self, other) -> "PageSet":
+        return PageSet(self.intervals + list(other.intervals), self.strides + list(other.strides))
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, PageSet):
+            return False
+        if self.intervals == other.intervals and self.strides == other.strides:
+            return True
+        missing = object()
+        return all(a == b for a, b in zip_longest(self, other, fillvalue=missing))
+
+    def __repr__(self) -> str:
+        return f"PageSet({self.format()!r})"
@@ -0,0 +1,126 @@
+# 禁止生成 .pyc 文件
+import sys
+sys.dont_write_bytecode = True
+
+import os
+import subprocess
+
+from XingNengFenXi import profiled
+from YaoCe import recorded
+from JieGuoHuanCun import cached
+from DuanDianXuChuan import Checkpoint, file_identity
+
+# 音频工具的核心处理逻辑。
+# 本模块不依赖 tkinter，图形界面工具和命令行都调用这里的函数。
+
+def _report(progress, done, total, message=""):
+    """调用进度回调(如果有)"""
+    if progress is not None:
+        progress(done, total, message)
+
+def check_ffmpeg() -> bool:
+    """检查 FFmpeg 是否可用"""
+    try:
+        subprocess.run(["ffmpeg", "-version"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    except FileNotFoundError:
+        return False
+    return True
+
+@recorded("audio-extract")
+@cached("audio-extract", inputs=("video_file",), output="audio_file")
+@profiled("audio-extract")
+def extract_audio(video_file: str, audio_file: str, progress=None) -> dict:
+    """
+    使用 FFmpeg 从视频中提取音频。
+
+    Args:
+        video_file (str): 输入视频路径
+        audio_file (str): 输出音频路径，格式由扩展名决定(mp3/wav)
+        progress: 进度回调
+
+    Returns:
+        dict: {"outputs": [输出文件]}
+
+    Raises:
+        FileNotFoundError: 视频文件不存在或 FFmpeg 未安装
+        RuntimeError: FFmpeg 执行失败
+    """
+    if not os.path.isfile(video_file):
+        raise FileNotFoundError("请选择有效的视频文件！")
+    if not audio_file:
+        raise ValueError("请输入音频输出路径！")
+    if not check_ffmpeg():
+        raise FileNotFoundError("FFmpeg 未安装或不在系统路径中。")
+
+    _report(progress, 0, 1, "正在提取音频...")
+    _run_ffmpeg(video_file, audio_file)
+    _report(progress, 1, 1, audio_file)
+    return {"outputs": [audio_file]}
+
+def _run_ffmpeg(video_file: str, audio_file: str) -> None:
+    """
+    调用 FFmpeg 提取音频。
+
+    先写入同目录下的临时文件，成功后再改名，中断时不会留下不完整的输出文件。
+    """
+    root, ext = os.path.splitext(audio_file)
+    partial_file = f"{root}.partial{ext}"
+    command = [
+        'ffmpeg',
+        '-i', video_file,
+        '-q:a', '0',
+        '-map', 'a',
+        '-y',
+        partial_file
+    ]
+    try:
+        subprocess.run(command, check=True)
+        os.replace(partial_file, audio_file)
+    except subprocess.CalledProcessError:
+        raise RuntimeError("音频提取过程中发生错误。")
+    finally:
+        if os.path.exists(partial_file):
+            os.remove(partial_file)
+
+@recorded("audio-extract")
+@cached("audio-extract", inputs=("video_files",), output="output_dir")
+@profiled("audio-extract")
+def extract_audio_batch(video_files, output_dir: str, audio_format: str = "mp3", progress=None) -> dict:
+    """
+    批量从视频中提取音频，输出为 <输出目录>/<视频文件名>.<格式>。
+
+    每提取完一个文件就写入检查点，中断后重新运行时跳过已经提取好的文件。
+
+    Args:
+        video_files: 视频路径列表
+        output_dir (str): 输出目录
+        audio_format (str): mp3/wav
+        progress: 进度回调
+
+    Returns:
+        dict: {"outputs": 输出文件列表, "resumed": 从上次中断处跳过的文件数}
+    """
+    if not video_files:
+        raise ValueError("请选择视频文件！")
+    for video_file in video_files:
+        if not os.path.isfile(video_file):
+            raise FileNotFoundError(f"视频文件不存在: {video_file}")
+    if not check_ffmpeg():
+        raise FileNotFoundError("FFmpeg 未安装或不在系统路径中。")
+    os.makedirs(output_dir, exist_ok=True)
+
+    outputs = []
+    total = len(video_files)
+    identity = [os.path.abspath(output_dir), audio_format]
+    with Checkpoint("audio-extract", identity, total, min_items=2) as checkpoint:
+        for i, video_file in enumerate(video_files):
+            name = os.path.splitext(os.path.basename(video_file))[0]
+            audio_file = os.path.join(output_dir, f"{name}.{audio_format}")
+            item = file_identity(video_file)
+            if not checkpoint.is_done(item):
+                _report(progress, i, total, f"正在提取 {os.path.basename(video_file)}")
+                _run_ffmpeg(video_file, audio_file)
+                checkpoint.record(item, [audio_file])
+            outputs.append(audio_file)
+            _report(progress, i + 1, total, audio_file)
+    return {"outputs": outputs, "resumed": checkpoint.resumed}
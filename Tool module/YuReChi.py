@@ -0,0 +1,221 @@
+# 禁止生成 .pyc 文件
+import sys
+sys.dont_write_bytecode = True
+
+import importlib
+import json
+import os
+import queue
+import subprocess
+import threading
+import time
+
+# 预热进程默认提前导入的重型依赖
+DEFAULT_PRELOAD = [
+    "tkinter",
+    "tkinter.ttk",
+    "PIL.Image",
+    "PIL.ImageTk",
+    "PyPDF2",
+    "fitz",
+    "reportlab.pdfgen.canvas",
+    "pdf2docx",
+]
+
+class WarmPool:
+    """
+    预热进程池，用于加快重型工具的启动速度。
+
+    池中始终保持若干个已经导入重型依赖的后台Python进程，
+    启动工具时将工具脚本交给其中一个进程执行(命中)，
+    池中没有可用进程时直接冷启动(未命中)，交付后在后台补充新的预热进程。
+
+    每次启动都会统计从交付到工具首个窗口完成绘制的时间，
+    结果放入 reports 队列，由界面线程通过 after 定时读取。
+
+    使用示例：
+    pool = WarmPool(size=2)
+    pool.start()
+    pool.launch("PDF tool/PDF Zhuan Tu Pian_Alpha1-0-1.py", "PDF转图片")
+    """
+
+    def __init__(self, size: int = 2, preload=None):
+        self.size = size
+        self.preload = list(DEFAULT_PRELOAD if preload is None else preload)
+        self.ready = []
+        self.lock = threading.Lock()
+        self.closed = False
+        # 每个工具的统计: {工具名: {"hits": 0, "misses": 0, "first_window_ms": []}}
+        self.stats = {}
+        # 启动报告队列: (工具名, 是否命中, 首窗口耗时毫秒)
+        self.reports = queue.Queue()
+
+    def start(self) -> None:
+        """在后台填充预热进程"""
+        for _ in range(self.size):
+            self._refill()
+
+    def resize(self, size: int) -> None:
+        """
+        调整池大小，多余的空闲进程会被结束。
+
+        Args:
+            size (int): 新的预热进程数量
+        """
+        with self.lock:
+            self.size = size
+            extra = self.ready[size:]
+            del self.ready[size:]
+        for process in extra:
+            process.kill()
+        self.start_missing()
+
+    def start_missing(self) -> None:
+        """补足池中缺少的预热进程"""
+        with self.lock:
+            missing = self.size - len(self.ready)
+        for _ in range(max(0, missing)):
+            self._refill()
+
+    def launch(self, script: str, tool_name: str) -> subprocess.Popen:
+        """
+        启动工具脚本。
+
+        Args:
+            script (str): 工具脚本的完整路径
+            tool_name (str): 工具显示名称，用于统计
+
+        Returns:
+            subprocess.Popen: 运行该工具的进程
+        """
+        with self.lock:
+            process = self.ready.pop(0) if self.ready else None
+        hit = process is not None
+        start_time = time.perf_counter()
+
+        if hit:
+            # 命中：把脚本交给已预热的进程
+            process.stdin.write(json.dumps({"script": script}) + "\n")
+            process.stdin.close()
+            self._refill()
+        else:
+            # 未命中：冷启动，但仍然统计首窗口时间
+            process = subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__), "--run", script],
+                stdout=subprocess.PIPE,
+                text=True,
+            )
+
+        threading.Thread(
+            target=self._wait_first_window,
+            args=(process, tool_name, hit, start_time),
+            daemon=True,
+        ).start()
+        return process
+
+    def shutdown(self) -> None:
+        """结束所有空闲的预热进程"""
+        with self.lock:
+            self.closed = True
+            idle = self.ready
+            self.ready = []
+        for process in idle:
+            process.kill()
+
+    def _refill(self) -> None:
+        """在后台线程中启动一个新的预热进程"""
+        threading.Thread(target=self._spawn_worker, daemon=True).start()
+
+    def _spawn_worker(self) -> None:
+        """启动预热进程并等待其完成依赖导入"""
+        with self.lock:
+            if self.closed or len(self.ready) >= self.size:
+                return
+        process = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--worker", *self.preload],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        line = process.stdout.readline()
+        with self.lock:
+            if _parse_event(line) == "ready" and not self.closed and len(self.ready) < self.size:
+                self.ready.append(process)
+                return
+        process.kill()
+
+    def _wait_first_window(self, process, tool_name, hit, start_time) -> None:
+        """等待工具报告首个窗口完成绘制，并记录统计"""
+        elapsed_ms = None
+        for line in process.stdout:
+            if _parse_event(line) == "first_window":
+                elapsed_ms = (time.perf_counter() - start_time) * 1000
+                break
+        process.stdout.close()
+
+        with self.lock:
+            tool_stats = self.stats.setdefault(tool_name, {"hits": 0, "misses": 0, "first_window_ms": []})
+            tool_stats["hits" if hit else "misses"] += 1
+            if elapsed_ms is not None:
+                tool_stats["first_window_ms"].append(elapsed_ms)
+        self.reports.put((tool_name, hit, elapsed_ms))
+
+def _parse_event(line: str):
+    """解析预热进程输出的事件名称"""
+    try:
+        return json.loads(line).get("event")
+    except (ValueError, AttributeError):
+        return None
+
+def _install_first_window_hook(channel) -> None:
+    """在首个Tk窗口完成绘制时向启动器报告"""
+    import tkinter
+
+    original_init = tkinter.Tk.__init__
+
+    def patched_init(self, *args, **kwargs):
+        original_init(self, *args, **kwargs)
+
+        def report():
+            if not channel.closed:
+                channel.write(json.dumps({"event": "first_window"}) + "\n")
+                channel.close()
+
+        self.after_idle(report)
+
+    tkinter.Tk.__init__ = patched_init
+
+def _run_script(script: str, channel) -> None:
+    """在当前进程中以 __main__ 方式运行工具脚本"""
+    import runpy
+
+    # 工具的输出改到标准错误，标准输出只用于和启动器通信
+    sys.stdout = sys.stderr
+    _install_first_window_hook(channel)
+    sys.argv = [script]
+    sys.path[0] = os.path.dirname(os.path.abspath(script))
+    runpy.run_path(script, run_name="__main__")
+
+def _worker_main(preload) -> None:
+    """预热进程入口：导入依赖后等待启动器交付工具脚本"""
+    channel = sys.stdout
+    for name in preload:
+        try:
+            importlib.import_module(name)
+        except Exception:
+            # 未安装的依赖直接跳过，由工具自己报告错误
+            pass
+    channel.write(json.dumps({"event": "ready"}) + "\n")
+    channel.flush()
+
+    line = sys.stdin.readline()
+    if not line:
+        # 启动器已退出或结束了该进程
+        return
+    _run_script(json.loads(line)["script"], channel)
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 2 and sys.argv[1] == "--worker":
+        _worker_main(sys.argv[2:])
+    elif len(sys.argv) >= 3 and sys.argv[1] == "--run":
+        _run_script(sys.argv[2], sys.stdout)
@@ -0,0 +1,121 @@
+# 禁止生成 .pyc 文件
+import sys
+sys.dont_write_bytecode = True
+
+from os.path import dirname, join
+sys.path.insert(0, join(dirname(dirname(__file__)), "Tool module"))
+
+import pytest
+
+from YeMaFanWei import PageSet
+
+# 页码范围 PageSet 的测试，页码写法见 YeMaFanWei 模块开头的说明。
+# 拆分、合并、转图片都通过 PageSet 解析页码，这里按原来逐页展开的结果逐项核对。
+
+def pages(spec, total=10):
+    return list(PageSet.parse(spec, total))
+
+@pytest.mark.parametrize("spec, expected", [
+    ("5", [4]),
+    ("1-3", [0, 1, 2]),
+    ("8-20", [7, 8, 9]),
+    ("5-", [4, 5, 6, 7, 8, 9]),
+    ("-1", [9]),
+    ("-3--1", [7, 8, 9]),
+    ("-3-", [7, 8, 9]),
+    ("odd", [0, 2, 4, 6, 8]),
+    ("even", [1, 3, 5, 7, 9]),
+    ("奇数", [0, 2, 4, 6, 8]),
+    ("偶数", [1, 3, 5, 7, 9]),
+    ("first-3", [0, 1, 2]),
+    ("last-2", [8, 9]),
+    ("last-20", list(range(10))),
+    ("every-3", [2, 5, 8]),
+    ("every-3rd", [2, 5, 8]),
+    ("every-1", list(range(10))),
+    ("1-3, 5，last-2", [0, 1, 2, 4, 8, 9]),
+    ("11", []),
+])
+def test_parse(spec, expected):
+    assert pages(spec) == expected
+
+@pytest.mark.parametrize("spec", ["0", "abc", "3-1", "-", "1-2-3", "first-0", "every-0", "odd-2"])
+def test_invalid_specs_raise(spec):
+    with pytest.raises(ValueError):
+        PageSet.parse(spec, 10)
+
+def test_large_range_stays_compact():
+    page_set = PageSet.parse("1-99999", 100000)
+    assert page_set.intervals == [(0, 99998)]
+    assert len(page_set) == 99999
+    assert 99998 in page_set and 99999 not in page_set
+    assert [(g.start, g.stop) for g in page_set.groups()] == [(0, 99999)]
+
+def test_strides_stay_compact():
+    page_set = PageSet.parse("odd", 100000)
+    assert page_set.intervals == [] and page_set.strides == [(0, 99998, 2)]
+    assert len(page_set) == 50000
+    assert 99998 in page_set and 99997 not in page_set
+
+@pytest.mark.parametrize("spec", ["odd,every-3", "even,every-4,1-5", "odd,even", "every-2,every-3,last-4",
+                                  "odd,1-10", "every-5,3,7-8"])
+def test_union_matches_expanded_pages(spec):
+    total = 30
+    expected = set()
+    for term in spec.split(","):
+        if term in ("odd", "even"):
+            expected |= set(range(0 if term == "odd" else 1, total, 2))
+        elif term.startswith("every-"):
+            step = int(term[len("every-"):])
+            expected |= set(range(step - 1, total, step))
+        else:
+            expected |= set(pages(term, total))
+    page_set = PageSet.parse(spec, total)
+    assert list(page_set) == sorted(expected)
+    assert len(page_set) == len(expected)
+    assert [i for i in range(-2, total + 2) if i in page_set] == sorted(expected)
+    assert [i for group in page_set.groups() for i in group] == sorted(expected)
+
+def test_groups_split_on_gaps():
+    page_set = PageSet.parse("1-3,5,odd", 9)
+    assert [list(g) for g in page_set.groups()] == [[0, 1, 2], [4], [6], [8]]
+    assert page_set.format() == "1-3,5,7,9"
+
+def test_add_and_discard():
+    page_set = PageSet.parse("1-3,7", 10)
+    page_set.add(3)
+    page_set.add(5)
+    page_set.add(4)
+    assert page_set.intervals == [(0, 6)]
+    page_set.discard(0)
+    page_set.discard(6)
+    page_set.discard(9)
+    assert list(page_set) == [1, 2, 3, 4, 5]
+    assert page_set == PageSet.from_indices([5, 4, 3, 2, 1, 1])
+
+def test_add_and_discard_strides():
+    page_set = PageSet.parse("odd", 10)
+    page_set.discard(4)
+    assert list(page_set) == [0, 2, 6, 8]
+    assert 4 not in page_set and len(page_set) == 4
+    page_set.add(4)
+    page_set.add(5)
+    assert list(page_set) == [0, 2, 4, 5, 6, 8]
+    assert len(page_set) == 6
+
+def test_equality_ignores_representation():
+    assert PageSet.parse("odd", 5) == PageSet.parse("1,3,5", 5)
+    assert PageSet.parse("odd,even", 6) == PageSet.all(6)
+    assert PageSet.parse("odd", 6) != PageSet.parse("even", 6)
+
+def test_copy_is_independent():
+    page_set = PageSet.parse("odd", 10)
+    copy = page_set.copy()
+    copy.discard(0)
+    assert 0 in page_set and 0 not in copy
+
+def test_empty():
+    assert not PageSet()
+    assert not PageSet.all(0)
+    assert len(PageSet.parse("20-30", 10)) == 0
+    assert PageSet().format() == ""